@@ -0,0 +1,89 @@
+"""パッケージのインポート時間のベンチマーク
+
+モジュールごとに新しいPythonプロセスでインポートし、-X importtime の累積時間の中央値を計測する。
+GUI以外のモジュールが PySide6・shiboken6・maya をインポートしていないことも確認する。
+
+使い方:
+    python benchmarks/import_time.py --repeat 20 --output import_time.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PYTHON_ROOT = Path(__file__).resolve().parents[1] / "python"
+
+# GUIなしでインポートできる必要があるモジュール
+CORE_MODULES = ["maya_fk_to_ik", "maya_fk_to_ik.app", "maya_fk_to_ik.bake", "maya_fk_to_ik.core.match_info"]
+GUI_MODULES = ["maya_fk_to_ik.gui.gui"]
+FORBIDDEN_PACKAGES = ("PySide6", "shiboken6", "maya")
+
+_IMPORT_TIME_PATTERN = re.compile(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*(\S+)")
+_SCRIPT = "import json, sys; exec(f'import {sys.argv[1]}'); print(json.dumps(sorted(sys.modules)))"
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """新しいプロセスでモジュールをインポートする
+
+    Args:
+        module (str): モジュール名
+
+    Returns:
+        tuple[float, list[str]]: 累積のインポート時間 (ミリ秒) と、インポートされたモジュールの一覧
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT, module],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=PYTHON_ROOT,
+    )
+    cumulative = {name: int(micro_seconds) for micro_seconds, name in _IMPORT_TIME_PATTERN.findall(process.stderr)}
+    return cumulative.get(module, 0) / 1000.0, json.loads(process.stdout)
+
+
+def has_qt() -> bool:
+    """PySide6が使えるかどうか"""
+    try:
+        from PySide6 import QtCore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main() -> int:
+    """ベンチマークのエントリーポイント"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="モジュールごとの計測回数")
+    parser.add_argument("--output", type=Path, help="結果を書き出すJSONファイル")
+    args = parser.parse_args()
+
+    modules = CORE_MODULES + (GUI_MODULES if has_qt() else [])
+    results = []
+    ok = True
+    for module in modules:
+        timings = []
+        for _ in range(args.repeat):
+            milli_seconds, loaded = measure(module)
+            timings.append(milli_seconds)
+        forbidden = sorted({name.split(".")[0] for name in loaded if name.split(".")[0] in FORBIDDEN_PACKAGES})
+        if module in CORE_MODULES and forbidden:
+            ok = False
+
+        result = {"module": module, "median_ms": statistics.median(timings), "min_ms": min(timings), "forbidden": forbidden}
+        results.append(result)
+        mark = f"  imports {', '.join(forbidden)}" if forbidden else ""
+        print(f"{module:<32} median={result['median_ms']:8.2f}ms  min={result['min_ms']:8.2f}ms{mark}")  # noqa: T201
+
+    if args.output:
+        args.output.write_text(json.dumps({"python": sys.version.split()[0], "results": results}, indent=4), encoding="utf-8")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
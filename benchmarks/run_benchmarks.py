@@ -0,0 +1,207 @@
+"""疑似シーン (FakeBackend) を使ったベンチマーク
+
+Mayaのない環境で、マッチ・一括マッチ・ベイク・テーブル描画の処理時間とシーンへの問い合わせ回数を計測する。
+
+使い方:
+    python benchmarks/run_benchmarks.py --sizes 10 100 1000 10000 --output result.json
+    python benchmarks/run_benchmarks.py --baseline result.json  # 前回の結果と比較する
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "python"))
+
+from maya_fk_to_ik import app  # noqa: E402
+from maya_fk_to_ik.backend import set_backend  # noqa: E402
+from maya_fk_to_ik.backend.fake import FakeBackend  # noqa: E402
+from maya_fk_to_ik.bake import bake_fk_to_ik  # noqa: E402
+from maya_fk_to_ik.core.match_info import MatchInfos  # noqa: E402
+from maya_fk_to_ik.core.rotate_type import RotateType  # noqa: E402
+from maya_fk_to_ik.utils.instrumentation import instrumentation  # noqa: E402
+
+CHAIN_LENGTH = 5
+VISIBLE_ROWS = 40
+MIN_COMPARE_SECONDS = 0.01  # これより短い計測は誤差が大きいので時間の比較に使わない
+
+
+def build_scene(backend: FakeBackend, size: int, frames: int) -> MatchInfos:
+    """FKコントローラーとジョイントのチェーンを size 個作成する
+
+    Args:
+        backend (FakeBackend): 疑似シーン
+        size (int): FKコントローラーの数
+        frames (int): ジョイントのアニメーションのフレーム数
+
+    Returns:
+        MatchInfos: 作成したノードのマッチ情報
+    """
+    match_infos = MatchInfos()
+    rotate_types = list(RotateType)
+    fk_root = backend.create_node("fk_root")
+    joint_root = backend.create_node("joint_root")
+    frame_list = list(range(1, frames + 1))
+
+    fk_parent = joint_parent = ""
+    for i in range(size):
+        if i % CHAIN_LENGTH == 0:
+            fk_parent, joint_parent = fk_root, joint_root
+        offset = backend.create_node(f"fk_{i}_offset", fk_parent, translate=(0, 2, 0))
+        fk_ctrl = backend.create_node(f"fk_{i}_ctrl", offset, rotate_order=i % 6)
+        joint = backend.create_node(f"joint_{i}", joint_parent, "joint", translate=(0, 2, 0))
+        for axis, attribute in enumerate(("rotateX", "rotateY", "rotateZ")):
+            values = [(i * 7 + axis * 13 + frame * (axis + 1)) % 90 - 45 for frame in frame_list]
+            backend.set_keyframes(joint, attribute, frame_list, values)
+        match_infos.add(fk_ctrl, joint, rotate_types[i % len(rotate_types)])
+        fk_parent, joint_parent = fk_ctrl, joint
+    return match_infos
+
+
+def bench_match(match_infos: MatchInfos, frames: int) -> Callable[[], None]:  # noqa: ARG001
+    """1行ずつマッチする"""
+    return lambda: [app.match_fk_to_ik(info) for info in match_infos]  # type: ignore
+
+
+def bench_match_many(match_infos: MatchInfos, frames: int) -> Callable[[], None]:  # noqa: ARG001
+    """全行を一括でマッチする"""
+    return lambda: app.match_many_fk_to_ik(list(match_infos))
+
+
+def bench_bake(match_infos: MatchInfos, frames: int) -> Callable[[], None]:
+    """全行をフレーム範囲でベイクする"""
+    return lambda: bake_fk_to_ik(list(match_infos), 1, frames)
+
+
+def bench_table_repaint(match_infos: MatchInfos, frames: int) -> Callable[[], None]:  # noqa: ARG001
+    """テーブルの表示範囲の全セルを10回描画する (モデルの作成は計測しない)"""
+    from maya_fk_to_ik.gui.model import MatchInfoTableModel
+
+    model = MatchInfoTableModel(match_infos)
+    rows = min(VISIBLE_ROWS, model.rowCount())
+
+    def repaint() -> None:
+        for _ in range(10):
+            for row in range(rows):
+                for column in range(model.columnCount()):
+                    model.data(model.index(row, column))
+    return repaint
+
+
+def has_qt() -> bool:
+    """PySide6が使えるかどうか"""
+    try:
+        from PySide6 import QtCore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+BENCHMARKS: dict[str, Callable[[MatchInfos, int], Callable[[], None]]] = {
+    "match": bench_match,
+    "match_many": bench_match_many,
+    "bake": bench_bake,
+    "table_repaint": bench_table_repaint,
+}
+
+
+def run(sizes: list[int], frames: int, latency: float, names: list[str], instrument: bool = False) -> list[dict]:
+    """ベンチマークを実行する
+
+    instrument が True の場合は、ステージごとの計測結果も記録する (計測自体のオーバーヘッドが加わる)
+
+    Returns:
+        list[dict]: 各ベンチマークの結果
+    """
+    results = []
+    for name in names:
+        if name == "table_repaint" and not has_qt():
+            print(f"{name}: skipped (PySide6 is not installed)")  # noqa: T201
+            continue
+        for size in sizes:
+            backend = FakeBackend()
+            set_backend(backend)
+            match_infos = build_scene(backend, size, frames)
+            benchmark = BENCHMARKS[name](match_infos, frames)
+            backend.reset_counters()
+            backend.latency = latency
+            instrumentation.reset()
+            instrumentation.enable(instrument)
+
+            start = time.perf_counter()
+            benchmark()
+            seconds = time.perf_counter() - start
+
+            result = {
+                "name": name,
+                "size": size,
+                "frames": frames,
+                "seconds": seconds,
+                "scene_calls": sum(backend.call_counts.values()),
+                "calls": dict(backend.call_counts),
+            }
+            if instrument:
+                result["stages"] = instrumentation.report()["stages"]
+            results.append(result)
+            print(f"{name:>14} size={size:>6} {seconds:10.4f}s  scene calls={result['scene_calls']}")  # noqa: T201
+    set_backend(None)
+    instrumentation.enable(False)
+    return results
+
+
+def compare(results: list[dict], baseline_file: Path, threshold: float) -> bool:
+    """前回の結果と比較し、threshold 倍より遅くなったものを表示する
+
+    Returns:
+        bool: 遅くなったものがなければTrue
+    """
+    baseline = {(item["name"], item["size"]): item for item in json.loads(baseline_file.read_text())["results"]}
+    ok = True
+    for result in results:
+        old = baseline.get((result["name"], result["size"]))
+        if not old or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        slower = ratio > threshold and result["seconds"] > MIN_COMPARE_SECONDS
+        regressed = slower or result["scene_calls"] > old["scene_calls"]
+        ok = ok and not regressed
+        mark = "REGRESSION" if regressed else "ok"
+        print(f"{result['name']:>14} size={result['size']:>6} x{ratio:6.2f}  {mark}")  # noqa: T201
+    return ok
+
+
+def main() -> int:
+    """ベンチマークのエントリーポイント"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--frames", type=int, default=10, help="ベイクとジョイントのアニメーションのフレーム数")
+    parser.add_argument("--latency", type=float, default=0.0, help="シーンへの問い合わせ1回ごとに加える遅延 (秒)")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--instrument", action="store_true", help="ステージごとの計測結果も記録する")
+    parser.add_argument("--output", type=Path, help="結果を書き出すJSONファイル")
+    parser.add_argument("--baseline", type=Path, help="比較する前回の結果のJSONファイル")
+    parser.add_argument("--threshold", type=float, default=1.25, help="遅くなったとみなす比率")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.frames, args.latency, args.benchmarks, args.instrument)
+    if args.output:
+        report = {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=4), encoding="utf-8")
+    if args.baseline:
+        return 0 if compare(results, args.baseline, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,23 @@
-import maya.OpenMayaUI as omui  # noqa: N813 # type: ignore
-import shiboken6
-from PySide6 import QtWidgets
+from __future__ import annotations
 
-from .gui.gui import MatchFKToIKGUI
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PySide6 import QtWidgets
 
 
 def _get_maya_main_window() -> QtWidgets.QWidget:
+    import maya.OpenMayaUI as omui  # noqa: N813 # type: ignore
+    import shiboken6
+    from PySide6 import QtWidgets
+
     main_window_ptr = omui.MQtUtil.mainWindow()
     return shiboken6.wrapInstance(int(main_window_ptr), QtWidgets.QWidget)  # type: ignore
 
 
 def show() -> None:
     """MatchFKToIKGUIを表示する"""
+    from .gui.gui import MatchFKToIKGUI
+
     gui = MatchFKToIKGUI(_get_maya_main_window())
     gui.show()
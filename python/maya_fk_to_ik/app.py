@@ -1,11 +1,64 @@
 from __future__ import annotations
 
-import maya.cmds as cmds  # type: ignore
+import functools
+import inspect
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence, TypeVar
 
-from .core.const import DEFAULT_MATCH_INFO_FILE_NAME, DEFAULT_SETTINGS_FOLDER_PATH
-from .core.match_info import MatchInfo, MatchInfos
+import numpy as np
+
+from .backend import SceneBackend, bind_backend, get_backend, use_backend
+from .bake import bake_fk_to_ik, iter_bake_fk_to_ik
+from .core.const import (
+    AUTO_PAIR_MAX_DEPTH,
+    DEFAULT_MATCH_INFO_FILE_NAME,
+    DEFAULT_SETTINGS_FOLDER_PATH,
+    ROTATE_TYPE_TOLERANCE_DEGREES,
+    VERIFY_ANGLE_TOLERANCE_DEGREES,
+    VERIFY_POSITION_TOLERANCE,
+)
+from .core.hierarchy import sort_by_hierarchy
+from .core.match_info import MatchInfo, MatchInfos, expand_template, make_template
+from .core.matrix import (
+    capture_offsets,
+    compile_offsets,
+    compute_mirrored_fk_world,
+    compute_target_matrices,
+    find_nearest_rotate_types,
+    get_offset_matrices,
+    remove_offset_scale,
+    to_matrices,
+)
+from .core.mirror import DEFAULT_MIRROR_RULES, NameMirror
+from .core.profile_store import get_rig_name, get_scene_rig_names
 from .core.rotate_type import RotateType
-from .utils.decorator import undo_decorator
+from .scene import find_template_namespaces, iter_find_pair_proposals, query_current_world_matrices, resolve_match_infos
+from .utils.decorator import undo_decorator, undo_disabled
+from .utils.instrumentation import STAGE_COMPUTE, STAGE_QUERY, STAGE_RESOLVE, STAGE_SET, instrumentation
+from .utils.job import Job, record_job_changes, run_to_completion
+from .verify import iter_verify_fk_to_ik
+
+if TYPE_CHECKING:
+    from .core.connection_index import PairProposal
+    from .core.bake_cache import BakeCache
+    from .core.key_reduction import CurveFilter
+    from .core.profile_store import ProfileStore, RigSwitch
+    from .utils.job import Steps
+    from .verify import VerifyReport
+
+MATCH_CHUNK = 50  # マッチを1単位として進める行数
+# マッチでワールド行列を設定したときに変わるアトリビュート
+MATCH_ATTRIBUTES = tuple(f"{name}{axis}" for name in ("translate", "rotate", "scale") for axis in "XYZ")
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+@dataclass
+class RotateTypeDetection:
+    """回転タイプの自動検出結果を保持するデータクラス"""
+    info: MatchInfo
+    rotate_type: RotateType
+    residual: float  # 最も近い回転タイプとの角度差 (度)
 
 
 @undo_decorator("Match FK to IK")
@@ -15,22 +68,370 @@ def match_fk_to_ik(info: MatchInfo) -> None:
     Args:
         info (MatchInfo): マッチ情報を保持するデータクラスのインスタンス
     """
-    mat = cmds.xform(info.joint, q=True, ws=True, m=True)  # type: ignore
-    cmds.xform(info.fk_ctrl, ws=True, m=mat)  # type: ignore
-    cmds.rotate(*RotateType.from_string(info.type), info.fk_ctrl, cs=True, r=True)  # type: ignore
+    backend = get_backend()
+    instrumentation.add_count("rows")
+    with instrumentation.stage(STAGE_QUERY):
+        joint_world = to_matrices(backend.get_world_matrix(info.joint))
+    with instrumentation.stage(STAGE_COMPUTE):
+        target_world = compute_target_matrices(joint_world[np.newaxis], [info])[0]
+    with instrumentation.stage(STAGE_SET):
+        backend.set_world_matrix(info.fk_ctrl, target_world.flatten().tolist())
+
+
+def iter_match_many_fk_to_ik(infos: Sequence[MatchInfo]) -> Steps[None]:
+    """複数のFKコントローラーの回転をまとめてジョイントに合わせる
+
+    先に全ジョイントのワールド行列を取得してから、親が子より先になる順番でFKコントローラーに適用する。
+    行列の取得と適用は MATCH_CHUNK 行ずつを1単位として進捗を返す
+
+    Args:
+        infos (Sequence[MatchInfo]): マッチ情報のリスト
+
+    Yields:
+        tuple[int, int]: 完了した単位数と全体の単位数
+    """
+    infos_by_path = resolve_match_infos(infos)
+    if not infos_by_path:
+        return
+
+    fk_ctrls = sort_by_hierarchy(infos_by_path)
+    rows = [infos_by_path[fk_ctrl] for fk_ctrl in fk_ctrls]
+
+    backend = get_backend()
+    instrumentation.add_count("rows", len(rows))
+    chunks = [range(i, min(i + MATCH_CHUNK, len(rows))) for i in range(0, len(rows), MATCH_CHUNK)]
+    total = len(chunks) * 2
+    joint_world = np.empty((len(rows), 4, 4))
+    for done, chunk in enumerate(chunks, 1):
+        joint_world[chunk.start:chunk.stop] = query_current_world_matrices([rows[row].joint for row in chunk])
+        yield done, total
+    with instrumentation.stage(STAGE_COMPUTE):
+        target_world = compute_target_matrices(joint_world, rows)
+    for done, chunk in enumerate(chunks, len(chunks) + 1):
+        record_job_changes([(fk_ctrls[row], attribute) for row in chunk for attribute in MATCH_ATTRIBUTES])
+        with instrumentation.stage(STAGE_SET):
+            for row in chunk:
+                backend.set_world_matrix(fk_ctrls[row], target_world[row].flatten().tolist())
+        yield done, total
+
+
+@undo_decorator("Match FK to IK")
+def match_many_fk_to_ik(infos: Sequence[MatchInfo]) -> None:
+    """複数のFKコントローラーの回転をまとめてジョイントに合わせる
+
+    処理の内容は iter_match_many_fk_to_ik() を参照
+
+    Args:
+        infos (Sequence[MatchInfo]): マッチ情報のリスト
+    """
+    run_to_completion(iter_match_many_fk_to_ik(infos))
+
+
+def detect_rotate_types(infos: Sequence[MatchInfo]) -> list[RotateTypeDetection]:
+    """FK状態の現在のポーズから、各マッチ情報の回転タイプを求める
+
+    Args:
+        infos (Sequence[MatchInfo]): マッチ情報のリスト
+
+    Returns:
+        list[RotateTypeDetection]: 各マッチ情報の検出結果
+    """
+    rows = list(resolve_match_infos(infos).values())
+    if not rows:
+        return []
+
+    fk_world = query_current_world_matrices([info.fk_ctrl for info in rows])
+    joint_world = query_current_world_matrices([info.joint for info in rows])
+    rotate_types, residuals = find_nearest_rotate_types(fk_world, joint_world, preferred=[info.type for info in rows])
+    return [
+        RotateTypeDetection(info, rotate_type, float(residual))
+        for info, rotate_type, residual in zip(rows, rotate_types, np.degrees(residuals))
+    ]
+
+
+def capture_match_offsets(infos: Sequence[MatchInfo]) -> list[MatchInfo]:
+    """FK状態の現在のポーズ (バインドポーズなど) から、各マッチ情報のオフセットを求めて設定する
+
+    回転タイプには、オフセットの回転に最も近いものを設定する (オフセットを解除したときに使う)
+
+    Args:
+        infos (Sequence[MatchInfo]): マッチ情報のリスト
+
+    Returns:
+        list[MatchInfo]: オフセットを設定したマッチ情報
+    """
+    rows = list(resolve_match_infos(infos).values())
+    if not rows:
+        return []
+
+    world = query_current_world_matrices([info.fk_ctrl for info in rows] + [info.joint for info in rows])
+    fk_world, joint_world = world[:len(rows)], world[len(rows):]
+    with instrumentation.stage(STAGE_COMPUTE):
+        offsets = capture_offsets(fk_world, joint_world)
+        rotate_types, _ = find_nearest_rotate_types(fk_world, joint_world, preferred=[info.type for info in rows])
+    for info, offset, rotate_type in zip(rows, offsets, rotate_types):
+        info.offset = offset
+        info.type = rotate_type
+    return rows
+
+
+def mirror_match_infos(
+    infos: Sequence[MatchInfo],
+    rules: Sequence[tuple[str, str]] = DEFAULT_MIRROR_RULES,
+    mirror_axis: int = 0,
+) -> list[RotateTypeDetection]:
+    """マッチ情報の左右を入れ替えた行を作り、反対側の回転タイプを求める
+
+    左右のノードがミラーの関係にあるポーズ (バインドポーズなど) で実行する。
+    作った行のノードの存在とタイプは、1回のクエリでまとめて確認する
+
+    Args:
+        infos (Sequence[MatchInfo]): 元のマッチ情報
+        rules (Sequence[tuple[str, str]]): 左右の名前の置換ルール
+        mirror_axis (int): ミラーの軸 (0: X, 1: Y, 2: Z)
+
+    Returns:
+        list[RotateTypeDetection]: 左右を入れ替えた行と、その回転タイプの検出結果
+    """
+    backend = get_backend()
+    pairs = NameMirror(rules).mirror_match_infos(infos)
+    if not pairs:
+        return []
+
+    count = len(pairs)
+    with instrumentation.stage(STAGE_RESOLVE):
+        node_types = backend.node_types(
+            [source.fk_ctrl for source, _ in pairs] + [source.joint for source, _ in pairs]
+            + [mirrored.fk_ctrl for _, mirrored in pairs] + [mirrored.joint for _, mirrored in pairs],
+        )
+    valid_pairs = []
+    for i, (source, mirrored) in enumerate(pairs):
+        source_fk_type, source_joint_type, fk_type, joint_type = node_types[i::count]
+        if source_fk_type is None or source_joint_type is None:
+            backend.warning(f"Node not found for match info: {source.fk_ctrl} / {source.joint}")
+        elif fk_type is None or joint_type is None:
+            backend.warning(f"Node not found for mirrored match info: {mirrored.fk_ctrl} / {mirrored.joint}")
+        elif joint_type != "joint":
+            backend.warning(f"Mirrored object '{mirrored.joint}' is not a joint.")
+        else:
+            valid_pairs.append((source, mirrored))
+    if not valid_pairs:
+        return []
+
+    count = len(valid_pairs)
+    world = query_current_world_matrices(
+        [source.fk_ctrl for source, _ in valid_pairs] + [source.joint for source, _ in valid_pairs]
+        + [mirrored.fk_ctrl for _, mirrored in valid_pairs] + [mirrored.joint for _, mirrored in valid_pairs],
+    )
+    fk_world, joint_world, mirrored_fk_world, mirrored_joint_world = (world[i * count:(i + 1) * count] for i in range(4))
+    source_types = [source.type for source, _ in valid_pairs]
+    with instrumentation.stage(STAGE_COMPUTE):
+        sources = [source for source, _ in valid_pairs]
+        target_world = compute_mirrored_fk_world(
+            fk_world, remove_offset_scale(joint_world, sources), compile_offsets(sources), mirrored_fk_world, mirror_axis,
+        )
+        rotate_types, residuals = find_nearest_rotate_types(target_world, mirrored_joint_world, preferred=source_types)
+        # オフセットを持つ行は、反対側でもオフセットを使う
+        custom_rows = [row for row, (source, _) in enumerate(valid_pairs) if source.offset is not None]
+        offsets = dict(zip(custom_rows, capture_offsets(target_world[custom_rows], mirrored_joint_world[custom_rows])))
+
+    detections = []
+    for row, ((_, mirrored), rotate_type, residual) in enumerate(zip(valid_pairs, rotate_types, np.degrees(residuals))):
+        mirrored.type = rotate_type
+        mirrored.offset = offsets.get(row)
+        # オフセットを持つ行は、回転タイプではなくオフセットでマッチするため角度差は0とする
+        detections.append(RotateTypeDetection(mirrored, rotate_type, 0.0 if mirrored.offset is not None else float(residual)))
+    return detections
+
+
+class RotateTypePreview:
+    """回転タイプの候補をUndoに記録せずにプレビューするクラス
+
+    作成時にFKコントローラーのローカルのトランスフォームを保存し、全回転タイプの結果を一度に計算しておく。
+    preview() と restore() はUndoに記録せずに直接書き込み、commit() で1回だけUndo可能な書き込みを行う。
+    """
+
+    CHANNELS = (
+        "translateX", "translateY", "translateZ",
+        "rotateX", "rotateY", "rotateZ",
+        "scaleX", "scaleY", "scaleZ",
+    )
+
+    def __init__(self, info: MatchInfo) -> None:
+        """
+        Args:
+            info (MatchInfo): プレビューするマッチ情報
+
+        Raises:
+            ValueError: FKコントローラーまたはジョイントが存在しない場合
+        """
+        infos_by_path = resolve_match_infos([info])
+        if not infos_by_path:
+            msg = f"Node not found for match info: {info.fk_ctrl} / {info.joint}"
+            raise ValueError(msg)
+
+        backend = get_backend()
+        self.fk_ctrl = next(iter(infos_by_path))
+        self.snapshot = {
+            channel: backend.get_attr(self.fk_ctrl, channel)
+            for channel in self.CHANNELS
+            if not backend.is_locked(self.fk_ctrl, channel)
+        }
+
+        joint_world = query_current_world_matrices([info.joint])[0]
+        rotate_types = list(RotateType)
+        target_world = get_offset_matrices(rotate_types) @ joint_world
+        self.targets = {rotate_type: matrix.flatten().tolist() for rotate_type, matrix in zip(rotate_types, target_world)}
+
+    def preview(self, rotate_type: RotateType) -> None:
+        """回転タイプの結果をUndoに記録せずに適用する
+
+        Args:
+            rotate_type (RotateType): プレビューする回転タイプ
+        """
+        with undo_disabled():
+            get_backend().set_world_matrix(self.fk_ctrl, self.targets[RotateType(rotate_type)])
+
+    def restore(self) -> None:
+        """保存したトランスフォームにUndoに記録せずに戻す"""
+        backend = get_backend()
+        with undo_disabled():
+            for channel, value in self.snapshot.items():
+                backend.set_attr(self.fk_ctrl, channel, value)
+
+    @undo_decorator("Match FK to IK")
+    def commit(self, rotate_type: RotateType) -> None:
+        """保存したトランスフォームに戻してから、回転タイプの結果をUndo可能な1回の書き込みで適用する
+
+        Args:
+            rotate_type (RotateType): 適用する回転タイプ
+        """
+        self.restore()
+        with instrumentation.stage(STAGE_SET):
+            get_backend().set_world_matrix(self.fk_ctrl, self.targets[RotateType(rotate_type)])
+
+
+def _with_instance_backend(func: _F) -> _F:
+    """MatchFKToIK のメソッドを、インスタンスのバックエンドを使って実行するデコレーター
+
+    少しずつ実行する処理 (ジェネレーター) を返すメソッドは、1回ごとの処理をインスタンスのバックエンドで実行する
+    """
+    @functools.wraps(func)
+    def wrapper(self: MatchFKToIK, *args, **kwargs) -> Any:  # noqa: ANN002, ANN003, ANN401
+        with use_backend(self.backend):
+            result = func(self, *args, **kwargs)
+        if inspect.isgenerator(result):
+            return bind_backend(self.backend, result)
+        return result
+    return wrapper  # type: ignore
 
 
 class MatchFKToIK:
     """FKコントローラーの回転をジョイントに合わせるためのクラス"""
 
-    def __init__(self) -> None:
-        self.match_infos = MatchInfos()
+    def __init__(
+        self,
+        backend: SceneBackend | None = None,
+        match_infos: MatchInfos | None = None,
+        profile_store: ProfileStore | None = None,
+        bake_cache: BakeCache | None = None,
+        compact_undo: bool = False,
+        curve_filter: CurveFilter | None = None,
+    ) -> None:
+        """
+        Args:
+            backend (SceneBackend, optional): このインスタンスで使用するバックエンド (例: Om2Backend)。
+                省略時は現在のバックエンドを使う。指定しても、ほかの処理が使う現在のバックエンドは変更しない
+            match_infos (MatchInfos, optional): 共有するマッチ情報
+            profile_store (ProfileStore, optional): リグごとのプロファイルの保存先
+            bake_cache (BakeCache, optional): ベイク結果のキャッシュ。指定した場合は変更された部分だけを計算し直す
+            compact_undo (bool): ベイクのUndoを、キーの書き込みの記録ではなく書き込む前のカーブのスナップショットで行うかどうか
+            curve_filter (CurveFilter, optional): ベイクしたカーブを書き込む前の後処理 (Euler Filter・キーの削減) の設定
+
+        match_infos も profile_store も省略した場合は、初期設定ファイルからマッチ情報を1回だけ読み込む。
+        profile_store を指定した場合は、シーンに含まれるリグのプロファイルを読み込む。
+        """
+        self.backend = backend
+        self.profile_store = profile_store
+        self.bake_cache = bake_cache
+        self.compact_undo = compact_undo
+        self.curve_filter = curve_filter
+
+        if match_infos is not None:
+            self.match_infos = match_infos
+        elif profile_store is not None:
+            self.match_infos = MatchInfos()
+            self.load_scene_profiles()
+        else:
+            # 初期設定ファイルからマッチ情報を読み込む
+            self.match_infos = MatchInfos()
+            match_info_file = DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_MATCH_INFO_FILE_NAME
+            if match_info_file.exists():
+                self.match_infos.load_json(match_info_file)
+
+    @_with_instance_backend
+    def get_scene_rigs(self) -> list[str]:
+        """シーンに含まれるリグの名前 (ネームスペース、なければ最上位のノードのロング名) の一覧を取得する
+
+        Returns:
+            list[str]: リグの名前
+        """
+        backend = get_backend()
+        return get_scene_rig_names(backend.get_namespaces(), backend.get_root_nodes())
 
-        # 初期設定ファイルからマッチ情報を読み込む
-        match_info_file = DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_MATCH_INFO_FILE_NAME
-        if match_info_file.exists():
-            self.match_infos.load_json(match_info_file)
+    @_with_instance_backend
+    def load_scene_switches(self) -> list[RigSwitch]:
+        """シーンに含まれるリグのIK/FKスイッチの設定を読み込む
 
+        Returns:
+            list[RigSwitch]: 設定されているスイッチ
+        """
+        if self.profile_store is None:
+            msg = "No profile store is set."
+            raise ValueError(msg)
+        return self.profile_store.load_switches(self.get_scene_rigs())
+
+    @_with_instance_backend
+    def load_scene_profiles(self) -> int:
+        """シーンに含まれるリグのプロファイルだけを読み込み、マッチ情報を置き換える
+
+        ネームスペースがなく、ロング名でもない行はリグを区別できず、すべてのシーンで読み込まれるため警告を表示する
+
+        Returns:
+            int: 読み込んだ行の数
+        """
+        if self.profile_store is None:
+            msg = "No profile store is set."
+            raise ValueError(msg)
+        # 読み込み中の置き換えはプロファイルに書き込まない
+        self.profile_store.detach()
+        infos = self.profile_store.load(self.get_scene_rigs())
+        unidentified = [info.fk_ctrl for info in infos if not get_rig_name(info)]
+        if unidentified:
+            get_backend().warning(
+                f"{len(unidentified)} profile rows have no namespace or long name and are shared by every rig "
+                f"(e.g. {unidentified[0]}). Re-register them with long names.",
+            )
+        self.match_infos.clear()
+        for info in infos:
+            self.match_infos.add(info.fk_ctrl, info.joint, info.type, info.offset)
+        self.profile_store.attach(self.match_infos)
+        return len(infos)
+
+    def save_profiles(self) -> int:
+        """プロファイルの変更された行だけを保存する
+
+        load_scene_profiles() の後の変更は都度書き込まれているため、通常は何も書き込まない
+
+        Returns:
+            int: 書き込んだ行の数
+        """
+        if self.profile_store is None:
+            msg = "No profile store is set."
+            raise ValueError(msg)
+        return self.profile_store.save(self.match_infos)
+
+    @_with_instance_backend
     def match(self, fk_ctrl: str, override_match_info: MatchInfo | None = None) -> None:
         """FKコントローラーに対応するジョイントの回転を合わせる
 
@@ -42,7 +443,345 @@ class MatchFKToIK:
         if match_info:
             match_fk_to_ik(match_info)
         else:
-            cmds.warning(f"No match info found for FK controller: {fk_ctrl}")
+            get_backend().warning(f"No match info found for FK controller: {fk_ctrl}")
+
+    @_with_instance_backend
+    def match_many(self, infos: Sequence[MatchInfo]) -> None:
+        """複数のFKコントローラーを1つのUndoチャンクでまとめてジョイントに合わせる
+
+        Args:
+            infos (Sequence[MatchInfo]): マッチ情報のリスト
+        """
+        match_many_fk_to_ik(infos)
+
+    @_with_instance_backend
+    def match_namespaces(self, namespaces: Sequence[str] | None = None, infos: Sequence[MatchInfo] | None = None) -> list[str]:
+        """マッチ情報をテンプレートとして、複数のネームスペースのリグをまとめてジョイントに合わせる
+
+        マッチ情報のネームスペースを取り除いたテンプレートを各ネームスペースに展開し、1つのUndoチャンクでマッチする
+
+        Args:
+            namespaces (Sequence[str], optional): 対象のネームスペース。省略時はテンプレートのFKコントローラーが存在するすべてのネームスペース
+            infos (Sequence[MatchInfo], optional): テンプレートにするマッチ情報。省略時は登録されているすべてのマッチ情報
+
+        Returns:
+            list[str]: マッチしたネームスペース
+        """
+        return Job("Match FK to IK", self.iter_match_namespaces(namespaces, infos)).run()
+
+    @_with_instance_backend
+    def iter_match_namespaces(
+        self, namespaces: Sequence[str] | None = None, infos: Sequence[MatchInfo] | None = None,
+    ) -> Steps[list[str]]:
+        """match_namespaces() を少しずつ実行する (Undoチャンクは開かない)
+
+        Args:
+            namespaces (Sequence[str], optional): 対象のネームスペース。省略時はテンプレートのFKコントローラーが存在するすべてのネームスペース
+            infos (Sequence[MatchInfo], optional): テンプレートにするマッチ情報。省略時は登録されているすべてのマッチ情報
+
+        Yields:
+            tuple[int, int]: 完了した単位数と全体の単位数
+
+        Returns:
+            list[str]: マッチしたネームスペース
+        """
+        template = make_template(self.match_infos if infos is None else infos)
+        if namespaces is None:
+            namespaces = find_template_namespaces(template)
+        yield from iter_match_many_fk_to_ik(expand_template(template, namespaces))
+        return list(namespaces)
+
+    @_with_instance_backend
+    def bake_namespaces(
+        self,
+        start: int,
+        end: int,
+        namespaces: Sequence[str] | None = None,
+        infos: Sequence[MatchInfo] | None = None,
+    ) -> list[str]:
+        """マッチ情報をテンプレートとして、複数のネームスペースのリグをまとめてベイクする
+
+        Args:
+            start (int): 開始フレーム
+            end (int): 終了フレーム (含む)
+            namespaces (Sequence[str], optional): 対象のネームスペース。省略時はテンプレートのFKコントローラーが存在するすべてのネームスペース
+            infos (Sequence[MatchInfo], optional): テンプレートにするマッチ情報。省略時は登録されているすべてのマッチ情報
+
+        Returns:
+            list[str]: ベイクしたネームスペース
+        """
+        return Job("Bake FK to IK", self.iter_bake_namespaces(start, end, namespaces, infos)).run()
+
+    @_with_instance_backend
+    def iter_bake_namespaces(
+        self,
+        start: int,
+        end: int,
+        namespaces: Sequence[str] | None = None,
+        infos: Sequence[MatchInfo] | None = None,
+    ) -> Steps[list[str]]:
+        """bake_namespaces() を少しずつ実行する (Undoチャンクは開かない)
+
+        Args:
+            start (int): 開始フレーム
+            end (int): 終了フレーム (含む)
+            namespaces (Sequence[str], optional): 対象のネームスペース。省略時はテンプレートのFKコントローラーが存在するすべてのネームスペース
+            infos (Sequence[MatchInfo], optional): テンプレートにするマッチ情報。省略時は登録されているすべてのマッチ情報
+
+        Yields:
+            tuple[int, int]: 完了した単位数と全体の単位数
+
+        Returns:
+            list[str]: ベイクしたネームスペース
+        """
+        template = make_template(self.match_infos if infos is None else infos)
+        if namespaces is None:
+            namespaces = find_template_namespaces(template)
+        yield from iter_bake_fk_to_ik(expand_template(template, namespaces), start, end, self.bake_cache, self.compact_undo, self.curve_filter)
+        return list(namespaces)
+
+    @_with_instance_backend
+    def detect_rotate_types(self, tolerance: float = ROTATE_TYPE_TOLERANCE_DEGREES) -> list[RotateTypeDetection]:
+        """登録されているすべてのマッチ情報の回転タイプを自動で検出して設定する
+
+        FK状態のポーズで実行する。角度差が tolerance を超える行は変更しない。
+
+        Args:
+            tolerance (float): 一致とみなす角度差 (度)
+
+        Returns:
+            list[RotateTypeDetection]: 各マッチ情報の検出結果
+        """
+        detections = detect_rotate_types(list(self.match_infos))
+        for detection in detections:
+            if detection.residual <= tolerance:
+                detection.info.type = detection.rotate_type
+                detection.info.offset = None
+                self.match_infos.edit(detection.info.fk_ctrl, detection.info)
+        return detections
+
+    @_with_instance_backend
+    def capture_offsets(self, infos: Sequence[MatchInfo] | None = None) -> list[MatchInfo]:
+        """FK状態の現在のポーズ (バインドポーズなど) から、マッチ情報のオフセットを求めて設定する
+
+        回転タイプ (0度・180度の反転) で表せない向きや位置のずれがあるリグで使う
+
+        Args:
+            infos (Sequence[MatchInfo], optional): 対象のマッチ情報。省略時は登録されているすべての行
+
+        Returns:
+            list[MatchInfo]: オフセットを設定したマッチ情報
+        """
+        captured = capture_match_offsets(list(self.match_infos) if infos is None else infos)
+        for info in captured:
+            if self.match_infos.get(info.fk_ctrl) is not None:
+                self.match_infos.edit(info.fk_ctrl, info)
+        return captured
+
+    @_with_instance_backend
+    def clear_offsets(self, infos: Sequence[MatchInfo] | None = None) -> int:
+        """マッチ情報のオフセットを解除し、回転タイプでマッチするようにする
+
+        Args:
+            infos (Sequence[MatchInfo], optional): 対象のマッチ情報。省略時は登録されているすべての行
+
+        Returns:
+            int: オフセットを解除した行の数
+        """
+        cleared = 0
+        for info in list(self.match_infos) if infos is None else infos:
+            if info.offset is not None:
+                info.offset = None
+                if self.match_infos.get(info.fk_ctrl) is not None:
+                    self.match_infos.edit(info.fk_ctrl, info)
+                cleared += 1
+        return cleared
+
+    @_with_instance_backend
+    def mirror(
+        self,
+        infos: Sequence[MatchInfo] | None = None,
+        rules: Sequence[tuple[str, str]] = DEFAULT_MIRROR_RULES,
+        mirror_axis: int = 0,
+        overwrite: bool = False,
+    ) -> list[RotateTypeDetection]:
+        """マッチ情報の左右を入れ替えた行を、反対側の回転タイプを求めて追加する
+
+        左右のノードがミラーの関係にあるポーズ (バインドポーズなど) で実行する
+
+        Args:
+            infos (Sequence[MatchInfo], optional): 元のマッチ情報。省略時は登録されているすべての行
+            rules (Sequence[tuple[str, str]]): 左右の名前の置換ルール
+            mirror_axis (int): ミラーの軸 (0: X, 1: Y, 2: Z)
+            overwrite (bool): 反対側の行が登録済みの場合に上書きするかどうか
+
+        Returns:
+            list[RotateTypeDetection]: 追加 (上書き) した行と、その回転タイプの検出結果
+        """
+        if infos is None:
+            infos = list(self.match_infos)
+        detections = []
+        for detection in mirror_match_infos(infos, rules, mirror_axis):
+            info = detection.info
+            if self.match_infos.get(info.fk_ctrl) is None:
+                self.match_infos.add(info.fk_ctrl, info.joint, info.type, info.offset)
+            elif overwrite:
+                self.match_infos.edit(info.fk_ctrl, info)
+            else:
+                continue
+            detections.append(detection)
+        return detections
+
+    @_with_instance_backend
+    def propose_pairs(self, roots: Sequence[str] | None = None, max_depth: int = AUTO_PAIR_MAX_DEPTH) -> list[PairProposal]:
+        """リグの接続から、FKコントローラーとジョイントの組み合わせを提案する
+
+        登録済みのFKコントローラーは除く。提案した組み合わせは add_pairs() で追加する
+
+        Args:
+            roots (Sequence[str], optional): リグのルートノード。省略時は選択しているノード
+            max_depth (int): 接続をたどる際に経由するノードの最大数
+
+        Returns:
+            list[PairProposal]: 信頼度の高い順の候補
+        """
+        return run_to_completion(self.iter_propose_pairs(roots, max_depth))
+
+    @_with_instance_backend
+    def iter_propose_pairs(
+        self, roots: Sequence[str] | None = None, max_depth: int = AUTO_PAIR_MAX_DEPTH,
+    ) -> Steps[list[PairProposal]]:
+        """propose_pairs() を少しずつ実行する
+
+        Args:
+            roots (Sequence[str], optional): リグのルートノード。省略時は選択しているノード
+            max_depth (int): 接続をたどる際に経由するノードの最大数
+
+        Yields:
+            tuple[int, int]: たどり終えた深さと最大の深さ
+
+        Returns:
+            list[PairProposal]: 信頼度の高い順の候補
+        """
+        if roots is None:
+            roots = get_backend().get_selection()
+        proposals = yield from iter_find_pair_proposals(roots, max_depth)
+        return [proposal for proposal in proposals if self.match_infos.get(proposal.fk_ctrl) is None]
+
+    def add_pairs(self, proposals: Sequence[PairProposal]) -> int:
+        """提案された組み合わせをマッチ情報に追加する
+
+        回転タイプはFFFで追加するため、FK状態のポーズで detect_rotate_types() を実行して設定する
+
+        Args:
+            proposals (Sequence[PairProposal]): 追加する組み合わせ
+
+        Returns:
+            int: 追加した行の数
+        """
+        added = 0
+        for proposal in proposals:
+            if self.match_infos.get(proposal.fk_ctrl) is None:
+                self.match_infos.add(proposal.fk_ctrl, proposal.joint, RotateType.FFF)
+                added += 1
+        return added
+
+    @_with_instance_backend
+    @undo_decorator("Bake FK to IK")
+    def bake(self, infos: Sequence[MatchInfo], start: int, end: int) -> None:
+        """フレーム範囲の全フレームでFKコントローラーをジョイントに合わせてキーを打つ
+
+        Args:
+            infos (Sequence[MatchInfo]): ベイクするマッチ情報
+            start (int): 開始フレーム
+            end (int): 終了フレーム (含む)
+        """
+        bake_fk_to_ik(infos, start, end, self.bake_cache, self.compact_undo, self.curve_filter)
+
+    @_with_instance_backend
+    def iter_match_many(self, infos: Sequence[MatchInfo]) -> Steps[None]:
+        """match_many() を少しずつ実行する (Undoチャンクは開かない)
+
+        Args:
+            infos (Sequence[MatchInfo]): マッチ情報のリスト
+
+        Yields:
+            tuple[int, int]: 完了した単位数と全体の単位数
+        """
+        return iter_match_many_fk_to_ik(infos)
+
+    @_with_instance_backend
+    def iter_bake(self, infos: Sequence[MatchInfo], start: int, end: int) -> Steps[None]:
+        """bake() を少しずつ実行する (Undoチャンクは開かない)
+
+        Args:
+            infos (Sequence[MatchInfo]): ベイクするマッチ情報
+            start (int): 開始フレーム
+            end (int): 終了フレーム (含む)
+
+        Yields:
+            tuple[int, int]: 完了した単位数と全体の単位数
+        """
+        return iter_bake_fk_to_ik(infos, start, end, self.bake_cache, self.compact_undo, self.curve_filter)
+
+    @_with_instance_backend
+    def verify(
+        self,
+        infos: Sequence[MatchInfo],
+        start: int,
+        end: int,
+        angle_tolerance: float = VERIFY_ANGLE_TOLERANCE_DEGREES,
+        position_tolerance: float = VERIFY_POSITION_TOLERANCE,
+        switches: Sequence[RigSwitch] | None = None,
+    ) -> VerifyReport:
+        """フレーム範囲の全フレームで、FKコントローラーがジョイントに合っているかを検証する (シーンは変更しない)
+
+        Args:
+            infos (Sequence[MatchInfo]): 検証するマッチ情報
+            start (int): 開始フレーム
+            end (int): 終了フレーム (含む)
+            angle_tolerance (float): 一致とみなす回転の誤差 (度)
+            position_tolerance (float): 一致とみなす位置の誤差 (シーンの単位)
+            switches (Sequence[RigSwitch], optional): リグのIK/FKスイッチ。省略時はプロファイルから読み込む
+
+        Returns:
+            VerifyReport: 検証結果
+        """
+        steps = self.iter_verify(infos, start, end, angle_tolerance, position_tolerance, switches)
+        return Job("Verify FK to IK", steps, undoable=False).run()
+
+    @_with_instance_backend
+    def iter_verify(
+        self,
+        infos: Sequence[MatchInfo],
+        start: int,
+        end: int,
+        angle_tolerance: float = VERIFY_ANGLE_TOLERANCE_DEGREES,
+        position_tolerance: float = VERIFY_POSITION_TOLERANCE,
+        switches: Sequence[RigSwitch] | None = None,
+    ) -> Steps[VerifyReport]:
+        """verify() を少しずつ実行する
+
+        スイッチがあるリグの行はFK状態とIK状態のジョイントを比べ、ないリグの行は自己整合性だけを確認する
+        (iter_verify_fk_to_ik() を参照)
+
+        Args:
+            infos (Sequence[MatchInfo]): 検証するマッチ情報
+            start (int): 開始フレーム
+            end (int): 終了フレーム (含む)
+            angle_tolerance (float): 一致とみなす回転の誤差 (度)
+            position_tolerance (float): 一致とみなす位置の誤差 (シーンの単位)
+            switches (Sequence[RigSwitch], optional): リグのIK/FKスイッチ。省略時はプロファイルから読み込む
+
+        Yields:
+            tuple[int, int]: 完了した単位数と全体の単位数
+
+        Returns:
+            VerifyReport: 検証結果
+        """
+        if switches is None:
+            switches = self.load_scene_switches() if self.profile_store is not None else []
+        return iter_verify_fk_to_ik(infos, start, end, angle_tolerance, position_tolerance, switches)
 
 
 def main() -> None:
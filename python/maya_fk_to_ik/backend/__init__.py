@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Generator, Iterator, TypeVar
+
+from .base import SceneBackend
+
+_Y = TypeVar("_Y")
+_R = TypeVar("_R")
+
+_backend: SceneBackend | None = None
+
+
+def get_backend() -> SceneBackend:
+    """現在のバックエンドを取得する
+
+    未設定の場合は maya.cmds のバックエンドを作成する
+    """
+    global _backend  # noqa: PLW0603
+    if _backend is None:
+        from .cmds_backend import CmdsBackend
+
+        _backend = CmdsBackend()
+    return _backend
+
+
+def set_backend(backend: SceneBackend | None) -> None:
+    """バックエンドを差し替える (Noneで maya.cmds のバックエンドに戻す)
+
+    Args:
+        backend (SceneBackend | None): 使用するバックエンド
+    """
+    global _backend  # noqa: PLW0603
+    _backend = backend
+
+
+@contextmanager
+def use_backend(backend: SceneBackend | None) -> Iterator[None]:
+    """囲んだ範囲だけ、get_backend() が backend を返すようにする
+
+    Args:
+        backend (SceneBackend | None): 使用するバックエンド。Noneの場合は現在のバックエンドのまま
+    """
+    global _backend  # noqa: PLW0603
+    if backend is None:
+        yield
+        return
+    previous = _backend
+    _backend = backend
+    try:
+        yield
+    finally:
+        _backend = previous
+
+
+def bind_backend(backend: SceneBackend | None, steps: Generator[_Y, None, _R]) -> Generator[_Y, None, _R]:
+    """ジェネレーターの1回ごとの処理 (中断を含む) を、backend を使って実行するようにする
+
+    Args:
+        backend (SceneBackend | None): 使用するバックエンド。Noneの場合は steps をそのまま返す
+        steps (Generator): 処理のジェネレーター
+
+    Returns:
+        Generator: 同じ値をyield・returnするジェネレーター
+    """
+    if backend is None:
+        return steps
+    return _iter_with_backend(backend, steps)
+
+
+def _iter_with_backend(backend: SceneBackend, steps: Generator[_Y, None, _R]) -> Generator[_Y, None, _R]:
+    try:
+        while True:
+            with use_backend(backend):
+                try:
+                    value = next(steps)
+                except StopIteration as e:
+                    return e.value
+            yield value
+    finally:
+        with use_backend(backend):
+            steps.close()
+
+
+__all__ = ["SceneBackend", "bind_backend", "get_backend", "set_backend", "use_backend"]
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import abc
+from typing import Any, Callable, Sequence
+
+
+class SceneBackend(abc.ABC):
+    """シーンへのアクセスをまとめたバックエンドのインターフェース
+
+    ツールのシーン操作はすべてこのインターフェースを通して行う。
+    Maya上では maya.cmds を使う実装を、Mayaのない環境ではメモリ上の疑似シーンを使う実装を利用する。
+    """
+
+    # ノード
+    @abc.abstractmethod
+    def exists(self, node: str) -> bool:
+        """ノードが存在するかどうか"""
+
+    @abc.abstractmethod
+    def resolve_long_names(self, nodes: Sequence[str]) -> list[str | None]:
+        """ノード名をロング名に解決する (存在しないノードはNone)"""
+
+    @abc.abstractmethod
+    def node_type(self, node: str) -> str:
+        """ノードのタイプを取得する"""
+
+    @abc.abstractmethod
+    def get_uuids(self, nodes: Sequence[str]) -> list[str | None]:
+        """ノードのUUIDを取得する (存在しないノードはNone)"""
+
+    @abc.abstractmethod
+    def get_display_names(self, uuids: Sequence[str]) -> list[str | None]:
+        """UUIDから表示用の短い名前を取得する (存在しないノードはNone)"""
+
+    @abc.abstractmethod
+    def node_types(self, nodes: Sequence[str]) -> list[str | None]:
+        """ノードのタイプをまとめて取得する (存在しないノードはNone)"""
+
+    @abc.abstractmethod
+    def list_transforms(self, roots: Sequence[str]) -> list[str]:
+        """ルートノードとその子孫のトランスフォーム (ジョイントを含む) のロング名を取得する"""
+
+    @abc.abstractmethod
+    def get_output_connections(self, nodes: Sequence[str]) -> list[tuple[str, str]]:
+        """ノードから出ている接続を (接続元のプラグ, 接続先のプラグ) のリストでまとめて取得する
+
+        DAGノードはロング名で返す。単位変換ノードは経由せずに、その先の接続を返す
+        """
+
+    @abc.abstractmethod
+    def get_namespaces(self) -> list[str]:
+        """シーンのネームスペースの一覧を取得する (ルートネームスペースは空文字)"""
+
+    @abc.abstractmethod
+    def get_root_nodes(self) -> list[str]:
+        """シーンの最上位のトランスフォーム (ジョイントを含む) のロング名を取得する"""
+
+    # トランスフォーム
+    @abc.abstractmethod
+    def get_world_matrix(self, node: str) -> list[float]:
+        """現在のフレームのワールド行列 (16要素) を取得する"""
+
+    @abc.abstractmethod
+    def set_world_matrix(self, node: str, matrix: Sequence[float]) -> None:
+        """ワールド行列 (16要素) を設定する"""
+
+    @abc.abstractmethod
+    def rotate(self, node: str, rotation: Sequence[float]) -> None:
+        """ノードのローカル空間で相対的に回転する (UI単位)"""
+
+    @abc.abstractmethod
+    def get_matrix_at(self, node: str, attribute: str, frame: float) -> list[float]:
+        """currentTimeを変更せずに、指定フレームの行列アトリビュート (worldMatrix, parentMatrixなど) を取得する"""
+
+    def get_matrices_at(self, node: str, attribute: str, frames: Sequence[float]) -> list[list[float]]:
+        """currentTimeを変更せずに、各フレームの行列アトリビュートを取得する
+
+        既定では get_matrix_at をフレームごとに呼ぶ。まとめて評価できるバックエンドはオーバーライドする
+        """
+        return [self.get_matrix_at(node, attribute, frame) for frame in frames]
+
+    @abc.abstractmethod
+    def get_attr(self, node: str, attribute: str) -> Any:
+        """アトリビュートの値を取得する"""
+
+    @abc.abstractmethod
+    def set_attr(self, node: str, attribute: str, value: Any) -> None:  # noqa: ANN401
+        """アトリビュートの値を設定する"""
+
+    @abc.abstractmethod
+    def is_locked(self, node: str, attribute: str) -> bool:
+        """アトリビュートがロックされているかどうか"""
+
+    @abc.abstractmethod
+    def get_rotate_axes(self, nodes: Sequence[str]) -> list[tuple[list[float], list[float]]]:
+        """ノードごとに rotateAxis と jointOrient (UI単位、ジョイント以外の jointOrient はゼロ) をまとめて取得する"""
+
+    # キーフレーム
+    @abc.abstractmethod
+    def get_keyframes(self, node: str, attribute: str) -> tuple[list[float], list[float]]:
+        """アトリビュートのキーの時間と値 (UI単位) を取得する"""
+
+    @abc.abstractmethod
+    def set_keyframes(
+        self, node: str, attribute: str, frames: Sequence[float], values: Sequence[float], linear: bool = False,
+    ) -> bool:
+        """フレーム範囲のキーを一括で書き込む (範囲外のキーは残す)
+
+        linear の場合は、書き込んだキーの接線を直線にする (削減したキーの間を直線で補間する)
+
+        Returns:
+            bool: 書き込めたかどうか
+        """
+
+    @abc.abstractmethod
+    def get_anim_curves(self, nodes: Sequence[str]) -> list[list[tuple[str, str, bool]]]:
+        """各ノードのワールド行列に影響するアニメーションカーブをまとめて取得する
+
+        ノード自身とDAGの祖先、それらの上流 (コンストレイント・IKハンドルなど) にあるカーブを、
+        上流のDAGノード (コンストレイントのターゲット・ポールベクターなど) の祖先とその上流も含めて、
+        ノードごとに (カーブ名, カーブが接続されているノードのロング名, 時間のカーブかどうか) のリストで返す
+        """
+
+    @abc.abstractmethod
+    def get_curve_keys(self, curves: Sequence[str]) -> list[list[list[float]]]:
+        """アニメーションカーブのキーをまとめて取得する
+
+        カーブごとに、キーの [時間 (ドリブンキーの場合は入力値), 値, 補間に影響するその他の値...] のリストを返す
+        """
+
+    # Undo
+    @abc.abstractmethod
+    def open_undo_chunk(self, name: str) -> None:
+        """Undoのチャンクを開く"""
+
+    @abc.abstractmethod
+    def close_undo_chunk(self) -> None:
+        """Undoのチャンクを閉じる"""
+
+    @abc.abstractmethod
+    def undo(self) -> None:
+        """Undoを実行する"""
+
+    @abc.abstractmethod
+    def is_undo_enabled(self) -> bool:
+        """Undoへの記録が有効かどうか"""
+
+    @abc.abstractmethod
+    def set_undo_enabled(self, enabled: bool) -> None:
+        """Undoへの記録を有効 (または無効) にする (Undoのキューは破棄しない)"""
+
+    @abc.abstractmethod
+    def is_undoing(self) -> bool:
+        """Undo・Redoの実行中かどうか (コールバックの中で、ユーザーの操作による変更と区別するため)"""
+
+    @abc.abstractmethod
+    def register_undo(self, undo: Callable[[], None], redo: Callable[[], None]) -> None:
+        """Undo・Redoで関数を呼び出すだけの操作を、Undoのキューに1つ登録する (Undoへの記録が無効な場合は何もしない)"""
+
+    @abc.abstractmethod
+    def capture_curves(self, plugs: Sequence[tuple[str, str]]) -> list[Any]:
+        """アトリビュートのアニメーションカーブの状態をまとめて取得する
+
+        (ノード, アトリビュート) ごとに、restore_curves() で元に戻せる状態 (カーブがない場合はNone) を返す
+        """
+
+    @abc.abstractmethod
+    def restore_curves(self, plugs: Sequence[tuple[str, str]], states: Sequence[Any]) -> None:
+        """capture_curves() で取得した状態に、アトリビュートのアニメーションカーブを戻す (カーブのノードはできるだけ作り直さない)"""
+
+    # 選択
+    @abc.abstractmethod
+    def get_selection(self) -> list[str]:
+        """選択しているノードのロング名を選択順に取得する"""
+
+    @abc.abstractmethod
+    def select(self, nodes: Sequence[str]) -> None:
+        """ノードを選択する"""
+
+    # その他
+    @abc.abstractmethod
+    def warning(self, message: str) -> None:
+        """警告を表示する"""
+
+    @abc.abstractmethod
+    def angle_unit(self) -> str:
+        """角度のUI単位 ("deg" または "rad") を取得する"""
+
+    @abc.abstractmethod
+    def linear_unit(self) -> str:
+        """長さのUI単位 ("cm", "m", "in" など) を取得する"""
+
+    @abc.abstractmethod
+    def playback_range(self) -> tuple[float, float]:
+        """タイムスライダーの再生範囲を取得する"""
+
+    # シーンファイル
+    @abc.abstractmethod
+    def open_scene(self, file_path: str) -> None:
+        """シーンファイルを開く (現在のシーンの変更は破棄する)"""
+
+    @abc.abstractmethod
+    def save_scene(self, file_path: str | None = None) -> str:
+        """シーンを保存する (file_path を指定した場合はその名前で保存する)
+
+        Returns:
+            str: 保存したファイルのパス
+        """
+
+    # コールバック
+    @abc.abstractmethod
+    def add_scene_callbacks(
+        self,
+        on_node_changed: Callable[[str], None],
+        on_node_added: Callable[[], None],
+        on_scene_reset: Callable[[], None],
+    ) -> Any:
+        """シーンの変更を受け取るコールバックを登録する
+
+        Args:
+            on_node_changed (Callable[[str], None]): ノードのリネーム・削除・親子関係の変更 (引数はUUID)
+            on_node_added (Callable[[], None]): ノードの追加
+            on_scene_reset (Callable[[], None]): 新規シーン・シーンを開いたとき
+
+        Returns:
+            Any: remove_scene_callbacks に渡すハンドル
+        """
+
+    @abc.abstractmethod
+    def remove_scene_callbacks(self, handle: Any) -> None:
+        """add_scene_callbacks で登録したコールバックを削除する"""
+
+    @abc.abstractmethod
+    def add_attribute_callbacks(self, plugs: Sequence[tuple[str, str]], on_changed: Callable[[str, str], None]) -> Any:  # noqa: ANN401
+        """アトリビュートの値が設定されたときのコールバックを登録する
+
+        コールバックは指定したノードにだけ登録し、アニメーションの評価による変化では呼ばれない
+
+        Args:
+            plugs (Sequence[tuple[str, str]]): 監視する (ノード, アトリビュート) のリスト
+            on_changed (Callable[[str, str], None]): 値が設定されたときに (ノード, アトリビュート) を渡して呼ぶ関数
+
+        Returns:
+            Any: remove_attribute_callbacks に渡すハンドル
+        """
+
+    @abc.abstractmethod
+    def remove_attribute_callbacks(self, handle: Any) -> None:
+        """add_attribute_callbacks で登録したコールバックを削除する"""
+
+    @abc.abstractmethod
+    def defer(self, func: Callable[[], None]) -> None:
+        """現在の処理が終わり、アイドル状態になってから関数を実行する"""
@@ -0,0 +1,493 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+import maya.api.OpenMaya as om  # type: ignore # noqa: N813
+import maya.cmds as cmds  # type: ignore
+import maya.utils  # type: ignore
+import numpy as np
+
+from . import maya_fk_to_ik_undo
+from .base import SceneBackend
+
+ROTATE_ATTRIBUTES = ("rotateX", "rotateY", "rotateZ")
+# アニメーションカーブのキーごとの接線のアトリビュート (Maya ASCII と同じく、キーの設定後にまとめて書き込む)
+CURVE_TANGENT_TYPE_ATTRIBUTES = ("kit", "kot")
+CURVE_TANGENT_ATTRIBUTES = ("kix", "kiy", "kox", "koy")
+# アニメーションカーブのキーごとのフラグのアトリビュート (ブレイクダウン・接線のロック・ウェイトのロック)
+CURVE_KEY_FLAG_ATTRIBUTES = ("kbd", "ktl", "kwl")
+CURVE_LOCK_ATTRIBUTES = ("ktl", "kwl")
+
+
+@dataclass
+class CurveState:
+    """アニメーションカーブを元に戻すための状態を保持するデータクラス (capture_curves() で作成する)"""
+    name: str  # カーブのノード名
+    node_type: str  # カーブのノードタイプ
+    keys: np.ndarray  # (キー数, 6) の [時間, 値, kix, kiy, kox, koy]
+    tangent_types: np.ndarray  # (キー数, 2) の [kit, kot]
+    key_flags: np.ndarray  # (キー数, 3) の [kbd, ktl, kwl]
+    tangent_type: int  # カーブの新しいキーの接線タイプ (tangentType)
+    weighted: bool  # ウェイト付き接線かどうか
+    infinity: tuple[int, int]  # 前後の補間方法 (preInfinity, postInfinity)
+
+
+def _get_multi(plug: str, count: int) -> list[Any]:
+    """マルチアトリビュートの先頭から count 個の値をまとめて取得する"""
+    if count == 0:
+        return []
+    values = cmds.getAttr(f"{plug}[0:{count - 1}]")  # type: ignore
+    return list(values) if isinstance(values, (list, tuple)) else [values]
+
+
+def _set_multi(plug: str, values: Sequence[Any], components: int = 1) -> None:
+    """マルチアトリビュートの先頭から値をまとめて設定する (components は要素ごとの値の数。keyTimeValue は2)"""
+    count = len(values) // components
+    if count:
+        cmds.setAttr(f"{plug}[0:{count - 1}]", *values, size=count)  # type: ignore
+
+
+def _get_driving_curve(plug: str) -> str | None:
+    """アトリビュートに直接つながっているアニメーションカーブを取得する
+
+    アニメーションレイヤー (animBlendNode) やほかのノードで動いている場合はNoneを返す
+    """
+    curves = cmds.listConnections(plug, source=True, destination=False, type="animCurve") or []  # type: ignore
+    return curves[0] if curves else None
+
+
+def _get_dag_ancestors(node: str) -> list[str]:
+    """DAGノード自身と祖先のロング名を取得する (ロング名でない場合はノード自身だけ)"""
+    if not node.startswith("|"):
+        return [node]
+    parts = node.split("|")
+    return ["|".join(parts[:i]) for i in range(2, len(parts) + 1)]
+
+
+class CmdsBackend(SceneBackend):
+    """maya.cmds を使うバックエンド"""
+
+    def exists(self, node: str) -> bool:
+        return bool(cmds.objExists(node))  # type: ignore
+
+    def resolve_long_names(self, nodes: Sequence[str]) -> list[str | None]:
+        """ノード名をまとめて1回の ls でロング名に解決する"""
+        nodes = list(nodes)
+        paths: list[str] = (cmds.ls(nodes, long=True) or []) if nodes else []  # type: ignore
+        paths_by_short_name: dict[str, list[str]] = {}
+        for path in paths:
+            paths_by_short_name.setdefault(path.rsplit("|", 1)[-1], []).append(path)
+
+        result: list[str | None] = []
+        for node in nodes:
+            candidates = paths_by_short_name.get(node.rsplit("|", 1)[-1].lstrip(":"), [])
+            if node.startswith("|"):
+                candidates = [path for path in candidates if path == node]
+            elif "|" in node:
+                candidates = [path for path in candidates if path.endswith(f"|{node}")]
+            result.append(candidates[0] if candidates else None)
+        return result
+
+    def node_type(self, node: str) -> str:
+        return cmds.objectType(node)  # type: ignore
+
+    def get_uuids(self, nodes: Sequence[str]) -> list[str | None]:
+        nodes = list(nodes)
+        uuids: list[str] = (cmds.ls(nodes, uuid=True) or []) if nodes else []  # type: ignore
+        long_names: list[str] = (cmds.ls(uuids, long=True) or []) if uuids else []  # type: ignore
+        uuids_by_long_name = dict(zip(long_names, uuids))
+        # ロング名以外のノードは、短い名前の索引から候補を絞ってパスの末尾で対応を探す
+        long_names_by_short_name: dict[str, list[str]] = {}
+        for long_name in long_names:
+            long_names_by_short_name.setdefault(long_name.rsplit("|", 1)[-1], []).append(long_name)
+
+        result: list[str | None] = []
+        for node in nodes:
+            uuid = uuids_by_long_name.get(node)
+            if uuid is None and not node.startswith("|"):
+                candidates = long_names_by_short_name.get(node.rsplit("|", 1)[-1], [])
+                uuid = next((uuids_by_long_name[key] for key in candidates if key.endswith(f"|{node}")), None)
+            result.append(uuid)
+        return result
+
+    def get_display_names(self, uuids: Sequence[str]) -> list[str | None]:
+        uuids = list(uuids)
+        existing: list[str] = (cmds.ls(uuids, uuid=True) or []) if uuids else []  # type: ignore
+        short_names: list[str] = (cmds.ls(existing, shortNames=True) or []) if existing else []  # type: ignore
+        names = dict(zip(existing, short_names))
+        return [names.get(uuid) for uuid in uuids]
+
+    def node_types(self, nodes: Sequence[str]) -> list[str | None]:
+        nodes = list(nodes)
+        result: list[str] = (cmds.ls(nodes, showType=True, long=True) or []) if nodes else []  # type: ignore
+        types = dict(zip(result[::2], result[1::2]))
+        long_names = self.resolve_long_names(nodes)
+        return [types.get(long_name) if long_name else None for long_name in long_names]
+
+    def list_transforms(self, roots: Sequence[str]) -> list[str]:
+        roots = list(roots)
+        if not roots:
+            return []
+        descendants = cmds.listRelatives(roots, allDescendents=True, fullPath=True) or []  # type: ignore
+        return cmds.ls(roots + descendants, type="transform", long=True) or []  # type: ignore
+
+    def get_output_connections(self, nodes: Sequence[str]) -> list[tuple[str, str]]:
+        nodes = list(nodes)
+        if not nodes:
+            return []
+        plugs = cmds.listConnections(  # type: ignore
+            nodes, source=False, destination=True, connections=True, plugs=True, skipConversionNodes=True,
+        ) or []
+        connections = list(zip(plugs[::2], plugs[1::2]))
+
+        # ノード名をロング名にそろえる
+        names = list({plug.split(".", 1)[0] for connection in connections for plug in connection})
+        long_names = dict(zip(names, self.resolve_long_names(names)))
+
+        def _to_long_plug(plug: str) -> str:
+            node, _, attribute = plug.partition(".")
+            return f"{long_names.get(node) or node}.{attribute}"
+
+        return [(_to_long_plug(source), _to_long_plug(destination)) for source, destination in connections]
+
+    def get_namespaces(self) -> list[str]:
+        namespaces = cmds.namespaceInfo(":", listOnlyNamespaces=True, recurse=True) or []  # type: ignore
+        return [""] + [namespace for namespace in namespaces if namespace not in ("UI", "shared")]
+
+    def get_root_nodes(self) -> list[str]:
+        return cmds.ls(assemblies=True, long=True) or []  # type: ignore
+
+    def get_world_matrix(self, node: str) -> list[float]:
+        return cmds.xform(node, q=True, ws=True, m=True)  # type: ignore
+
+    def set_world_matrix(self, node: str, matrix: Sequence[float]) -> None:
+        cmds.xform(node, ws=True, m=list(matrix))  # type: ignore
+
+    def rotate(self, node: str, rotation: Sequence[float]) -> None:
+        cmds.rotate(*rotation, node, cs=True, r=True)  # type: ignore
+
+    def get_matrix_at(self, node: str, attribute: str, frame: float) -> list[float]:
+        return cmds.getAttr(f"{node}.{attribute}[0]", time=frame)  # type: ignore
+
+    def get_attr(self, node: str, attribute: str) -> Any:
+        return cmds.getAttr(f"{node}.{attribute}")  # type: ignore
+
+    def set_attr(self, node: str, attribute: str, value: Any) -> None:  # noqa: ANN401
+        cmds.setAttr(f"{node}.{attribute}", value)  # type: ignore
+
+    def is_locked(self, node: str, attribute: str) -> bool:
+        return bool(cmds.getAttr(f"{node}.{attribute}", lock=True))  # type: ignore
+
+    def get_rotate_axes(self, nodes: Sequence[str]) -> list[tuple[list[float], list[float]]]:
+        """ジョイントを1回の ls で判定し、ジョイントだけ jointOrient を取得する"""
+        nodes = list(nodes)
+        joints = set(cmds.ls(nodes, type="joint", long=True) or []) if nodes else set()  # type: ignore
+        long_names = self.resolve_long_names(nodes)
+        result = []
+        for node, long_name in zip(nodes, long_names):
+            rotate_axis = list(cmds.getAttr(f"{node}.rotateAxis")[0])  # type: ignore
+            joint_orient = list(cmds.getAttr(f"{node}.jointOrient")[0]) if long_name in joints else [0.0, 0.0, 0.0]  # type: ignore
+            result.append((rotate_axis, joint_orient))
+        return result
+
+    def get_keyframes(self, node: str, attribute: str) -> tuple[list[float], list[float]]:
+        plug = f"{node}.{attribute}"
+        times = cmds.keyframe(plug, query=True, timeChange=True) or []  # type: ignore
+        values = cmds.keyframe(plug, query=True, valueChange=True) or []  # type: ignore
+        return times, values
+
+    def set_keyframes(
+        self, node: str, attribute: str, frames: Sequence[float], values: Sequence[float], linear: bool = False,
+    ) -> bool:
+        """アトリビュートのアニメーションカーブへ、全フレームのキーを一括で書き込む
+
+        新しいキーは、作成したカーブに keyTimeValue の1回の setAttr で設定する。
+        既存のカーブがある場合は、作成したカーブのキーでフレーム範囲のキーだけを置き換え (pasteKey -option replace)、
+        作成したカーブを削除する。既存のカーブのノード・範囲外のキーの接線やフラグ・カーブへのほかの接続はそのまま残る
+        """
+        plug = f"{node}.{attribute}"
+        if self.is_locked(node, attribute):
+            return False
+
+        curve = _get_driving_curve(plug)
+        if curve is None and cmds.listConnections(plug, source=True, destination=False):  # type: ignore
+            cmds.warning(f"'{plug}' is driven by another connection. Skipped.")
+            return False
+
+        curve_type = "animCurveTA" if attribute in ROTATE_ATTRIBUTES else "animCurveTL"
+        short_name = node.rsplit("|", 1)[-1].replace(":", "_")
+        name = f"{short_name}_{attribute}" if curve is None else f"{short_name}_{attribute}_bake"
+        new_curve = cmds.createNode(curve_type, name=name, skipSelect=True)  # type: ignore
+        _set_multi(f"{new_curve}.keyTimeValue", [item for key in zip(frames, values) for item in key], components=2)
+        if linear:
+            cmds.keyTangent(new_curve, inTangentType="linear", outTangentType="linear")  # type: ignore
+        if curve is None:
+            cmds.connectAttr(f"{new_curve}.output", plug)  # type: ignore
+            return True
+
+        # Mayaのクリップボードを上書きしないように、APIのクリップボードを使う
+        try:
+            cmds.copyKey(new_curve, clipboard="api")  # type: ignore
+            cmds.pasteKey(curve, time=(frames[0], frames[-1]), option="replace", clipboard="api")  # type: ignore
+        finally:
+            cmds.delete(new_curve)  # type: ignore
+        return True
+
+    def get_anim_curves(self, nodes: Sequence[str]) -> list[list[tuple[str, str, bool]]]:
+        """ノード・DAGの祖先・IKハンドルの上流のカーブを listHistory でまとめて取得する
+
+        上流にDAGノード (コンストレイントのターゲット・ポールベクター・IKハンドルなど) がある場合は、
+        その祖先とその上流もたどる (DAGの親子関係は接続ではないため listHistory には含まれない)
+        """
+        curve_info: dict[str, tuple[str, str, bool]] = {}  # 複数のノードで共有するカーブは1回だけ問い合わせる
+        histories: dict[str, tuple[list[str], list[str]]] = {}  # DAGノード -> (上流のノード, 上流のDAGノードのロング名)
+        result = []
+        for node in nodes:
+            pending = _get_dag_ancestors((cmds.ls(node, long=True) or [node])[0])  # type: ignore
+            visited: set[str] = set()
+            upstream: dict[str, None] = {}
+            while pending:
+                dag_node = pending.pop()
+                if dag_node in visited:
+                    continue
+                visited.add(dag_node)
+                if dag_node not in histories:
+                    handles = cmds.ls(cmds.listConnections(dag_node, type="ikHandle") or [], long=True) or []  # type: ignore
+                    history = cmds.listHistory([dag_node, *handles]) or []  # type: ignore
+                    histories[dag_node] = (history, handles + (cmds.ls(history, long=True, type="transform") or []))  # type: ignore
+                history, dag_history = histories[dag_node]
+                upstream.update(dict.fromkeys(history))
+                for upstream_dag_node in dag_history:
+                    pending.extend(ancestor for ancestor in _get_dag_ancestors(upstream_dag_node) if ancestor not in visited)
+
+            curves = []
+            for curve in dict.fromkeys(cmds.ls(list(upstream), type="animCurve") or []):  # type: ignore
+                if curve not in curve_info:
+                    driven = cmds.listConnections(f"{curve}.output", source=False, destination=True, skipConversionNodes=True) or [""]  # type: ignore
+                    driven_node = (cmds.ls(driven[0], long=True) or [driven[0]])[0] if driven[0] else ""  # type: ignore
+                    time_based = cmds.nodeType(curve) in ("animCurveTA", "animCurveTL", "animCurveTT", "animCurveTU")  # type: ignore
+                    curve_info[curve] = (curve, driven_node, time_based)
+                curves.append(curve_info[curve])
+            result.append(curves)
+        return result
+
+    def get_curve_keys(self, curves: Sequence[str]) -> list[list[list[float]]]:
+        result = []
+        for curve in curves:
+            inputs = (
+                cmds.keyframe(curve, query=True, timeChange=True)  # type: ignore
+                or cmds.keyframe(curve, query=True, floatChange=True)  # type: ignore
+                or []
+            )
+            columns = [
+                inputs,
+                cmds.keyframe(curve, query=True, valueChange=True) or [],  # type: ignore
+                cmds.keyTangent(curve, query=True, inAngle=True) or [],  # type: ignore
+                cmds.keyTangent(curve, query=True, outAngle=True) or [],  # type: ignore
+                cmds.keyTangent(curve, query=True, inWeight=True) or [],  # type: ignore
+                cmds.keyTangent(curve, query=True, outWeight=True) or [],  # type: ignore
+            ]
+            infinity = [
+                float(cmds.getAttr(f"{curve}.preInfinity")),  # type: ignore
+                float(cmds.getAttr(f"{curve}.postInfinity")),  # type: ignore
+            ]
+            # 前後の補間方法は、すべてのキーの最後の値として含める
+            result.append([[*key, *infinity] for key in zip(*columns)])
+        return result
+
+    def open_undo_chunk(self, name: str) -> None:
+        cmds.undoInfo(chunkName=name, openChunk=True)  # type: ignore
+
+    def close_undo_chunk(self) -> None:
+        cmds.undoInfo(closeChunk=True)  # type: ignore
+
+    def undo(self) -> None:
+        cmds.undo()  # type: ignore
+
+    def is_undo_enabled(self) -> bool:
+        return bool(cmds.undoInfo(query=True, state=True))  # type: ignore
+
+    def set_undo_enabled(self, enabled: bool) -> None:
+        cmds.undoInfo(stateWithoutFlush=enabled)  # type: ignore
+
+    def is_undoing(self) -> bool:
+        return om.MGlobal.isUndoing() or om.MGlobal.isRedoing()
+
+    def register_undo(self, undo: Callable[[], None], redo: Callable[[], None]) -> None:
+        """プラグインのコマンドを1回実行し、Undoのキューに登録する"""
+        if not self.is_undo_enabled():
+            return
+        maya_fk_to_ik_undo.load()
+        maya_fk_to_ik_undo.push(undo, redo)
+        getattr(cmds, maya_fk_to_ik_undo.COMMAND_NAME)()
+
+    def capture_curves(self, plugs: Sequence[tuple[str, str]]) -> list[Any]:
+        """接続されているカーブのキー・接線・フラグ・補間方法を、カーブごとに数回の getAttr で取得する"""
+        states: list[Any] = []
+        for node, attribute in plugs:
+            curve = _get_driving_curve(f"{node}.{attribute}")
+            if curve is None:
+                states.append(None)
+                continue
+            count = cmds.keyframe(curve, query=True, keyframeCount=True) or 0  # type: ignore
+            columns = [
+                cmds.keyframe(curve, query=True, timeChange=True) or [],  # type: ignore
+                cmds.keyframe(curve, query=True, valueChange=True) or [],  # type: ignore
+                *(_get_multi(f"{curve}.{name}", count) for name in CURVE_TANGENT_ATTRIBUTES),
+            ]
+            states.append(CurveState(
+                name=curve,
+                node_type=cmds.nodeType(curve),  # type: ignore
+                keys=np.array(columns, dtype=np.float64).T.reshape(count, len(columns)),
+                tangent_types=np.array(
+                    [_get_multi(f"{curve}.{name}", count) for name in CURVE_TANGENT_TYPE_ATTRIBUTES], dtype=np.int16,
+                ).T.reshape(count, len(CURVE_TANGENT_TYPE_ATTRIBUTES)),
+                key_flags=np.array(
+                    [_get_multi(f"{curve}.{name}", count) for name in CURVE_KEY_FLAG_ATTRIBUTES], dtype=bool,
+                ).T.reshape(count, len(CURVE_KEY_FLAG_ATTRIBUTES)),
+                tangent_type=int(cmds.getAttr(f"{curve}.tangentType")),  # type: ignore
+                weighted=bool(cmds.getAttr(f"{curve}.weightedTangents")),  # type: ignore
+                infinity=(int(cmds.getAttr(f"{curve}.preInfinity")), int(cmds.getAttr(f"{curve}.postInfinity"))),  # type: ignore
+            ))
+        return states
+
+    def restore_curves(self, plugs: Sequence[tuple[str, str]], states: Sequence[Any]) -> None:
+        """保存した状態を、接続されているカーブのノードにそのまま書き戻す
+
+        カーブのノードは削除せずにキーを入れ替えるため、カーブへのほかの接続やノードのUUIDは保たれる。
+        保存時にカーブがなかった場合はカーブを削除し、今カーブがない場合だけ作成して接続する。
+        アニメーションレイヤーなど、カーブ以外で動いているアトリビュートは警告を出して変更しない
+        """
+        for (node, attribute), state in zip(plugs, states):
+            plug = f"{node}.{attribute}"
+            curve = _get_driving_curve(plug)
+            if state is None or not len(state.keys):
+                if curve is not None:
+                    cmds.delete(curve)  # type: ignore
+                continue
+            if curve is None and cmds.listConnections(plug, source=True, destination=False):  # type: ignore
+                cmds.warning(f"'{plug}' is driven by an animation layer or another connection. Skipped restoring its curve.")
+                continue
+
+            # カーブの種類が変わった場合だけ作り直す
+            if curve is not None and cmds.nodeType(curve) != state.node_type:  # type: ignore
+                cmds.delete(curve)  # type: ignore
+                curve = None
+            if curve is None:
+                curve = cmds.createNode(state.node_type, name=state.name, skipSelect=True)  # type: ignore
+                cmds.connectAttr(f"{curve}.output", plug)  # type: ignore
+            else:
+                self._trim_curve_keys(curve, len(state.keys))
+                if curve.rsplit("|", 1)[-1] != state.name:
+                    curve = cmds.rename(curve, state.name)  # type: ignore
+            self._write_curve_state(curve, state)
+
+    def _trim_curve_keys(self, curve: str, count: int) -> None:
+        """カーブのキーを count 個まで減らす (すべてのキーを削除するとカーブのノードも削除されるため、先頭のキーは残す)"""
+        current = cmds.keyframe(curve, query=True, keyframeCount=True) or 0  # type: ignore
+        if current > count:
+            cmds.cutKey(curve, index=(count, current - 1), clear=True)  # type: ignore
+
+    def _write_curve_state(self, curve: str, state: CurveState) -> None:
+        """キーの数をそろえたカーブに、保存したキー・接線・フラグ・補間方法を書き込む"""
+        # ウェイト付き接線の切り替えは接線を変換するため、キーと接線より先に設定する
+        cmds.setAttr(f"{curve}.weightedTangents", state.weighted)  # type: ignore
+        cmds.setAttr(f"{curve}.tangentType", state.tangent_type)  # type: ignore
+        count = len(state.keys)
+        _set_multi(f"{curve}.keyTimeValue", state.keys[:, :2].reshape(-1).tolist(), components=2)
+        # ロックされた接線は片側の変更でもう片側も変わるため、ロックを外してから接線を書き込む
+        for name in CURVE_LOCK_ATTRIBUTES:
+            _set_multi(f"{curve}.{name}", [False] * count)
+        for column, name in enumerate(CURVE_TANGENT_TYPE_ATTRIBUTES):
+            _set_multi(f"{curve}.{name}", state.tangent_types[:, column].tolist())
+        for column, name in enumerate(CURVE_TANGENT_ATTRIBUTES, start=2):
+            _set_multi(f"{curve}.{name}", state.keys[:, column].tolist())
+        for column, name in enumerate(CURVE_KEY_FLAG_ATTRIBUTES):
+            _set_multi(f"{curve}.{name}", state.key_flags[:, column].tolist())
+        cmds.setAttr(f"{curve}.preInfinity", state.infinity[0])  # type: ignore
+        cmds.setAttr(f"{curve}.postInfinity", state.infinity[1])  # type: ignore
+
+    def get_selection(self) -> list[str]:
+        return cmds.ls(selection=True, long=True) or []  # type: ignore
+
+    def select(self, nodes: Sequence[str]) -> None:
+        cmds.select(list(nodes))  # type: ignore
+
+    def warning(self, message: str) -> None:
+        cmds.warning(message)  # type: ignore
+
+    def angle_unit(self) -> str:
+        return cmds.currentUnit(query=True, angle=True)  # type: ignore
+
+    def linear_unit(self) -> str:
+        return cmds.currentUnit(query=True, linear=True)  # type: ignore
+
+    def playback_range(self) -> tuple[float, float]:
+        start = cmds.playbackOptions(query=True, minTime=True)  # type: ignore
+        end = cmds.playbackOptions(query=True, maxTime=True)  # type: ignore
+        return start, end
+
+    def open_scene(self, file_path: str) -> None:
+        cmds.file(str(file_path), open=True, force=True, prompt=False)  # type: ignore
+
+    def save_scene(self, file_path: str | None = None) -> str:
+        if file_path is not None:
+            cmds.file(rename=str(file_path))  # type: ignore
+            file_type = "mayaAscii" if str(file_path).lower().endswith(".ma") else "mayaBinary"
+            return cmds.file(save=True, force=True, type=file_type)  # type: ignore
+        return cmds.file(save=True, force=True)  # type: ignore
+
+    def add_scene_callbacks(
+        self,
+        on_node_changed: Callable[[str], None],
+        on_node_added: Callable[[], None],
+        on_scene_reset: Callable[[], None],
+    ) -> list[int]:
+        def _on_node_changed(node: om.MObject, *args) -> None:  # noqa: ANN002
+            on_node_changed(om.MFnDependencyNode(node).uuid().asString())
+
+        def _on_dag_changed(message: int, child: om.MDagPath, *args) -> None:  # noqa: ANN002, ARG001
+            on_node_changed(om.MFnDependencyNode(child.node()).uuid().asString())
+
+        return [
+            om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, _on_node_changed),
+            om.MDGMessage.addNodeRemovedCallback(_on_node_changed, "dependNode"),
+            om.MDGMessage.addNodeAddedCallback(lambda *args: on_node_added(), "dependNode"),  # noqa: ARG005
+            om.MDagMessage.addAllDagChangesCallback(_on_dag_changed),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, lambda *args: on_scene_reset()),  # noqa: ARG005
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, lambda *args: on_scene_reset()),  # noqa: ARG005
+        ]
+
+    def remove_scene_callbacks(self, handle: list[int]) -> None:
+        if handle:
+            om.MMessage.removeCallbacks(handle)
+
+    def add_attribute_callbacks(self, plugs: Sequence[tuple[str, str]], on_changed: Callable[[str, str], None]) -> list[int]:
+        attributes_by_node: dict[str, set[str]] = {}
+        for node, attribute in plugs:
+            attributes_by_node.setdefault(node, set()).add(attribute)
+
+        handles = []
+        for node, attributes in attributes_by_node.items():
+            selection = om.MSelectionList()
+            selection.add(node)
+            short_names = {cmds.attributeQuery(attribute, node=node, shortName=True): attribute for attribute in attributes}  # type: ignore
+
+            def _on_attribute_changed(message: int, plug: om.MPlug, *args, node: str = node, short_names: dict[str, str] = short_names) -> None:  # noqa: ANN002, ARG001
+                # 値の設定以外 (接続の変更など) と、監視していないアトリビュートは無視する
+                if not message & om.MNodeMessage.kAttributeSet:
+                    return
+                attribute = short_names.get(plug.partialName())
+                if attribute is not None:
+                    on_changed(node, attribute)
+
+            handles.append(om.MNodeMessage.addAttributeChangedCallback(selection.getDependNode(0), _on_attribute_changed))
+        return handles
+
+    def remove_attribute_callbacks(self, handle: list[int]) -> None:
+        if handle:
+            om.MMessage.removeCallbacks(handle)
+
+    def defer(self, func: Callable[[], None]) -> None:
+        maya.utils.executeDeferred(func)
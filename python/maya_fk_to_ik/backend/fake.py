@@ -0,0 +1,698 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import time
+import uuid as uuid_module
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Sequence, TypeVar
+
+import numpy as np
+
+from ..core.const import LINEAR_UNIT_CENTIMETERS
+from ..core.hierarchy import NAMESPACE_SEPARATOR, get_namespace
+from ..core.matrix import euler_to_matrix, matrix_to_euler, normalize_rotation
+from .base import SceneBackend
+
+_T = TypeVar("_T", bound=Callable[..., Any])
+
+FAKE_SCENE_FILE_VERSION = 1
+
+TRANSFORM_ATTRIBUTES = {
+    "translateX": ("translate", 0), "translateY": ("translate", 1), "translateZ": ("translate", 2),
+    "rotateX": ("rotate", 0), "rotateY": ("rotate", 1), "rotateZ": ("rotate", 2),
+    "scaleX": ("scale", 0), "scaleY": ("scale", 1), "scaleZ": ("scale", 2),
+}
+
+
+def _scene_call(func: _T) -> _T:
+    """シーンへの問い合わせ回数と時間を記録するデコレーター"""
+    @functools.wraps(func)
+    def wrapper(self: FakeBackend, *args, **kwargs) -> Any:  # noqa: ANN002, ANN003, ANN401
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.call_counts[func.__name__] += 1
+            self.call_seconds[func.__name__] += time.perf_counter() - start
+    return wrapper  # type: ignore
+
+
+@dataclass(eq=False)
+class FakeNode:
+    """疑似シーンのノード"""
+    name: str
+    parent: FakeNode | None = None
+    node_type: str = "transform"
+    translate: np.ndarray = field(default_factory=lambda: np.zeros(3))
+    rotate: np.ndarray = field(default_factory=lambda: np.zeros(3))  # 度
+    scale: np.ndarray = field(default_factory=lambda: np.ones(3))
+    rotate_order: int = 0
+    uuid: str = field(default_factory=lambda: str(uuid_module.uuid4()).upper())
+    children: list[FakeNode] = field(default_factory=list)
+    attributes: dict[str, Any] = field(default_factory=dict)
+    locked: set[str] = field(default_factory=set)
+    rotate_axis: np.ndarray = field(default_factory=lambda: np.zeros(3))  # 度
+    joint_orient: np.ndarray = field(default_factory=lambda: np.zeros(3))  # 度 (ジョイントのみ)
+
+    @property
+    def path(self) -> str:
+        """ロング名"""
+        return f"{self.parent.path if self.parent else ''}|{self.name}"
+
+
+class FakeBackend(SceneBackend):
+    """メモリ上の疑似シーンを使うバックエンド
+
+    トランスフォームのDAG・アニメーションカーブ・選択・コールバックを持ち、
+    Mayaのない環境でのベンチマークや動作確認に使う。
+    シーンへの問い合わせごとに回数と時間を call_counts / call_seconds に記録し、
+    latency を設定すると1回ごとにその秒数の遅延を加える。
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.call_counts: Counter[str] = Counter()
+        self.call_seconds: Counter[str] = Counter()
+        self.current_time = 0.0
+        self.start_time = 0.0
+        self.end_time = 100.0
+        self.unit = "cm"  # 長さのUI単位 (移動値はこの単位、行列はMayaと同じくセンチメートル)
+        self.undo_chunk_depth = 0
+        self.undo_enabled = True
+        self.undo_queue: list[list[tuple[Callable[[], None], Callable[[], None]]]] = []  # register_undo() で登録した操作 (チャンクごと)
+        self.redo_queue: list[list[tuple[Callable[[], None], Callable[[], None]]]] = []
+        self.undoing = False  # undo()・redo() の実行中かどうか
+        self.scene_path: str | None = None  # 開いている (保存した) シーンファイルのパス
+        self._nodes: dict[str, FakeNode] = {}  # UUID -> ノード
+        self._nodes_by_name: dict[str, list[FakeNode]] = {}
+        self._curves: dict[tuple[str, str], tuple[np.ndarray, np.ndarray]] = {}
+        self._linear_curves: set[tuple[str, str]] = set()  # linear を指定して書き込んだ (UUID, アトリビュート)
+        self._selection: list[FakeNode] = []
+        self._connections: list[tuple[FakeNode, str, FakeNode, str]] = []
+        self._constraints: dict[str, list[tuple[FakeNode, FakeNode, str, float]]] = {}  # UUID -> [(ターゲット, スイッチ, アトリビュート, 値)]
+        self._callbacks: dict[int, tuple[Callable[[str], None], Callable[[], None], Callable[[], None]]] = {}
+        self._next_callback_id = 0
+        self._attribute_callbacks: dict[int, tuple[set[tuple[str, str]], Callable[[str, str], None]]] = {}
+        self.deferred: list[Callable[[], None]] = []  # defer() で登録され、まだ実行していない関数
+
+    # 疑似シーンの構築 (記録の対象外)
+    def create_node(
+        self,
+        name: str,
+        parent: str | None = None,
+        node_type: str = "transform",
+        translate: Sequence[float] = (0.0, 0.0, 0.0),
+        rotate: Sequence[float] = (0.0, 0.0, 0.0),
+        rotate_order: int = 0,
+        rotate_axis: Sequence[float] = (0.0, 0.0, 0.0),
+        joint_orient: Sequence[float] = (0.0, 0.0, 0.0),
+    ) -> str:
+        """ノードを作成する
+
+        Args:
+            name (str): ノード名
+            parent (str, optional): 親ノード名
+            node_type (str): ノードのタイプ
+            translate (Sequence[float]): 移動値
+            rotate (Sequence[float]): 回転値 (度)
+            rotate_order (int): 回転順序
+            rotate_axis (Sequence[float]): rotateAxis の値 (度)
+            joint_orient (Sequence[float]): jointOrient の値 (度、ジョイントのみ)
+
+        Returns:
+            str: 作成したノードのロング名
+        """
+        parent_node = self._find(parent) if parent else None
+        node = FakeNode(
+            name,
+            parent_node,
+            node_type,
+            np.array(translate, dtype=np.float64),
+            np.array(rotate, dtype=np.float64),
+            rotate_order=rotate_order,
+            rotate_axis=np.array(rotate_axis, dtype=np.float64),
+            joint_orient=np.array(joint_orient if node_type == "joint" else (0.0, 0.0, 0.0), dtype=np.float64),
+        )
+        if parent_node:
+            parent_node.children.append(node)
+        self._nodes[node.uuid] = node
+        self._nodes_by_name.setdefault(name, []).append(node)
+        for _, on_node_added, _ in list(self._callbacks.values()):
+            on_node_added()
+        return node.path
+
+    def connect(self, source_plug: str, destination_plug: str) -> None:
+        """アトリビュートを接続する (評価には影響しない)"""
+        source, _, source_attribute = source_plug.partition(".")
+        destination, _, destination_attribute = destination_plug.partition(".")
+        self._connections.append((self._get(source), source_attribute, self._get(destination), destination_attribute))
+
+    def constrain(self, node: str, target: str, switch_plug: str, value: float) -> None:
+        """スイッチのアトリビュートが value のとき、ノードのワールド行列をターゲットに合わせる (IK/FKスイッチの代わり)"""
+        switch, _, attribute = switch_plug.partition(".")
+        self._constraints.setdefault(self._get(node).uuid, []).append((self._get(target), self._get(switch), attribute, value))
+
+    def rename(self, node: str, new_name: str) -> str:
+        """ノードをリネームする"""
+        target = self._get(node)
+        self._nodes_by_name[target.name].remove(target)
+        target.name = new_name
+        self._nodes_by_name.setdefault(new_name, []).append(target)
+        self._notify_changed(target)
+        return target.path
+
+    def delete(self, node: str) -> None:
+        """ノードを子ノードごと削除する"""
+        target = self._get(node)
+        for child in list(target.children):
+            self.delete(child.path)
+        if target.parent:
+            target.parent.children.remove(target)
+        self._nodes_by_name[target.name].remove(target)
+        del self._nodes[target.uuid]
+        self._curves = {key: value for key, value in self._curves.items() if key[0] != target.uuid}
+        self._selection = [selected for selected in self._selection if selected is not target]
+        self._connections = [
+            connection for connection in self._connections if connection[0] is not target and connection[2] is not target
+        ]
+        self._constraints = {
+            key: [constraint for constraint in constraints if constraint[0] is not target and constraint[1] is not target]
+            for key, constraints in self._constraints.items() if key != target.uuid
+        }
+        self._notify_changed(target)
+
+    def new_scene(self) -> None:
+        """シーンを空にする"""
+        self.scene_path = None
+        self._nodes.clear()
+        self._nodes_by_name.clear()
+        self._curves.clear()
+        self._linear_curves.clear()
+        self._selection.clear()
+        self._connections.clear()
+        self._constraints.clear()
+        self.undo_queue.clear()
+        self.redo_queue.clear()
+        for _, _, on_scene_reset in list(self._callbacks.values()):
+            on_scene_reset()
+
+    def lock(self, node: str, attribute: str) -> None:
+        """アトリビュートをロックする"""
+        self._get(node).locked.add(attribute)
+
+    def is_linear(self, node: str, attribute: str) -> bool:
+        """最後の set_keyframes() で、キーの接線を直線にするよう指定されたかどうか"""
+        return (self._get(node).uuid, attribute) in self._linear_curves
+
+    def run_deferred(self) -> int:
+        """defer() で登録された関数を実行する (アイドル状態になったときの代わり)
+
+        Returns:
+            int: 実行した関数の数
+        """
+        count = 0
+        while self.deferred:
+            functions, self.deferred = self.deferred, []
+            for func in functions:
+                func()
+            count += len(functions)
+        return count
+
+    def redo(self) -> None:
+        """undo() で戻した操作をやり直す"""
+        if self.redo_queue:
+            entries = self.redo_queue.pop()
+            self.undoing = True
+            try:
+                for _, redo in entries:
+                    redo()
+            finally:
+                self.undoing = False
+            self.undo_queue.append(entries)
+
+    def reset_counters(self) -> None:
+        """問い合わせの記録をリセットする"""
+        self.call_counts.clear()
+        self.call_seconds.clear()
+
+    # SceneBackend
+    @_scene_call
+    def exists(self, node: str) -> bool:
+        return self._find(node) is not None
+
+    @_scene_call
+    def resolve_long_names(self, nodes: Sequence[str]) -> list[str | None]:
+        return [found.path if (found := self._find(node)) else None for node in nodes]
+
+    @_scene_call
+    def node_type(self, node: str) -> str:
+        return self._get(node).node_type
+
+    @_scene_call
+    def get_uuids(self, nodes: Sequence[str]) -> list[str | None]:
+        return [found.uuid if (found := self._find(node)) else None for node in nodes]
+
+    @_scene_call
+    def get_display_names(self, uuids: Sequence[str]) -> list[str | None]:
+        return [self._display_name(self._nodes[uuid]) if uuid in self._nodes else None for uuid in uuids]
+
+    @_scene_call
+    def node_types(self, nodes: Sequence[str]) -> list[str | None]:
+        found = [self._find(node) for node in nodes]
+        return [node.node_type if node else None for node in found]
+
+    @_scene_call
+    def list_transforms(self, roots: Sequence[str]) -> list[str]:
+        result: dict[str, None] = {}
+        stack = [self._get(root) for root in reversed(roots)]
+        while stack:
+            node = stack.pop()
+            if node.node_type in ("transform", "joint"):
+                result[node.path] = None
+            stack.extend(reversed(node.children))
+        return list(result)
+
+    @_scene_call
+    def get_output_connections(self, nodes: Sequence[str]) -> list[tuple[str, str]]:
+        sources = {id(node) for node in (self._find(name) for name in nodes) if node}
+        return [
+            (f"{source.path}.{source_attribute}", f"{destination.path}.{destination_attribute}")
+            for source, source_attribute, destination, destination_attribute in self._connections
+            if id(source) in sources
+        ]
+
+    @_scene_call
+    def get_namespaces(self) -> list[str]:
+        namespaces = set()
+        for node in self._nodes.values():
+            parts = get_namespace(node.name).split(NAMESPACE_SEPARATOR)
+            namespaces.update(NAMESPACE_SEPARATOR.join(parts[:i]) for i in range(1, len(parts) + 1))
+        return [""] + sorted(namespace for namespace in namespaces if namespace)
+
+    @_scene_call
+    def get_root_nodes(self) -> list[str]:
+        return [node.path for node in self._nodes.values() if node.parent is None and node.node_type in ("transform", "joint")]
+
+    @_scene_call
+    def get_world_matrix(self, node: str) -> list[float]:
+        return self._world_matrix(self._get(node), self.current_time).flatten().tolist()
+
+    @_scene_call
+    def set_world_matrix(self, node: str, matrix: Sequence[float]) -> None:
+        target = self._get(node)
+        parent_world = self._world_matrix(target.parent, self.current_time)
+        self._set_local_matrix(target, np.reshape(matrix, (4, 4)) @ np.linalg.inv(parent_world))
+
+    @_scene_call
+    def rotate(self, node: str, rotation: Sequence[float]) -> None:
+        target = self._get(node)
+        offset = np.identity(4)
+        offset[:3, :3] = euler_to_matrix(np.radians(rotation))
+        self._set_local_matrix(target, offset @ self._local_matrix(target, self.current_time))
+
+    @_scene_call
+    def get_matrix_at(self, node: str, attribute: str, frame: float) -> list[float]:
+        target = self._get(node)
+        if attribute == "worldMatrix":
+            matrix = self._world_matrix(target, frame)
+        elif attribute == "parentMatrix":
+            matrix = self._world_matrix(target.parent, frame)
+        elif attribute == "worldInverseMatrix":
+            matrix = np.linalg.inv(self._world_matrix(target, frame))
+        else:
+            msg = f"Unsupported matrix attribute: {attribute}"
+            raise ValueError(msg)
+        return matrix.flatten().tolist()
+
+    @_scene_call
+    def get_attr(self, node: str, attribute: str) -> Any:  # noqa: ANN401
+        target = self._get(node)
+        if attribute in TRANSFORM_ATTRIBUTES:
+            return self._evaluate(target, attribute, self.current_time)
+        if attribute == "rotateOrder":
+            return target.rotate_order
+        return target.attributes[attribute]
+
+    @_scene_call
+    def set_attr(self, node: str, attribute: str, value: Any) -> None:  # noqa: ANN401
+        target = self._get(node)
+        if attribute in TRANSFORM_ATTRIBUTES:
+            name, axis = TRANSFORM_ATTRIBUTES[attribute]
+            getattr(target, name)[axis] = value
+        elif attribute == "rotateOrder":
+            target.rotate_order = int(value)
+        else:
+            target.attributes[attribute] = value
+        for plugs, on_changed in list(self._attribute_callbacks.values()):
+            for watched_node, watched_attribute in plugs:
+                if watched_attribute == attribute and self._find(watched_node) is target:
+                    on_changed(watched_node, attribute)
+
+    @_scene_call
+    def is_locked(self, node: str, attribute: str) -> bool:
+        return attribute in self._get(node).locked
+
+    @_scene_call
+    def get_rotate_axes(self, nodes: Sequence[str]) -> list[tuple[list[float], list[float]]]:
+        targets = [self._get(node) for node in nodes]
+        return [(target.rotate_axis.tolist(), target.joint_orient.tolist()) for target in targets]
+
+    @_scene_call
+    def get_keyframes(self, node: str, attribute: str) -> tuple[list[float], list[float]]:
+        curve = self._curves.get((self._get(node).uuid, attribute))
+        if curve is None:
+            return [], []
+        return curve[0].tolist(), curve[1].tolist()
+
+    @_scene_call
+    def set_keyframes(
+        self, node: str, attribute: str, frames: Sequence[float], values: Sequence[float], linear: bool = False,
+    ) -> bool:
+        """キーを書き込む (疑似シーンのカーブは常にキーの間を直線で補間する)"""
+        target = self._get(node)
+        if attribute in target.locked:
+            return False
+        keys = dict(zip(frames, values))
+        old_curve = self._curves.get((target.uuid, attribute))
+        if old_curve is not None:
+            for frame, value in zip(*old_curve):
+                if frame < frames[0] or frame > frames[-1]:
+                    keys[float(frame)] = float(value)
+        times = np.array(sorted(keys), dtype=np.float64)
+        self._curves[(target.uuid, attribute)] = (times, np.array([keys[t] for t in times], dtype=np.float64))
+        if linear:
+            self._linear_curves.add((target.uuid, attribute))
+        else:
+            self._linear_curves.discard((target.uuid, attribute))
+        return True
+
+    @_scene_call
+    def get_anim_curves(self, nodes: Sequence[str]) -> list[list[tuple[str, str, bool]]]:
+        attributes: dict[str, list[str]] = {}
+        for uuid, attribute in self._curves:
+            attributes.setdefault(uuid, []).append(attribute)
+        result = []
+        for node in nodes:
+            curves = []
+            target: FakeNode | None = self._get(node)
+            while target is not None:
+                curves.extend((f"{target.path}.{attribute}", target.path, True) for attribute in attributes.get(target.uuid, []))
+                target = target.parent
+            result.append(curves)
+        return result
+
+    @_scene_call
+    def get_curve_keys(self, curves: Sequence[str]) -> list[list[list[float]]]:
+        result = []
+        for curve in curves:
+            node, _, attribute = curve.rpartition(".")
+            times, values = self._curves.get((self._get(node).uuid, attribute), (np.empty(0), np.empty(0)))
+            result.append(np.stack([times, values], axis=-1).tolist())
+        return result
+
+    @_scene_call
+    def open_undo_chunk(self, name: str) -> None:  # noqa: ARG002
+        if self.undo_chunk_depth == 0:
+            self.undo_queue.append([])
+        self.undo_chunk_depth += 1
+
+    @_scene_call
+    def close_undo_chunk(self) -> None:
+        self.undo_chunk_depth -= 1
+
+    @_scene_call
+    def undo(self) -> None:
+        """register_undo() で登録した操作だけを、チャンク単位で元に戻す (シーンへの直接の変更は戻さない)"""
+        if self.undo_queue:
+            entries = self.undo_queue.pop()
+            self.undoing = True
+            try:
+                for undo, _ in reversed(entries):
+                    undo()
+            finally:
+                self.undoing = False
+            self.redo_queue.append(entries)
+
+    @_scene_call
+    def is_undo_enabled(self) -> bool:
+        return self.undo_enabled
+
+    @_scene_call
+    def set_undo_enabled(self, enabled: bool) -> None:
+        self.undo_enabled = enabled
+
+    @_scene_call
+    def is_undoing(self) -> bool:
+        return self.undoing
+
+    @_scene_call
+    def register_undo(self, undo: Callable[[], None], redo: Callable[[], None]) -> None:
+        if not self.undo_enabled:
+            return
+        if self.undo_chunk_depth > 0:
+            self.undo_queue[-1].append((undo, redo))
+        else:
+            self.undo_queue.append([(undo, redo)])
+        self.redo_queue.clear()
+
+    @_scene_call
+    def capture_curves(self, plugs: Sequence[tuple[str, str]]) -> list[Any]:
+        states: list[Any] = []
+        for node, attribute in plugs:
+            curve = self._curves.get((self._get(node).uuid, attribute))
+            states.append((curve[0].copy(), curve[1].copy()) if curve is not None else None)
+        return states
+
+    @_scene_call
+    def restore_curves(self, plugs: Sequence[tuple[str, str]], states: Sequence[Any]) -> None:
+        for (node, attribute), state in zip(plugs, states):
+            key = (self._get(node).uuid, attribute)
+            if state is None:
+                self._curves.pop(key, None)
+            else:
+                self._curves[key] = (state[0].copy(), state[1].copy())
+
+    @_scene_call
+    def get_selection(self) -> list[str]:
+        return [node.path for node in self._selection]
+
+    @_scene_call
+    def select(self, nodes: Sequence[str]) -> None:
+        self._selection = [self._get(node) for node in nodes]
+
+    @_scene_call
+    def warning(self, message: str) -> None:
+        print(f"Warning: {message}")  # noqa: T201
+
+    @_scene_call
+    def angle_unit(self) -> str:
+        return "deg"
+
+    @_scene_call
+    def linear_unit(self) -> str:
+        return self.unit
+
+    @_scene_call
+    def playback_range(self) -> tuple[float, float]:
+        return self.start_time, self.end_time
+
+    @_scene_call
+    def open_scene(self, file_path: str) -> None:
+        """save_scene() で保存したJSON形式の疑似シーンを開く"""
+        with Path(file_path).open(encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version", 0) > FAKE_SCENE_FILE_VERSION:
+            msg = f"Unsupported fake scene file version: {data.get('version')}"
+            raise ValueError(msg)
+
+        self.new_scene()
+        nodes: list[FakeNode] = []
+        for item in data["nodes"]:
+            parent = nodes[item["parent"]] if item["parent"] is not None else None
+            node = FakeNode(
+                item["name"],
+                parent,
+                item["node_type"],
+                np.array(item["translate"], dtype=np.float64),
+                np.array(item["rotate"], dtype=np.float64),
+                np.array(item["scale"], dtype=np.float64),
+                item["rotate_order"],
+                item["uuid"],
+                attributes=item["attributes"],
+                locked=set(item["locked"]),
+                rotate_axis=np.array(item.get("rotate_axis", [0.0, 0.0, 0.0]), dtype=np.float64),
+                joint_orient=np.array(item.get("joint_orient", [0.0, 0.0, 0.0]), dtype=np.float64),
+            )
+            if parent:
+                parent.children.append(node)
+            self._nodes[node.uuid] = node
+            self._nodes_by_name.setdefault(node.name, []).append(node)
+            nodes.append(node)
+        for index, attribute, times, values in data["curves"]:
+            self._curves[(nodes[index].uuid, attribute)] = (np.array(times, dtype=np.float64), np.array(values, dtype=np.float64))
+        for source, source_attribute, destination, destination_attribute in data["connections"]:
+            self._connections.append((nodes[source], source_attribute, nodes[destination], destination_attribute))
+        self.start_time, self.end_time = data["playback_range"]
+        self.current_time = data["current_time"]
+        self.scene_path = str(file_path)
+
+    @_scene_call
+    def save_scene(self, file_path: str | None = None) -> str:
+        """疑似シーンをJSON形式で保存する"""
+        file_path = str(file_path or self.scene_path or "")
+        if not file_path:
+            msg = "The scene has no file path."
+            raise ValueError(msg)
+
+        nodes: list[FakeNode] = []
+        stack = [node for node in reversed(list(self._nodes.values())) if node.parent is None]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node.children))
+        indices = {id(node): index for index, node in enumerate(nodes)}
+        data = {
+            "version": FAKE_SCENE_FILE_VERSION,
+            "playback_range": [self.start_time, self.end_time],
+            "current_time": self.current_time,
+            "nodes": [
+                {
+                    "name": node.name,
+                    "parent": indices[id(node.parent)] if node.parent else None,
+                    "node_type": node.node_type,
+                    "translate": node.translate.tolist(),
+                    "rotate": node.rotate.tolist(),
+                    "scale": node.scale.tolist(),
+                    "rotate_order": node.rotate_order,
+                    "rotate_axis": node.rotate_axis.tolist(),
+                    "joint_orient": node.joint_orient.tolist(),
+                    "uuid": node.uuid,
+                    "attributes": node.attributes,
+                    "locked": sorted(node.locked),
+                }
+                for node in nodes
+            ],
+            "curves": [
+                [indices[id(self._nodes[uuid])], attribute, times.tolist(), values.tolist()]
+                for (uuid, attribute), (times, values) in self._curves.items()
+            ],
+            "connections": [
+                [indices[id(source)], source_attribute, indices[id(destination)], destination_attribute]
+                for source, source_attribute, destination, destination_attribute in self._connections
+            ],
+        }
+        temp_path = Path(f"{file_path}.tmp")
+        with temp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        temp_path.replace(file_path)
+        self.scene_path = file_path
+        return file_path
+
+    def add_scene_callbacks(
+        self,
+        on_node_changed: Callable[[str], None],
+        on_node_added: Callable[[], None],
+        on_scene_reset: Callable[[], None],
+    ) -> int:
+        self._next_callback_id += 1
+        self._callbacks[self._next_callback_id] = (on_node_changed, on_node_added, on_scene_reset)
+        return self._next_callback_id
+
+    def remove_scene_callbacks(self, handle: int) -> None:
+        self._callbacks.pop(handle, None)
+
+    def add_attribute_callbacks(self, plugs: Sequence[tuple[str, str]], on_changed: Callable[[str, str], None]) -> int:
+        self._next_callback_id += 1
+        self._attribute_callbacks[self._next_callback_id] = (set(plugs), on_changed)
+        return self._next_callback_id
+
+    def remove_attribute_callbacks(self, handle: int) -> None:
+        self._attribute_callbacks.pop(handle, None)
+
+    def defer(self, func: Callable[[], None]) -> None:
+        self.deferred.append(func)
+
+    # 内部処理
+    def _find(self, node: str) -> FakeNode | None:
+        """ノード名 (ロング名・部分パス・短い名前・UUID) からノードを探す"""
+        if node in self._nodes:
+            return self._nodes[node]
+        parts = node.lstrip("|").split("|")
+        candidates = [
+            candidate for candidate in self._nodes_by_name.get(parts[-1], [])
+            if candidate.path == node or candidate.path.endswith(f"|{node.lstrip('|')}")
+        ]
+        if node.startswith("|"):
+            candidates = [candidate for candidate in candidates if candidate.path == node]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _get(self, node: str) -> FakeNode:
+        """ノードを取得する (存在しなければエラー)"""
+        found = self._find(node)
+        if found is None:
+            msg = f"No object matches name: {node}"
+            raise ValueError(msg)
+        return found
+
+    def _display_name(self, node: FakeNode) -> str:
+        """他のノードと区別できる最も短い名前"""
+        parts = node.path.lstrip("|").split("|")
+        for i in range(len(parts) - 1, -1, -1):
+            name = "|".join(parts[i:])
+            if self._find(name) is node:
+                return name
+        return node.path
+
+    def _notify_changed(self, node: FakeNode) -> None:
+        """ノードの変更をコールバックに通知する"""
+        for on_node_changed, _, _ in list(self._callbacks.values()):
+            on_node_changed(node.uuid)
+
+    def _evaluate(self, node: FakeNode, attribute: str, frame: float) -> float:
+        """アトリビュートの指定フレームでの値 (カーブがあれば線形補間)"""
+        curve = self._curves.get((node.uuid, attribute))
+        if curve is not None:
+            return float(np.interp(frame, curve[0], curve[1]))
+        name, axis = TRANSFORM_ATTRIBUTES[attribute]
+        return float(getattr(node, name)[axis])
+
+    def _local_matrix(self, node: FakeNode, frame: float) -> np.ndarray:
+        """ローカル行列 (スケール * rotateAxis * 回転 * jointOrient * 移動)"""
+        values = {attribute: self._evaluate(node, attribute, frame) for attribute in TRANSFORM_ATTRIBUTES}
+        matrix = np.identity(4)
+        rotate = np.radians([values["rotateX"], values["rotateY"], values["rotateZ"]])
+        scale = np.array([values["scaleX"], values["scaleY"], values["scaleZ"]])
+        rotation = euler_to_matrix(np.radians(node.rotate_axis)) @ euler_to_matrix(rotate, node.rotate_order)
+        matrix[:3, :3] = scale[:, np.newaxis] * (rotation @ euler_to_matrix(np.radians(node.joint_orient)))
+        matrix[3, :3] = np.array([values["translateX"], values["translateY"], values["translateZ"]]) * LINEAR_UNIT_CENTIMETERS[self.unit]
+        return matrix
+
+    def _world_matrix(self, node: FakeNode | None, frame: float) -> np.ndarray:
+        """ワールド行列 (スイッチが有効なコンストレイントがあれば、ターゲットのワールド行列)"""
+        matrix = np.identity(4)
+        while node is not None:
+            for target, switch, attribute, value in self._constraints.get(node.uuid, []):
+                if switch.attributes.get(attribute) == value:
+                    return matrix @ self._world_matrix(target, frame)
+            matrix = matrix @ self._local_matrix(node, frame)
+            node = node.parent
+        return matrix
+
+    def _set_local_matrix(self, node: FakeNode, matrix: np.ndarray) -> None:
+        """ローカル行列を移動・回転・スケールに分解して設定する"""
+        node.translate = matrix[3, :3] / LINEAR_UNIT_CENTIMETERS[self.unit]
+        node.scale = np.linalg.norm(matrix[:3, :3], axis=-1)
+        rotation = (
+            euler_to_matrix(np.radians(node.rotate_axis)).T
+            @ normalize_rotation(matrix[:3, :3])
+            @ euler_to_matrix(np.radians(node.joint_orient)).T
+        )
+        node.rotate = np.degrees(matrix_to_euler(rotation, node.rotate_order))
@@ -0,0 +1,80 @@
+"""Undo・Redoで Python の関数を呼び出すだけのコマンドを追加する Maya のプラグイン
+
+CmdsBackend.register_undo() が load() で読み込み、push() で渡した関数の組を、コマンドの実行ごとに1つ受け取る。
+Maya はプラグインのファイルをパッケージとは別のモジュールとして読み込むため、
+関数の受け渡しには常にパッケージ側のモジュール (maya_fk_to_ik.backend.maya_fk_to_ik_undo) の _pending を使う。
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import maya.api.OpenMaya as om  # type: ignore # noqa: N813
+
+PLUGIN_NAME = Path(__file__).stem
+COMMAND_NAME = "matchFKToIKUndo"
+
+# 次のコマンドの実行で受け取る (Undoの関数, Redoの関数)
+_pending: list[tuple[Callable[[], None], Callable[[], None]]] = []
+
+
+def maya_useNewAPI() -> None:  # noqa: N802
+    """OpenMaya API 2.0 を使うプラグインであることを Maya に伝える"""
+
+
+def load() -> None:
+    """プラグインを読み込む (読み込み済みの場合は何もしない)"""
+    import maya.cmds as cmds  # type: ignore
+
+    if not cmds.pluginInfo(PLUGIN_NAME, query=True, loaded=True):  # type: ignore
+        cmds.loadPlugin(__file__, quiet=True)  # type: ignore
+
+
+def push(undo: Callable[[], None], redo: Callable[[], None]) -> None:
+    """次のコマンドの実行で登録する関数を渡す
+
+    Args:
+        undo (Callable[[], None]): Undoで呼び出す関数
+        redo (Callable[[], None]): Redoで呼び出す関数
+    """
+    _pending.append((undo, redo))
+
+
+class UndoCommand(om.MPxCommand):
+    """Undo・Redoで push() された関数を呼び出すだけのコマンド"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._undo: Callable[[], None] | None = None
+        self._redo: Callable[[], None] | None = None
+
+    @staticmethod
+    def creator() -> UndoCommand:
+        return UndoCommand()
+
+    def doIt(self, args: om.MArgList) -> None:  # noqa: ARG002, N802
+        from maya_fk_to_ik.backend import maya_fk_to_ik_undo
+
+        if not maya_fk_to_ik_undo._pending:  # noqa: SLF001
+            msg = f"{COMMAND_NAME} can only be run from the Match FK to IK tool."
+            raise RuntimeError(msg)
+        self._undo, self._redo = maya_fk_to_ik_undo._pending.pop(0)  # noqa: SLF001
+
+    def undoIt(self) -> None:  # noqa: N802
+        if self._undo is not None:
+            self._undo()
+
+    def redoIt(self) -> None:  # noqa: N802
+        if self._redo is not None:
+            self._redo()
+
+    def isUndoable(self) -> bool:  # noqa: N802
+        return True
+
+
+def initializePlugin(plugin: om.MObject) -> None:  # noqa: N802
+    om.MFnPlugin(plugin).registerCommand(COMMAND_NAME, UndoCommand.creator)
+
+
+def uninitializePlugin(plugin: om.MObject) -> None:  # noqa: N802
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import weakref
+from types import TracebackType
+from typing import Any, Sequence
+
+import maya.api.OpenMaya as om  # type: ignore # noqa: N813
+import maya.api.OpenMayaAnim as oma  # type: ignore # noqa: N813
+
+from .cmds_backend import CmdsBackend
+
+
+class Om2Backend(CmdsBackend):
+    """OpenMaya API 2.0 を使うバックエンド
+
+    ノード名を一度だけ MDagPath に解決してキャッシュし、行列の取得・設定を文字列のコマンドを介さずに行う。
+    キャッシュはDAGノードの削除・リネーム・親子関係の変更時に、そのノードと子孫の分だけをコールバックで破棄する。
+    シーンの切り替え時はすべて破棄する。
+    コールバックは close() で削除する。with 文で使うか、バックエンドが破棄されたときにも削除される。
+
+    undoable が True で、Undoへの記録が有効な場合は、トランスフォームとキーの書き込みをUndoに対応させるため maya.cmds で行う。
+    undoable が False の場合や、ジョブの実行中 (変更前の状態を記録してUndoへの記録を止めている) など
+    Undoへの記録が無効な場合は、MFnTransform・MFnAnimCurve で直接書き込む。
+    FKコントローラーのピボットはゼロであることを前提とする。
+    """
+
+    def __init__(self, undoable: bool = True) -> None:
+        self.undoable = undoable
+        self._dag_paths: dict[str, om.MDagPath] = {}
+        self._plugs: dict[str, dict[str, om.MPlug]] = {}  # ノード名 -> アトリビュート名 -> プラグ
+        self._dependents: dict[int, set[str]] = {}  # DAGノードのハッシュ -> そのノードか子孫を指すキャッシュしたノード名
+        self._callback_ids = self._add_cache_callbacks()
+
+    def __enter__(self) -> Om2Backend:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_callback_ids", None):
+            self.close()
+
+    def _add_cache_callbacks(self) -> list[int]:
+        # コールバックがバックエンドを参照し続けて破棄されなくならないように、弱参照を通して呼び出す
+        backend_ref = weakref.ref(self)
+
+        def _invalidate(node: om.MObject) -> None:
+            backend = backend_ref()
+            if backend is not None:
+                backend.invalidate(node)
+
+        def _clear_cache(*args) -> None:  # noqa: ANN002, ARG001
+            backend = backend_ref()
+            if backend is not None:
+                backend.clear_cache()
+
+        def _on_node_renamed(node: om.MObject, *args) -> None:  # noqa: ANN002, ARG001
+            # アニメーションカーブなどDAGノード以外のリネームはキャッシュに影響しない
+            if node.hasFn(om.MFn.kDagNode):
+                _invalidate(node)
+
+        def _on_dag_changed(message: int, child: om.MDagPath, *args) -> None:  # noqa: ANN002, ARG001
+            _invalidate(child.node())
+
+        return [
+            om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, _on_node_renamed),
+            om.MDGMessage.addNodeRemovedCallback(lambda node, *args: _invalidate(node), "dagNode"),  # noqa: ARG005
+            om.MDagMessage.addAllDagChangesCallback(_on_dag_changed),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, _clear_cache),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, _clear_cache),
+        ]
+
+    def close(self) -> None:
+        """キャッシュを破棄するコールバックを削除する"""
+        if self._callback_ids:
+            om.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """キャッシュしているDAGパスとプラグを破棄する"""
+        self._dag_paths.clear()
+        self._plugs.clear()
+        self._dependents.clear()
+
+    def invalidate(self, node: om.MObject) -> None:
+        """DAGノードとその子孫のキャッシュを破棄する
+
+        ノードのパス (ロング名) が変わると子孫のパスも変わるため、子孫のキャッシュも破棄する。
+        キャッシュしたノード名はパス上のすべてのノードに登録してあるため、キャッシュ全体は調べない
+
+        Args:
+            node (om.MObject): 削除・リネーム・親子関係が変更されたDAGノード
+        """
+        for name in self._dependents.pop(om.MObjectHandle(node).hashCode(), ()):
+            self._dag_paths.pop(name, None)
+            self._plugs.pop(name, None)
+
+    def get_dag_path(self, node: str) -> om.MDagPath | None:
+        """ノードのDAGパスを取得する (存在しないノードはNone)
+
+        Args:
+            node (str): ノード名
+
+        Returns:
+            om.MDagPath | None: キャッシュしたDAGパス
+        """
+        dag_path = self._dag_paths.get(node)
+        if dag_path is not None and dag_path.isValid():
+            return dag_path
+
+        selection = om.MSelectionList()
+        try:
+            selection.add(node)
+            dag_path = selection.getDagPath(0)
+        except (RuntimeError, TypeError):
+            return None
+        self._dag_paths[node] = dag_path
+        self._plugs.pop(node, None)
+        path = om.MDagPath(dag_path)
+        while path.length() > 0:
+            self._dependents.setdefault(om.MObjectHandle(path.node()).hashCode(), set()).add(node)
+            path.pop()
+        return dag_path
+
+    def _get_dag_path(self, node: str) -> om.MDagPath:
+        dag_path = self.get_dag_path(node)
+        if dag_path is None:
+            msg = f"Node not found: {node}"
+            raise ValueError(msg)
+        return dag_path
+
+    def _get_plug(self, node: str, attribute: str) -> om.MPlug:
+        dag_path = self._get_dag_path(node)
+        plugs = self._plugs.setdefault(node, {})
+        plug = plugs.get(attribute)
+        if plug is None:
+            plug = om.MFnDependencyNode(dag_path.node()).findPlug(attribute, False)
+            if plug.isArray:
+                plug = plug.elementByLogicalIndex(dag_path.instanceNumber())
+            plugs[attribute] = plug
+        return plug
+
+    def exists(self, node: str) -> bool:
+        return self.get_dag_path(node) is not None or super().exists(node)
+
+    def resolve_long_names(self, nodes: Sequence[str]) -> list[str | None]:
+        result: list[str | None] = []
+        for node in nodes:
+            dag_path = self.get_dag_path(node)
+            result.append(dag_path.fullPathName() if dag_path is not None else None)
+        return result
+
+    def get_world_matrix(self, node: str) -> list[float]:
+        return list(self._get_dag_path(node).inclusiveMatrix())
+
+    def _writes_through_api(self) -> bool:
+        """書き込みをAPIで直接行うかどうか (Undoに記録しない場合)"""
+        return not self.undoable or not self.is_undo_enabled()
+
+    def set_world_matrix(self, node: str, matrix: Sequence[float]) -> None:
+        """ワールド行列を設定する
+
+        APIで書き込む場合は、ローカル行列の回転から rotateAxis と jointOrient を取り除いて rotate に設定する
+        """
+        dag_path = self._get_dag_path(node)
+        if not self._writes_through_api():
+            super().set_world_matrix(dag_path.fullPathName(), matrix)
+            return
+
+        local = om.MTransformationMatrix(om.MMatrix(list(matrix)) * dag_path.exclusiveMatrixInverse())
+        # ローカル行列の回転は rotateAxis * rotate * jointOrient の順に掛けたもの
+        rotate_axis = self._get_euler(node, "rotateAxis").asMatrix()
+        rotation = rotate_axis.transpose() * local.rotation(asQuaternion=True).asMatrix()
+        if dag_path.hasFn(om.MFn.kJoint):
+            rotation *= self._get_euler(node, "jointOrient").asMatrix().transpose()
+        transform = om.MFnTransform(dag_path)
+        transform.setTranslation(local.translation(om.MSpace.kTransform), om.MSpace.kTransform)
+        transform.setRotation(om.MTransformationMatrix(rotation).rotation(asQuaternion=True), om.MSpace.kTransform)
+        transform.setScale(local.scale(om.MSpace.kTransform))
+
+    def _get_euler(self, node: str, attribute: str) -> om.MEulerRotation:
+        """XYZ順の角度の複合アトリビュート (rotateAxis・jointOrient) を取得する"""
+        plug = self._get_plug(node, attribute)
+        return om.MEulerRotation(*(plug.child(i).asDouble() for i in range(3)))
+
+    def rotate(self, node: str, rotation: Sequence[float]) -> None:
+        dag_path = self._get_dag_path(node)
+        if not self._writes_through_api():
+            super().rotate(dag_path.fullPathName(), rotation)
+            return
+
+        unit = om.MAngle.uiUnit()
+        radians = [om.MAngle(value, unit).asRadians() for value in rotation]
+        om.MFnTransform(dag_path).rotateBy(om.MEulerRotation(*radians).asQuaternion(), om.MSpace.kTransform)
+
+    def set_keyframes(
+        self, node: str, attribute: str, frames: Sequence[float], values: Sequence[float], linear: bool = False,
+    ) -> bool:
+        """アトリビュートのアニメーションカーブへ、全フレームのキーを一括で書き込む
+
+        APIで書き込む場合は、既存のカーブのフレーム範囲のキーだけを削除し、MFnAnimCurve.addKeys でまとめて追加する。
+        既存のカーブのノード・範囲外のキー・カーブへのほかの接続はそのまま残る。カーブがない場合だけ作成して接続する
+        """
+        if not self._writes_through_api():
+            return super().set_keyframes(node, attribute, frames, values, linear)
+
+        plug = self._get_plug(node, attribute)
+        if plug.isLocked:
+            return False
+        source = plug.source()
+        anim_curve = oma.MFnAnimCurve()
+        if source.isNull:
+            anim_curve.create(plug)
+        elif source.node().hasFn(om.MFn.kAnimCurve):
+            anim_curve.setObject(source.node())
+        else:
+            self.warning(f"'{node}.{attribute}' is driven by another connection. Skipped.")
+            return False
+
+        time_unit = om.MTime.uiUnit()
+        start, end = om.MTime(frames[0], time_unit), om.MTime(frames[-1], time_unit)
+        for index in reversed(range(anim_curve.numKeys)):
+            if start <= anim_curve.input(index) <= end:
+                anim_curve.remove(index)
+
+        # キーの値はAPIの内部単位 (ラジアン・センチメートル) で渡す
+        if anim_curve.animCurveType == oma.MFnAnimCurve.kAnimCurveTA:
+            angle_unit = om.MAngle.uiUnit()
+            values = [om.MAngle(value, angle_unit).asRadians() for value in values]
+        elif anim_curve.animCurveType == oma.MFnAnimCurve.kAnimCurveTL:
+            distance_unit = om.MDistance.uiUnit()
+            values = [om.MDistance(value, distance_unit).asCentimeters() for value in values]
+        tangent = oma.MFnAnimCurve.kTangentLinear if linear else oma.MFnAnimCurve.kTangentGlobal
+        anim_curve.addKeys(
+            [om.MTime(frame, time_unit) for frame in frames], list(values), tangent, tangent, keepExistingKeys=True,
+        )
+        return True
+
+    def get_matrix_at(self, node: str, attribute: str, frame: float) -> list[float]:
+        return self.get_matrices_at(node, attribute, [frame])[0]
+
+    def get_matrices_at(self, node: str, attribute: str, frames: Sequence[float]) -> list[list[float]]:
+        plug = self._get_plug(node, attribute)
+        unit = om.MTime.uiUnit()
+        matrices = []
+        for frame in frames:
+            previous = om.MDGContext(om.MTime(frame, unit)).makeCurrent()
+            try:
+                matrices.append(list(om.MFnMatrixData(plug.asMObject()).matrix()))
+            finally:
+                previous.makeCurrent()
+        return matrices
+
+    def get_attr(self, node: str, attribute: str) -> Any:  # noqa: ANN401
+        if attribute == "rotateOrder":
+            return self._get_plug(node, attribute).asShort()
+        return super().get_attr(node, attribute)
+
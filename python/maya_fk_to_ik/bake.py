@@ -0,0 +1,436 @@
+from __future__ import annotations
+
+import math
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+from .backend import get_backend
+from .core.bake_cache import BakeCacheEntry, find_changed_span, hash_curve_keys, hash_values, to_key_array
+from .core.const import LINEAR_UNIT_CENTIMETERS
+from .core.hierarchy import find_nearest_ancestor, sort_by_hierarchy
+from .core.key_reduction import CurveFilter, reduce_keys
+from .core.matrix import (
+    compute_local_matrices,
+    compute_target_matrices,
+    filter_euler,
+    matrix_to_euler,
+    remove_rotate_axes,
+)
+from .core.rotate_type import RotateType
+from .scene import query_world_matrices, resolve_match_infos
+from .utils.instrumentation import STAGE_COMPUTE, STAGE_QUERY, STAGE_RESOLVE, STAGE_SET, STAGE_UNDO_SNAPSHOT, instrumentation
+from .utils.decorator import register_curve_undo, undo_disabled
+from .utils.job import record_job_changes, run_to_completion
+
+if TYPE_CHECKING:
+    from .core.bake_cache import BakeCache
+    from .core.match_info import MatchInfo
+    from .utils.job import Steps
+
+ROTATE_ATTRIBUTES = ("rotateX", "rotateY", "rotateZ")
+TRANSLATE_ATTRIBUTES = ("translateX", "translateY", "translateZ")
+BAKE_FRAME_CHUNK = 100  # 行列の取得を1単位として進めるフレーム数
+BAKE_CACHE_SAMPLE_COUNT = 3  # キャッシュの検証で行列を比べるフレーム数
+BAKE_CACHE_TOLERANCE = 1.0e-9  # キャッシュの検証で同じとみなす行列の誤差
+
+
+def get_frames(start: int, end: int) -> list[int]:
+    """ベイクするフレームのリストを取得する
+
+    Args:
+        start (int): 開始フレーム
+        end (int): 終了フレーム (含む)
+
+    Returns:
+        list[int]: フレームのリスト
+    """
+    if end < start:
+        msg = f"Invalid frame range: {start} - {end}"
+        raise ValueError(msg)
+    return list(range(start, end + 1))
+
+
+def iter_bake_fk_to_ik(
+    infos: Sequence[MatchInfo],
+    start: int,
+    end: int,
+    cache: BakeCache | None = None,
+    compact_undo: bool = False,
+    curve_filter: CurveFilter | None = None,
+) -> Steps[None]:
+    """フレーム範囲の全フレームでFKコントローラーをジョイントに合わせ、キーとして書き込む
+
+    シーンの時間を変更せずに各フレームのワールド行列を評価し、全行・全フレームの計算をまとめて行列演算で行い、
+    アトリビュートごとに一括でキーを書き込む (範囲外のキーは残す)。
+    行列の移動はMayaの内部単位 (センチメートル) のため、シーンの長さの単位に変換して書き込む。
+    親のFKコントローラーも同時にベイクされる場合は、新しい親の姿勢を使って子のローカル値を計算する。
+    FKコントローラーの rotateAxis と jointOrient (ジョイントの場合) は、回転の値から取り除く。
+    FKコントローラーのピボットはゼロであることを前提とする。
+
+    cache を指定した場合は、前回のベイク結果から変わった可能性のある行・フレームだけを評価して計算し、
+    残りのフレームはキャッシュの値をそのままキーとして書き込む (詳しくは check_bake_cache() を参照)。
+
+    compact_undo の場合は、書き込む前のカーブのスナップショットを1つのUndoの操作として登録し、
+    キーの書き込み自体はUndoに記録しない (Undoのメモリがフレーム数ではなくカーブの数に比例する)。
+
+    curve_filter を指定した場合は、書き込む前に回転の不連続を取り除き、キーを削減する (filter_bake_values() を参照)。
+
+    行列の取得はノードごとに BAKE_FRAME_CHUNK フレームずつ、キーの書き込みは行ごとに1単位として進捗を返す
+
+    Args:
+        infos (Sequence[MatchInfo]): ベイクするマッチ情報
+        start (int): 開始フレーム
+        end (int): 終了フレーム (含む)
+        cache (BakeCache, optional): ベイク結果のキャッシュ
+        compact_undo (bool): 書き込むカーブのスナップショットでUndoするかどうか
+        curve_filter (CurveFilter, optional): 書き込む前に行う後処理の設定
+
+    Yields:
+        tuple[int, int]: 完了した単位数と全体の単位数
+    """
+    backend = get_backend()
+    frames = get_frames(start, end)
+    frame_array = np.array(frames)
+    angle_scale = 180.0 / math.pi if backend.angle_unit() == "deg" else 1.0
+    linear_scale = 1.0 / LINEAR_UNIT_CENTIMETERS[backend.linear_unit()]
+
+    infos_by_path = resolve_match_infos(infos)
+    if not infos_by_path:
+        return
+
+    fk_ctrls = sort_by_hierarchy(infos_by_path)
+    rows = [infos_by_path[fk_ctrl] for fk_ctrl in fk_ctrls]
+    instrumentation.add_count("rows", len(rows))
+    instrumentation.add_count("frames", len(frames))
+    row_indices = {fk_ctrl: row for row, fk_ctrl in enumerate(fk_ctrls)}
+    ancestors = {fk_ctrl: find_nearest_ancestor(fk_ctrl, row_indices) for fk_ctrl in fk_ctrls}
+    with instrumentation.stage(STAGE_QUERY):
+        rotate_orders = np.array([backend.get_attr(fk_ctrl, "rotateOrder") for fk_ctrl in fk_ctrls])
+        # (行数, 2, 3) の [rotateAxis, jointOrient] (ラジアン)
+        rotate_axes = np.array(backend.get_rotate_axes(fk_ctrls), dtype=np.float64).reshape(-1, 2, 3) / angle_scale
+
+    # 評価して計算し直すフレーム
+    if cache is not None:
+        check = check_bake_cache(cache, fk_ctrls, rows, ancestors, frames, rotate_orders, rotate_axes, angle_scale, linear_scale)
+        dirty = check.dirty
+    else:
+        check = None
+        dirty = np.ones((len(rows), len(frames)), dtype=bool)
+
+    # ワールド行列を取得するノードとアトリビュート、取得するフレーム (祖先のFKコントローラーは1回だけ取得する)
+    query_masks: dict[tuple[str, str], np.ndarray] = {}
+    for row, (info, fk_ctrl) in enumerate(zip(rows, fk_ctrls)):
+        needed = [(info.joint, "worldMatrix"), (fk_ctrl, "parentMatrix")]
+        ancestor = ancestors[fk_ctrl]
+        if ancestor:
+            needed += [(ancestor, "worldMatrix"), (rows[row_indices[ancestor]].joint, "worldMatrix")]
+        for query in needed:
+            query_masks[query] = query_masks.get(query, np.zeros(len(frames), dtype=bool)) | dirty[row]
+    query_frames = {query: np.flatnonzero(mask) for query, mask in query_masks.items()}
+    total = sum(math.ceil(len(indices) / BAKE_FRAME_CHUNK) for indices in query_frames.values()) + 1 + len(rows)
+    done = 0
+
+    world: dict[tuple[str, str], np.ndarray] = {}
+    for query, indices in query_frames.items():
+        world[query] = np.tile(np.identity(4), (len(frames), 1, 1))
+        for i in range(0, len(indices), BAKE_FRAME_CHUNK):
+            chunk = indices[i:i + BAKE_FRAME_CHUNK]
+            world[query][chunk] = query_world_matrices(*query, [frames[index] for index in chunk])
+            done += 1
+            yield done, total
+
+    joint_world = np.stack([world[(info.joint, "worldMatrix")] for info in rows])
+    parent_world = np.stack([world[(fk_ctrl, "parentMatrix")] for fk_ctrl in fk_ctrls])
+    target_world = compute_target_matrices(joint_world, rows)
+
+    # 祖先のFKコントローラーもベイクする場合は、ベイク後の祖先の姿勢に合わせて親の行列を置き換える
+    for row, fk_ctrl in enumerate(fk_ctrls):
+        ancestor = ancestors[fk_ctrl]
+        if ancestor:
+            ancestor_world = world[(ancestor, "worldMatrix")]
+            parent_world[row] = parent_world[row] @ np.linalg.inv(ancestor_world) @ target_world[row_indices[ancestor]]
+
+    with instrumentation.stage(STAGE_COMPUTE):
+        local = compute_local_matrices(target_world, parent_world)
+        rotation = remove_rotate_axes(local, rotate_axes[:, 0], rotate_axes[:, 1])
+        values = np.empty((len(fk_ctrls), len(frames), len(ROTATE_ATTRIBUTES) + len(TRANSLATE_ATTRIBUTES)))
+        for rotate_order in np.unique(rotate_orders):
+            mask = rotate_orders == rotate_order
+            values[mask, :, :3] = matrix_to_euler(rotation[mask], int(rotate_order)) * angle_scale
+        values[:, :, 3:] = local[:, :, 3, :3] * linear_scale
+        if check is not None:
+            values = np.where(dirty[..., np.newaxis], values, check.cached_values)
+        keys, keep = filter_bake_values(values, rotate_orders, angle_scale, curve_filter)
+    instrumentation.add_count("keys", int(keep.sum()))
+    done += 1
+    yield done, total
+
+    plugs = [(fk_ctrl, attribute) for fk_ctrl in fk_ctrls for attribute in ROTATE_ATTRIBUTES + TRANSLATE_ATTRIBUTES]
+    record_job_changes(plugs)
+    if compact_undo:
+        with instrumentation.stage(STAGE_UNDO_SNAPSHOT):
+            register_curve_undo(plugs)
+    for row, fk_ctrl in enumerate(fk_ctrls):
+        with instrumentation.stage(STAGE_SET), undo_disabled() if compact_undo else nullcontext():
+            for axis, attribute in enumerate(ROTATE_ATTRIBUTES + TRANSLATE_ATTRIBUTES):
+                mask = keep[row, :, axis]
+                backend.set_keyframes(
+                    fk_ctrl,
+                    attribute,
+                    frame_array[mask].tolist(),
+                    keys[row, mask, axis].tolist(),
+                    linear=not mask.all(),
+                )
+        done += 1
+        yield done, total
+
+    if check is not None:
+        check.save(cache, fk_ctrls, values)  # type: ignore
+
+
+def filter_bake_values(
+    values: np.ndarray,
+    rotate_orders: np.ndarray,
+    angle_scale: float,
+    curve_filter: CurveFilter | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """ベイクした値の回転の不連続を取り除き、書き込むキーを選ぶ
+
+    Euler Filter は行の回転順序ごとに全フレームをまとめて処理する。
+    キーの削減はすべての行・チャンネルをまとめて処理し、回転は度、移動はシーンの単位の許容誤差で、
+    キーの間を直線で補間しても誤差に収まるキーだけを残す
+
+    Args:
+        values (np.ndarray): (行数, フレーム数, 6) の回転と移動 (UI単位)
+        rotate_orders (np.ndarray): 各行の回転順序
+        angle_scale (float): ラジアンからUI単位への変換係数
+        curve_filter (CurveFilter | None): 後処理の設定。Noneの場合はそのまま全フレームを書き込む
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (行数, フレーム数, 6) の書き込む値と、書き込むキーのマスク
+    """
+    keep = np.ones(values.shape, dtype=bool)
+    if curve_filter is None:
+        return values, keep
+
+    values = values.copy()
+    if curve_filter.euler_filter:
+        for rotate_order in np.unique(rotate_orders):
+            mask = rotate_orders == rotate_order
+            values[mask, :, :3] = filter_euler(values[mask, :, :3] / angle_scale, int(rotate_order)) * angle_scale
+
+    channels = len(ROTATE_ATTRIBUTES)
+    for axes, tolerance in (
+        (slice(0, channels), None if curve_filter.rotate_tolerance is None else math.radians(curve_filter.rotate_tolerance) * angle_scale),
+        (slice(channels, None), curve_filter.translate_tolerance),
+    ):
+        if tolerance is not None:
+            curves = values[:, :, axes].transpose(0, 2, 1)
+            reduced = reduce_keys(curves.reshape(-1, values.shape[1]), tolerance).reshape(curves.shape)
+            keep[:, :, axes] = reduced.transpose(0, 2, 1)
+    return values, keep
+
+
+class BakeCacheCheck:
+    """ベイク結果のキャッシュを検証した結果を保持するクラス (check_bake_cache() で作成する)"""
+
+    def __init__(self, frames: list[int], row_count: int) -> None:
+        self.frames = frames
+        self.dirty = np.ones((row_count, len(frames)), dtype=bool)  # 評価して計算し直す行・フレーム
+        self.cached_values = np.zeros((row_count, len(frames), 6))  # キャッシュの値 (dirty のフレームは使わない)
+        self.joints: list[str] = []
+        self.keys: list[str] = [""] * row_count
+        self.sources: list[dict[str, str]] = [{} for _ in range(row_count)]
+        self.samples = np.zeros((row_count, 0, 2, 4, 4))
+        self.sample_frames: list[int] = []
+        self.unchanged = np.zeros(row_count, dtype=bool)  # キャッシュを書き直す必要のない行
+
+    def save(self, cache: BakeCache, fk_ctrls: Sequence[str], values: np.ndarray) -> None:
+        """ベイク結果をキャッシュに書き込む (変更のない行は書き込まない)
+
+        書き込んだ場合は、どの行からも参照されなくなったアニメーションカーブのキーを削除する
+
+        Args:
+            cache (BakeCache): キャッシュ
+            fk_ctrls (Sequence[str]): 各行のFKコントローラーのロング名
+            values (np.ndarray): (行数, フレーム数, 6) のベイク結果
+        """
+        for row, fk_ctrl in enumerate(fk_ctrls):
+            if self.unchanged[row]:
+                continue
+            cache.save(fk_ctrl, self.joints[row], BakeCacheEntry(
+                key=self.keys[row],
+                start=self.frames[0],
+                sources=self.sources[row],
+                sample_frames=self.sample_frames,
+                samples=self.samples[row],
+                values=values[row],
+            ))
+        if not self.unchanged.all():
+            cache.prune_curve_keys()
+
+
+def check_bake_cache(
+    cache: BakeCache,
+    fk_ctrls: Sequence[str],
+    rows: Sequence[MatchInfo],
+    ancestors: dict[str, str | None],
+    frames: list[int],
+    rotate_orders: np.ndarray,
+    rotate_axes: np.ndarray,
+    angle_scale: float,
+    linear_scale: float,
+) -> BakeCacheCheck:
+    """ベイク結果のキャッシュと比べて、評価して計算し直す必要のある行・フレームを求める
+
+    次の場合は行のすべてのフレームを計算し直す
+    - キャッシュがない、またはマッチ情報・回転順序・rotateAxis・jointOrient・角度と長さの単位・ベイクする祖先が変わった
+    - 数フレームだけ評価したジョイントと親 (ベイクする祖先からの相対) の行列が、前回と異なる (リグの変更など)
+    - ジョイントと親に影響するアニメーションカーブが増減した、またはドリブンキーのカーブが変更された
+    それ以外は、変更されたキーの前後のキーまでの範囲と、キャッシュの範囲外のフレームだけを計算し直す。
+    ベイクする祖先のフレームを計算し直す場合は、その子孫の同じフレームも計算し直す。
+    ベイクするFKコントローラー自体のカーブは、ベイクで書き換えるため比べない
+
+    Args:
+        cache (BakeCache): キャッシュ
+        fk_ctrls (Sequence[str]): 親が子より先になる順番のFKコントローラーのロング名
+        rows (Sequence[MatchInfo]): 各行のマッチ情報
+        ancestors (dict[str, str | None]): FKコントローラー -> ベイクする最も近い祖先のFKコントローラー
+        frames (list[int]): ベイクするフレーム
+        rotate_orders (np.ndarray): 各行の回転順序
+        rotate_axes (np.ndarray): (行数, 2, 3) の各行の rotateAxis と jointOrient (ラジアン)
+        angle_scale (float): ラジアンからUI単位への変換係数
+        linear_scale (float): センチメートルからUI単位への変換係数
+
+    Returns:
+        BakeCacheCheck: 検証結果
+    """
+    backend = get_backend()
+    check = BakeCacheCheck(frames, len(rows))
+    with instrumentation.stage(STAGE_RESOLVE):
+        joints: list[str] = backend.resolve_long_names([info.joint for info in rows])  # type: ignore
+    check.joints = joints
+    frame_array = np.array(frames, dtype=np.float64)
+
+    with instrumentation.stage(STAGE_QUERY):
+        curves_by_node = backend.get_anim_curves(joints + list(fk_ctrls))
+    outputs = set(fk_ctrls)
+    time_based: dict[str, bool] = {}
+    row_curves: list[list[str]] = [[] for _ in rows]
+    for row in range(len(rows)):
+        for curve, driven_node, is_time_based in curves_by_node[row] + curves_by_node[len(rows) + row]:
+            if driven_node not in outputs:
+                time_based[curve] = is_time_based
+                row_curves[row].append(curve)
+    curve_names = list(time_based)
+    with instrumentation.stage(STAGE_QUERY):
+        curve_keys = dict(zip(curve_names, map(to_key_array, backend.get_curve_keys(curve_names))))
+    curve_digests = {curve: hash_curve_keys(keys) for curve, keys in curve_keys.items()}
+
+    entries = [cache.load(fk_ctrl, joint) for fk_ctrl, joint in zip(fk_ctrls, joints)]
+    sample_frames = sorted({frames[0], frames[len(frames) // 2], frames[-1]})[:BAKE_CACHE_SAMPLE_COUNT]
+    check.sample_frames = sample_frames
+    samples = _query_cache_samples(fk_ctrls, joints, ancestors, entries, sample_frames)
+    check.samples = samples[:, :len(sample_frames)]
+
+    row_indices = {fk_ctrl: row for row, fk_ctrl in enumerate(fk_ctrls)}
+    for row, (fk_ctrl, info) in enumerate(zip(fk_ctrls, rows)):
+        ancestor = ancestors[fk_ctrl]
+        check.keys[row] = hash_values([
+            fk_ctrl,
+            joints[row],
+            ancestor or "",
+            RotateType(info.type).value,
+            info.offset.to_list() if info.offset is not None else None,
+            int(rotate_orders[row]),
+            rotate_axes[row].tolist(),
+            angle_scale,
+            linear_scale,
+        ])
+        check.sources[row] = {curve: curve_digests[curve] for curve in row_curves[row]}
+
+        entry = entries[row]
+        if entry is None or entry.key != check.keys[row] or not np.allclose(
+            samples[row, len(sample_frames):len(sample_frames) + len(entry.samples)], entry.samples, rtol=0.0, atol=BAKE_CACHE_TOLERANCE,
+        ):
+            continue
+        dirty = (frame_array < entry.start) | (frame_array > entry.end)
+        for curve in entry.sources.keys() | check.sources[row].keys():
+            old_digest, new_digest = entry.sources.get(curve), check.sources[row].get(curve)
+            if old_digest == new_digest:
+                continue
+            old_keys = cache.load_curve_keys(old_digest) if old_digest and new_digest and time_based[curve] else None
+            span = find_changed_span(old_keys, curve_keys[curve]) if old_keys is not None else (-np.inf, np.inf)
+            if span is not None:
+                dirty |= (frame_array >= span[0]) & (frame_array <= span[1])
+        check.dirty[row] = dirty
+        cached = ~dirty
+        check.cached_values[row, cached] = entry.values[frame_array[cached].astype(int) - entry.start]
+        check.unchanged[row] = (
+            not dirty.any() and entry.start == frames[0] and entry.end == frames[-1]
+            and entry.sources == check.sources[row] and entry.sample_frames == sample_frames
+        )
+
+    # ベイクする祖先を計算し直すフレームは、子孫も計算し直す
+    for row, fk_ctrl in enumerate(fk_ctrls):
+        ancestor = ancestors[fk_ctrl]
+        if ancestor:
+            check.dirty[row] |= check.dirty[row_indices[ancestor]]
+            check.unchanged[row] &= not check.dirty[row].any()
+
+    for curve in curve_names:
+        cache.save_curve_keys(curve_digests[curve], curve_keys[curve])
+    return check
+
+
+def _query_cache_samples(
+    fk_ctrls: Sequence[str],
+    joints: Sequence[str],
+    ancestors: dict[str, str | None],
+    entries: Sequence[BakeCacheEntry | None],
+    sample_frames: list[int],
+) -> np.ndarray:
+    """キャッシュの検証に使うジョイントと親の行列を、今回と前回のサンプルフレームで評価する
+
+    親の行列は、ベイクする祖先のFKコントローラーからの相対の行列にする (祖先のキーはベイクで書き換えるため)
+
+    Returns:
+        np.ndarray: (行数, 今回と前回のサンプルフレーム数, 2, 4, 4) の行列
+    """
+    count = max([len(sample_frames) * 2] + [len(sample_frames) + len(entry.sample_frames) for entry in entries if entry])
+    samples = np.zeros((len(fk_ctrls), count, 2, 4, 4))
+    for row, (fk_ctrl, joint) in enumerate(zip(fk_ctrls, joints)):
+        entry = entries[row]
+        row_frames = sample_frames + (entry.sample_frames if entry else [])
+        samples[row, :len(row_frames), 0] = query_world_matrices(joint, "worldMatrix", row_frames)
+        parent = query_world_matrices(fk_ctrl, "parentMatrix", row_frames)
+        ancestor = ancestors[fk_ctrl]
+        if ancestor:
+            parent = parent @ np.linalg.inv(query_world_matrices(ancestor, "worldMatrix", row_frames))
+        samples[row, :len(row_frames), 1] = parent
+    return samples
+
+
+def bake_fk_to_ik(
+    infos: Sequence[MatchInfo],
+    start: int,
+    end: int,
+    cache: BakeCache | None = None,
+    compact_undo: bool = False,
+    curve_filter: CurveFilter | None = None,
+) -> None:
+    """フレーム範囲の全フレームでFKコントローラーをジョイントに合わせ、キーとして書き込む
+
+    処理の内容は iter_bake_fk_to_ik() を参照
+
+    Args:
+        infos (Sequence[MatchInfo]): ベイクするマッチ情報
+        start (int): 開始フレーム
+        end (int): 終了フレーム (含む)
+        cache (BakeCache, optional): ベイク結果のキャッシュ
+        compact_undo (bool): 書き込むカーブのスナップショットでUndoするかどうか
+        curve_filter (CurveFilter, optional): 書き込む前に行う後処理の設定
+    """
+    run_to_completion(iter_bake_fk_to_ik(infos, start, end, cache, compact_undo, curve_filter))
@@ -0,0 +1,574 @@
+"""複数のシーンファイルにマッチ・ベイクを適用するバッチ処理
+
+マニフェスト (JSON) に書いたシーンを複数のワーカープロセスに振り分けて処理し、結果をJSONのレポートに書き出す。
+ワーカーはそれぞれ1回だけMayaを初期化し、その後は次々にシーンを開いて処理するため、
+シーン数が多い場合の処理時間はワーカー数 (コア数) にほぼ比例して短くなる。
+ベイクの後は、FKコントローラーがジョイントに合っているかを検証し、許容誤差を超えた場合は "mismatch" として報告する。
+IK/FKスイッチがないリグの行は自己整合性しか確認できないため、誤差がなくても "unverified" として報告する。
+
+使い方:
+    mayapy -m maya_fk_to_ik.batch shots.json --workers 8 --timeout 900 --startup-timeout 300 --report results.json
+    python -m maya_fk_to_ik.batch shots.json --backend fake  # Mayaのない環境で疑似シーンに対して実行する
+
+マニフェストの例:
+    {
+        "defaults": {"operation": "bake", "profile": "profiles.sqlite3", "timeout": 600},
+        "scenes": [
+            {"scene": "shots/sh010.ma", "start": 1001, "end": 1120, "output": "baked/sh010.ma",
+             "rotate_tolerance": 0.05, "verify_angle_tolerance": 0.5},
+            {"scene": "shots/sh020.ma", "namespaces": ["charA", "charB"], "profile": "biped.json", "overwrite": true},
+            {"scene": "shots/sh030.ma", "operation": "match", "save": false}
+        ]
+    }
+
+相対パスはマニフェストのフォルダーからのパスとして扱う。
+元のシーンに上書き保存するには "overwrite": true を指定する (output も overwrite もない項目はエラーになる)。
+保存は同じフォルダーの一時ファイルに書き出してから置き換えるため、保存の途中で落ちても元のファイルは壊れない。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+from .app import MatchFKToIK
+from .backend import get_backend, set_backend
+from .core.const import (
+    DEFAULT_PROFILE_DATABASE_FILE_NAME,
+    DEFAULT_SETTINGS_FOLDER_PATH,
+    VERIFY_ANGLE_TOLERANCE_DEGREES,
+    VERIFY_POSITION_TOLERANCE,
+)
+from .core.key_reduction import CurveFilter
+from .core.match_info import MatchInfos, expand_template, make_template
+from .core.profile_store import ProfileStore
+from .scene import find_template_namespaces
+from .utils.decorator import undo_disabled
+from .utils.job import Job
+
+if TYPE_CHECKING:
+    from .core.match_info import MatchInfo
+
+BATCH_MANIFEST_VERSION = 1
+BATCH_REPORT_VERSION = 1
+BATCH_POLL_SECONDS = 0.1  # ワーカーの結果・タイムアウトを確認する間隔
+BATCH_STARTUP_TIMEOUT = 600.0  # ワーカーがシーンを渡されてから処理を始めるまで (Mayaの初期化を含む) の制限時間 (秒)
+
+# 処理の種類
+OPERATION_MATCH = "match"
+OPERATION_BAKE = "bake"
+OPERATIONS = (OPERATION_MATCH, OPERATION_BAKE)
+
+# 処理の結果
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_MISMATCH = "mismatch"  # ベイクは保存したが、検証で許容誤差を超えた
+STATUS_UNVERIFIED = "unverified"  # ベイクは保存したが、IK/FKスイッチがないリグの行は自己整合性しか確認できなかった
+STATUSES = (STATUS_OK, STATUS_UNVERIFIED, STATUS_MISMATCH, STATUS_FAILED, STATUS_TIMEOUT)
+
+# バックエンド
+BACKEND_CMDS = "cmds"
+BACKEND_OM2 = "om2"
+BACKEND_FAKE = "fake"
+BACKENDS = (BACKEND_CMDS, BACKEND_OM2, BACKEND_FAKE)
+
+ALL_NAMESPACES = "*"  # テンプレートのFKコントローラーが存在するすべてのネームスペース
+
+
+@dataclass
+class BatchTask:
+    """1つのシーンに対する処理を保持するデータクラス"""
+    scene: str  # シーンファイルのパス
+    operation: str = OPERATION_BAKE  # "match" (現在のフレームでマッチ) または "bake"
+    profile: str | None = None  # プロファイルのデータベース (.sqlite3) またはマッチ情報のJSON。省略時は既定のプロファイル
+    start: float | None = None  # ベイクの開始フレーム。省略時はタイムスライダーの範囲
+    end: float | None = None  # ベイクの終了フレーム (含む)。省略時はタイムスライダーの範囲
+    namespaces: list[str] | str | None = None  # プロファイルをテンプレートとして展開するネームスペース ("*" ですべて)
+    output: str | None = None  # 保存先のパス。省略時は overwrite に従う
+    save: bool = True  # 処理したシーンを保存するかどうか
+    overwrite: bool = False  # output がない場合に、開いたシーンに上書き保存するかどうか
+    timeout: float | None = None  # 1シーンの処理の制限時間 (秒)
+    euler_filter: bool = False  # ベイクした回転の不連続を取り除くかどうか
+    rotate_tolerance: float | None = None  # ベイクした回転のキーを削減する許容誤差 (度)
+    translate_tolerance: float | None = None  # ベイクした移動のキーを削減する許容誤差
+    verify: bool = True  # ベイクの後に、FKコントローラーがジョイントに合っているかを検証するかどうか
+    verify_angle_tolerance: float | None = None  # 検証で一致とみなす回転の誤差 (度)。省略時は既定値
+    verify_position_tolerance: float | None = None  # 検証で一致とみなす位置の誤差。省略時は既定値
+
+    @property
+    def curve_filter(self) -> CurveFilter | None:
+        """ベイクしたカーブを書き込む前の後処理の設定 (後処理をしない場合はNone)"""
+        if not self.euler_filter and self.rotate_tolerance is None and self.translate_tolerance is None:
+            return None
+        return CurveFilter(self.euler_filter, self.rotate_tolerance, self.translate_tolerance)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | str, defaults: dict[str, Any] | None = None, base_path: Path | None = None) -> BatchTask:
+        """マニフェストの項目から作成する
+
+        Args:
+            data (dict[str, Any] | str): 項目 (シーンのパスだけの文字列も可)
+            defaults (dict[str, Any], optional): 項目で省略された値
+            base_path (Path, optional): 相対パスの基準のフォルダー
+
+        Returns:
+            BatchTask: シーンの処理
+        """
+        values = {**(defaults or {}), **({"scene": data} if isinstance(data, str) else data)}
+        names = {item.name for item in fields(cls)}
+        unknown = values.keys() - names
+        if unknown:
+            msg = f"Unknown manifest keys: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        if "scene" not in values:
+            msg = "Manifest entry has no scene."
+            raise ValueError(msg)
+        task = cls(**values)
+        if task.operation not in OPERATIONS:
+            msg = f"Unknown operation: {task.operation}"
+            raise ValueError(msg)
+        if task.save and not task.output and not task.overwrite:
+            msg = f"Manifest entry for {task.scene} has no output. Set output, or overwrite: true to overwrite the scene."
+            raise ValueError(msg)
+        if base_path is not None:
+            for name in ("scene", "profile", "output"):
+                value = getattr(task, name)
+                if value is not None:
+                    setattr(task, name, str(base_path / value))
+        return task
+
+
+@dataclass
+class BatchResult:
+    """1つのシーンの処理結果を保持するデータクラス"""
+    scene: str
+    status: str  # "ok", "unverified", "mismatch", "failed", "timeout"
+    seconds: float = 0.0  # シーンを開いてから保存するまでの時間
+    rows: int = 0  # 処理したマッチ情報の行数
+    frames: int = 0  # ベイクしたフレーム数
+    namespaces: list[str] = field(default_factory=list)
+    output: str | None = None  # 保存したファイルのパス
+    error: str | None = None  # エラーの内容
+    details: str | None = None  # エラーのトレースバック
+    worker: int | None = None  # 処理したワーカーのプロセスID
+    verify: dict[str, Any] | None = None  # ベイク後の検証結果 (VerifyReport.to_dict())
+
+
+def load_manifest(file_path: Path | str) -> list[BatchTask]:
+    """マニフェストのJSONファイルを読み込む
+
+    Args:
+        file_path (Path | str): マニフェストのパス
+
+    Returns:
+        list[BatchTask]: シーンごとの処理
+    """
+    file_path = Path(file_path)
+    with file_path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"scenes": data}
+    version = data.get("version", BATCH_MANIFEST_VERSION)
+    if version > BATCH_MANIFEST_VERSION:
+        msg = f"Unsupported batch manifest version: {version}"
+        raise ValueError(msg)
+    base_path = file_path.resolve().parent
+    return [BatchTask.from_dict(item, data.get("defaults"), base_path) for item in data["scenes"]]
+
+
+def initialize_backend(backend_name: str) -> None:
+    """ワーカーのバックエンドを用意する (Mayaのバックエンドの場合はスタンドアロンのMayaを初期化する)
+
+    Args:
+        backend_name (str): "cmds", "om2", "fake" のいずれか
+    """
+    if backend_name == BACKEND_FAKE:
+        from .backend.fake import FakeBackend
+
+        set_backend(FakeBackend())
+        return
+
+    import maya.standalone  # type: ignore
+
+    maya.standalone.initialize(name="python")  # type: ignore
+    if backend_name == BACKEND_OM2:
+        from .backend.om2_backend import Om2Backend
+
+        set_backend(Om2Backend())
+    else:
+        from .backend.cmds_backend import CmdsBackend
+
+        set_backend(CmdsBackend())
+
+
+def save_scene_atomically(file_path: Path | str) -> str:
+    """シーンを同じフォルダーの一時ファイルに保存してから、保存先のファイルと置き換える (現在のバックエンドを使う)
+
+    保存の途中で落ちても、保存先の元のファイルは壊れない
+
+    Args:
+        file_path (Path | str): 保存先のパス
+
+    Returns:
+        str: 保存したファイルのパス
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    # 拡張子でファイル形式が決まるため、拡張子は変えない
+    temp_path = file_path.with_name(f".{file_path.stem}.{os.getpid()}.tmp{file_path.suffix}")
+    try:
+        get_backend().save_scene(str(temp_path))
+        temp_path.replace(file_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    return str(file_path)
+
+
+def run_task(task: BatchTask) -> BatchResult:
+    """1つのシーンを開いて処理し、保存する (現在のバックエンドを使う)
+
+    処理に失敗した場合は保存せず、エラーの内容を結果に記録する。
+    保存先は output、なければ overwrite の場合だけ開いたシーン (save_scene_atomically() で保存する)
+
+    Args:
+        task (BatchTask): シーンの処理
+
+    Returns:
+        BatchResult: 処理結果
+    """
+    start_time = time.perf_counter()
+    result = BatchResult(task.scene, STATUS_OK, worker=os.getpid())
+    profile_store = None
+    try:
+        if task.save and not task.output and not task.overwrite:
+            msg = "The task has no output. Set output, or overwrite to overwrite the scene."
+            raise ValueError(msg)
+        backend = get_backend()
+        backend.open_scene(task.scene)
+
+        profile = Path(task.profile) if task.profile else DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_PROFILE_DATABASE_FILE_NAME
+        if profile.suffix.lower() == ".json":
+            match_infos = MatchInfos()
+            match_infos.load_json(profile)
+            tool = MatchFKToIK(match_infos=match_infos, curve_filter=task.curve_filter)
+        else:
+            if not profile.exists():
+                msg = f"Profile not found: {profile}"
+                raise FileNotFoundError(msg)
+            profile_store = ProfileStore(profile, read_only=True)
+            tool = MatchFKToIK(profile_store=profile_store, curve_filter=task.curve_filter)
+
+        infos: list[MatchInfo] = list(tool.match_infos)
+        if task.namespaces is not None:
+            template = make_template(infos)
+            namespaces = find_template_namespaces(template) if task.namespaces == ALL_NAMESPACES else list(task.namespaces)
+            infos = expand_template(template, namespaces)
+            result.namespaces = namespaces
+        if not infos:
+            msg = "No match infos for the scene."
+            raise ValueError(msg)
+        result.rows = len(infos)
+
+        if task.operation == OPERATION_BAKE:
+            playback_start, playback_end = backend.playback_range()
+            start = int(task.start if task.start is not None else playback_start)
+            end = int(task.end if task.end is not None else playback_end)
+            # ヘッドレスの処理はUndoしないため、変更前のカーブの記録もUndoへの記録も行わない
+            with undo_disabled():
+                Job("Bake FK to IK", tool.iter_bake(infos, start, end), undoable=False).run()
+            result.frames = end - start + 1
+            if task.verify:
+                report = tool.verify(
+                    infos,
+                    start,
+                    end,
+                    VERIFY_ANGLE_TOLERANCE_DEGREES if task.verify_angle_tolerance is None else task.verify_angle_tolerance,
+                    VERIFY_POSITION_TOLERANCE if task.verify_position_tolerance is None else task.verify_position_tolerance,
+                )
+                result.verify = report.to_dict()
+                if report.failed_rows.any():
+                    result.status = STATUS_MISMATCH
+                    result.error = (
+                        f"{result.verify['failed_rows']} rows over tolerance "
+                        f"(max rotate error {report.max_angle_error:.4f} deg, max translate error {report.max_position_error:.4f})"
+                    )
+                elif report.self_consistency_only:
+                    result.status = STATUS_UNVERIFIED
+                    result.error = (
+                        f"{result.verify['self_consistency_rows']} rows are self-consistency only "
+                        "(their rigs have no IK/FK switch in the profile)"
+                    )
+        else:
+            with undo_disabled():
+                Job("Match FK to IK", tool.iter_match_many(infos), undoable=False).run()
+
+        if task.save:
+            result.output = save_scene_atomically(task.output or task.scene)
+    except Exception as e:  # noqa: BLE001
+        result.status = STATUS_FAILED
+        result.error = f"{type(e).__name__}: {e}"
+        result.details = traceback.format_exc()
+    finally:
+        if profile_store is not None:
+            profile_store.close()
+    result.seconds = time.perf_counter() - start_time
+    return result
+
+
+def _worker_main(backend_name: str, tasks: multiprocessing.Queue, results: multiprocessing.Queue) -> None:
+    """ワーカープロセスの処理 (Noneを受け取るまでシーンを処理する)
+
+    シーンの処理を始めるときに (番号, プロセスID, None) を、終えたときに (番号, プロセスID, 結果) を送る
+    """
+    initialize_backend(backend_name)
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        index, task = item
+        results.put((index, os.getpid(), None))
+        results.put((index, os.getpid(), run_task(task)))
+
+
+class _Worker:
+    """ワーカープロセスと、処理中のシーンを保持するクラス"""
+
+    def __init__(self, context: Any, backend_name: str, results: multiprocessing.Queue) -> None:  # noqa: ANN401
+        self.tasks = context.Queue()
+        self.process = context.Process(target=_worker_main, args=(backend_name, self.tasks, results), daemon=True)
+        self.process.start()
+        self.index: int | None = None  # 処理中のシーンの番号
+        self.assigned: float | None = None  # シーンを渡した時刻
+        self.started: float | None = None  # 処理を始めた時刻 (Mayaの初期化中はNone)
+
+    def assign(self, index: int, task: BatchTask) -> None:
+        """シーンの処理を渡す"""
+        self.index = index
+        self.assigned = time.perf_counter()
+        self.started = None
+        self.tasks.put((index, task))
+
+    def release(self) -> None:
+        """処理中のシーンをなくす"""
+        self.index = None
+        self.assigned = None
+        self.started = None
+
+    def stop(self) -> None:
+        """ワーカーを終了させる"""
+        if self.process.is_alive():
+            self.tasks.put(None)
+
+    def kill(self) -> None:
+        """ワーカーを強制終了する"""
+        self.process.terminate()
+        self.process.join()
+
+
+class BatchRunner:
+    """シーンの処理を複数のワーカープロセスに振り分けて実行するクラス
+
+    ワーカーにはシーンを1つずつ渡し、終わったワーカーから次のシーンを渡す (シーンごとの処理時間の差を吸収する)。
+    制限時間を超えたシーンや、処理中にワーカーが落ちたシーンは、そのワーカーを作り直して次のシーンに進む。
+    Mayaの初期化が終わらないなど、シーンを渡してから startup_timeout 秒以内に処理を始めないワーカーも同様に作り直す。
+    Mayaはforkしたプロセスでは安全に動かないため、ワーカーはspawnで起動する。
+    """
+
+    def __init__(
+        self,
+        backend_name: str = BACKEND_CMDS,
+        workers: int | None = None,
+        timeout: float | None = None,
+        startup_timeout: float | None = BATCH_STARTUP_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            backend_name (str): ワーカーで使うバックエンド ("cmds", "om2", "fake")
+            workers (int, optional): ワーカーの数。省略時はCPUのコア数
+            timeout (float, optional): シーンで指定されていない場合の1シーンの制限時間 (秒)
+            startup_timeout (float, optional): シーンを渡してから処理を始めるまで (Mayaの初期化を含む) の制限時間 (秒)。
+                Noneの場合は制限しない
+        """
+        if backend_name not in BACKENDS:
+            msg = f"Unknown backend: {backend_name}"
+            raise ValueError(msg)
+        self.backend_name = backend_name
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+
+    def run(self, tasks: Sequence[BatchTask], on_result: Callable[[int, BatchResult], None] | None = None) -> list[BatchResult]:
+        """すべてのシーンを処理する
+
+        Args:
+            tasks (Sequence[BatchTask]): シーンの処理
+            on_result (Callable[[int, BatchResult], None], optional): シーンの処理が終わるたびに (番号, 結果) を渡して呼ぶ関数
+
+        Returns:
+            list[BatchResult]: tasks と同じ順番の処理結果
+        """
+        results: list[BatchResult | None] = [None] * len(tasks)
+        if not tasks:
+            return []
+
+        def _finish(index: int, result: BatchResult) -> None:
+            if results[index] is None:
+                results[index] = result
+                if on_result is not None:
+                    on_result(index, result)
+
+        context = multiprocessing.get_context("spawn")
+        result_queue = context.Queue()
+        pending = deque(range(len(tasks)))
+        workers = [_Worker(context, self.backend_name, result_queue) for _ in range(min(self.workers, len(tasks)))]
+        try:
+            while pending or any(worker.index is not None for worker in workers):
+                for worker in workers:
+                    if worker.index is None and pending:
+                        index = pending.popleft()
+                        worker.assign(index, tasks[index])
+
+                try:
+                    index, pid, result = result_queue.get(timeout=BATCH_POLL_SECONDS)
+                except queue.Empty:
+                    pass
+                else:
+                    worker = next((worker for worker in workers if worker.index == index and worker.process.pid == pid), None)
+                    if worker is not None:
+                        if result is None:
+                            worker.started = time.perf_counter()
+                        else:
+                            _finish(index, result)
+                            worker.release()
+
+                for i, worker in enumerate(workers):
+                    if worker.index is None:
+                        continue
+                    task = tasks[worker.index]
+                    timeout = task.timeout if task.timeout is not None else self.timeout
+                    now = time.perf_counter()
+                    if worker.started is not None and timeout is not None and now - worker.started > timeout:
+                        error = f"Timed out after {timeout} seconds."
+                        status = STATUS_TIMEOUT
+                    elif (
+                        worker.started is None and worker.assigned is not None
+                        and self.startup_timeout is not None and now - worker.assigned > self.startup_timeout
+                    ):
+                        error = f"Worker did not start the scene within {self.startup_timeout} seconds."
+                        status = STATUS_TIMEOUT
+                    elif not worker.process.is_alive():
+                        error = f"Worker exited with code {worker.process.exitcode}."
+                        status = STATUS_FAILED
+                    else:
+                        continue
+                    seconds = time.perf_counter() - worker.started if worker.started is not None else 0.0
+                    _finish(worker.index, BatchResult(task.scene, status, seconds, error=error, worker=worker.process.pid))
+                    worker.kill()
+                    workers[i] = _Worker(context, self.backend_name, result_queue)
+        finally:
+            for worker in workers:
+                worker.stop()
+            for worker in workers:
+                worker.process.join(timeout=10.0)
+                if worker.process.is_alive():
+                    worker.kill()
+        return [result for result in results if result is not None]
+
+
+def write_report(results: Sequence[BatchResult], file_path: Path | str, **info: Any) -> dict[str, Any]:  # noqa: ANN401
+    """処理結果をまとめたレポートをJSONファイルに書き出す
+
+    一時ファイルに書き出してから置き換えるため、書き込みの途中で落ちても元のファイルは壊れない
+
+    Args:
+        results (Sequence[BatchResult]): 処理結果
+        file_path (Path | str): 書き出し先のパス
+        **info: レポートに加える情報 (ワーカー数・全体の処理時間など)
+
+    Returns:
+        dict[str, Any]: 書き出したレポート
+    """
+    summary = {status: 0 for status in STATUSES}
+    for result in results:
+        summary[result.status] += 1
+    report = {
+        "version": BATCH_REPORT_VERSION,
+        "date": datetime.now(timezone.utc).isoformat(),
+        **info,
+        "summary": {"scenes": len(results), **summary, "scene_seconds": sum(result.seconds for result in results)},
+        "results": [asdict(result) for result in results],
+    }
+    file_path = Path(file_path)
+    temp_path = file_path.with_name(f"{file_path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    temp_path.replace(file_path)
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """バッチ処理のエントリーポイント
+
+    Returns:
+        int: すべてのシーンが成功した場合は0、それ以外は1
+    """
+    parser = argparse.ArgumentParser(prog="maya_fk_to_ik.batch", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", type=Path, help="シーンと処理を書いたマニフェストのJSONファイル")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセスの数 (省略時はCPUのコア数)")
+    parser.add_argument("--timeout", type=float, default=None, help="1シーンの制限時間 (秒)。マニフェストの指定が優先される")
+    parser.add_argument(
+        "--startup-timeout", type=float, default=BATCH_STARTUP_TIMEOUT,
+        help=f"ワーカーがシーンの処理を始めるまで (Mayaの初期化を含む) の制限時間 (秒)。既定は{BATCH_STARTUP_TIMEOUT:g}秒",
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_CMDS, help="ワーカーで使うバックエンド")
+    parser.add_argument("--report", type=Path, default=None, help="結果のレポートのJSONファイル (省略時はマニフェストの隣)")
+    args = parser.parse_args(argv)
+
+    tasks = load_manifest(args.manifest)
+    runner = BatchRunner(args.backend, args.workers, args.timeout, args.startup_timeout)
+    report_path = args.report or args.manifest.with_name(f"{args.manifest.stem}_results.json")
+
+    finished = 0
+
+    def _on_result(index: int, result: BatchResult) -> None:  # noqa: ARG001
+        nonlocal finished
+        finished += 1
+        print(f"[{finished}/{len(tasks)}] {result.status:8} {result.seconds:8.2f}s  {result.scene}", flush=True)  # noqa: T201
+        if result.error:
+            print(f"    {result.error}", flush=True)  # noqa: T201
+
+    start_time = time.perf_counter()
+    results = runner.run(tasks, _on_result)
+    seconds = time.perf_counter() - start_time
+    report = write_report(
+        results,
+        report_path,
+        manifest=str(args.manifest.resolve()),
+        backend=args.backend,
+        workers=runner.workers,
+        seconds=seconds,
+    )
+    summary = report["summary"]
+    print(  # noqa: T201
+        f"{summary['scenes']} scenes in {seconds:.2f}s: {summary[STATUS_OK]} ok, {summary[STATUS_UNVERIFIED]} unverified, "
+        f"{summary[STATUS_MISMATCH]} mismatch, {summary[STATUS_FAILED]} failed, {summary[STATUS_TIMEOUT]} timeout. Report: {report_path}",
+    )
+    return 0 if summary[STATUS_OK] == summary["scenes"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Sequence
+
+import numpy as np
+
+BAKE_CACHE_VERSION = 1
+BAKE_CACHE_CHANNELS = 6  # rotateX, rotateY, rotateZ, translateX, translateY, translateZ
+_CURVE_FOLDER_NAME = "curves"
+
+
+def hash_values(values: Any) -> str:  # noqa: ANN401
+    """JSONにできる値のハッシュを求める"""
+    return hashlib.sha1(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def to_key_array(keys: Sequence[Sequence[float]]) -> np.ndarray:
+    """アニメーションカーブのキーのリストを (キー数, 列数) の配列にする"""
+    array = np.asarray(keys, dtype=np.float64)
+    return array if array.ndim == 2 else array.reshape(0, 2)  # noqa: PLR2004
+
+
+def hash_curve_keys(keys: np.ndarray) -> str:
+    """アニメーションカーブのキーの配列のハッシュを求める"""
+    digest = hashlib.sha1(str(keys.shape).encode("utf-8"))
+    digest.update(np.ascontiguousarray(keys).tobytes())
+    return digest.hexdigest()
+
+
+def find_changed_span(old_keys: np.ndarray, new_keys: np.ndarray) -> tuple[float, float] | None:
+    """アニメーションカーブの変更によって、値が変わる可能性のある時間の範囲を求める
+
+    変更 (追加・削除・値や接線の変更) されたキーのうち最初と最後のキーについて、その前後のキーまでの範囲とする。
+    最初 (最後) のキーより前 (後) は、前後の補間方法 (インフィニティ) の影響を受けるため無限の範囲とする
+
+    Args:
+        old_keys (np.ndarray): (キー数, 列数) の変更前のキー。1列目は時間
+        new_keys (np.ndarray): (キー数, 列数) の変更後のキー
+
+    Returns:
+        tuple[float, float] | None: 範囲 (両端を含む)。変更がない場合はNone
+    """
+    old_rows = {tuple(row) for row in old_keys.tolist()}
+    new_rows = {tuple(row) for row in new_keys.tolist()}
+    changed = sorted({row[0] for row in old_rows ^ new_rows})
+    if not changed:
+        return None
+    times = np.unique(np.concatenate([old_keys[:, 0], new_keys[:, 0]]))
+    first = int(np.searchsorted(times, changed[0]))
+    last = int(np.searchsorted(times, changed[-1]))
+    lower = float(times[first - 1]) if first > 0 else -np.inf
+    upper = float(times[last + 1]) if last + 1 < len(times) else np.inf
+    return lower, upper
+
+
+@dataclass
+class BakeCacheEntry:
+    """1つのFKコントローラーのベイク結果のキャッシュを保持するデータクラス"""
+    key: str  # マッチ情報・回転順序・角度の単位などのハッシュ
+    start: int  # values の最初のフレーム
+    sources: dict[str, str]  # ジョイント・親に影響するアニメーションカーブ -> キーのハッシュ
+    sample_frames: list[int]  # キャッシュの検証に使うフレーム
+    samples: np.ndarray  # (フレーム数, 2, 4, 4) のサンプルフレームでのジョイントと親の行列
+    values: np.ndarray  # (フレーム数, 6) の各フレームのローカルの回転 (UI単位) と移動
+
+    @property
+    def end(self) -> int:
+        """values の最後のフレーム (含む)"""
+        return self.start + len(self.values) - 1
+
+
+class BakeCache:
+    """ベイク結果をFKコントローラーごとにバイナリファイルへ保存するキャッシュ
+
+    ベイク結果はフレーム順の連続した配列 (.npy) として保存し、読み込み時はメモリマップで開くため、
+    使うフレームの部分だけがファイルから読み込まれる。
+    ジョイントと親に影響するアニメーションカーブのキーは、内容のハッシュをファイル名として1回だけ保存し、
+    次回のベイク時に変更されたキーの範囲を求めるために使う。どのキャッシュからも参照されなくなったキーは
+    prune_curve_keys() で削除する。
+
+    ファイルは一時ファイルに書き出してから置き換えるため、書き込みの途中で落ちても以前のキャッシュは壊れない。
+    """
+
+    def __init__(self, folder: Path | str) -> None:
+        """
+        Args:
+            folder (Path | str): キャッシュを保存するフォルダー
+        """
+        self.folder = Path(folder)
+
+    def load(self, fk_ctrl: str, joint: str) -> BakeCacheEntry | None:
+        """FKコントローラーのキャッシュを読み込む (ベイク結果はメモリマップで開く)
+
+        Args:
+            fk_ctrl (str): FKコントローラーのロング名
+            joint (str): ジョイントのロング名
+
+        Returns:
+            BakeCacheEntry | None: キャッシュ。ない場合や読み込めない場合はNone
+        """
+        name = self._entry_name(fk_ctrl, joint)
+        try:
+            with (self.folder / f"{name}.json").open(encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != BAKE_CACHE_VERSION:
+                return None
+            values = np.load(self.folder / data["values"], mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        if values.ndim != 2 or values.shape[1] != BAKE_CACHE_CHANNELS:  # noqa: PLR2004
+            return None
+        return BakeCacheEntry(
+            key=data["key"],
+            start=data["start"],
+            sources=data["sources"],
+            sample_frames=data["sample_frames"],
+            samples=np.array(data["samples"], dtype=np.float64).reshape(-1, 2, 4, 4),
+            values=values,
+        )
+
+    def save(self, fk_ctrl: str, joint: str, entry: BakeCacheEntry) -> None:
+        """FKコントローラーのキャッシュを書き込む (以前のキャッシュは置き換える)
+
+        Args:
+            fk_ctrl (str): FKコントローラーのロング名
+            joint (str): ジョイントのロング名
+            entry (BakeCacheEntry): キャッシュ
+        """
+        self.folder.mkdir(parents=True, exist_ok=True)
+        name = self._entry_name(fk_ctrl, joint)
+        values_name = f"{name}.{uuid.uuid4().hex[:8]}.npy"
+        self._write(self.folder / values_name, lambda f: np.save(f, np.ascontiguousarray(entry.values, dtype=np.float64)))
+        data = {
+            "version": BAKE_CACHE_VERSION,
+            "fk_ctrl": fk_ctrl,
+            "joint": joint,
+            "key": entry.key,
+            "start": entry.start,
+            "values": values_name,
+            "sources": entry.sources,
+            "sample_frames": entry.sample_frames,
+            "samples": entry.samples.reshape(-1).tolist(),
+        }
+        self._write(self.folder / f"{name}.json", lambda f: f.write(json.dumps(data).encode("utf-8")))
+
+        # 置き換えた以前のベイク結果を削除する (メモリマップで開いている場合は次回以降に削除する)
+        for old_values in self.folder.glob(f"{name}.*.npy"):
+            if old_values.name != values_name:
+                try:
+                    old_values.unlink()
+                except OSError:
+                    pass
+
+    def load_curve_keys(self, digest: str) -> np.ndarray | None:
+        """保存したアニメーションカーブのキーを読み込む
+
+        Args:
+            digest (str): キーのハッシュ
+
+        Returns:
+            np.ndarray | None: (キー数, 列数) のキー。ない場合はNone
+        """
+        try:
+            return np.load(self.folder / _CURVE_FOLDER_NAME / f"{digest}.npy")
+        except (OSError, ValueError):
+            return None
+
+    def save_curve_keys(self, digest: str, keys: np.ndarray) -> None:
+        """アニメーションカーブのキーを保存する (同じ内容のキーは1回だけ保存する)
+
+        Args:
+            digest (str): キーのハッシュ
+            keys (np.ndarray): (キー数, 列数) のキー
+        """
+        file_path = self.folder / _CURVE_FOLDER_NAME / f"{digest}.npy"
+        if file_path.exists():
+            return
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write(file_path, lambda f: np.save(f, keys))
+
+    def prune_curve_keys(self) -> int:
+        """どのFKコントローラーのキャッシュからも参照されていないアニメーションカーブのキーを削除する
+
+        Returns:
+            int: 削除したファイルの数
+        """
+        curve_folder = self.folder / _CURVE_FOLDER_NAME
+        if not curve_folder.exists():
+            return 0
+        referenced: set[str] = set()
+        for file_path in self.folder.glob("*.json"):
+            try:
+                with file_path.open(encoding="utf-8") as f:
+                    referenced.update(json.load(f).get("sources", {}).values())
+            except (OSError, ValueError, AttributeError):
+                continue
+
+        removed = 0
+        for file_path in curve_folder.glob("*.npy"):
+            if file_path.stem in referenced:
+                continue
+            try:
+                file_path.unlink()
+            except OSError:
+                continue
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """すべてのキャッシュを削除する"""
+        if self.folder.exists():
+            shutil.rmtree(self.folder, ignore_errors=True)
+
+    @staticmethod
+    def _entry_name(fk_ctrl: str, joint: str) -> str:
+        """FKコントローラーとジョイントのキャッシュのファイル名"""
+        return hashlib.sha1(f"{fk_ctrl}\n{joint}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _write(file_path: Path, write: Callable[[BinaryIO], object]) -> None:
+        """一時ファイルに書き出してから置き換える"""
+        temp_path = file_path.with_name(f"{file_path.name}.tmp")
+        with temp_path.open("wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        temp_path.replace(file_path)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+# 接続の種類
+KIND_DIRECT = "direct"  # FKコントローラーのアトリビュートからジョイントへの直接の接続
+KIND_CONSTRAINT = "constraint"  # コンストレイントを経由した接続
+KIND_MATRIX = "matrix"  # 行列ノード・offsetParentMatrixを経由した接続
+KIND_UTILITY = "utility"  # その他のユーティリティノードを経由した接続
+
+ROTATE_PLUGS = ("rotate", "rotateX", "rotateY", "rotateZ", "rx", "ry", "rz", "r")
+MATRIX_PLUGS = ("offsetParentMatrix", "opm")
+MATRIX_NODE_TYPES = {
+    "multMatrix", "decomposeMatrix", "composeMatrix", "holdMatrix", "pickMatrix",
+    "blendMatrix", "aimMatrix", "wtAddMatrix", "inverseMatrix", "uvPinMatrix",
+}
+STRONG_CONSTRAINT_TYPES = {"parentConstraint", "orientConstraint"}
+
+# 接続の種類ごとの信頼度
+DIRECT_ROTATE_SCORE = 1.0
+DIRECT_OTHER_SCORE = 0.7
+STRONG_CONSTRAINT_SCORE = 0.9
+OTHER_CONSTRAINT_SCORE = 0.6
+MATRIX_SCORE = 0.85
+UTILITY_SCORE = 0.6
+HOP_PENALTY = 0.95  # 経由するノードが1つ増えるごとに掛ける係数
+
+
+@dataclass
+class PairProposal:
+    """FKコントローラーとジョイントの組み合わせの候補"""
+    fk_ctrl: str
+    joint: str
+    score: float  # 信頼度 (0 ~ 1)
+    kind: str  # 接続の種類
+    path: list[str]  # FKコントローラーからジョイントまでに経由したノード
+
+
+def split_plug(plug: str) -> tuple[str, str]:
+    """プラグ名をノード名とアトリビュート名に分ける
+
+    Args:
+        plug (str): "node.attribute" 形式のプラグ名
+
+    Returns:
+        tuple[str, str]: ノード名とアトリビュート名 (配列のインデックスや子アトリビュートは含む)
+    """
+    node, _, attribute = plug.partition(".")
+    return node, attribute
+
+
+def get_plug_leaf(attribute: str) -> str:
+    """アトリビュート名から、配列のインデックスを除いた末端のアトリビュート名を取得する"""
+    return attribute.rsplit(".", 1)[-1].split("[", 1)[0]
+
+
+class ConnectionIndex:
+    """DGの接続を索引化し、FKコントローラーが動かしているジョイントを探すクラス
+
+    接続は1回ずつ追加するのではなく、シーンからまとめて取得したものを add_connections() で登録する
+    """
+
+    def __init__(self) -> None:
+        self.outputs: dict[str, list[tuple[str, str, str]]] = {}  # ノード -> [(出力アトリビュート, 接続先ノード, 入力アトリビュート)]
+        self.node_types: dict[str, str] = {}
+
+    def add_connections(self, connections: Iterable[tuple[str, str]]) -> list[str]:
+        """接続を登録する
+
+        Args:
+            connections (Iterable[tuple[str, str]]): (接続元のプラグ, 接続先のプラグ) のリスト
+
+        Returns:
+            list[str]: 新しく現れた接続先のノード
+        """
+        new_nodes: dict[str, None] = {}
+        for source_plug, destination_plug in connections:
+            source, source_attribute = split_plug(source_plug)
+            destination, destination_attribute = split_plug(destination_plug)
+            self.outputs.setdefault(source, []).append((source_attribute, destination, destination_attribute))
+            if destination not in self.outputs and destination not in self.node_types:
+                new_nodes[destination] = None
+        return list(new_nodes)
+
+    def set_node_types(self, node_types: dict[str, str]) -> None:
+        """ノードのタイプを登録する
+
+        Args:
+            node_types (dict[str, str]): ノード名 -> ノードのタイプ
+        """
+        self.node_types.update(node_types)
+
+    def propose_pairs(self, fk_ctrls: Iterable[str], max_depth: int) -> list[PairProposal]:
+        """各FKコントローラーが動かしているジョイントを探し、最も信頼度の高い組み合わせを返す
+
+        ジョイントに到達した経路はそこで打ち切り、max_depth より多くのノードを経由する経路は探さない
+
+        Args:
+            fk_ctrls (Iterable[str]): FKコントローラーの候補
+            max_depth (int): 経由するノードの最大数
+
+        Returns:
+            list[PairProposal]: 信頼度の高い順の候補
+        """
+        proposals = []
+        for fk_ctrl in fk_ctrls:
+            best: PairProposal | None = None
+            for proposal in self._find_joints(fk_ctrl, max_depth):
+                if best is None or proposal.score > best.score:
+                    best = proposal
+            if best is not None:
+                proposals.append(best)
+        return sorted(proposals, key=lambda proposal: -proposal.score)
+
+    def _find_joints(self, fk_ctrl: str, max_depth: int) -> list[PairProposal]:
+        """FKコントローラーから接続をたどり、到達したジョイントごとの候補を返す"""
+        proposals = []
+        visited = {fk_ctrl}
+        # (ノード, FKコントローラーの出力アトリビュート, ノードへの入力アトリビュート, 経由したノード)
+        frontier: list[tuple[str, str, str, list[str]]] = [
+            (destination, source_attribute, destination_attribute, [])
+            for source_attribute, destination, destination_attribute in self.outputs.get(fk_ctrl, [])
+        ]
+        while frontier:
+            next_frontier = []
+            for node, source_attribute, input_attribute, path in frontier:
+                if node in visited:
+                    continue
+                visited.add(node)
+                if self.node_types.get(node) == "joint":
+                    kind, score = self._score(source_attribute, input_attribute, path)
+                    proposals.append(PairProposal(fk_ctrl, node, score, kind, path))
+                    continue
+                if len(path) >= max_depth:
+                    continue
+                next_frontier.extend(
+                    (destination, source_attribute, destination_attribute, [*path, node])
+                    for _, destination, destination_attribute in self.outputs.get(node, [])
+                )
+            frontier = next_frontier
+        return proposals
+
+    def _score(self, source_attribute: str, joint_attribute: str, path: list[str]) -> tuple[str, float]:
+        """経路から接続の種類と信頼度を求める
+
+        Args:
+            source_attribute (str): FKコントローラーの出力アトリビュート
+            joint_attribute (str): ジョイントの入力アトリビュート
+            path (list[str]): 経由したノード
+
+        Returns:
+            tuple[str, float]: 接続の種類と信頼度
+        """
+        joint_attribute = get_plug_leaf(joint_attribute)
+        if not path:
+            if get_plug_leaf(source_attribute) in ROTATE_PLUGS and joint_attribute in ROTATE_PLUGS:
+                return KIND_DIRECT, DIRECT_ROTATE_SCORE
+            return KIND_DIRECT, DIRECT_OTHER_SCORE
+
+        penalty = HOP_PENALTY ** (len(path) - 1)
+        node_types = [self.node_types.get(node, "") for node in path]
+        if any(node_type in STRONG_CONSTRAINT_TYPES for node_type in node_types):
+            return KIND_CONSTRAINT, STRONG_CONSTRAINT_SCORE * penalty
+        if any(node_type.endswith("Constraint") for node_type in node_types):
+            return KIND_CONSTRAINT, OTHER_CONSTRAINT_SCORE * penalty
+        if joint_attribute in MATRIX_PLUGS or any(node_type in MATRIX_NODE_TYPES for node_type in node_types):
+            return KIND_MATRIX, MATRIX_SCORE * penalty
+        return KIND_UTILITY, UTILITY_SCORE * penalty
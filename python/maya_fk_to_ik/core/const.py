@@ -2,3 +2,27 @@ from pathlib import Path
 
 DEFAULT_SETTINGS_FOLDER_PATH = Path("~/.maya_tools/match_fk_to_ik").expanduser()
 DEFAULT_MATCH_INFO_FILE_NAME = "match_info.json"
+DEFAULT_PROFILE_DATABASE_FILE_NAME = "profiles.sqlite3"
+DEFAULT_BAKE_CACHE_FOLDER_NAME = "bake_cache"
+
+# 長さのUI単位 (currentUnit -linear) の1単位あたりのセンチメートル (Mayaの内部単位) の値
+LINEAR_UNIT_CENTIMETERS = {"mm": 0.1, "cm": 1.0, "m": 100.0, "km": 100000.0, "in": 2.54, "ft": 30.48, "yd": 91.44, "mi": 160934.4}
+
+# ベイクしたキーの削減で、初期値として使う許容誤差 (回転は度、移動はシーンの単位)
+DEFAULT_KEY_REDUCTION_ROTATE_TOLERANCE = 0.01
+DEFAULT_KEY_REDUCTION_TRANSLATE_TOLERANCE = 0.001
+
+# マッチ結果の検証で、この誤差 (回転は度、位置はシーンの単位) 以内であれば一致とみなす
+VERIFY_ANGLE_TOLERANCE_DEGREES = 0.1
+VERIFY_POSITION_TOLERANCE = 0.01
+
+# リグのIK/FKスイッチの値が、この誤差以内であればIK状態とみなす
+SWITCH_VALUE_TOLERANCE = 1.0e-6
+
+# 回転タイプの自動検出で、この角度 (度) 以内の差であれば一致とみなす
+ROTATE_TYPE_TOLERANCE_DEGREES = 1.0
+
+# FKコントローラーとジョイントの自動ペアリングで、接続をたどる際に経由するノードの最大数
+AUTO_PAIR_MAX_DEPTH = 4
+# 自動ペアリングで、この信頼度以上の候補を最初から採用する
+AUTO_PAIR_MIN_SCORE = 0.8
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+DAG_SEPARATOR = "|"
+NAMESPACE_SEPARATOR = ":"
+
+
+def get_depth(path: str) -> int:
+    """DAGパス (ロング名) の階層の深さを取得する
+
+    Args:
+        path (str): ノードのロング名
+
+    Returns:
+        int: 階層の深さ
+    """
+    return path.count(DAG_SEPARATOR)
+
+
+def sort_by_hierarchy(paths: Iterable[str]) -> list[str]:
+    """親が子より先に来るようにDAGパスを並べ替える
+
+    同じ深さのノード同士は元の順番を保つ
+
+    Args:
+        paths (Iterable[str]): ノードのロング名
+
+    Returns:
+        list[str]: 並べ替えたロング名のリスト
+    """
+    return sorted(paths, key=get_depth)
+
+
+def find_nearest_ancestor(path: str, candidates: set[str] | dict[str, object]) -> str | None:
+    """候補の中から最も近い祖先ノードを探す
+
+    Args:
+        path (str): ノードのロング名
+        candidates (set[str] | dict[str, object]): 祖先の候補となるロング名
+
+    Returns:
+        str | None: 最も近い祖先のロング名。見つからなければNone
+    """
+    parts = path.split(DAG_SEPARATOR)
+    for i in range(len(parts) - 1, 1, -1):
+        parent = DAG_SEPARATOR.join(parts[:i])
+        if parent in candidates:
+            return parent
+    return None
+
+
+def get_namespace(node: str) -> str:
+    """ノード名のネームスペースを取得する
+
+    Args:
+        node (str): ノード名 (ロング名も可)
+
+    Returns:
+        str: 先頭の ":" を除いたネームスペース。ルートネームスペースの場合は空文字
+    """
+    short_name = node.rsplit(DAG_SEPARATOR, 1)[-1].lstrip(NAMESPACE_SEPARATOR)
+    if NAMESPACE_SEPARATOR not in short_name:
+        return ""
+    return short_name.rsplit(NAMESPACE_SEPARATOR, 1)[0]
+
+
+def strip_namespace(node: str) -> str:
+    """ノード名 (DAGパスの各要素) からネームスペースを取り除く
+
+    Args:
+        node (str): ノード名 (ロング名も可)
+
+    Returns:
+        str: ネームスペースを取り除いたノード名
+    """
+    return DAG_SEPARATOR.join(part.rsplit(NAMESPACE_SEPARATOR, 1)[-1] for part in node.split(DAG_SEPARATOR))
+
+
+def add_namespace(node: str, namespace: str) -> str:
+    """ネームスペースのないノード名 (DAGパスの各要素) にネームスペースを付ける
+
+    Args:
+        node (str): ネームスペースのないノード名 (ロング名も可)
+        namespace (str): 付けるネームスペース。空文字の場合はそのまま返す
+
+    Returns:
+        str: ネームスペースを付けたノード名
+    """
+    if not namespace:
+        return node
+    return DAG_SEPARATOR.join(f"{namespace}{NAMESPACE_SEPARATOR}{part}" if part else part for part in node.split(DAG_SEPARATOR))
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class CurveFilter:
+    """ベイクしたカーブを書き込む前に行う後処理の設定を保持するデータクラス"""
+    euler_filter: bool = True  # 回転の不連続 (360度の飛び・別解への反転) を取り除くかどうか
+    rotate_tolerance: float | None = None  # 回転のキーを削減するときの許容誤差 (度)。Noneの場合は削減しない
+    translate_tolerance: float | None = None  # 移動のキーを削減するときの許容誤差 (シーンの単位)。Noneの場合は削減しない
+
+    @property
+    def reduces_keys(self) -> bool:
+        """キーを削減するかどうか"""
+        return self.rotate_tolerance is not None or self.translate_tolerance is not None
+
+
+def reduce_keys(values: np.ndarray, tolerance: float | np.ndarray) -> np.ndarray:
+    """等間隔のフレームの値を、キーの間を直線で補間しても許容誤差に収まる少ないキーに削減する
+
+    最初と最後のフレームを残し、残したキーの間を直線で補間したときの誤差が最も大きいフレームを、
+    すべてのフレームが許容誤差に収まるまで区間ごとに追加する (Douglas-Peucker法)。
+    すべてのカーブのすべての区間を1回の配列演算でまとめて分割するため、繰り返しの回数は区間の分割の深さだけになる
+
+    Args:
+        values (np.ndarray): (カーブ数, フレーム数) の値
+        tolerance (float | np.ndarray): 許容誤差。カーブごとに指定する場合は (カーブ数,) の配列
+
+    Returns:
+        np.ndarray: (カーブ数, フレーム数) の残すキーのマスク
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count, frames = values.shape
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), (count,))[:, np.newaxis]
+    keep = np.zeros(values.shape, dtype=bool)
+    if frames == 0:
+        return keep
+    keep[:, [0, -1]] = True
+
+    index = np.arange(frames)
+    rows = np.arange(count)[:, np.newaxis]
+    while True:
+        # 各フレームの前後で最も近い残したキーの間を直線で補間する
+        previous = np.maximum.accumulate(np.where(keep, index, 0), axis=1)
+        following = np.minimum.accumulate(np.where(keep, index, frames - 1)[:, ::-1], axis=1)[:, ::-1]
+        weight = (index - previous) / np.maximum(following - previous, 1)
+        interpolated = values[rows, previous] * (1.0 - weight) + values[rows, following] * weight
+        error = np.abs(interpolated - values)
+        over = np.flatnonzero(error > tolerance)
+        if not len(over):
+            return keep
+
+        # 許容誤差を超えたフレームのうち、区間 (カーブと前のキー) ごとに誤差が最も大きいフレームを残す
+        segments = (rows * frames + previous).reshape(-1)[over]
+        errors = error.reshape(-1)[over]
+        order = np.lexsort((-errors, segments))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = segments[order][1:] != segments[order][:-1]
+        keep.flat[over[order[first]]] = True
@@ -1,47 +1,180 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Iterator
+from typing import TYPE_CHECKING, Iterable, Iterator, Protocol
+
+from .hierarchy import add_namespace, strip_namespace
+from .offset import OffsetTransform
 
 if TYPE_CHECKING:
     from .rotate_type import RotateType
 
+MATCH_INFO_FILE_VERSION = 2
+
 
 @dataclass
 class MatchInfo:
-    """FKコントローラーとジョイントのマッチ情報を保持するデータクラス"""
+    """FKコントローラーとジョイントのマッチ情報を保持するデータクラス
+
+    offset がある場合は回転タイプの代わりにそのオフセットでマッチする
+    """
     joint: str
     fk_ctrl: str
     type: RotateType
+    offset: OffsetTransform | None = None
+
+
+def make_template(infos: Iterable[MatchInfo]) -> list[MatchInfo]:
+    """マッチ情報のノード名からネームスペースを取り除き、ネームスペースに依存しないテンプレートにする
+
+    同じFKコントローラーになる行は先に現れた行を使う
+
+    Args:
+        infos (Iterable[MatchInfo]): マッチ情報
+
+    Returns:
+        list[MatchInfo]: ネームスペースのないマッチ情報
+    """
+    template: dict[str, MatchInfo] = {}
+    for info in infos:
+        fk_ctrl = strip_namespace(info.fk_ctrl)
+        if fk_ctrl not in template:
+            template[fk_ctrl] = MatchInfo(joint=strip_namespace(info.joint), fk_ctrl=fk_ctrl, type=info.type, offset=info.offset)
+    return list(template.values())
+
+
+def expand_template(template: Iterable[MatchInfo], namespaces: Iterable[str]) -> list[MatchInfo]:
+    """テンプレートのマッチ情報を各ネームスペースのマッチ情報に展開する
+
+    Args:
+        template (Iterable[MatchInfo]): ネームスペースのないマッチ情報
+        namespaces (Iterable[str]): 展開先のネームスペース
+
+    Returns:
+        list[MatchInfo]: ネームスペースごと・行ごとのマッチ情報
+    """
+    template = list(template)
+    return [
+        MatchInfo(
+            joint=add_namespace(info.joint, namespace),
+            fk_ctrl=add_namespace(info.fk_ctrl, namespace),
+            type=info.type,
+            offset=info.offset,
+        )
+        for namespace in namespaces
+        for info in template
+    ]
+
+
+class MatchInfosObserver(Protocol):
+    """MatchInfosの変更を受け取るオブザーバー (テーブルモデルなど)"""
+    def rows_about_to_be_inserted(self, first: int, last: int) -> None:
+        """行が挿入される直前に呼ばれる"""
+
+    def rows_inserted(self, first: int, last: int) -> None:
+        """行が挿入された直後に呼ばれる"""
+
+    def rows_about_to_be_removed(self, first: int, last: int) -> None:
+        """行が削除される直前に呼ばれる"""
+
+    def rows_removed(self, first: int, last: int) -> None:
+        """行が削除された直後に呼ばれる"""
+
+    def row_about_to_be_changed(self, row: int) -> None:
+        """行の内容が変更される直前に呼ばれる"""
+
+    def row_changed(self, row: int) -> None:
+        """行の内容が変更された直後に呼ばれる"""
 
 
 class MatchInfos:
-    """FKコントローラーとジョイントのマッチ情報を保持するクラス"""
+    """FKコントローラーとジョイントのマッチ情報を保持するクラス
+
+    登録順の行リストと、FKコントローラー・ジョイントからの索引を持ち、
+    行番号・FKコントローラー・ジョイントのいずれからもO(1)で取得できる
+    """
     def __init__(self) -> None:
         self._data: dict[str, MatchInfo] = {}
+        self._rows: list[MatchInfo] = []
+        self._row_indices: dict[str, int] = {}
+        self._joint_index: dict[str, list[MatchInfo]] = {}
+        self._observers: list[MatchInfosObserver] = []
 
     def __len__(self) -> int:
         """マッチ情報の数を取得する"""
-        return len(self._data)
+        return len(self._rows)
 
     def __iter__(self) -> Iterator[MatchInfo]:
         """マッチ情報をイテレートする"""
-        return iter(self._data.values())
+        return iter(self._rows)
+
+    def add_observer(self, observer: MatchInfosObserver) -> None:
+        """変更を通知するオブザーバーを登録する
+
+        Args:
+            observer (MatchInfosObserver): オブザーバー
+        """
+        if observer not in self._observers:
+            self._observers.append(observer)
+
+    def remove_observer(self, observer: MatchInfosObserver) -> None:
+        """オブザーバーの登録を解除する
 
-    def add(self, fk_ctrl: str, joint: str, rotate_type: RotateType) -> None:
+        Args:
+            observer (MatchInfosObserver): オブザーバー
+        """
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def add(
+        self,
+        fk_ctrl: str,
+        joint: str,
+        rotate_type: RotateType,
+        offset: OffsetTransform | None = None,
+        row: int | None = None,
+    ) -> None:
         """マッチ情報を追加する
 
         Args:
             fk_ctrl (str): FKコントローラーの名前
             joint (str): ジョイントの名前
             rotate_type (RotateType): FKコントローラーの回転タイプ
+            offset (OffsetTransform, optional): 回転タイプの代わりに使うオフセット
+            row (int, optional): 挿入する行番号。省略時は末尾に追加する
         """
         if fk_ctrl in self._data:
             msg = f"FK controller '{fk_ctrl}' already exists in match info."
             raise ValueError(msg)
-        self._data[fk_ctrl] = MatchInfo(joint, fk_ctrl, rotate_type)
+        if row is not None and not 0 <= row <= len(self._rows):
+            msg = f"Row out of range: {row}"
+            raise IndexError(msg)
+        self._set(fk_ctrl, MatchInfo(joint, fk_ctrl, rotate_type, offset), row)
+
+    def at(self, row: int) -> MatchInfo:
+        """行番号に対応するマッチ情報を取得する
+
+        Args:
+            row (int): 行番号
+
+        Returns:
+            MatchInfo: 行番号に対応するマッチ情報
+        """
+        return self._rows[row]
+
+    def row_of(self, fk_ctrl: str) -> int:
+        """FKコントローラーに対応する行番号を取得する
+
+        Args:
+            fk_ctrl (str): FKコントローラーの名前
+
+        Returns:
+            int: 行番号。見つからなければ-1
+        """
+        return self._row_indices.get(fk_ctrl, -1)
 
     def get(self, fk_ctrl: str) -> MatchInfo | None:
         """FKコントローラーに対応するマッチ情報を取得する
@@ -54,6 +187,20 @@ class MatchInfos:
         """
         return self._data.get(fk_ctrl)
 
+    def get_by_joint(self, joint: str) -> MatchInfo | None:
+        """ジョイントに対応するマッチ情報を取得する
+
+        同じジョイントが複数の行に登録されている場合は、先に登録された行を返す
+
+        Args:
+            joint (str): ジョイントの名前
+
+        Returns:
+            MatchInfo: ジョイントに対応するマッチ情報
+        """
+        infos = self._joint_index.get(joint)
+        return infos[0] if infos else None
+
     def remove(self, fk_ctrl: str) -> None:
         """FKコントローラーに対応するマッチ情報を削除する
 
@@ -61,39 +208,127 @@ class MatchInfos:
             fk_ctrl (str): FKコントローラーの名前
         """
         if fk_ctrl in self._data:
-            del self._data[fk_ctrl]
+            row = self._row_indices[fk_ctrl]
+            for observer in self._observers:
+                observer.rows_about_to_be_removed(row, row)
+            del self._row_indices[fk_ctrl]
+            self._unindex_joint(self._data.pop(fk_ctrl))
+            del self._rows[row]
+            self._reindex_rows(row)
+            for observer in self._observers:
+                observer.rows_removed(row, row)
         else:
             print(f"No match info found for FK controller: {fk_ctrl}")  # noqa: T201
 
+    def clear(self) -> None:
+        """すべてのマッチ情報を削除する"""
+        if not self._rows:
+            return
+        last = len(self._rows) - 1
+        for observer in self._observers:
+            observer.rows_about_to_be_removed(0, last)
+        self._data.clear()
+        self._rows.clear()
+        self._row_indices.clear()
+        self._joint_index.clear()
+        for observer in self._observers:
+            observer.rows_removed(0, last)
+
     def edit(self, fk_ctrl: str, new_match_info: MatchInfo) -> None:
         """キャラごとのマッチ情報を編集する
 
+        新しいマッチ情報のFKコントローラーが異なる場合は、同じ行のままFKコントローラーを付け替える
+
         Args:
             fk_ctrl (str): FKコントローラーの名前
             new_match_info (MatchInfo): 新しいマッチ情報を保持するデータクラスのインスタンス
         """
-        if fk_ctrl in self._data:
-            self._data[fk_ctrl] = new_match_info
-        else:
+        if fk_ctrl not in self._data:
             msg = f"No match info found for FK controller: {fk_ctrl}"
             raise KeyError(msg)
+        if new_match_info.fk_ctrl != fk_ctrl and new_match_info.fk_ctrl in self._data:
+            msg = f"FK controller '{new_match_info.fk_ctrl}' already exists in match info."
+            raise ValueError(msg)
+        self._set(fk_ctrl, new_match_info)
+
+    def _set(self, fk_ctrl: str, match_info: MatchInfo, row: int | None = None) -> None:
+        """マッチ情報を登録し、索引を更新する
+
+        既存の行は同じ位置で置き換え、新しい行は row (省略時は末尾) に挿入する。
+        索引のキーは常に match_info.fk_ctrl にする
+        """
+        old_match_info = self._data.get(fk_ctrl)
+        if old_match_info is not None:
+            row = self._row_indices[fk_ctrl]
+            for observer in self._observers:
+                observer.row_about_to_be_changed(row)
+            del self._row_indices[fk_ctrl]
+            del self._data[fk_ctrl]
+            self._unindex_joint(old_match_info)
+            self._rows[row] = match_info
+            self._row_indices[match_info.fk_ctrl] = row
+        else:
+            row = len(self._rows) if row is None else row
+            for observer in self._observers:
+                observer.rows_about_to_be_inserted(row, row)
+            self._rows.insert(row, match_info)
+            self._reindex_rows(row)
+        self._data[match_info.fk_ctrl] = match_info
+        self._joint_index.setdefault(match_info.joint, []).append(match_info)
+
+        for observer in self._observers:
+            if old_match_info is not None:
+                observer.row_changed(row)
+            else:
+                observer.rows_inserted(row, row)
+
+    def _reindex_rows(self, first: int) -> None:
+        """first 以降の行の行番号の索引を作り直す (行の挿入・削除で行番号がずれるため)"""
+        for row in range(first, len(self._rows)):
+            self._row_indices[self._rows[row].fk_ctrl] = row
+
+    def _unindex_joint(self, match_info: MatchInfo) -> None:
+        """ジョイントの索引からマッチ情報を取り除く"""
+        infos = self._joint_index.get(match_info.joint, [])
+        for i, info in enumerate(infos):
+            if info is match_info:
+                del infos[i]
+                break
+        if not infos:
+            self._joint_index.pop(match_info.joint, None)
 
     def export_json(self, file_path: Path) -> None:
         """マッチ情報をJSONファイルにエクスポートする
 
+        一時ファイルに書き出してから置き換えるため、書き込みの途中で落ちても元のファイルは壊れない
+
         Args:
             file_path (str): エクスポート先のファイルパス
         """
-        with Path.open(file_path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, ensure_ascii=False, indent=4, default=lambda o: o.__dict__)
+        file_path = Path(file_path)
+        data = {"version": MATCH_INFO_FILE_VERSION, "match_infos": self._data}
+        temp_path = file_path.with_name(f"{file_path.name}.tmp")
+        with Path.open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4, default=lambda o: o.__dict__)
+            f.flush()
+            os.fsync(f.fileno())
+        Path.replace(temp_path, file_path)
 
     def load_json(self, file_path: Path) -> None:
         """JSONファイルからマッチ情報をロードする
 
+        バージョンのない以前の形式・オフセットのないバージョン1のファイルも読み込める
+
         Args:
             file_path (str): ロード元のファイルパス
         """
         with Path.open(file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-            for fk_ctrl, match_info in data.items():
-                self._data[fk_ctrl] = MatchInfo(**match_info)
+        version = data.get("version") if isinstance(data.get("version"), int) else 0
+        if version > MATCH_INFO_FILE_VERSION:
+            msg = f"Unsupported match info file version: {version}"
+            raise ValueError(msg)
+        match_infos = data["match_infos"] if version else data
+        for fk_ctrl, match_info in match_infos.items():
+            offset = match_info.pop("offset", None)
+            self._set(fk_ctrl, MatchInfo(**match_info, offset=OffsetTransform.from_dict(offset) if offset else None))
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+from .offset import OffsetTransform
+from .rotate_type import RotateType
+
+if TYPE_CHECKING:
+    from .match_info import MatchInfo
+
+# Mayaの rotateOrder の値と回転軸の順番の対応 (xyz, yzx, zxy, xzy, yxz, zyx)
+ROTATE_ORDER_AXES = ((0, 1, 2), (1, 2, 0), (2, 0, 1), (0, 2, 1), (1, 0, 2), (2, 1, 0))
+
+_GIMBAL_EPSILON = 1.0e-9
+
+
+def to_matrices(values: Sequence[float] | Sequence[Sequence[float]]) -> np.ndarray:
+    """Mayaから取得した16要素の行列値を4x4行列の配列に変換する
+
+    Args:
+        values: 16要素のリスト、またはそのリスト
+
+    Returns:
+        np.ndarray: (..., 4, 4) の行列配列
+    """
+    array = np.asarray(values, dtype=np.float64)
+    return array.reshape((*array.shape[:-1], 4, 4))
+
+
+def axis_rotation(axis: int, angles: np.ndarray) -> np.ndarray:
+    """単一軸の回転行列を作成する (Mayaと同じ行ベクトル表記)
+
+    Args:
+        axis (int): 回転軸 (0: X, 1: Y, 2: Z)
+        angles (np.ndarray): 回転角度 (ラジアン)
+
+    Returns:
+        np.ndarray: (..., 3, 3) の回転行列
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    cos = np.cos(angles)
+    sin = np.sin(angles)
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    result = np.zeros((*angles.shape, 3, 3))
+    result[..., axis, axis] = 1.0
+    result[..., i, i] = cos
+    result[..., i, j] = sin
+    result[..., j, i] = -sin
+    result[..., j, j] = cos
+    return result
+
+
+def euler_to_matrix(angles: np.ndarray, rotate_order: int = 0) -> np.ndarray:
+    """オイラー角から回転行列を作成する
+
+    Args:
+        angles (np.ndarray): (..., 3) のXYZ回転角度 (ラジアン)
+        rotate_order (int): Mayaの rotateOrder の値
+
+    Returns:
+        np.ndarray: (..., 3, 3) の回転行列
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    first, second, third = ROTATE_ORDER_AXES[rotate_order]
+    return (
+        axis_rotation(first, angles[..., first])
+        @ axis_rotation(second, angles[..., second])
+        @ axis_rotation(third, angles[..., third])
+    )
+
+
+def matrix_to_euler(matrices: np.ndarray, rotate_order: int = 0) -> np.ndarray:
+    """回転行列 (スケールを含んでもよい) をオイラー角に分解する
+
+    Args:
+        matrices (np.ndarray): (..., 3, 3) または (..., 4, 4) の行列
+        rotate_order (int): Mayaの rotateOrder の値
+
+    Returns:
+        np.ndarray: (..., 3) のXYZ回転角度 (ラジアン)
+    """
+    rotation = normalize_rotation(np.asarray(matrices, dtype=np.float64)[..., :3, :3])
+    i, j, k = ROTATE_ORDER_AXES[rotate_order]
+    parity = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    sin_second = np.clip(-parity * rotation[..., i, k], -1.0, 1.0)
+    cos_second = np.hypot(rotation[..., i, i], rotation[..., i, j])
+    gimbal = cos_second < _GIMBAL_EPSILON
+
+    result = np.empty((*rotation.shape[:-2], 3))
+    result[..., j] = np.arctan2(sin_second, cos_second)
+    result[..., i] = np.where(
+        gimbal,
+        np.arctan2(-parity * rotation[..., k, j], rotation[..., j, j]),
+        np.arctan2(parity * rotation[..., j, k], rotation[..., k, k]),
+    )
+    result[..., k] = np.where(gimbal, 0.0, np.arctan2(parity * rotation[..., i, j], rotation[..., i, i]))
+    return result
+
+
+def filter_euler(angles: np.ndarray, rotate_order: int = 0) -> np.ndarray:
+    """フレーム順に並んだオイラー角の不連続 (360度の飛びと、同じ姿勢の別解への反転) を取り除く
+
+    各フレームで、同じ回転を表す2つの解 (a, b, c) と (a + 180, 180 - b, c + 180) のうち前のフレームに近い方を選び、
+    360度の倍数を足して前のフレームとの差を180度以内にする (Euler Filter と同じ結果)。
+    別解に切り替えるかどうかは隣り合うフレームの組ごとに判定できるため、切り替えの累積和の偶奇でまとめて求める。
+    全フレームを1回の配列演算で処理する
+
+    Args:
+        angles (np.ndarray): (..., フレーム数, 3) のXYZ回転角度 (ラジアン)
+        rotate_order (int): Mayaの rotateOrder の値
+
+    Returns:
+        np.ndarray: (..., フレーム数, 3) の連続したXYZ回転角度 (ラジアン)。最初のフレームの解は変えない
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    first, second, third = ROTATE_ORDER_AXES[rotate_order]
+    flipped = angles.copy()
+    flipped[..., first] += np.pi
+    flipped[..., second] = np.pi - flipped[..., second]
+    flipped[..., third] += np.pi
+
+    def distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """360度の倍数を除いた角度の差の大きさ"""
+        return np.square((a - b + np.pi) % (2.0 * np.pi) - np.pi).sum(axis=-1)
+
+    # 1つ前のフレームと別の解にした方が近い組で切り替え、切り替えた回数が奇数のフレームで別解を使う
+    switch = distance(flipped[..., 1:, :], angles[..., :-1, :]) < distance(angles[..., 1:, :], angles[..., :-1, :])
+    use_flipped = np.zeros(angles.shape[:-1], dtype=bool)
+    use_flipped[..., 1:] = np.cumsum(switch, axis=-1) % 2 == 1
+    result = np.where(use_flipped[..., np.newaxis], flipped, angles)
+    return np.unwrap(result, axis=-2)
+
+
+def rotation_angles_between(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """2つの行列の回転の差の角度を求める (スケールは無視する)
+
+    回転行列の差のフロベニウスノルム 2√2 sin(θ/2) から求めるため、arccos を使うよりも小さな角度で精度が高い
+
+    Args:
+        a (np.ndarray): (..., 3, 3) または (..., 4, 4) の行列
+        b (np.ndarray): a と同じ形の行列
+
+    Returns:
+        np.ndarray: (...) の角度 (ラジアン)
+    """
+    difference = normalize_rotation(np.asarray(a, dtype=np.float64)[..., :3, :3]) - normalize_rotation(
+        np.asarray(b, dtype=np.float64)[..., :3, :3],
+    )
+    return 2.0 * np.arcsin(np.clip(np.linalg.norm(difference, axis=(-2, -1)) / (2.0 * np.sqrt(2.0)), 0.0, 1.0))
+
+
+def normalize_rotation(matrices: np.ndarray) -> np.ndarray:
+    """3x3行列からスケールを取り除き、回転成分だけにする
+
+    Args:
+        matrices (np.ndarray): (..., 3, 3) の行列
+
+    Returns:
+        np.ndarray: (..., 3, 3) の回転行列
+    """
+    scale = np.linalg.norm(matrices, axis=-1, keepdims=True)
+    rotation = matrices / np.where(scale == 0.0, 1.0, scale)
+    # 負のスケールが含まれる場合はX軸を反転して右手系に戻す
+    flip = np.linalg.det(rotation) < 0.0
+    rotation[flip, 0, :] *= -1.0
+    return rotation
+
+
+def _build_offset_matrix(rotate_type: RotateType) -> np.ndarray:
+    """回転タイプのオフセット行列を作成する"""
+    offset = np.identity(4)
+    offset[:3, :3] = euler_to_matrix(np.radians(list(RotateType.from_string(rotate_type))))
+    return offset
+
+
+# 回転タイプごとのオフセット行列 (FKコントローラーのローカル空間での回転)
+OFFSET_MATRICES: dict[RotateType, np.ndarray] = {rotate_type: _build_offset_matrix(rotate_type) for rotate_type in RotateType}
+
+
+# 回転タイプのオフセット行列を1つの配列にまとめたもの (インデックスで一括して取り出す)
+_PRESET_INDICES: dict[str, int] = {rotate_type.value: i for i, rotate_type in enumerate(OFFSET_MATRICES)}
+_PRESET_MATRICES = np.stack(list(OFFSET_MATRICES.values()))
+
+
+def get_offset_matrices(rotate_types: Sequence[RotateType | str]) -> np.ndarray:
+    """回転タイプのリストに対応するオフセット行列の配列を取得する
+
+    Args:
+        rotate_types (Sequence[RotateType | str]): 回転タイプのリスト
+
+    Returns:
+        np.ndarray: (回転タイプ数, 4, 4) のオフセット行列
+    """
+    try:
+        indices = [_PRESET_INDICES[rotate_type] for rotate_type in rotate_types]
+    except KeyError as e:
+        msg = f"Unknown rotate type: {e.args[0]}"
+        raise ValueError(msg) from None
+    return _PRESET_MATRICES[np.array(indices, dtype=np.intp)].reshape(-1, 4, 4)
+
+
+def quaternions_to_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """クォータニオンを回転行列に変換する (Mayaと同じ行ベクトル表記)
+
+    Args:
+        quaternions (np.ndarray): (..., 4) のクォータニオン (x, y, z, w)。正規化していなくてもよい
+
+    Returns:
+        np.ndarray: (..., 3, 3) の回転行列
+    """
+    norm = np.linalg.norm(quaternions, axis=-1, keepdims=True)
+    x, y, z, w = np.moveaxis(quaternions / np.where(norm == 0.0, 1.0, norm), -1, 0)
+    return np.stack([
+        np.stack([1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y + z * w), 2.0 * (x * z - y * w)], axis=-1),
+        np.stack([2.0 * (x * y - z * w), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z + x * w)], axis=-1),
+        np.stack([2.0 * (x * z + y * w), 2.0 * (y * z - x * w), 1.0 - 2.0 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+
+def matrices_to_quaternions(matrices: np.ndarray) -> np.ndarray:
+    """回転行列をクォータニオンに変換する (quaternions_to_matrices の逆変換)
+
+    数値誤差を抑えるため、行列ごとにトレースと対角成分のうち最大のものを基準に計算する
+
+    Args:
+        matrices (np.ndarray): (..., 3, 3) の回転行列 (スケールを含む場合は取り除く)
+
+    Returns:
+        np.ndarray: (..., 4) の正規化したクォータニオン (x, y, z, w)。wは0以上
+    """
+    m = normalize_rotation(np.asarray(matrices, dtype=np.float64))
+    m00, m01, m02 = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    m10, m11, m12 = m[..., 1, 0], m[..., 1, 1], m[..., 1, 2]
+    m20, m21, m22 = m[..., 2, 0], m[..., 2, 1], m[..., 2, 2]
+    # 各基準での (x, y, z, w) の4倍の値 (行ベクトル表記なので、列ベクトル表記の非対角成分とは符号が逆になる)
+    candidates = np.stack([
+        np.stack([m12 - m21, m20 - m02, m01 - m10, 1.0 + m00 + m11 + m22], axis=-1),
+        np.stack([1.0 + m00 - m11 - m22, m01 + m10, m02 + m20, m12 - m21], axis=-1),
+        np.stack([m01 + m10, 1.0 - m00 + m11 - m22, m12 + m21, m20 - m02], axis=-1),
+        np.stack([m02 + m20, m12 + m21, 1.0 - m00 - m11 + m22, m01 - m10], axis=-1),
+    ], axis=-2)
+    pivots = np.argmax(np.stack([m00 + m11 + m22, m00, m11, m22], axis=-1), axis=-1)
+    quaternions = np.take_along_axis(candidates, pivots[..., np.newaxis, np.newaxis], axis=-2)[..., 0, :]
+    quaternions /= np.linalg.norm(quaternions, axis=-1, keepdims=True)
+    return np.where(quaternions[..., 3:] < 0.0, -quaternions, quaternions)
+
+
+def transforms_to_matrices(values: np.ndarray) -> np.ndarray:
+    """[qx, qy, qz, qw, tx, ty, tz] の配列をまとめてオフセット行列に変換する
+
+    Args:
+        values (np.ndarray): (行数, 7) の値
+
+    Returns:
+        np.ndarray: (行数, 4, 4) のオフセット行列
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 7)
+    matrices = np.zeros((len(values), 4, 4))
+    matrices[:, :3, :3] = quaternions_to_matrices(values[:, :4])
+    matrices[:, 3, :3] = values[:, 4:]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def compile_offsets(infos: Sequence[MatchInfo]) -> np.ndarray:
+    """マッチ情報のオフセットを1つの連続した配列にまとめる
+
+    オフセット (OffsetTransform) を持つ行はその行列を、持たない行は回転タイプのオフセット行列を使う
+
+    Args:
+        infos (Sequence[MatchInfo]): マッチ情報のリスト
+
+    Returns:
+        np.ndarray: (行数, 4, 4) のオフセット行列
+    """
+    offsets = get_offset_matrices([info.type for info in infos])
+    custom_rows = [row for row, info in enumerate(infos) if info.offset is not None]
+    if custom_rows:
+        values = [infos[row].offset.to_list() for row in custom_rows]  # type: ignore
+        offsets[custom_rows] = transforms_to_matrices(np.array(values))
+    return offsets
+
+
+def capture_offsets(fk_world: np.ndarray, joint_world: np.ndarray) -> list[OffsetTransform]:
+    """現在のポーズのFKコントローラーとジョイントのワールド行列から、オフセットを求める
+
+    FKコントローラーのワールド行列 = オフセット行列 * ジョイントのワールド行列 となるオフセットを求める。
+    どちらの行列もスケールを取り除いてから求める (適用するときもジョイントのスケールを取り除く)
+
+    Args:
+        fk_world (np.ndarray): (行数, 4, 4) のFKコントローラーのワールド行列
+        joint_world (np.ndarray): (行数, 4, 4) のジョイントのワールド行列
+
+    Returns:
+        list[OffsetTransform]: 各行のオフセット
+    """
+    fk_world = fk_world.copy()
+    fk_world[..., :3, :3] = normalize_rotation(fk_world[..., :3, :3])
+    joint_world = joint_world.copy()
+    joint_world[..., :3, :3] = normalize_rotation(joint_world[..., :3, :3])
+    offsets = fk_world @ np.linalg.inv(joint_world)
+    values = np.concatenate([matrices_to_quaternions(offsets[..., :3, :3]), offsets[..., 3, :3]], axis=-1)
+    return [OffsetTransform.from_list(row) for row in values.tolist()]
+
+
+def remove_offset_scale(joint_world: np.ndarray, infos: Sequence[MatchInfo]) -> np.ndarray:
+    """オフセット (OffsetTransform) を持つ行のジョイントのワールド行列からスケールを取り除く
+
+    オフセットはスケールを取り除いたジョイントに対して記録するため、適用するときも同じ空間に揃える。
+    回転タイプの行はこれまでどおりジョイントのスケールも含めて合わせる
+
+    Args:
+        joint_world (np.ndarray): (行数, ..., 4, 4) のジョイントのワールド行列
+        infos (Sequence[MatchInfo]): 各行のマッチ情報
+
+    Returns:
+        np.ndarray: (行数, ..., 4, 4) のワールド行列。オフセットを持つ行がなければ元の配列をそのまま返す
+    """
+    custom_rows = [row for row, info in enumerate(infos) if info.offset is not None]
+    if not custom_rows:
+        return joint_world
+    joint_world = np.array(joint_world, dtype=np.float64)
+    joint_world[custom_rows, ..., :3, :3] = normalize_rotation(joint_world[custom_rows, ..., :3, :3])
+    return joint_world
+
+
+def compute_target_matrices(joint_world: np.ndarray, infos: Sequence[MatchInfo]) -> np.ndarray:
+    """ジョイントのワールド行列にオフセットを掛け、FKコントローラーの目標ワールド行列を求める
+
+    Args:
+        joint_world (np.ndarray): (行数, ..., 4, 4) のジョイントのワールド行列 (フレームの次元を含んでもよい)
+        infos (Sequence[MatchInfo]): 各行のマッチ情報
+
+    Returns:
+        np.ndarray: (行数, ..., 4, 4) の目標ワールド行列
+    """
+    offsets = compile_offsets(infos)
+    offsets = offsets.reshape(len(offsets), *(1,) * (np.ndim(joint_world) - 3), 4, 4)
+    return offsets @ remove_offset_scale(joint_world, infos)
+
+
+def compute_local_matrices(target_world: np.ndarray, parent_world: np.ndarray) -> np.ndarray:
+    """目標ワールド行列を親の空間に変換する
+
+    Args:
+        target_world (np.ndarray): (..., 4, 4) の目標ワールド行列
+        parent_world (np.ndarray): (..., 4, 4) の親のワールド行列
+
+    Returns:
+        np.ndarray: (..., 4, 4) のローカル行列
+    """
+    return target_world @ np.linalg.inv(parent_world)
+
+
+def remove_rotate_axes(local: np.ndarray, rotate_axes: np.ndarray, joint_orients: np.ndarray) -> np.ndarray:
+    """ローカル行列から rotateAxis と jointOrient を取り除き、rotate アトリビュートの回転行列を求める
+
+    ピボットがゼロのトランスフォームのローカル行列は スケール * rotateAxis * 回転 * jointOrient * 移動 となるため、
+    スケールを取り除いた回転成分の前後から rotateAxis と jointOrient (どちらもXYZの回転順序) の逆行列を掛ける
+
+    Args:
+        local (np.ndarray): (行数, フレーム数, 4, 4) のローカル行列
+        rotate_axes (np.ndarray): (行数, 3) の rotateAxis (ラジアン)
+        joint_orients (np.ndarray): (行数, 3) の jointOrient (ラジアン)。ジョイント以外はゼロ
+
+    Returns:
+        np.ndarray: (行数, フレーム数, 3, 3) の回転行列
+    """
+    rotate_axis_inverse = np.swapaxes(euler_to_matrix(rotate_axes), -1, -2)[:, np.newaxis]
+    joint_orient_inverse = np.swapaxes(euler_to_matrix(joint_orients), -1, -2)[:, np.newaxis]
+    return rotate_axis_inverse @ normalize_rotation(local[..., :3, :3]) @ joint_orient_inverse
+
+
+def find_nearest_rotate_types(
+    fk_world: np.ndarray,
+    joint_world: np.ndarray,
+    preferred: Sequence[RotateType | str] | None = None,
+) -> tuple[list[RotateType], np.ndarray]:
+    """FKコントローラーとジョイントのワールド行列から、最も近い回転タイプを求める
+
+    FK状態ではFKコントローラーの回転 = オフセット * ジョイントの回転 となるため、
+    オフセットを直接求めて、各回転タイプのオフセット行列との角度差が最も小さいものを選ぶ。
+    角度差が同じ回転タイプが複数ある場合は preferred の回転タイプ、なければRotateTypeの定義順で先のものを選ぶ。
+
+    Args:
+        fk_world (np.ndarray): (行数, 4, 4) のFKコントローラーのワールド行列
+        joint_world (np.ndarray): (行数, 4, 4) のジョイントのワールド行列
+        preferred (Sequence[RotateType | str], optional): 同じ角度差のときに優先する各行の回転タイプ
+
+    Returns:
+        tuple[list[RotateType], np.ndarray]: 各行の回転タイプと、その回転タイプとの角度差 (ラジアン)
+    """
+    offsets = normalize_rotation(fk_world[..., :3, :3]) @ np.swapaxes(normalize_rotation(joint_world[..., :3, :3]), -1, -2)
+    rotate_types = list(OFFSET_MATRICES)
+    candidates = np.array([OFFSET_MATRICES[rotate_type][:3, :3] for rotate_type in rotate_types])
+    # trace(A^T B) から2つの回転の間の角度を求める
+    cosines = (np.einsum("nij,kij->nk", offsets, candidates) - 1.0) / 2.0
+    residuals = np.round(np.arccos(np.clip(cosines, -1.0, 1.0)), 9)
+    nearest = np.argmin(residuals, axis=1)
+    if preferred is not None:
+        preferred_indices = np.array([rotate_types.index(RotateType(rotate_type)) for rotate_type in preferred], dtype=int)
+        rows = np.arange(len(nearest))
+        nearest = np.where(residuals[rows, preferred_indices] <= residuals[rows, nearest], preferred_indices, nearest)
+    return [rotate_types[index] for index in nearest], residuals[np.arange(len(nearest)), nearest]
+
+
+def compute_mirrored_fk_world(
+    fk_world: np.ndarray,
+    joint_world: np.ndarray,
+    offsets: np.ndarray,
+    mirrored_fk_world: np.ndarray,
+    mirror_axis: int = 0,
+) -> np.ndarray:
+    """元の行のオフセットを反対側に写した場合の、反対側のFKコントローラーの目標のワールド行列を求める
+
+    左右のノードがミラーの関係にあるポーズ (バインドポーズなど) で、反対側のFKコントローラーとジョイントが
+    それぞれ元のノードをミラーした軸の向き (ビヘイビア・オリエンテーションのどちらでもよい) を持つとみなす。
+    反対側の軸の向き = 反対側の回転 * (元の回転 * ミラー行列)^-1 を、目標の回転 (オフセット * ジョイント) にも適用する。
+    位置は元の目標の位置 (オフセット * ジョイント) をミラーしたものにする。
+    結果を find_nearest_rotate_types() に反対側のジョイントの行列と一緒に渡すと、反対側の回転タイプが求まる。
+    FKコントローラーとジョイントが一致しているポーズでは、反対側の行列から直接求めた回転タイプと同じになる。
+
+    Args:
+        fk_world (np.ndarray): (行数, 4, 4) の元のFKコントローラーのワールド行列
+        joint_world (np.ndarray): (行数, 4, 4) の元のジョイントのワールド行列
+        offsets (np.ndarray): (行数, 4, 4) の元の行のオフセット行列
+        mirrored_fk_world (np.ndarray): (行数, 4, 4) の反対側のFKコントローラーのワールド行列
+        mirror_axis (int): ミラーの軸 (0: X, 1: Y, 2: Z)。この軸に垂直な平面で左右を反転する
+
+    Returns:
+        np.ndarray: (行数, 4, 4) の反対側のFKコントローラーの目標のワールド行列
+    """
+    mirror = np.identity(3)
+    mirror[mirror_axis, mirror_axis] = -1.0
+    fk_rotation = normalize_rotation(fk_world[..., :3, :3])
+    joint_rotation = normalize_rotation(joint_world[..., :3, :3])
+    mirrored_fk_rotation = normalize_rotation(mirrored_fk_world[..., :3, :3])
+    target_rotation = offsets[..., :3, :3] @ joint_rotation
+    target_translation = (offsets @ joint_world)[..., 3, :3]
+
+    result = np.zeros(fk_world.shape)
+    result[..., :3, :3] = mirrored_fk_rotation @ mirror @ np.swapaxes(fk_rotation, -1, -2) @ target_rotation @ mirror
+    result[..., 3, :3] = target_translation @ mirror
+    result[..., 3, 3] = 1.0
+    return result
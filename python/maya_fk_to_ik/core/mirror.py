@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Sequence
+
+from .hierarchy import DAG_SEPARATOR, NAMESPACE_SEPARATOR
+from .match_info import MatchInfo
+
+# 左右の名前の置換ルール (左側の文字列, 右側の文字列)。どちらの向きにも置換する
+DEFAULT_MIRROR_RULES: tuple[tuple[str, str], ...] = (
+    ("L_", "R_"),
+    ("_L", "_R"),
+    ("Left", "Right"),
+    ("left", "right"),
+)
+_RULE_SEPARATOR = ","
+_PAIR_SEPARATOR = ":"
+
+
+def parse_mirror_rules(text: str) -> list[tuple[str, str]]:
+    """"L_:R_, _L:_R" 形式のテキストから置換ルールを読み込む
+
+    Args:
+        text (str): 置換ルールのテキスト
+
+    Returns:
+        list[tuple[str, str]]: 置換ルールのリスト
+    """
+    rules = []
+    for item in text.split(_RULE_SEPARATOR):
+        item = item.strip()  # noqa: PLW2901
+        if not item:
+            continue
+        left, separator, right = item.partition(_PAIR_SEPARATOR)
+        left, right = left.strip(), right.strip()
+        if not separator or not left or not right or left == right:
+            msg = f"Invalid mirror rule: {item!r}"
+            raise ValueError(msg)
+        rules.append((left, right))
+    return rules
+
+
+def format_mirror_rules(rules: Iterable[tuple[str, str]]) -> str:
+    """置換ルールを parse_mirror_rules() で読み込めるテキストにする"""
+    return f"{_RULE_SEPARATOR} ".join(f"{left}{_PAIR_SEPARATOR}{right}" for left, right in rules)
+
+
+class NameMirror:
+    """置換ルールに従って、ノード名の左右を入れ替えるクラス
+
+    すべてのルールを1つの正規表現にまとめ、1回の走査で置換する (L_ -> R_ -> L_ のように二重に置換されない)。
+    英字で始まる (終わる) ルールは、前に英字がある (後に小文字が続く) 場合は置換しない (例: "_L" は "_Leg" に一致しない)。
+    ネームスペースは置換しない。
+    """
+
+    def __init__(self, rules: Sequence[tuple[str, str]] = DEFAULT_MIRROR_RULES) -> None:
+        """
+        Args:
+            rules (Sequence[tuple[str, str]]): 置換ルールのリスト
+        """
+        self.rules = list(rules)
+        self._replacements: dict[str, str] = {}
+        for left, right in self.rules:
+            self._replacements.setdefault(left, right)
+            self._replacements.setdefault(right, left)
+
+        patterns = []
+        for token in sorted(self._replacements, key=len, reverse=True):
+            before = r"(?<![A-Za-z])" if token[0].isalpha() else ""
+            after = r"(?![a-z])" if token[-1].isalpha() else ""
+            patterns.append(f"{before}{re.escape(token)}{after}")
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def mirror_name(self, node: str) -> str | None:
+        """ノード名 (ロング名も可) の左右を入れ替える
+
+        Args:
+            node (str): ノード名
+
+        Returns:
+            str | None: 左右を入れ替えたノード名。置換するところがない (中央のノードなど) 場合はNone
+        """
+        if self._pattern is None:
+            return None
+        parts = []
+        for part in node.split(DAG_SEPARATOR):
+            namespace, separator, name = part.rpartition(NAMESPACE_SEPARATOR)
+            parts.append(namespace + separator + self._pattern.sub(lambda match: self._replacements[match.group(0)], name))
+        mirrored = DAG_SEPARATOR.join(parts)
+        return mirrored if mirrored != node else None
+
+    def mirror_match_infos(self, infos: Iterable[MatchInfo]) -> list[tuple[MatchInfo, MatchInfo]]:
+        """マッチ情報のFKコントローラーとジョイントの左右を入れ替えた行を作る
+
+        回転タイプは元の行のものをそのまま使うため、シーンの行列から求め直す必要がある。
+        FKコントローラーとジョイントのどちらかの名前が変わらない行は除く
+
+        Args:
+            infos (Iterable[MatchInfo]): 元のマッチ情報
+
+        Returns:
+            list[tuple[MatchInfo, MatchInfo]]: (元の行, 左右を入れ替えた行) のリスト
+        """
+        pairs = []
+        for info in infos:
+            fk_ctrl = self.mirror_name(info.fk_ctrl)
+            joint = self.mirror_name(info.joint)
+            if fk_ctrl is None or joint is None:
+                continue
+            pairs.append((info, MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=info.type)))
+        return pairs
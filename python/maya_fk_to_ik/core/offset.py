@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+
+@dataclass(frozen=True)
+class OffsetTransform:
+    """FKコントローラーのジョイントに対するオフセット (回転と移動) を保持するデータクラス
+
+    FKコントローラーのワールド行列 = オフセット行列 * ジョイントのワールド行列 となるオフセットで、
+    回転タイプ (0度・180度の反転) で表せない任意の向き・位置のずれを表す。
+    ジョイントのワールド行列はスケールを取り除いたものを使う
+    """
+    quaternion: tuple[float, float, float, float] = (0.0, 0.0, 0.0, 1.0)  # 回転 (x, y, z, w)
+    translation: tuple[float, float, float] = (0.0, 0.0, 0.0)  # ジョイントの空間での移動
+
+    def to_list(self) -> list[float]:
+        """[qx, qy, qz, qw, tx, ty, tz] のリストにする"""
+        return [*self.quaternion, *self.translation]
+
+    @classmethod
+    def from_list(cls, values: Sequence[float]) -> OffsetTransform:
+        """[qx, qy, qz, qw, tx, ty, tz] のリストから作成する
+
+        Args:
+            values (Sequence[float]): 7つの値
+
+        Returns:
+            OffsetTransform: オフセット
+        """
+        if len(values) != 7:  # noqa: PLR2004
+            msg = f"Offset transform needs 7 values, got {len(values)}"
+            raise ValueError(msg)
+        values = [float(value) for value in values]
+        return cls(quaternion=tuple(values[:4]), translation=tuple(values[4:]))  # type: ignore
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> OffsetTransform:
+        """JSONから読み込んだ辞書から作成する"""
+        return cls.from_list([*data["quaternion"], *data["translation"]])
@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .const import SWITCH_VALUE_TOLERANCE
+from .hierarchy import DAG_SEPARATOR, get_namespace
+from .match_info import MatchInfo, MatchInfos
+from .offset import OffsetTransform
+from .rotate_type import RotateType
+
+SCHEMA_VERSION = 4
+_MAX_SQL_VARIABLES = 900  # SQLiteのプレースホルダー数の上限 (999) より少なくする
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_infos (
+    rig TEXT NOT NULL,
+    fk_ctrl TEXT NOT NULL,
+    joint TEXT NOT NULL,
+    type TEXT NOT NULL,
+    offset_transform TEXT,
+    PRIMARY KEY (rig, fk_ctrl)
+);
+CREATE TABLE IF NOT EXISTS rig_switches (
+    rig TEXT PRIMARY KEY,
+    node TEXT NOT NULL,
+    attribute TEXT NOT NULL,
+    ik_value REAL NOT NULL
+);
+"""
+_UPSERT = """
+INSERT INTO match_infos (rig, fk_ctrl, joint, type, offset_transform) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (rig, fk_ctrl) DO UPDATE SET
+    joint = excluded.joint, type = excluded.type, offset_transform = excluded.offset_transform
+"""
+
+
+@dataclass
+class RigSwitch:
+    """リグのIK/FKスイッチの設定を保持するデータクラス"""
+    rig: str  # リグの名前 (get_node_rig_name() を参照)
+    node: str  # スイッチのアトリビュートを持つノード
+    attribute: str  # スイッチのアトリビュート名
+    ik_value: float = 1.0  # IK状態のときのアトリビュートの値
+
+    @property
+    def plug(self) -> str:
+        """"node.attribute" 形式のプラグ名"""
+        return f"{self.node}.{self.attribute}"
+
+    @property
+    def fk_value(self) -> float:
+        """FK状態にするときのアトリビュートの値 (IKの値が0以外なら0、0なら1)"""
+        return 0.0 if self.ik_value else 1.0
+
+    def is_ik(self, value: float) -> bool:
+        """アトリビュートの値がIK状態かどうか
+
+        Args:
+            value (float): スイッチのアトリビュートの値
+
+        Returns:
+            bool: IK状態かどうか
+        """
+        return abs(value - self.ik_value) <= SWITCH_VALUE_TOLERANCE
+
+
+def get_node_rig_name(node: str) -> str:
+    """ノードが属するリグの名前を取得する
+
+    ネームスペースがあればネームスペースを、なければ最上位のノードのロング名 ("|rig_root" の形式) をリグの名前とする。
+    ネームスペースのないリグ同士が同じ名前で混ざらないようにするため。
+
+    Args:
+        node (str): ノード名 (ロング名も可)
+
+    Returns:
+        str: リグの名前。ネームスペースがなく、ロング名でもないため決められない場合は空文字
+    """
+    namespace = get_namespace(node)
+    if namespace or not node.startswith(DAG_SEPARATOR):
+        return namespace
+    return DAG_SEPARATOR + node.split(DAG_SEPARATOR, 2)[1]
+
+
+def get_rig_name(info: MatchInfo) -> str:
+    """マッチ情報が属するリグの名前 (FKコントローラーのリグの名前) を取得する
+
+    Args:
+        info (MatchInfo): マッチ情報
+
+    Returns:
+        str: リグの名前。決められない場合は空文字 (get_node_rig_name() を参照)
+    """
+    return get_node_rig_name(info.fk_ctrl)
+
+
+def get_scene_rig_names(namespaces: Iterable[str], root_nodes: Iterable[str]) -> list[str]:
+    """シーンに含まれるリグの名前の一覧を求める
+
+    リグの名前を決められない以前のバージョンの行を読み込むため、空文字も含める
+
+    Args:
+        namespaces (Iterable[str]): シーンのネームスペース
+        root_nodes (Iterable[str]): シーンの最上位のノードのロング名
+
+    Returns:
+        list[str]: リグの名前
+    """
+    rigs = dict.fromkeys(namespaces)
+    rigs[""] = None
+    rigs.update(dict.fromkeys(get_node_rig_name(node) for node in root_nodes if not get_namespace(node)))
+    return list(rigs)
+
+
+def _to_row(info: MatchInfo) -> tuple[str, str, str, str, str | None]:
+    """マッチ情報をデータベースの行 (リグ, FKコントローラー, ジョイント, 回転タイプ, オフセット) にする
+
+    オフセットは [qx, qy, qz, qw, tx, ty, tz] のJSONで保存する
+    """
+    offset = json.dumps(info.offset.to_list()) if info.offset is not None else None
+    return (get_rig_name(info), info.fk_ctrl, info.joint, RotateType(info.type).value, offset)
+
+
+class ProfileStore:
+    """リグごとのマッチ情報 (プロファイル) をSQLiteに保存するクラス
+
+    プロファイルはリグの名前 (FKコントローラーのネームスペース、なければ最上位のノードのロング名) で索引付けし、
+    シーンに含まれるリグのプロファイルだけを読み込む。
+    読み込んだ時点の内容を覚えておき、保存時は変更された行だけを書き込む。
+
+    attach() したMatchInfosの追加・編集・削除は、その都度1行ずつ書き込む。
+    データベースはWALモードで開くため、書き込みは追記のみで行われ、定期的にデータベース本体へまとめられる。
+    書き込みの途中でMayaが落ちても、最後にコミットした変更までが残る。
+    read_only で開いた場合は何も書き込まないため、ネットワーク上のデータベースを複数のプロセスから同時に読み込める。
+    """
+
+    def __init__(self, file_path: Path | str, read_only: bool = False) -> None:
+        """
+        Args:
+            file_path (Path | str): データベースのファイルパス (":memory:" も可)
+            read_only (bool): 読み込み専用で開くかどうか。バッチ処理のワーカーなど、複数のプロセスで同じデータベースを開く場合に使う。
+                WALモードへの切り替え・以前のバージョンからの更新・attach() による書き込みは行わない
+        """
+        self._read_only = read_only
+        if read_only:
+            self._connection = sqlite3.connect(f"{Path(file_path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            if str(file_path) != ":memory:":
+                Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(file_path))
+        self._saved: dict[str, tuple[str, str, str, str | None]] = {}  # FKコントローラー -> (リグ, ジョイント, 回転タイプ, オフセット)
+        self._match_infos: MatchInfos | None = None
+        self._removing: list[str] = []
+        self._changing: str | None = None
+
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            msg = f"Unsupported profile database version: {version}"
+            raise ValueError(msg)
+        if read_only:
+            # 更新していない以前のバージョンのデータベースは、足りないテーブル・列を空として読む
+            self._tables = {row[0] for row in self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(match_infos)")}
+            self._offset_column = "offset_transform" if "offset_transform" in columns else "NULL"
+            return
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._migrate()
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._tables = {"match_infos", "rig_switches"}
+        self._offset_column = "offset_transform"
+
+    def _migrate(self) -> None:
+        """以前のバージョンのデータベースに足りない列を追加し、ネームスペースのないリグの名前を付け直す"""
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(match_infos)")}
+        if "offset_transform" not in columns:
+            self._connection.execute("ALTER TABLE match_infos ADD COLUMN offset_transform TEXT")
+
+        # ロング名で保存されている行は、ネームスペースがなくても最上位のノードでリグを区別できる
+        rows = self._connection.execute("SELECT fk_ctrl FROM match_infos WHERE rig = ''").fetchall()
+        renamed = [(get_node_rig_name(fk_ctrl), fk_ctrl) for fk_ctrl, in rows if get_node_rig_name(fk_ctrl)]
+        self._connection.executemany("UPDATE OR REPLACE match_infos SET rig = ? WHERE rig = '' AND fk_ctrl = ?", renamed)
+        rows = self._connection.execute("SELECT node FROM rig_switches WHERE rig = ''").fetchall()
+        renamed = [(get_node_rig_name(node), node) for node, in rows if get_node_rig_name(node)]
+        self._connection.executemany("UPDATE OR REPLACE rig_switches SET rig = ? WHERE rig = '' AND node = ?", renamed)
+
+    def close(self) -> None:
+        """データベースを閉じる (WALの内容はデータベース本体にまとめられる)"""
+        self.detach()
+        self._connection.close()
+
+    def attach(self, match_infos: MatchInfos) -> None:
+        """MatchInfosの変更を都度書き込むようにする (読み込み専用の場合は何もしない)
+
+        Args:
+            match_infos (MatchInfos): 変更を書き込むマッチ情報
+        """
+        self.detach()
+        if self._read_only:
+            return
+        self._match_infos = match_infos
+        match_infos.add_observer(self)
+
+    def detach(self) -> None:
+        """attach() したMatchInfosの変更の書き込みをやめる"""
+        if self._match_infos is not None:
+            self._match_infos.remove_observer(self)
+            self._match_infos = None
+
+    def rows_about_to_be_inserted(self, first: int, last: int) -> None:
+        """MatchInfosに行が挿入される直前の処理 (何もしない)"""
+
+    def rows_inserted(self, first: int, last: int) -> None:
+        """挿入された行を書き込む"""
+        if self._match_infos is not None:
+            self._write([self._match_infos.at(row) for row in range(first, last + 1)], [])
+
+    def rows_about_to_be_removed(self, first: int, last: int) -> None:
+        """削除される行のFKコントローラーを覚えておく"""
+        if self._match_infos is not None:
+            self._removing = [self._match_infos.at(row).fk_ctrl for row in range(first, last + 1)]
+
+    def rows_removed(self, first: int, last: int) -> None:  # noqa: ARG002
+        """削除された行をデータベースから削除する"""
+        removing, self._removing = self._removing, []
+        self._write([], removing)
+
+    def row_about_to_be_changed(self, row: int) -> None:
+        """変更される行のFKコントローラーを覚えておく"""
+        if self._match_infos is not None:
+            self._changing = self._match_infos.at(row).fk_ctrl
+
+    def row_changed(self, row: int) -> None:
+        """変更された行を書き込む
+
+        FKコントローラーが付け替えられた場合は、以前のFKコントローラーの行を同じトランザクションで削除する
+        """
+        changing, self._changing = self._changing, None
+        if self._match_infos is not None:
+            info = self._match_infos.at(row)
+            self._write([info], [changing] if changing is not None and changing != info.fk_ctrl else [])
+
+    def _write(self, infos: list[MatchInfo], removed_fk_ctrls: list[str]) -> None:
+        """行の追加・更新と削除を1つのトランザクションで書き込む"""
+        changed = [_to_row(info) for info in infos]
+        removed = [(self._saved[fk_ctrl][0], fk_ctrl) for fk_ctrl in removed_fk_ctrls if fk_ctrl in self._saved]
+        with self._connection:
+            self._connection.executemany("DELETE FROM match_infos WHERE rig = ? AND fk_ctrl = ?", removed)
+            self._connection.executemany(_UPSERT, changed)
+        for _, fk_ctrl in removed:
+            del self._saved[fk_ctrl]
+        for rig, fk_ctrl, joint, rotate_type, offset in changed:
+            self._saved[fk_ctrl] = (rig, joint, rotate_type, offset)
+
+    def set_switch(self, switch: RigSwitch) -> None:
+        """リグのIK/FKスイッチの設定を保存する (既存の設定は置き換える)
+
+        Args:
+            switch (RigSwitch): スイッチの設定
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO rig_switches (rig, node, attribute, ik_value) VALUES (?, ?, ?, ?)",
+                (switch.rig, switch.node, switch.attribute, switch.ik_value),
+            )
+
+    def remove_switch(self, rig: str) -> None:
+        """リグのIK/FKスイッチの設定を削除する
+
+        Args:
+            rig (str): リグの名前
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM rig_switches WHERE rig = ?", (rig,))
+
+    def load_switches(self, rigs: Iterable[str]) -> list[RigSwitch]:
+        """リグのIK/FKスイッチの設定を読み込む
+
+        Args:
+            rigs (Iterable[str]): 読み込むリグの名前
+
+        Returns:
+            list[RigSwitch]: 設定されているスイッチ
+        """
+        rigs = list(dict.fromkeys(rigs))
+        switches: list[RigSwitch] = []
+        if "rig_switches" not in self._tables:
+            return switches
+        for i in range(0, len(rigs), _MAX_SQL_VARIABLES):
+            chunk = rigs[i:i + _MAX_SQL_VARIABLES]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT rig, node, attribute, ik_value FROM rig_switches WHERE rig IN ({placeholders}) ORDER BY rig"  # noqa: S608
+            switches.extend(RigSwitch(*row) for row in self._connection.execute(query, chunk))
+        return switches
+
+    def rigs(self) -> list[str]:
+        """保存されているリグの名前の一覧を取得する"""
+        return [row[0] for row in self._connection.execute("SELECT DISTINCT rig FROM match_infos ORDER BY rig")]
+
+    def is_empty(self) -> bool:
+        """プロファイルが1つも保存されていないかどうか"""
+        return self._connection.execute("SELECT 1 FROM match_infos LIMIT 1").fetchone() is None
+
+    def load(self, rigs: Iterable[str]) -> list[MatchInfo]:
+        """リグのプロファイルを読み込む
+
+        以降の save() は、ここで読み込んだ内容との差分を書き込む
+
+        Args:
+            rigs (Iterable[str]): 読み込むリグの名前
+
+        Returns:
+            list[MatchInfo]: 読み込んだマッチ情報
+        """
+        rigs = list(dict.fromkeys(rigs))
+        self._saved = {}
+        infos: list[MatchInfo] = []
+        if "match_infos" not in self._tables:
+            return infos
+        for i in range(0, len(rigs), _MAX_SQL_VARIABLES):
+            chunk = rigs[i:i + _MAX_SQL_VARIABLES]
+            placeholders = ", ".join("?" * len(chunk))
+            query = (
+                f"SELECT rig, fk_ctrl, joint, type, {self._offset_column} FROM match_infos "  # noqa: S608
+                f"WHERE rig IN ({placeholders}) ORDER BY rowid"
+            )
+            for rig, fk_ctrl, joint, rotate_type, offset in self._connection.execute(query, chunk):
+                self._saved[fk_ctrl] = (rig, joint, rotate_type, offset)
+                infos.append(MatchInfo(
+                    joint=joint,
+                    fk_ctrl=fk_ctrl,
+                    type=RotateType(rotate_type),
+                    offset=OffsetTransform.from_list(json.loads(offset)) if offset is not None else None,
+                ))
+        return infos
+
+    def save(self, infos: Iterable[MatchInfo]) -> int:
+        """読み込んだ時点 (または前回の保存) から変更された行だけを書き込む
+
+        読み込んでいないリグの行は変更しない
+
+        Args:
+            infos (Iterable[MatchInfo]): 現在のマッチ情報
+
+        Returns:
+            int: 書き込んだ (追加・更新・削除した) 行の数
+        """
+        current = {row[1]: (row[0], *row[2:]) for row in map(_to_row, infos)}
+        removed = [(self._saved[fk_ctrl][0], fk_ctrl) for fk_ctrl in self._saved.keys() - current.keys()]
+        changed = [
+            (rig, fk_ctrl, joint, rotate_type, offset)
+            for fk_ctrl, (rig, joint, rotate_type, offset) in current.items()
+            if self._saved.get(fk_ctrl) != (rig, joint, rotate_type, offset)
+        ]
+        if not removed and not changed:
+            return 0
+
+        with self._connection:
+            self._connection.executemany("DELETE FROM match_infos WHERE rig = ? AND fk_ctrl = ?", removed)
+            self._connection.executemany(_UPSERT, changed)
+        self._saved = current
+        return len(removed) + len(changed)
+
+    def import_json(self, file_path: Path) -> int:
+        """MatchInfos.export_json で書き出したJSONファイルのマッチ情報を追加する
+
+        Args:
+            file_path (Path): JSONファイルのパス
+
+        Returns:
+            int: 追加した行の数
+        """
+        match_infos = MatchInfos()
+        match_infos.load_json(file_path)
+        return self.import_match_infos(match_infos)
+
+    def import_match_infos(self, infos: Iterable[MatchInfo]) -> int:
+        """マッチ情報をリグごとのプロファイルとして追加する (既存の行は更新する)
+
+        リグの名前を決められない行 (ネームスペースのない短い名前) は、ほかのリグのプロファイルと混ざるため追加しない
+
+        Args:
+            infos (Iterable[MatchInfo]): 追加するマッチ情報
+
+        Returns:
+            int: 追加した行の数
+        """
+        rows = [row for row in map(_to_row, infos) if row[0]]
+        with self._connection:
+            self._connection.executemany(_UPSERT, rows)
+        return len(rows)
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import enum
 from typing import Iterator
 
@@ -26,23 +28,20 @@ class RotateType(str, enum.Enum):
     FFF = "FFF"
 
     @classmethod
-    def from_string(cls, value: str) -> RotateVector:  # noqa: PLR0911
-        """文字列からRotateVectorを生成する"""
-        if value == "TTT":
-            return RotateVector(0, 0, 0)
-        if value == "TTF":
-            return RotateVector(0, 0, 180)
-        if value == "TFT":
-            return RotateVector(0, 180, 0)
-        if value == "TFF":
-            return RotateVector(0, 180, 180)
-        if value == "FTT":
-            return RotateVector(180, 0, 0)
-        if value == "FTF":
-            return RotateVector(180, 0, 180)
-        if value == "FFT":
-            return RotateVector(180, 180, 0)
-        if value == "FFF":
-            return RotateVector(180, 180, 180)
-        msg = f"Unknown rotate type: {value}"
-        raise ValueError(msg)
+    def from_string(cls, value: str) -> RotateVector:
+        """文字列からRotateVectorを取得する
+
+        各回転タイプのRotateVectorは1つだけ作成して使い回すため、変更しないこと
+        """
+        rotate_vector = _ROTATE_VECTORS.get(value)
+        if rotate_vector is None:
+            msg = f"Unknown rotate type: {value}"
+            raise ValueError(msg)
+        return rotate_vector
+
+
+# 回転タイプごとのXYZの回転 (T: 0度、F: 180度)
+_ROTATE_VECTORS: dict[str, RotateVector] = {
+    rotate_type.value: RotateVector(*(0 if flag == "T" else 180 for flag in rotate_type.value))
+    for rotate_type in RotateType
+}
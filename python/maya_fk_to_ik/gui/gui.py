@@ -1,13 +1,34 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from typing import TYPE_CHECKING
+import json
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from ..app import MatchFKToIK
-from ..core.const import DEFAULT_MATCH_INFO_FILE_NAME, DEFAULT_SETTINGS_FOLDER_PATH
+from ..app import MatchFKToIK, RotateTypePreview
+from ..backend import get_backend
+from ..core.bake_cache import BakeCache
+from ..core.const import (
+    AUTO_PAIR_MIN_SCORE,
+    DEFAULT_BAKE_CACHE_FOLDER_NAME,
+    DEFAULT_KEY_REDUCTION_ROTATE_TOLERANCE,
+    DEFAULT_KEY_REDUCTION_TRANSLATE_TOLERANCE,
+    DEFAULT_MATCH_INFO_FILE_NAME,
+    DEFAULT_PROFILE_DATABASE_FILE_NAME,
+    DEFAULT_SETTINGS_FOLDER_PATH,
+    ROTATE_TYPE_TOLERANCE_DEGREES,
+)
+from ..core.match_info import MatchInfos
+from ..core.mirror import DEFAULT_MIRROR_RULES, format_mirror_rules, parse_mirror_rules
+from ..core.key_reduction import CurveFilter
+from ..core.profile_store import ProfileStore, RigSwitch, get_node_rig_name
 from ..core.rotate_type import RotateType
+from ..switch_watcher import SwitchWatcher
+from ..utils.instrumentation import instrumentation
+from ..utils.job import JOB_FAILED, JOB_FINISHED, Job
 from .model import (
     HEADER_FK_CTRL,
     HEADER_JOINT,
@@ -16,27 +37,46 @@ from .model import (
     MatchInfoTableModel,
     UserRole,
     get_match_info_from_selection,
+    get_playback_range,
     select_node,
-    undo,
 )
 from .ui.main_ui import Ui_MainWindow
 
 if TYPE_CHECKING:
-    from pathlib import Path
-
+    from ..core.connection_index import PairProposal
     from ..core.match_info import MatchInfo
+    from ..utils.job import Steps
+    from ..verify import VerifyReport
 
 GUI_SETTINGS_FILE = DEFAULT_SETTINGS_FOLDER_PATH / "gui_settings.ini"
 
+# ジョブの1回分の処理時間 (秒) の範囲。画面の更新にかかる時間に合わせてこの範囲で調整する
+JOB_SLICE_MIN_SECONDS = 0.01
+JOB_SLICE_MAX_SECONDS = 0.1
+JOB_WORK_RATIO = 0.8  # ジョブの処理に使う時間の割合 (残りは画面の更新・操作の受け付けに使う)
+JOB_COST_SMOOTHING = 0.3  # 計測した時間の指数移動平均の係数
+JOB_PROGRESS_DELAY_MS = 500  # これより早く終わるジョブは進捗ダイアログを表示しない
+DEFAULT_SWITCH_ATTRIBUTE = "ikFkSwitch"
+
+
+def format_seconds(seconds: float) -> str:
+    """秒数を "1:05" のような表示用のテキストにする"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{seconds:02d}"
+
 
 class RotateTypeDialog(QtWidgets.QDialog):
-    """RotateTypeを選択するダイアログ"""
-    pressed_rotate_type_signal = QtCore.Signal(RotateType)
-    released_rotate_type_signal = QtCore.Signal()
+    """RotateTypeを選択するダイアログ
+
+    ボタンにマウスを乗せている間はその回転タイプを、クリックした後は選択した回転タイプをプレビューする
+    """
+    preview_rotate_type_signal = QtCore.Signal(RotateType)
+    restore_signal = QtCore.Signal()
 
     def __init__(self, current_rotate_type: RotateType, parent=None) -> None:
         super().__init__(parent)
         self.current_rotate_type = current_rotate_type
+        self.is_selected = False  # ダイアログ内で回転タイプをクリックしたかどうか
 
         self.setWindowTitle("Select Rotate Type")
         self.resize(300, 200)
@@ -46,8 +86,8 @@ class RotateTypeDialog(QtWidgets.QDialog):
         self.rotate_type_buttons: list[QtWidgets.QPushButton] = []
         for rotate_type in RotateType:
             button = QtWidgets.QPushButton(rotate_type, self)
-            button.pressed.connect(self._on_button_pressed)
-            button.released.connect(self._on_button_released)
+            button.clicked.connect(self._on_button_clicked)
+            button.installEventFilter(self)
             self.rotate_type_buttons.append(button)
             self.layout.addWidget(button)
 
@@ -67,17 +107,30 @@ class RotateTypeDialog(QtWidgets.QDialog):
         """
         return self.current_rotate_type
 
-    def _on_button_pressed(self) -> None:
+    def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        """ボタンにマウスが乗ったとき・離れたときにプレビューを切り替える"""
+        if watched in self.rotate_type_buttons:
+            if event.type() == QtCore.QEvent.Type.Enter:
+                self.preview_rotate_type_signal.emit(RotateType(watched.text()))  # type: ignore
+            elif event.type() == QtCore.QEvent.Type.Leave:
+                self._preview_current()
+        return super().eventFilter(watched, event)
+
+    def _on_button_clicked(self) -> None:
         """回転タイプボタンがクリックされたときの処理"""
         button: QtWidgets.QPushButton = self.sender()  # type: ignore
         if button:
             self.current_rotate_type = RotateType(button.text())
+            self.is_selected = True
             self._change_all_button_style()
-            self.pressed_rotate_type_signal.emit(self.current_rotate_type)
+            self._preview_current()
 
-    def _on_button_released(self) -> None:
-        """回転タイプボタンが離されたときの処理"""
-        self.released_rotate_type_signal.emit()
+    def _preview_current(self) -> None:
+        """選択した回転タイプをプレビューする (未選択の場合は元に戻す)"""
+        if self.is_selected:
+            self.preview_rotate_type_signal.emit(self.current_rotate_type)
+        else:
+            self.restore_signal.emit()
 
     def _change_all_button_style(self) -> None:
         """すべてのボタンのスタイルを変更する"""
@@ -88,6 +141,360 @@ class RotateTypeDialog(QtWidgets.QDialog):
                 button.setStyleSheet("")
 
 
+class CurveFilterDialog(QtWidgets.QDialog):
+    """ベイクしたカーブを書き込む前の後処理 (Euler Filter・キーの削減) を設定するダイアログ"""
+
+    def __init__(self, curve_filter: CurveFilter | None, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Bake Curve Filter")
+
+        layout = QtWidgets.QFormLayout(self)
+        self.euler_filter_check_box = QtWidgets.QCheckBox("回転の不連続 (360度の飛び・反転) を取り除く", self)
+        self.euler_filter_check_box.setChecked(curve_filter is not None and curve_filter.euler_filter)
+        layout.addRow(self.euler_filter_check_box)
+
+        self.reduce_keys_check_box = QtWidgets.QCheckBox("許容誤差の範囲でキーを削減する", self)
+        self.reduce_keys_check_box.setChecked(curve_filter is not None and curve_filter.reduces_keys)
+        layout.addRow(self.reduce_keys_check_box)
+
+        self.rotate_tolerance_spin_box = QtWidgets.QDoubleSpinBox(self)
+        self.rotate_tolerance_spin_box.setDecimals(4)
+        self.rotate_tolerance_spin_box.setRange(0.0, 10.0)
+        self.rotate_tolerance_spin_box.setSingleStep(0.01)
+        self.rotate_tolerance_spin_box.setSuffix(" deg")
+        self.rotate_tolerance_spin_box.setValue(
+            curve_filter.rotate_tolerance
+            if curve_filter is not None and curve_filter.rotate_tolerance is not None
+            else DEFAULT_KEY_REDUCTION_ROTATE_TOLERANCE,
+        )
+        layout.addRow("回転の許容誤差", self.rotate_tolerance_spin_box)
+
+        self.translate_tolerance_spin_box = QtWidgets.QDoubleSpinBox(self)
+        self.translate_tolerance_spin_box.setDecimals(5)
+        self.translate_tolerance_spin_box.setRange(0.0, 10.0)
+        self.translate_tolerance_spin_box.setSingleStep(0.001)
+        self.translate_tolerance_spin_box.setValue(
+            curve_filter.translate_tolerance
+            if curve_filter is not None and curve_filter.translate_tolerance is not None
+            else DEFAULT_KEY_REDUCTION_TRANSLATE_TOLERANCE,
+        )
+        layout.addRow("移動の許容誤差", self.translate_tolerance_spin_box)
+
+        self.reduce_keys_check_box.toggled.connect(self.rotate_tolerance_spin_box.setEnabled)
+        self.reduce_keys_check_box.toggled.connect(self.translate_tolerance_spin_box.setEnabled)
+        self.rotate_tolerance_spin_box.setEnabled(self.reduce_keys_check_box.isChecked())
+        self.translate_tolerance_spin_box.setEnabled(self.reduce_keys_check_box.isChecked())
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+
+    def get_curve_filter(self) -> CurveFilter | None:
+        """設定した後処理を返す
+
+        Returns:
+            CurveFilter | None: 後処理の設定。何もしない場合はNone
+        """
+        euler_filter = self.euler_filter_check_box.isChecked()
+        if not self.reduce_keys_check_box.isChecked():
+            return CurveFilter(euler_filter=True) if euler_filter else None
+        return CurveFilter(
+            euler_filter=euler_filter,
+            rotate_tolerance=self.rotate_tolerance_spin_box.value(),
+            translate_tolerance=self.translate_tolerance_spin_box.value(),
+        )
+
+
+class TimingReportDialog(QtWidgets.QDialog):
+    """計測結果を表示するダイアログ"""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Timing Report")
+        self.resize(520, 360)
+
+        self.layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout(self)  # type: ignore
+
+        self.text_edit = QtWidgets.QPlainTextEdit(self)
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.layout.addWidget(self.text_edit)
+
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close, self)
+        refresh_button = self.button_box.addButton("Refresh", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        reset_button = self.button_box.addButton("Reset", QtWidgets.QDialogButtonBox.ButtonRole.ResetRole)
+        save_button = self.button_box.addButton("Save JSON...", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        self.layout.addWidget(self.button_box)
+
+        refresh_button.clicked.connect(self.refresh)
+        reset_button.clicked.connect(self._reset)
+        save_button.clicked.connect(self._save_json)
+        self.button_box.rejected.connect(self.reject)
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """計測結果の表示を更新する"""
+        if not instrumentation.enabled and not instrumentation.stages:
+            self.text_edit.setPlainText("Edit > Record Timings を有効にしてから、マッチやベイクを実行してください。")
+            return
+        self.text_edit.setPlainText(instrumentation.summary())
+
+    def _reset(self) -> None:
+        """計測結果を破棄する"""
+        instrumentation.reset()
+        self.refresh()
+
+    def _save_json(self) -> None:
+        """計測結果をJSONファイルに保存する"""
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Timing Report", "timing_report.json", "JSON (*.json)")
+        if file_path:
+            instrumentation.export_json(Path(file_path))
+
+
+class VerifyReportDialog(QtWidgets.QDialog):
+    """マッチ結果の検証結果を表示するダイアログ"""
+
+    def __init__(self, report: VerifyReport, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Verify Report")
+        self.resize(640, 360)
+        self.report = report
+
+        self.layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout(self)  # type: ignore
+
+        self.result_label = QtWidgets.QLabel(self)
+        if report.failed_rows.any():
+            self.result_label.setText(f"{int(report.failed_rows.sum())} 個のFKコントローラーが許容誤差を超えています。")
+        elif report.self_consistency_only:
+            self.result_label.setText(
+                f"{int(report.self_consistency_rows.sum())} 個のFKコントローラーは、リグにIK/FKスイッチが設定されていないため、"
+                "IKの姿勢と比べていません (オフセットとの自己整合性だけを確認しました)。",
+            )
+        else:
+            self.result_label.setText("すべてのフレームで、FK状態のジョイントがIK状態のジョイントに合っています。")
+        self.result_label.setWordWrap(True)
+        self.layout.addWidget(self.result_label)
+
+        self.text_edit = QtWidgets.QPlainTextEdit(self)
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
+        self.text_edit.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.text_edit.setPlainText(report.summary())
+        self.layout.addWidget(self.text_edit)
+
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close, self)
+        select_button = self.button_box.addButton("Select Failed", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        select_button.setEnabled(bool(report.failed_rows.any()))
+        save_button = self.button_box.addButton("Save JSON...", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        self.layout.addWidget(self.button_box)
+
+        select_button.clicked.connect(self._select_failed)
+        save_button.clicked.connect(self._save_json)
+        self.button_box.rejected.connect(self.reject)
+
+    def _select_failed(self) -> None:
+        """許容誤差を超えたFKコントローラーを選択する"""
+        get_backend().select([fk_ctrl for fk_ctrl, failed in zip(self.report.fk_ctrls, self.report.failed_rows) if failed])
+
+    def _save_json(self) -> None:
+        """検証結果をJSONファイルに保存する"""
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Verify Report", "verify_report.json", "JSON (*.json)")
+        if file_path:
+            with Path(file_path).open("w", encoding="utf-8") as f:
+                json.dump(self.report.to_dict(), f, ensure_ascii=False, indent=4)
+
+
+class JobScheduler(QtCore.QObject):
+    """時間のかかる処理を少しずつ実行し、進捗を表示するクラス
+
+    シーンへのアクセスはメインスレッドで行う必要があるため、タイマーのコールバックでジョブを少しずつ進め、
+    その合間にイベントループに戻ってMayaの画面更新と操作の受け付け (キャンセルボタンなど) を行う。
+    1回に進める量は、計測した1単位の処理時間と画面の更新にかかる時間から決める。
+    進捗ダイアログはアプリケーション全体に対してモーダルにし、実行中はMaya本体の操作も受け付けない。
+    キャンセル・エラーの場合はジョブの変更だけを元に戻す (Job を参照)。
+    """
+    finished = QtCore.Signal(object)  # 終了したJob (完了・キャンセル・エラーのいずれか)
+
+    def __init__(self, parent: QtWidgets.QWidget) -> None:
+        super().__init__(parent)
+        self.job: Job | None = None
+        self._on_finished: Callable[[Job], None] | None = None
+        self._progress_dialog: QtWidgets.QProgressDialog | None = None
+        self._step_cost = 0.0  # 1単位の処理時間 (秒)
+        self._frame_cost = 0.0  # 前回の処理から次の処理までに画面の更新などにかかった時間 (秒)
+        self._slice_end = 0.0
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run_slice)
+
+    @property
+    def is_running(self) -> bool:
+        """ジョブを実行中かどうか"""
+        return self.job is not None
+
+    def run(self, job: Job, on_finished: Callable[[Job], None] | None = None) -> bool:
+        """ジョブを開始する
+
+        Args:
+            job (Job): 実行するジョブ
+            on_finished (Callable[[Job], None], optional): ジョブが終了したときに呼ぶ関数
+
+        Returns:
+            bool: 開始したかどうか (ほかのジョブを実行中の場合は開始しない)
+        """
+        if self.job is not None:
+            return False
+        self.job = job
+        self._on_finished = on_finished
+        self._step_cost = 0.0
+        self._frame_cost = 0.0
+
+        parent: QtWidgets.QWidget = self.parent()  # type: ignore
+        self._progress_dialog = QtWidgets.QProgressDialog(job.name, "Cancel", 0, 0, parent)
+        self._progress_dialog.setWindowTitle(job.name)
+        self._progress_dialog.setWindowModality(QtCore.Qt.WindowModality.ApplicationModal)
+        self._progress_dialog.setMinimumDuration(JOB_PROGRESS_DELAY_MS)
+        self._progress_dialog.setAutoClose(False)
+        self._progress_dialog.setAutoReset(False)
+        self._progress_dialog.canceled.connect(self.cancel)
+
+        job.start()
+        self._slice_end = time.perf_counter()
+        self._timer.start(0)
+        return True
+
+    def cancel(self, rollback: bool = True) -> None:
+        """実行中のジョブを中断し、変更を元に戻す
+
+        Args:
+            rollback (bool): 変更を元に戻すかどうか (変更したシーンが閉じられた場合は戻さない)
+        """
+        if self.job is None:
+            return
+        self.job.cancel(rollback)
+        self._finish()
+
+    def _slice_seconds(self) -> float:
+        """今回の処理に使う時間を求める
+
+        画面の更新にかかる時間が長いほど1回の処理時間を長くし、処理と画面の更新の比率を JOB_WORK_RATIO に保つ
+        """
+        seconds = self._frame_cost * JOB_WORK_RATIO / (1.0 - JOB_WORK_RATIO)
+        return min(max(seconds, JOB_SLICE_MIN_SECONDS), JOB_SLICE_MAX_SECONDS)
+
+    def _run_slice(self) -> None:
+        """ジョブを少しだけ進める"""
+        job = self.job
+        if job is None:
+            return
+        start = time.perf_counter()
+        self._frame_cost = self._smooth(self._frame_cost, start - self._slice_end)
+        deadline = start + self._slice_seconds()
+
+        running = True
+        now = start
+        # 次の1単位が時間内に終わる見込みの間だけ進める (少なくとも1単位は進める)
+        while running and (now == start or now + self._step_cost <= deadline):
+            running = job.step()
+            step_end = time.perf_counter()
+            self._step_cost = self._smooth(self._step_cost, step_end - now)
+            now = step_end
+
+        if not running:
+            self._finish()
+            return
+        self._update_progress()
+        self._slice_end = time.perf_counter()
+        self._timer.start(0)
+
+    def _smooth(self, average: float, value: float) -> float:
+        """計測した時間の指数移動平均を求める"""
+        if average == 0.0:
+            return value
+        return average + (value - average) * JOB_COST_SMOOTHING
+
+    def _update_progress(self) -> None:
+        """進捗ダイアログの表示を更新する"""
+        job = self.job
+        if job is None or self._progress_dialog is None:
+            return
+        self._progress_dialog.setMaximum(job.total)
+        self._progress_dialog.setValue(min(job.done, job.total))
+        eta = job.eta()
+        remaining = f"残り 約{format_seconds(eta)}" if eta is not None else "残り時間を計算中"
+        self._progress_dialog.setLabelText(f"{job.name} ({job.done} / {job.total})\n{remaining}")
+
+    def _finish(self) -> None:
+        """ジョブの終了処理"""
+        job, self.job = self.job, None
+        self._timer.stop()
+        if self._progress_dialog is not None:
+            self._progress_dialog.canceled.disconnect(self.cancel)
+            self._progress_dialog.close()
+            self._progress_dialog.deleteLater()
+            self._progress_dialog = None
+        if job is None:
+            return
+        if self._on_finished is not None:
+            self._on_finished(job)
+        self.finished.emit(job)
+
+
+class AutoPairDialog(QtWidgets.QDialog):
+    """提案されたFKコントローラーとジョイントの組み合わせを確認するダイアログ
+
+    信頼度が AUTO_PAIR_MIN_SCORE 以上の行は最初からチェックしておく
+    """
+    HEADERS = ("FK Controller", "Joint", "Kind", "Score")
+
+    def __init__(self, proposals: list[PairProposal], parent=None) -> None:
+        super().__init__(parent)
+        self.proposals = proposals
+
+        self.setWindowTitle("Auto Pair")
+        self.resize(720, 400)
+
+        self.layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout(self)  # type: ignore
+
+        self.table_widget = QtWidgets.QTableWidget(len(proposals), len(self.HEADERS), self)
+        self.table_widget.setHorizontalHeaderLabels(self.HEADERS)
+        self.table_widget.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_widget.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_widget.horizontalHeader().setStretchLastSection(True)
+        for row, proposal in enumerate(proposals):
+            fk_ctrl_item = QtWidgets.QTableWidgetItem(proposal.fk_ctrl)
+            fk_ctrl_item.setFlags(fk_ctrl_item.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable)
+            checked = proposal.score >= AUTO_PAIR_MIN_SCORE
+            fk_ctrl_item.setCheckState(QtCore.Qt.CheckState.Checked if checked else QtCore.Qt.CheckState.Unchecked)
+            fk_ctrl_item.setToolTip(" -> ".join([proposal.fk_ctrl, *proposal.path, proposal.joint]))
+            self.table_widget.setItem(row, 0, fk_ctrl_item)
+            self.table_widget.setItem(row, 1, QtWidgets.QTableWidgetItem(proposal.joint))
+            self.table_widget.setItem(row, 2, QtWidgets.QTableWidgetItem(proposal.kind))
+            self.table_widget.setItem(row, 3, QtWidgets.QTableWidgetItem(f"{proposal.score:.2f}"))
+        self.table_widget.resizeColumnsToContents()
+        self.layout.addWidget(self.table_widget)
+
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel, self)
+        self.layout.addWidget(self.button_box)
+
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+
+    def get_checked_proposals(self) -> list[PairProposal]:
+        """チェックされた組み合わせを返す
+
+        Returns:
+            list[PairProposal]: チェックされた組み合わせ
+        """
+        return [
+            proposal for row, proposal in enumerate(self.proposals)
+            if self.table_widget.item(row, 0).checkState() == QtCore.Qt.CheckState.Checked
+        ]
+
+
 class MatchFKToIKGUI(QtWidgets.QMainWindow):
     """Match FK to IKのGUIクラス"""
     def __init__(self, parent=None) -> None:
@@ -98,14 +505,37 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
         self.ui.setupUi(self)
         self.setWindowTitle("Match FK to IK")
 
-        # MatchFKToIKのインスタンスを作成
-        self.match_fk_to_ik = MatchFKToIK()
+        self.mirror_rules = format_mirror_rules(DEFAULT_MIRROR_RULES)  # 左右の名前の置換ルール
+        self.job_scheduler = JobScheduler(self)
+        self.switch_watcher: SwitchWatcher | None = None
+        self.switch_attribute = DEFAULT_SWITCH_ATTRIBUTE  # 前回入力したIK/FKスイッチのアトリビュート名
 
-        # 初期設定ファイルからマッチ情報を読み込む
+        # MatchFKToIKのインスタンスを作成 (シーンに含まれるリグのプロファイルだけを読み込む)
         if not DEFAULT_SETTINGS_FOLDER_PATH.exists():
             DEFAULT_SETTINGS_FOLDER_PATH.mkdir(parents=True, exist_ok=True)
-        if (DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_MATCH_INFO_FILE_NAME).exists():
-            self.match_fk_to_ik.match_infos.load_json(DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_MATCH_INFO_FILE_NAME)
+        self.profile_store = ProfileStore(DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_PROFILE_DATABASE_FILE_NAME)
+        legacy_match_info_file = DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_MATCH_INFO_FILE_NAME
+        if self.profile_store.is_empty() and legacy_match_info_file.exists():
+            # 以前のバージョンのJSONファイルをプロファイルに移行する
+            legacy_match_infos = MatchInfos()
+            legacy_match_infos.load_json(legacy_match_info_file)
+            imported = self.profile_store.import_match_infos(legacy_match_infos)
+            if imported < len(legacy_match_infos):
+                QtWidgets.QMessageBox.warning(
+                    self, "プロファイルの移行",
+                    f"ネームスペースがなくロング名でもない {len(legacy_match_infos) - imported} 行は、"
+                    "ほかのリグのプロファイルと混ざるため移行しませんでした。\n"
+                    "シーンでFKコントローラーを選択して登録し直してください。",
+                )
+        self.match_fk_to_ik = MatchFKToIK(profile_store=self.profile_store)
+        self.bake_cache = BakeCache(DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_BAKE_CACHE_FOLDER_NAME)
+
+        # シーンを開き直したときは、前のシーンの変更を保存してから新しいシーンのプロファイルを読み込む
+        self._scene_callbacks = get_backend().add_scene_callbacks(
+            lambda uuid: None,  # noqa: ARG005
+            lambda: None,
+            self._on_scene_reset,
+        )
 
         # テーブルビューの設定
         self.ui.match_info_table_view.setModel(MatchInfoTableModel(self.match_fk_to_ik.match_infos))
@@ -117,7 +547,25 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
 
         # シグナルとスロットの接続
         self.ui.match_button.clicked.connect(self.match_fk_to_ik_controller)
+        self.ui.bake_button.clicked.connect(self.bake_fk_to_ik_controller)
         self.ui.add_button.clicked.connect(self.add_match_info)
+        self.ui.auto_pair_action.triggered.connect(self.auto_pair)
+        self.ui.auto_detect_rotate_type_action.triggered.connect(self.auto_detect_rotate_types)
+        self.ui.mirror_action.triggered.connect(self.mirror_match_infos)
+        self.ui.capture_offsets_action.triggered.connect(self.capture_offsets)
+        self.ui.clear_offsets_action.triggered.connect(self.clear_offsets)
+        self.ui.match_all_namespaces_action.triggered.connect(self.match_all_namespaces)
+        self.ui.bake_all_namespaces_action.triggered.connect(self.bake_all_namespaces)
+        self.ui.use_bake_cache_action.toggled.connect(self.set_bake_cache_enabled)
+        self.ui.clear_bake_cache_action.triggered.connect(self.clear_bake_cache)
+        self.ui.compact_undo_action.toggled.connect(self.set_compact_undo_enabled)
+        self.ui.curve_filter_action.triggered.connect(self.edit_curve_filter)
+        self.ui.verify_action.triggered.connect(self.verify_match)
+        self.ui.set_switch_action.triggered.connect(self.set_switch_from_selection)
+        self.ui.live_match_action.toggled.connect(self.set_live_match_enabled)
+        self.ui.record_timings_action.setChecked(instrumentation.enabled)
+        self.ui.record_timings_action.toggled.connect(instrumentation.enable)
+        self.ui.timing_report_action.triggered.connect(self._open_timing_report)
         self.ui.manual_action.triggered.connect(self._open_manual_url)
 
         # GUIの設定を復元
@@ -137,22 +585,76 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
             return
 
         # selected_indexesは行と列の両方のインデックスを持つ可能性があるため、行インデックスのみを取得
-        selected_indexes = [index for index in selected_indexes if index.column() == 0]
+        selected_indexes = [index for index in selected_indexes if index.column() == 0 and index.isValid()]
 
-        for index in selected_indexes:
-            if not index.isValid():
-                continue
+        if override_match_info:
+            match_infos = [override_match_info]
+        else:
+            model = self.ui.match_info_table_view.model()
+            match_infos = [model.data(index, UserRole.MatchInfo) for index in selected_indexes]
+        if not all(match_infos):
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報が見つかりません。")
+            return
 
-            match_info: MatchInfo = override_match_info if override_match_info else self.ui.match_info_table_view.model().data(index, UserRole.MatchInfo)
-            if not match_info:
-                QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報が見つかりません。")
-                return
+        self._run_job("Match FK to IK", self.match_fk_to_ik.iter_match_many(match_infos))
 
-            if match_info:
-                self.match_fk_to_ik.match(match_info.fk_ctrl, override_match_info=match_info)
-                self.ui.match_info_table_view.model().layoutChanged.emit()
-            else:
-                QtWidgets.QMessageBox.warning(self, "入力エラー", "FKコントローラー名を入力してください。")
+    def bake_fk_to_ik_controller(self) -> None:
+        """タイムスライダーの範囲でFKコントローラーをジョイントに合わせてベイクする"""
+        selected_indexes = [index for index in self.ui.match_info_table_view.selectedIndexes() if index.column() == 0]
+        if not selected_indexes:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+
+        model = self.ui.match_info_table_view.model()
+        match_infos: list[MatchInfo] = [model.data(index, UserRole.MatchInfo) for index in selected_indexes if index.isValid()]
+        start, end = get_playback_range()
+        self._run_job("Bake FK to IK", self.match_fk_to_ik.iter_bake(match_infos, start, end))
+
+    def match_all_namespaces(self) -> None:
+        """選択した行をテンプレートとして、すべてのネームスペースでマッチする"""
+        match_infos = self._get_selected_match_infos()
+        if not match_infos:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+
+        def _on_finished(namespaces: list[str]) -> None:
+            if not namespaces:
+                QtWidgets.QMessageBox.warning(self, "マッチ", "対象のネームスペースが見つかりませんでした。")
+
+        self._run_job("Match FK to IK", self.match_fk_to_ik.iter_match_namespaces(infos=match_infos), _on_finished)
+
+    def bake_all_namespaces(self) -> None:
+        """選択した行をテンプレートとして、すべてのネームスペースでタイムスライダーの範囲をベイクする"""
+        match_infos = self._get_selected_match_infos()
+        if not match_infos:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+        start, end = get_playback_range()
+
+        def _on_finished(namespaces: list[str]) -> None:
+            if not namespaces:
+                QtWidgets.QMessageBox.warning(self, "ベイク", "対象のネームスペースが見つかりませんでした。")
+
+        self._run_job("Bake FK to IK", self.match_fk_to_ik.iter_bake_namespaces(start, end, infos=match_infos), _on_finished)
+
+    def verify_match(self) -> None:
+        """タイムスライダーの範囲で、選択した行のFKコントローラーがジョイントに合っているかを検証する"""
+        match_infos = self._get_selected_match_infos()
+        if not match_infos:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+        start, end = get_playback_range()
+
+        def _on_finished(report: VerifyReport) -> None:
+            VerifyReportDialog(report, self).exec_()
+
+        self._run_job("Verify FK to IK", self.match_fk_to_ik.iter_verify(match_infos, start, end), _on_finished, undoable=False)
+
+    def _get_selected_match_infos(self) -> list[MatchInfo]:
+        """テーブルで選択されている行のマッチ情報を取得する"""
+        model = self.ui.match_info_table_view.model()
+        selected_indexes = self.ui.match_info_table_view.selectedIndexes()
+        return [model.data(index, UserRole.MatchInfo) for index in selected_indexes if index.column() == 0 and index.isValid()]
 
     def add_match_info(self) -> None:
         """マッチ情報を追加する"""
@@ -167,10 +669,199 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
 
         if fk_ctrl and joint and rotate_type:
             self.match_fk_to_ik.match_infos.add(joint=joint, fk_ctrl=fk_ctrl, rotate_type=rotate_type)
-            self.ui.match_info_table_view.model().layoutChanged.emit()
         else:
             QtWidgets.QMessageBox.warning(self, "入力エラー", "すべてのフィールドに入力してください。")
 
+    def auto_pair(self) -> None:
+        """選択したリグの接続からFKコントローラーとジョイントの組み合わせを提案し、確認したものを追加する"""
+        if not get_backend().get_selection():
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "リグのルートノードを選択してください。")
+            return
+        self._run_job("Auto Pair", self.match_fk_to_ik.iter_propose_pairs(), self._confirm_pairs, undoable=False)
+
+    def _confirm_pairs(self, proposals: list[PairProposal]) -> None:
+        """提案された組み合わせを確認し、チェックしたものを追加する"""
+        if not proposals:
+            QtWidgets.QMessageBox.information(self, "自動ペアリング", "新しい組み合わせが見つかりませんでした。")
+            return
+
+        auto_pair_dialog = AutoPairDialog(proposals, self)
+        if auto_pair_dialog.exec_() != QtWidgets.QDialog.DialogCode.Accepted:
+            return
+        added = self.match_fk_to_ik.add_pairs(auto_pair_dialog.get_checked_proposals())
+        if added:
+            QtWidgets.QMessageBox.information(
+                self, "自動ペアリング", f"{added}件のマッチ情報を追加しました。\nFK状態のポーズで Auto Detect Rotate Types を実行してください。",
+            )
+
+    def auto_detect_rotate_types(self) -> None:
+        """登録されているすべての行の回転タイプを自動で設定する"""
+        detections = self.match_fk_to_ik.detect_rotate_types()
+
+        unmatched = [detection for detection in detections if detection.residual > ROTATE_TYPE_TOLERANCE_DEGREES]
+        if unmatched:
+            lines = "\n".join(f"{detection.info.fk_ctrl}: {detection.residual:.2f}°" for detection in unmatched)
+            QtWidgets.QMessageBox.warning(self, "自動検出", f"以下の行は一致する回転タイプが見つかりませんでした。\n{lines}")
+
+    def mirror_match_infos(self) -> None:
+        """選択した行の左右を入れ替えた行を追加する"""
+        match_infos = self._get_selected_match_infos()
+        if not match_infos:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+
+        text, ok = QtWidgets.QInputDialog.getText(
+            self, "ミラー", "左右の名前の置換ルール (左:右 をカンマ区切り)", text=self.mirror_rules,
+        )
+        if not ok:
+            return
+        try:
+            rules = parse_mirror_rules(text)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "入力エラー", str(e))
+            return
+        self.mirror_rules = text
+
+        detections = self.match_fk_to_ik.mirror(match_infos, rules)
+        if not detections:
+            QtWidgets.QMessageBox.warning(self, "ミラー", "追加できる行が見つかりませんでした。")
+            return
+        unmatched = [detection for detection in detections if detection.residual > ROTATE_TYPE_TOLERANCE_DEGREES]
+        if unmatched:
+            lines = "\n".join(f"{detection.info.fk_ctrl}: {detection.residual:.2f}°" for detection in unmatched)
+            QtWidgets.QMessageBox.warning(
+                self, "ミラー", f"以下の行は左右のポーズが一致していないため、Rotate Typeを確認してください。\n{lines}",
+            )
+
+    def capture_offsets(self) -> None:
+        """選択した行のオフセットを現在のポーズから記録する"""
+        match_infos = self._get_selected_match_infos()
+        if not match_infos:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+        captured = self.match_fk_to_ik.capture_offsets(match_infos)
+        if len(captured) < len(match_infos):
+            QtWidgets.QMessageBox.warning(
+                self, "オフセット", f"{len(match_infos) - len(captured)}件の行はノードが見つからないため、オフセットを記録できませんでした。",
+            )
+
+    def clear_offsets(self) -> None:
+        """選択した行のオフセットを解除する"""
+        match_infos = self._get_selected_match_infos()
+        if not match_infos:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "マッチ情報を選択してください。")
+            return
+        self.match_fk_to_ik.clear_offsets(match_infos)
+
+    def _run_job(
+        self,
+        name: str,
+        steps: Steps[Any],
+        on_finished: Callable[[Any], None] | None = None,
+        undoable: bool = True,
+    ) -> None:
+        """時間のかかる処理をジョブとして少しずつ実行する
+
+        Args:
+            name (str): ジョブ名 (Undoのチャンク名)
+            steps (Steps): 処理のジェネレーター
+            on_finished (Callable[[Any], None], optional): 処理が完了したときに結果を渡して呼ぶ関数
+            undoable (bool): シーンを変更する処理かどうか
+        """
+        def _on_job_finished(job: Job) -> None:
+            if job.state == JOB_FAILED:
+                QtWidgets.QMessageBox.critical(self, "エラー", f"{job.name} に失敗したため、変更を元に戻しました。\n{job.error}")
+            elif job.state == JOB_FINISHED and on_finished is not None:
+                on_finished(job.result)
+
+        if not self.job_scheduler.run(Job(name, steps, undoable), _on_job_finished):
+            steps.close()
+            QtWidgets.QMessageBox.warning(self, "実行中", "ほかの処理を実行中です。終了するまでお待ちください。")
+
+    def set_switch_from_selection(self) -> None:
+        """選択したノードのアトリビュートを、そのリグのIK/FKスイッチとして保存する"""
+        backend = get_backend()
+        selection = backend.get_selection()
+        if not selection:
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "IK/FKスイッチのアトリビュートを持つノードを選択してください。")
+            return
+        node = selection[0]
+
+        attribute, ok = QtWidgets.QInputDialog.getText(self, "IK/FKスイッチ", "アトリビュート名", text=self.switch_attribute)
+        if not ok or not attribute:
+            return
+        try:
+            current_value = float(backend.get_attr(node, attribute))
+        except (KeyError, RuntimeError, TypeError, ValueError):
+            QtWidgets.QMessageBox.warning(self, "入力エラー", f"{node}.{attribute} の値を取得できません。")
+            return
+        self.switch_attribute = attribute
+
+        ik_value, ok = QtWidgets.QInputDialog.getDouble(
+            self, "IK/FKスイッチ", "IK状態のときの値", value=current_value, minValue=-1.0e6, maxValue=1.0e6, decimals=3,
+        )
+        if not ok:
+            return
+        self.profile_store.set_switch(RigSwitch(get_node_rig_name(node), node, attribute, ik_value))
+        if self.switch_watcher is not None:
+            self._start_switch_watcher()
+
+    def set_live_match_enabled(self, enabled: bool) -> None:
+        """IK/FKスイッチの監視を開始 (停止) する"""
+        if enabled:
+            switches = self._start_switch_watcher()
+            if not switches:
+                QtWidgets.QMessageBox.information(
+                    self, "ライブマッチ", "IK/FKスイッチが設定されたリグがありません。\nEdit > Set IK/FK Switch from Selection... で設定してください。",
+                )
+        else:
+            self._stop_switch_watcher()
+
+    def set_bake_cache_enabled(self, enabled: bool) -> None:
+        """ベイク結果のキャッシュを使う (使わない) ようにする"""
+        self.match_fk_to_ik.bake_cache = self.bake_cache if enabled else None
+
+    def clear_bake_cache(self) -> None:
+        """ベイク結果のキャッシュをすべて削除する"""
+        self.bake_cache.clear()
+        QtWidgets.QMessageBox.information(self, "削除完了", "ベイクのキャッシュが削除されました。")
+
+    def set_compact_undo_enabled(self, enabled: bool) -> None:
+        """ベイクのUndoをカーブのスナップショットで行う (行わない) ようにする"""
+        self.match_fk_to_ik.compact_undo = enabled
+
+    def edit_curve_filter(self) -> None:
+        """ベイクしたカーブを書き込む前の後処理を設定する"""
+        dialog = CurveFilterDialog(self.match_fk_to_ik.curve_filter, self)
+        if dialog.exec_():
+            self.match_fk_to_ik.curve_filter = dialog.get_curve_filter()
+
+    def _start_switch_watcher(self) -> list[RigSwitch]:
+        """シーンに含まれるリグのIK/FKスイッチの監視を開始する"""
+        self._stop_switch_watcher()
+        switches = self.match_fk_to_ik.load_scene_switches()
+        self.switch_watcher = SwitchWatcher(self.match_fk_to_ik.match_infos, switches)
+        return self.switch_watcher.start()
+
+    def _stop_switch_watcher(self) -> None:
+        """IK/FKスイッチの監視を停止する"""
+        if self.switch_watcher is not None:
+            self.switch_watcher.stop()
+            self.switch_watcher = None
+
+    def _on_scene_reset(self) -> None:
+        """新規シーン・シーンを開いたときの処理"""
+        # 前のシーンに対するジョブは続けられないため中断する (変更したシーンは閉じられているので元に戻さない)
+        self.job_scheduler.cancel(rollback=False)
+        self.match_fk_to_ik.save_profiles()
+        self.match_fk_to_ik.load_scene_profiles()
+        if self.switch_watcher is not None:
+            self._start_switch_watcher()
+
+    def _open_timing_report(self) -> None:
+        """計測結果のダイアログを開く"""
+        TimingReportDialog(self).exec_()
+
     def _open_table_menu(self, position: QtCore.QPoint) -> None:
         """テーブルのコンテキストメニューを開く"""
         menu = QtWidgets.QMenu(self.ui.match_info_table_view)
@@ -192,7 +883,6 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "選択エラー", "削除するマッチ情報が見つかりません。")
             return
         self.match_fk_to_ik.match_infos.remove(match_info.fk_ctrl)
-        self.ui.match_info_table_view.model().layoutChanged.emit()
         QtWidgets.QMessageBox.information(self, "削除完了", "マッチ情報が削除されました。")
 
     def _on_double_click_table(self, index: QtCore.QModelIndex) -> None:
@@ -209,35 +899,41 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
         elif index.column() == HEADERS.index(HEADER_JOINT):  # ジョイントの列
             self._select_joint()
         elif index.column() == HEADERS.index(HEADER_ROTATE_TYPE):  # 回転タイプの列
-            rotate_type_dialog = RotateTypeDialog(match_info.type, self)
-            rotate_type_dialog.pressed_rotate_type_signal.connect(self._on_rotate_type_dialog_button_pressed)
-            rotate_type_dialog.released_rotate_type_signal.connect(self._on_rotate_type_dialog_button_released)
-            result = rotate_type_dialog.exec_()
-
-            if result == QtWidgets.QDialog.DialogCode.Accepted:
-                selected_match_info = self.ui.match_info_table_view.model().data(index, UserRole.MatchInfo)
-                if selected_match_info:
-                    selected_match_info.type = rotate_type_dialog.get_selected_type()
-                    self.match_fk_to_ik.match_infos.edit(selected_match_info.fk_ctrl, selected_match_info)
-                    self.ui.match_info_table_view.model().layoutChanged.emit()
-                else:
-                    QtWidgets.QMessageBox.warning(self, "選択エラー", "回転タイプを選択できませんでした。")
-
-    def _on_rotate_type_dialog_button_pressed(self, rotate_type: RotateType) -> None:
-        """回転タイプダイアログのボタンが押されたときの処理"""
-        selected_index = self.ui.match_info_table_view.currentIndex()
-        if not selected_index.isValid():
+            self._open_rotate_type_dialog(index, match_info)
+
+    def _open_rotate_type_dialog(self, index: QtCore.QModelIndex, match_info: MatchInfo) -> None:
+        """回転タイプダイアログを開く
+
+        ダイアログを開いている間の候補のプレビューはUndoに記録せず、OKで選択した回転タイプを1回のUndo可能な操作でマッチする
+        """
+        try:
+            preview = RotateTypePreview(match_info)
+        except ValueError:
+            preview = None
+
+        rotate_type_dialog = RotateTypeDialog(match_info.type, self)
+        if preview:
+            rotate_type_dialog.preview_rotate_type_signal.connect(preview.preview)
+            rotate_type_dialog.restore_signal.connect(preview.restore)
+        result = rotate_type_dialog.exec_()
+
+        if result != QtWidgets.QDialog.DialogCode.Accepted:
+            if preview:
+                preview.restore()
             return
 
-        match_info = self.ui.match_info_table_view.model().data(selected_index, UserRole.MatchInfo)
-        match_info = deepcopy(match_info) if match_info else None
-        if match_info:
-            match_info.type = rotate_type
-            self.match_fk_to_ik_controller(override_match_info=match_info)
+        selected_match_info = self.ui.match_info_table_view.model().data(index, UserRole.MatchInfo)
+        if not selected_match_info:
+            if preview:
+                preview.restore()
+            QtWidgets.QMessageBox.warning(self, "選択エラー", "回転タイプを選択できませんでした。")
+            return
 
-    def _on_rotate_type_dialog_button_released(self) -> None:
-        """回転タイプダイアログのボタンが離されたときの処理"""
-        undo()
+        selected_match_info.type = rotate_type_dialog.get_selected_type()
+        selected_match_info.offset = None
+        self.match_fk_to_ik.match_infos.edit(selected_match_info.fk_ctrl, selected_match_info)
+        if preview:
+            preview.commit(selected_match_info.type)
 
     def _select_fk_controller(self) -> None:
         """選択されたFKコントローラーを選択する"""
@@ -281,15 +977,41 @@ class MatchFKToIKGUI(QtWidgets.QMainWindow):
         table_state = settings.value("tableState", QtCore.QByteArray())
         if table_state:
             self.ui.match_info_table_view.horizontalHeader().restoreState(table_state)  # type: ignore
+        self.mirror_rules = str(settings.value("mirrorRules", self.mirror_rules))
+        self.switch_attribute = str(settings.value("switchAttribute", self.switch_attribute))
+        self.ui.use_bake_cache_action.setChecked(settings.value("useBakeCache", "false") == "true")
+        self.ui.compact_undo_action.setChecked(settings.value("compactUndo", "false") == "true")
+        curve_filter = settings.value("curveFilter", "")
+        if curve_filter:
+            self.match_fk_to_ik.curve_filter = CurveFilter(**json.loads(str(curve_filter)))
+        if settings.value("liveMatch", "false") == "true":
+            # 起動時はスイッチが設定されていなくてもメッセージを出さない
+            with QtCore.QSignalBlocker(self.ui.live_match_action):
+                self.ui.live_match_action.setChecked(True)
+            self._start_switch_watcher()
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         """ウィンドウを閉じるときの処理"""
-        self.match_fk_to_ik.match_infos.export_json(DEFAULT_SETTINGS_FOLDER_PATH / DEFAULT_MATCH_INFO_FILE_NAME)
+        self.job_scheduler.cancel()
+        self._stop_switch_watcher()
+        get_backend().remove_scene_callbacks(self._scene_callbacks)
+        self.match_fk_to_ik.save_profiles()
+        self.profile_store.close()
+        model: MatchInfoTableModel = self.ui.match_info_table_view.model()  # type: ignore
+        model.node_names.remove_callbacks()
+        self.match_fk_to_ik.match_infos.remove_observer(model)
 
         settings = QtCore.QSettings(str(GUI_SETTINGS_FILE), QtCore.QSettings.Format.IniFormat)
         settings.setValue("geometry", self.saveGeometry())  # type: ignore
         settings.setValue("windowState", self.saveState())
         settings.setValue("tableGeometry", self.ui.match_info_table_view.horizontalHeader().saveGeometry())
         settings.setValue("tableState", self.ui.match_info_table_view.horizontalHeader().saveState())
+        settings.setValue("mirrorRules", self.mirror_rules)
+        settings.setValue("switchAttribute", self.switch_attribute)
+        settings.setValue("liveMatch", "true" if self.ui.live_match_action.isChecked() else "false")
+        settings.setValue("useBakeCache", "true" if self.ui.use_bake_cache_action.isChecked() else "false")
+        settings.setValue("compactUndo", "true" if self.ui.compact_undo_action.isChecked() else "false")
+        curve_filter = self.match_fk_to_ik.curve_filter
+        settings.setValue("curveFilter", json.dumps(asdict(curve_filter)) if curve_filter is not None else "")
         settings.sync()
         event.accept()
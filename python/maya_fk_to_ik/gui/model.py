@@ -3,16 +3,19 @@ from __future__ import annotations
 from enum import Enum
 from typing import Any
 
-import maya.cmds as cmds  # type: ignore
 from PySide6 import QtCore
 
+from ..backend import get_backend
 from ..core.match_info import MatchInfo, MatchInfos
 from ..core.rotate_type import RotateType
+from ..utils.instrumentation import STAGE_REFRESH, instrumentation
+from .node_name_cache import NodeNameCache
 
 HEADER_FK_CTRL = "FK Controller"
 HEADER_JOINT = "Joint"
 HEADER_ROTATE_TYPE = "Rotate Type"
 HEADERS = [HEADER_FK_CTRL, HEADER_JOINT, HEADER_ROTATE_TYPE]
+CUSTOM_OFFSET_LABEL = "Custom"  # オフセットを持つ行の回転タイプの表示
 
 
 class UserRole(int, Enum):
@@ -27,19 +30,54 @@ class MatchInfoTableModel(QtCore.QAbstractTableModel):
         self.match_infos = match_infos
         self.headers = HEADERS
 
+        # 表示名はUUIDでキャッシュし、シーンの変更はコールバックで反映する
+        self.node_names = NodeNameCache()
+        self.node_names.rebuild(node for info in match_infos for node in (info.fk_ctrl, info.joint))
+        self.node_names.add_callbacks()
+
+        # MatchInfosの変更を行単位でビューに通知する
+        self.match_infos.add_observer(self)
+
+    def rows_about_to_be_inserted(self, first: int, last: int) -> None:
+        """MatchInfosに行が挿入される直前の処理"""
+        self.beginInsertRows(QtCore.QModelIndex(), first, last)
+
+    def rows_inserted(self, first: int, last: int) -> None:  # noqa: ARG002
+        """MatchInfosに行が挿入された直後の処理"""
+        with instrumentation.stage(STAGE_REFRESH):
+            self.endInsertRows()
+
+    def rows_about_to_be_removed(self, first: int, last: int) -> None:
+        """MatchInfosから行が削除される直前の処理"""
+        self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+
+    def rows_removed(self, first: int, last: int) -> None:  # noqa: ARG002
+        """MatchInfosから行が削除された直後の処理"""
+        with instrumentation.stage(STAGE_REFRESH):
+            self.endRemoveRows()
+
+    def row_about_to_be_changed(self, row: int) -> None:
+        """MatchInfosの行が変更される直前の処理 (何もしない)"""
+
+    def row_changed(self, row: int) -> None:
+        """MatchInfosの行が変更された直後の処理"""
+        with instrumentation.stage(STAGE_REFRESH):
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
     def rowCount(self, parent=QtCore.QModelIndex()) -> int:  # type: ignore
-        return len(self.match_infos)
+        return 0 if parent.isValid() else len(self.match_infos)
 
     def columnCount(self, parent=QtCore.QModelIndex()) -> int:  # type: ignore
-        return len(self.headers)
+        return 0 if parent.isValid() else len(self.headers)
 
     def setData(self, index: QtCore.QModelIndex, value: Any, role=QtCore.Qt.ItemDataRole.EditRole) -> bool:  # type: ignore
         if not index.isValid() or role != QtCore.Qt.ItemDataRole.EditRole:
             return False
         if index.column() == HEADERS.index(HEADER_ROTATE_TYPE):
             # Update the rotate type
-            match_info: MatchInfo = list(self.match_infos)[index.row()]
+            match_info: MatchInfo = self.match_infos.at(index.row())
             match_info.type = RotateType[value]
+            match_info.offset = None
             self.match_infos.edit(match_info.fk_ctrl, match_info)
             return True
         return False
@@ -48,15 +86,20 @@ class MatchInfoTableModel(QtCore.QAbstractTableModel):
         if not index.isValid():
             return None
 
-        match_info: MatchInfo = list(self.match_infos)[index.row()]
+        match_info: MatchInfo = self.match_infos.at(index.row())
 
         if role == QtCore.Qt.ItemDataRole.DisplayRole:
             if index.column() == HEADERS.index(HEADER_FK_CTRL):
-                return get_simple_node_name(match_info.fk_ctrl)
+                return self.node_names.get(match_info.fk_ctrl)
             if index.column() == HEADERS.index(HEADER_JOINT):
-                return get_simple_node_name(match_info.joint)
+                return self.node_names.get(match_info.joint)
             if index.column() == HEADERS.index(HEADER_ROTATE_TYPE):
-                return match_info.type
+                return CUSTOM_OFFSET_LABEL if match_info.offset is not None else match_info.type
+        elif role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            if index.column() == HEADERS.index(HEADER_ROTATE_TYPE) and match_info.offset is not None:
+                quaternion = ", ".join(f"{value:.4f}" for value in match_info.offset.quaternion)
+                translation = ", ".join(f"{value:.4f}" for value in match_info.offset.translation)
+                return f"quaternion: ({quaternion})\ntranslation: ({translation})"
         elif role == UserRole.MatchInfo:
             return match_info
         return None
@@ -72,14 +115,10 @@ class MatchInfoTableModel(QtCore.QAbstractTableModel):
         return QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsSelectable
 
 
-def get_simple_node_name(node: str) -> str:
-    """ノード名からシンプルな名前を取得する"""
-    return cmds.ls(node, shortNames=True)[0] if cmds.objExists(node) else node  # type: ignore
-
-
 def get_match_info_from_selection() -> MatchInfo | None:
     """現在の選択からマッチ情報を取得する"""
-    selection = cmds.ls(selection=True, long=True)  # type: ignore
+    backend = get_backend()
+    selection = backend.get_selection()
     if len(selection) < 2:  # noqa: PLR2004
         return None
 
@@ -87,23 +126,29 @@ def get_match_info_from_selection() -> MatchInfo | None:
     joint = selection[1]
     rotate_type = RotateType.FFF  # デフォルトの回転タイプ
 
-    if not cmds.objExists(fk_ctrl):
-        cmds.warning(f"FK controller '{fk_ctrl}' does not exist.")
+    if not backend.exists(fk_ctrl):
+        backend.warning(f"FK controller '{fk_ctrl}' does not exist.")
         return None
 
-    if cmds.objectType(joint) != "joint":
-        cmds.warning(f"Selected object '{joint}' is not a joint.")
+    if backend.node_type(joint) != "joint":
+        backend.warning(f"Selected object '{joint}' is not a joint.")
         return None
 
     return MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=rotate_type)
 
 def select_node(node: str) -> None:
     """ノードを選択する"""
-    if cmds.objExists(node):
-        cmds.select(node)
+    backend = get_backend()
+    if backend.exists(node):
+        backend.select([node])
     else:
-        cmds.warning(f"Node '{node}' does not exist.")
+        backend.warning(f"Node '{node}' does not exist.")
+
+def get_playback_range() -> tuple[int, int]:
+    """タイムスライダーの再生範囲を取得する"""
+    start, end = get_backend().playback_range()
+    return int(start), int(end)
 
 def undo() -> None:
     """MayaのUndoを実行する"""
-    cmds.undo()  # type: ignore
+    get_backend().undo()
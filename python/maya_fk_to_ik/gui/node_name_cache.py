@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from ..backend import get_backend
+
+
+class NodeNameCache:
+    """テーブルに表示するノード名をUUIDで管理するキャッシュ
+
+    ノード名からUUIDへの対応と、UUIDから表示名への対応を保持する。
+    リネーム・削除・新規シーンのコールバックで該当するUUIDだけを古い状態にし、次に表示するときに解決し直すので、
+    テーブルを描画するたびにシーンへ問い合わせることはない。
+    """
+    def __init__(self) -> None:
+        self._uuids: dict[str, str] = {}  # ノード名 -> UUID
+        self._names: dict[str, str] = {}  # UUID -> 表示名
+        self._missing: set[str] = set()  # シーンに存在しなかったノード名
+        self._callback_handle: Any = None
+
+    def get(self, node: str) -> str:
+        """ノードの表示名を取得する
+
+        Args:
+            node (str): ノード名
+
+        Returns:
+            str: 表示名 (ノードが存在しない場合は元の名前)
+        """
+        if node in self._missing:
+            return node
+        if node not in self._uuids:
+            self.rebuild([node], clear=False)
+            if node in self._missing:
+                return node
+
+        uuid = self._uuids[node]
+        name = self._names.get(uuid)
+        if name is None:
+            name = get_backend().get_display_names([uuid])[0]
+            if name is None:
+                del self._uuids[node]
+                self._missing.add(node)
+                return node
+            self._names[uuid] = name
+        return name
+
+    def rebuild(self, nodes: Iterable[str], *, clear: bool = True) -> None:
+        """ノードの表示名をまとめて取得してキャッシュする
+
+        Args:
+            nodes (Iterable[str]): ノード名
+            clear (bool): 既存のキャッシュを破棄するかどうか
+        """
+        if clear:
+            self.clear()
+
+        nodes = list(dict.fromkeys(nodes))
+        if not nodes:
+            return
+        backend = get_backend()
+        uuids = backend.get_uuids(nodes)
+        existing = [uuid for uuid in uuids if uuid is not None]
+        self._names.update(zip(existing, backend.get_display_names(existing)))
+        for node, uuid in zip(nodes, uuids):
+            if uuid is None:
+                self._missing.add(node)
+            else:
+                self._uuids[node] = uuid
+                self._missing.discard(node)
+
+    def invalidate(self, uuid: str | None = None) -> None:
+        """キャッシュを古い状態にする (次に表示するときに解決し直す)
+
+        Args:
+            uuid (str, optional): 対象のUUID。省略した場合はすべて
+        """
+        if uuid is None:
+            self._names.clear()
+        else:
+            self._names.pop(uuid, None)
+
+    def invalidate_missing(self) -> None:
+        """存在しなかったノードを解決し直すようにする"""
+        self._missing.clear()
+
+    def clear(self) -> None:
+        """キャッシュをすべて破棄する"""
+        self._uuids.clear()
+        self._names.clear()
+        self._missing.clear()
+
+    def add_callbacks(self) -> None:
+        """リネーム・削除・追加・新規シーンのコールバックを登録する"""
+        if self._callback_handle is None:
+            self._callback_handle = get_backend().add_scene_callbacks(self.invalidate, self.invalidate_missing, self.clear)
+
+    def remove_callbacks(self) -> None:
+        """登録したコールバックを削除する"""
+        if self._callback_handle is not None:
+            get_backend().remove_scene_callbacks(self._callback_handle)
+        self._callback_handle = None
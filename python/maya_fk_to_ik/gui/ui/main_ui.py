@@ -29,6 +29,42 @@ class Ui_MainWindow(object):
         self.actionExport_setting_file.setObjectName(u"actionExport_setting_file")
         self.actionImport_setting_file = QAction(MainWindow)
         self.actionImport_setting_file.setObjectName(u"actionImport_setting_file")
+        self.auto_pair_action = QAction(MainWindow)
+        self.auto_pair_action.setObjectName(u"auto_pair_action")
+        self.auto_detect_rotate_type_action = QAction(MainWindow)
+        self.auto_detect_rotate_type_action.setObjectName(u"auto_detect_rotate_type_action")
+        self.mirror_action = QAction(MainWindow)
+        self.mirror_action.setObjectName(u"mirror_action")
+        self.capture_offsets_action = QAction(MainWindow)
+        self.capture_offsets_action.setObjectName(u"capture_offsets_action")
+        self.clear_offsets_action = QAction(MainWindow)
+        self.clear_offsets_action.setObjectName(u"clear_offsets_action")
+        self.match_all_namespaces_action = QAction(MainWindow)
+        self.match_all_namespaces_action.setObjectName(u"match_all_namespaces_action")
+        self.bake_all_namespaces_action = QAction(MainWindow)
+        self.bake_all_namespaces_action.setObjectName(u"bake_all_namespaces_action")
+        self.use_bake_cache_action = QAction(MainWindow)
+        self.use_bake_cache_action.setObjectName(u"use_bake_cache_action")
+        self.use_bake_cache_action.setCheckable(True)
+        self.clear_bake_cache_action = QAction(MainWindow)
+        self.clear_bake_cache_action.setObjectName(u"clear_bake_cache_action")
+        self.compact_undo_action = QAction(MainWindow)
+        self.compact_undo_action.setObjectName(u"compact_undo_action")
+        self.compact_undo_action.setCheckable(True)
+        self.curve_filter_action = QAction(MainWindow)
+        self.curve_filter_action.setObjectName(u"curve_filter_action")
+        self.verify_action = QAction(MainWindow)
+        self.verify_action.setObjectName(u"verify_action")
+        self.set_switch_action = QAction(MainWindow)
+        self.set_switch_action.setObjectName(u"set_switch_action")
+        self.live_match_action = QAction(MainWindow)
+        self.live_match_action.setObjectName(u"live_match_action")
+        self.live_match_action.setCheckable(True)
+        self.record_timings_action = QAction(MainWindow)
+        self.record_timings_action.setObjectName(u"record_timings_action")
+        self.record_timings_action.setCheckable(True)
+        self.timing_report_action = QAction(MainWindow)
+        self.timing_report_action.setObjectName(u"timing_report_action")
         self.manual_action = QAction(MainWindow)
         self.manual_action.setObjectName(u"manual_action")
         self.centralwidget = QWidget(MainWindow)
@@ -41,6 +77,11 @@ class Ui_MainWindow(object):
 
         self.verticalLayout.addWidget(self.match_button)
 
+        self.bake_button = QPushButton(self.centralwidget)
+        self.bake_button.setObjectName(u"bake_button")
+
+        self.verticalLayout.addWidget(self.bake_button)
+
         self.add_button = QPushButton(self.centralwidget)
         self.add_button.setObjectName(u"add_button")
 
@@ -60,11 +101,33 @@ class Ui_MainWindow(object):
         self.menubar = QMenuBar(MainWindow)
         self.menubar.setObjectName(u"menubar")
         self.menubar.setGeometry(QRect(0, 0, 419, 22))
+        self.menuEdit = QMenu(self.menubar)
+        self.menuEdit.setObjectName(u"menuEdit")
         self.menuHelp = QMenu(self.menubar)
         self.menuHelp.setObjectName(u"menuHelp")
         MainWindow.setMenuBar(self.menubar)
 
+        self.menubar.addAction(self.menuEdit.menuAction())
         self.menubar.addAction(self.menuHelp.menuAction())
+        self.menuEdit.addAction(self.auto_pair_action)
+        self.menuEdit.addAction(self.auto_detect_rotate_type_action)
+        self.menuEdit.addAction(self.mirror_action)
+        self.menuEdit.addAction(self.capture_offsets_action)
+        self.menuEdit.addAction(self.clear_offsets_action)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.match_all_namespaces_action)
+        self.menuEdit.addAction(self.bake_all_namespaces_action)
+        self.menuEdit.addAction(self.use_bake_cache_action)
+        self.menuEdit.addAction(self.clear_bake_cache_action)
+        self.menuEdit.addAction(self.compact_undo_action)
+        self.menuEdit.addAction(self.curve_filter_action)
+        self.menuEdit.addAction(self.verify_action)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.set_switch_action)
+        self.menuEdit.addAction(self.live_match_action)
+        self.menuEdit.addSeparator()
+        self.menuEdit.addAction(self.record_timings_action)
+        self.menuEdit.addAction(self.timing_report_action)
         self.menuHelp.addAction(self.manual_action)
 
         self.retranslateUi(MainWindow)
@@ -76,15 +139,81 @@ class Ui_MainWindow(object):
         MainWindow.setWindowTitle(QCoreApplication.translate("MainWindow", u"MainWindow", None))
         self.actionExport_setting_file.setText(QCoreApplication.translate("MainWindow", u"Export setting file", None))
         self.actionImport_setting_file.setText(QCoreApplication.translate("MainWindow", u"Import setting file", None))
+        self.auto_pair_action.setText(QCoreApplication.translate("MainWindow", u"Auto Pair from Selection...", None))
+#if QT_CONFIG(tooltip)
+        self.auto_pair_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305f\u30ea\u30b0\u306e\u63a5\u7d9a\u304b\u3089\u3001FK\u30b3\u30f3\u30c8\u30ed\u30fc\u30e9\u30fc\u3068\u30b8\u30e7\u30a4\u30f3\u30c8\u306e\u7d44\u307f\u5408\u308f\u305b\u3092\u63d0\u6848\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.auto_detect_rotate_type_action.setText(QCoreApplication.translate("MainWindow", u"Auto Detect Rotate Types", None))
+#if QT_CONFIG(tooltip)
+        self.auto_detect_rotate_type_action.setToolTip(QCoreApplication.translate("MainWindow", u"FK\u72b6\u614b\u306e\u30dd\u30fc\u30ba\u304b\u3089\u3001\u767b\u9332\u3055\u308c\u3066\u3044\u308b\u3059\u3079\u3066\u306e\u884c\u306eRotate Type\u3092\u81ea\u52d5\u3067\u8a2d\u5b9a\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.mirror_action.setText(QCoreApplication.translate("MainWindow", u"Mirror Selected Rows...", None))
+#if QT_CONFIG(tooltip)
+        self.mirror_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305f\u884c\u306e\u5de6\u53f3\u3092\u5165\u308c\u66ff\u3048\u305f\u884c\u3092\u3001\u53cd\u5bfe\u5074\u306eRotate Type\u3092\u6c42\u3081\u3066\u8ffd\u52a0\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.capture_offsets_action.setText(QCoreApplication.translate("MainWindow", u"Capture Offsets for Selected Rows", None))
+#if QT_CONFIG(tooltip)
+        self.capture_offsets_action.setToolTip(QCoreApplication.translate("MainWindow", u"FK\u72b6\u614b\u306e\u30dd\u30fc\u30ba (\u30d0\u30a4\u30f3\u30c9\u30dd\u30fc\u30ba\u306a\u3069) \u304b\u3089\u3001\u9078\u629e\u3057\u305f\u884c\u306eFK\u30b3\u30f3\u30c8\u30ed\u30fc\u30e9\u30fc\u3068\u30b8\u30e7\u30a4\u30f3\u30c8\u306e\u305a\u308c\u3092\u30aa\u30d5\u30bb\u30c3\u30c8\u3068\u3057\u3066\u8a18\u9332\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.clear_offsets_action.setText(QCoreApplication.translate("MainWindow", u"Clear Offsets for Selected Rows", None))
+#if QT_CONFIG(tooltip)
+        self.clear_offsets_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305f\u884c\u306e\u30aa\u30d5\u30bb\u30c3\u30c8\u3092\u89e3\u9664\u3057\u3001Rotate Type\u3067\u30de\u30c3\u30c1\u3059\u308b\u3088\u3046\u306b\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.match_all_namespaces_action.setText(QCoreApplication.translate("MainWindow", u"Match Selected Rows in All Namespaces", None))
+#if QT_CONFIG(tooltip)
+        self.match_all_namespaces_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305f\u884c\u3092\u30c6\u30f3\u30d7\u30ec\u30fc\u30c8\u3068\u3057\u3066\u3001\u540c\u3058\u30ea\u30b0\u3092\u8aad\u307f\u8fbc\u3093\u3067\u3044\u308b\u3059\u3079\u3066\u306e\u30cd\u30fc\u30e0\u30b9\u30da\u30fc\u30b9\u3067\u30de\u30c3\u30c1\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.bake_all_namespaces_action.setText(QCoreApplication.translate("MainWindow", u"Bake Selected Rows in All Namespaces", None))
+#if QT_CONFIG(tooltip)
+        self.bake_all_namespaces_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305f\u884c\u3092\u30c6\u30f3\u30d7\u30ec\u30fc\u30c8\u3068\u3057\u3066\u3001\u540c\u3058\u30ea\u30b0\u3092\u8aad\u307f\u8fbc\u3093\u3067\u3044\u308b\u3059\u3079\u3066\u306e\u30cd\u30fc\u30e0\u30b9\u30da\u30fc\u30b9\u3067\u30bf\u30a4\u30e0\u30b9\u30e9\u30a4\u30c0\u30fc\u306e\u7bc4\u56f2\u3092\u30d9\u30a4\u30af\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.use_bake_cache_action.setText(QCoreApplication.translate("MainWindow", u"Use Bake Cache", None))
+#if QT_CONFIG(tooltip)
+        self.use_bake_cache_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u524d\u56de\u306e\u30d9\u30a4\u30af\u7d50\u679c\u3092\u30ad\u30e3\u30c3\u30b7\u30e5\u3057\u3001\u30a2\u30cb\u30e1\u30fc\u30b7\u30e7\u30f3\u304c\u5909\u66f4\u3055\u308c\u305f\u7bc4\u56f2\u3060\u3051\u3092\u8a08\u7b97\u3057\u76f4\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.clear_bake_cache_action.setText(QCoreApplication.translate("MainWindow", u"Clear Bake Cache", None))
+#if QT_CONFIG(tooltip)
+        self.clear_bake_cache_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u4fdd\u5b58\u3055\u308c\u3066\u3044\u308b\u30d9\u30a4\u30af\u7d50\u679c\u306e\u30ad\u30e3\u30c3\u30b7\u30e5\u3092\u3059\u3079\u3066\u524a\u9664\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.compact_undo_action.setText(QCoreApplication.translate("MainWindow", u"Compact Undo for Bake", None))
+#if QT_CONFIG(tooltip)
+        self.compact_undo_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u30d9\u30a4\u30af\u3067\u30ad\u30fc\u306e\u66f8\u304d\u8fbc\u307f\u3092Undo\u306b\u8a18\u9332\u305b\u305a\u3001\u66f8\u304d\u8fbc\u3080\u524d\u306e\u30ab\u30fc\u30d6\u30921\u3064\u306eUndo\u3068\u3057\u3066\u4fdd\u5b58\u3057\u307e\u3059 (\u9577\u3044\u30d9\u30a4\u30af\u306eUndo\u306e\u30e1\u30e2\u30ea\u3068\u6642\u9593\u3092\u6e1b\u3089\u3057\u307e\u3059)", None))
+#endif // QT_CONFIG(tooltip)
+        self.curve_filter_action.setText(QCoreApplication.translate("MainWindow", u"Bake Curve Filter...", None))
+#if QT_CONFIG(tooltip)
+        self.curve_filter_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u30d9\u30a4\u30af\u3057\u305f\u30ab\u30fc\u30d6\u3092\u66f8\u304d\u8fbc\u3080\u524d\u306b\u3001\u56de\u8ee2\u306e\u4e0d\u9023\u7d9a\u3092\u53d6\u308a\u9664\u304d\u3001\u8a31\u5bb9\u8aa4\u5dee\u306e\u7bc4\u56f2\u3067\u30ad\u30fc\u3092\u524a\u6e1b\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.verify_action.setText(QCoreApplication.translate("MainWindow", u"Verify Selected Rows", None))
+#if QT_CONFIG(tooltip)
+        self.verify_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u30bf\u30a4\u30e0\u30b9\u30e9\u30a4\u30c0\u30fc\u306e\u7bc4\u56f2\u306e\u5168\u30d5\u30ec\u30fc\u30e0\u3067\u3001\u9078\u629e\u3057\u305f\u884c\u306eFK\u30b3\u30f3\u30c8\u30ed\u30fc\u30e9\u30fc\u304c\u30b8\u30e7\u30a4\u30f3\u30c8\u306b\u5408\u3063\u3066\u3044\u308b\u304b\u3092\u691c\u8a3c\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.set_switch_action.setText(QCoreApplication.translate("MainWindow", u"Set IK/FK Switch from Selection...", None))
+#if QT_CONFIG(tooltip)
+        self.set_switch_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305f\u30ce\u30fc\u30c9\u306e\u30a2\u30c8\u30ea\u30d3\u30e5\u30fc\u30c8\u3092\u3001\u305d\u306e\u30ea\u30b0\u306eIK/FK\u30b9\u30a4\u30c3\u30c1\u3068\u3057\u3066\u30d7\u30ed\u30d5\u30a1\u30a4\u30eb\u306b\u4fdd\u5b58\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.live_match_action.setText(QCoreApplication.translate("MainWindow", u"Live Match on IK/FK Switch", None))
+#if QT_CONFIG(tooltip)
+        self.live_match_action.setToolTip(QCoreApplication.translate("MainWindow", u"IK/FK\u30b9\u30a4\u30c3\u30c1\u304cIK\u304b\u3089\u5207\u308a\u66ff\u3048\u3089\u308c\u305f\u3068\u304d\u306b\u3001\u305d\u306e\u30ea\u30b0\u306e\u884c\u3092\u81ea\u52d5\u3067\u30de\u30c3\u30c1\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.record_timings_action.setText(QCoreApplication.translate("MainWindow", u"Record Timings", None))
+#if QT_CONFIG(tooltip)
+        self.record_timings_action.setToolTip(QCoreApplication.translate("MainWindow", u"\u30de\u30c3\u30c1\u30fb\u30d9\u30a4\u30af\u306e\u5404\u51e6\u7406\u306e\u56de\u6570\u3068\u6642\u9593\u3092\u8a18\u9332\u3057\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.timing_report_action.setText(QCoreApplication.translate("MainWindow", u"Timing Report...", None))
         self.manual_action.setText(QCoreApplication.translate("MainWindow", u"Manual", None))
 #if QT_CONFIG(tooltip)
         self.match_button.setToolTip(QCoreApplication.translate("MainWindow", u"Joint\u306e\u4f4d\u7f6e\u306b\u30de\u30c3\u30c1\u3059\u308b\u3088\u3046\u306bFK ctrl\u306e\u4f4d\u7f6e\u3092\u79fb\u52d5\u3057\u307e\u3059\uff08\u8868\u3067\u9078\u629e\u3057\u305f\u884c\u306e\u5185\u5bb9\u3092\u4f7f\u3044\u307e\u3059\uff09", None))
 #endif // QT_CONFIG(tooltip)
         self.match_button.setText(QCoreApplication.translate("MainWindow", u"Match", None))
+#if QT_CONFIG(tooltip)
+        self.bake_button.setToolTip(QCoreApplication.translate("MainWindow", u"\u30bf\u30a4\u30e0\u30b9\u30e9\u30a4\u30c0\u30fc\u306e\u7bc4\u56f2\u306e\u5168\u30d5\u30ec\u30fc\u30e0\u3067\u3001\u8868\u3067\u9078\u629e\u3057\u305f\u884c\u306eFK ctrl\u3092Joint\u306b\u30de\u30c3\u30c1\u3055\u305b\u3066\u30ad\u30fc\u3092\u6253\u3061\u307e\u3059", None))
+#endif // QT_CONFIG(tooltip)
+        self.bake_button.setText(QCoreApplication.translate("MainWindow", u"Bake (Time Slider Range)", None))
 #if QT_CONFIG(tooltip)
         self.add_button.setToolTip(QCoreApplication.translate("MainWindow", u"\u9078\u629e\u3057\u305fFK\u30b3\u30f3\u30c8\u30ed\u30fc\u30e9\u30fc\u3068\u30b8\u30e7\u30a4\u30f3\u30c8\u3092\u8ffd\u52a0\u3057\u307e\u3059\uff081\u9078\u629e\u76ee\u304cFK\u30b3\u30f3\u30c8\u30ed\u30fc\u30e9\u30fc / 2\u9078\u629e\u76ee\u304c\u30b8\u30e7\u30a4\u30f3\u30c8\uff09", None))
 #endif // QT_CONFIG(tooltip)
         self.add_button.setText(QCoreApplication.translate("MainWindow", u"Add FK ctrl and Joint", None))
+        self.menuEdit.setTitle(QCoreApplication.translate("MainWindow", u"Edit", None))
         self.menuHelp.setTitle(QCoreApplication.translate("MainWindow", u"Help", None))
     # retranslateUi
 
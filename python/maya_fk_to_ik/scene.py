@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+import numpy as np
+
+from .backend import get_backend
+from .core.connection_index import ConnectionIndex
+from .core.const import AUTO_PAIR_MAX_DEPTH
+from .core.hierarchy import get_namespace
+from .core.match_info import expand_template
+from .core.matrix import to_matrices
+from .utils.instrumentation import STAGE_QUERY, STAGE_RESOLVE, instrumentation
+from .utils.job import run_to_completion
+
+if TYPE_CHECKING:
+    from .core.connection_index import PairProposal
+    from .core.match_info import MatchInfo
+    from .utils.job import Steps
+
+
+def resolve_match_infos(infos: Iterable[MatchInfo]) -> dict[str, MatchInfo]:
+    """マッチ情報のFKコントローラーをロング名に解決する
+
+    存在しないノードを含むマッチ情報は警告を出して除外する
+
+    Args:
+        infos (Iterable[MatchInfo]): マッチ情報
+
+    Returns:
+        dict[str, MatchInfo]: FKコントローラーのロング名をキーとしたマッチ情報
+    """
+    backend = get_backend()
+    infos = list(infos)
+    with instrumentation.stage(STAGE_RESOLVE):
+        paths = backend.resolve_long_names([info.fk_ctrl for info in infos] + [info.joint for info in infos])
+    fk_ctrls, joints = paths[:len(infos)], paths[len(infos):]
+
+    infos_by_path: dict[str, MatchInfo] = {}
+    for info, fk_ctrl, joint in zip(infos, fk_ctrls, joints):
+        if not fk_ctrl or not joint:
+            backend.warning(f"Node not found for match info: {info.fk_ctrl} / {info.joint}")
+            continue
+        infos_by_path[fk_ctrl] = info
+    return infos_by_path
+
+
+def query_current_world_matrices(nodes: Sequence[str]) -> np.ndarray:
+    """現在のフレームでの各ノードのワールド行列を取得する
+
+    Args:
+        nodes (Sequence[str]): ノード名のリスト
+
+    Returns:
+        np.ndarray: (ノード数, 4, 4) の行列配列
+    """
+    backend = get_backend()
+    with instrumentation.stage(STAGE_QUERY):
+        return to_matrices([backend.get_world_matrix(node) for node in nodes]).reshape(-1, 4, 4)
+
+
+def query_world_matrices(node: str, attribute: str, frames: Sequence[int]) -> np.ndarray:
+    """currentTimeを変更せずに、各フレームでのワールド行列を取得する
+
+    Args:
+        node (str): ノード名
+        attribute (str): 行列のアトリビュート名 (worldMatrix, parentMatrixなど)
+        frames (Sequence[int]): フレームのリスト
+
+    Returns:
+        np.ndarray: (フレーム数, 4, 4) の行列配列
+    """
+    backend = get_backend()
+    with instrumentation.stage(STAGE_QUERY):
+        return to_matrices(backend.get_matrices_at(node, attribute, frames)).reshape(-1, 4, 4)
+
+
+def find_template_namespaces(template: Iterable[MatchInfo]) -> list[str]:
+    """テンプレートのFKコントローラーが存在するネームスペースを探す
+
+    Args:
+        template (Iterable[MatchInfo]): ネームスペースのないマッチ情報
+
+    Returns:
+        list[str]: テンプレートのFKコントローラーが1つ以上存在するネームスペース
+    """
+    backend = get_backend()
+    template = list(template)
+    namespaces = backend.get_namespaces()
+    candidates = expand_template(template, namespaces)
+    with instrumentation.stage(STAGE_RESOLVE):
+        paths = backend.resolve_long_names([info.fk_ctrl for info in candidates])
+    found = {get_namespace(info.fk_ctrl) for info, path in zip(candidates, paths) if path}
+    return [namespace for namespace in namespaces if namespace in found]
+
+
+def iter_scan_connections(fk_ctrls: Sequence[str], max_depth: int = AUTO_PAIR_MAX_DEPTH) -> Steps[ConnectionIndex]:
+    """FKコントローラーから出ている接続をたどり、索引化する
+
+    ノードごとに問い合わせるのではなく、たどる深さごとにまとめて接続とノードタイプを取得する。
+    ジョイントに到達した接続はそれ以上たどらない。1つの深さを1単位として進捗を返す
+
+    Args:
+        fk_ctrls (Sequence[str]): FKコントローラーの候補のロング名
+        max_depth (int): 経由するノードの最大数
+
+    Yields:
+        tuple[int, int]: たどり終えた深さと最大の深さ
+
+    Returns:
+        ConnectionIndex: 接続の索引
+    """
+    backend = get_backend()
+    index = ConnectionIndex()
+    with instrumentation.stage(STAGE_QUERY):
+        index.set_node_types({node: node_type or "" for node, node_type in zip(fk_ctrls, backend.node_types(fk_ctrls))})
+    frontier = list(fk_ctrls)
+    for depth in range(max_depth + 1):
+        if not frontier:
+            break
+        with instrumentation.stage(STAGE_QUERY):
+            new_nodes = index.add_connections(backend.get_output_connections(frontier))
+            node_types = backend.node_types(new_nodes)
+        index.set_node_types({node: node_type or "" for node, node_type in zip(new_nodes, node_types)})
+        frontier = [node for node, node_type in zip(new_nodes, node_types) if node_type != "joint"]
+        yield depth + 1, max_depth + 1
+    return index
+
+
+def scan_connections(fk_ctrls: Sequence[str], max_depth: int = AUTO_PAIR_MAX_DEPTH) -> ConnectionIndex:
+    """FKコントローラーから出ている接続をたどり、索引化する
+
+    処理の内容は iter_scan_connections() を参照
+
+    Args:
+        fk_ctrls (Sequence[str]): FKコントローラーの候補のロング名
+        max_depth (int): 経由するノードの最大数
+
+    Returns:
+        ConnectionIndex: 接続の索引
+    """
+    return run_to_completion(iter_scan_connections(fk_ctrls, max_depth))
+
+
+def iter_find_pair_proposals(roots: Sequence[str], max_depth: int = AUTO_PAIR_MAX_DEPTH) -> Steps[list[PairProposal]]:
+    """ルートノード以下のトランスフォームをFKコントローラーの候補とし、動かしているジョイントとの組み合わせを提案する
+
+    Args:
+        roots (Sequence[str]): リグのルートノード (選択ノードなど)
+        max_depth (int): 経由するノードの最大数
+
+    Yields:
+        tuple[int, int]: たどり終えた深さと最大の深さ
+
+    Returns:
+        list[PairProposal]: 信頼度の高い順の候補
+    """
+    backend = get_backend()
+    with instrumentation.stage(STAGE_RESOLVE):
+        transforms = backend.list_transforms(roots)
+        node_types = backend.node_types(transforms)
+    fk_ctrls = [node for node, node_type in zip(transforms, node_types) if node_type != "joint"]
+    index = yield from iter_scan_connections(fk_ctrls, max_depth)
+    return index.propose_pairs(fk_ctrls, max_depth)
+
+
+def find_pair_proposals(roots: Sequence[str], max_depth: int = AUTO_PAIR_MAX_DEPTH) -> list[PairProposal]:
+    """ルートノード以下のトランスフォームをFKコントローラーの候補とし、動かしているジョイントとの組み合わせを提案する
+
+    処理の内容は iter_find_pair_proposals() を参照
+
+    Args:
+        roots (Sequence[str]): リグのルートノード (選択ノードなど)
+        max_depth (int): 経由するノードの最大数
+
+    Returns:
+        list[PairProposal]: 信頼度の高い順の候補
+    """
+    return run_to_completion(iter_find_pair_proposals(roots, max_depth))
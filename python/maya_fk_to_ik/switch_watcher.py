@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
+from .app import match_many_fk_to_ik
+from .backend import get_backend
+from .core.profile_store import get_rig_name
+from .utils.decorator import undo_disabled
+from .utils.instrumentation import STAGE_QUERY, STAGE_RESOLVE, instrumentation
+
+if TYPE_CHECKING:
+    from .core.match_info import MatchInfo, MatchInfos
+    from .core.profile_store import RigSwitch
+
+
+class SwitchWatcher:
+    """リグのIK/FKスイッチを監視し、IKから切り替えられたリグの行を自動でマッチするクラス
+
+    コールバックはスイッチのノードにだけ登録し、コールバックの中では変化したスイッチを記録するだけにする。
+    記録したスイッチはアイドル状態になってから1回でまとめて処理するため、スライダーのドラッグなどで
+    値が何度も設定されても、マッチは1回にまとめられる。
+    アニメーションの評価による変化ではコールバックが呼ばれないため、再生速度には影響しない。
+
+    IKから切り替えられたときは、ジョイントがFKコントローラーに追従しているため、
+    スイッチを一時的に (Undoに記録せずに) IKの値に戻してジョイントのIKの姿勢を取得し、FKコントローラーを合わせる。
+    Undo・Redoによる変化ではマッチしない (マッチをUndoに記録するとRedoのキューが破棄されるため)。
+    前回の値だけを更新し、その後のユーザーの操作による切り替えを正しく判定できるようにする。
+    """
+
+    def __init__(self, match_infos: MatchInfos, switches: Sequence[RigSwitch]) -> None:
+        """
+        Args:
+            match_infos (MatchInfos): マッチ情報 (マッチする時点の内容を使う)
+            switches (Sequence[RigSwitch]): 監視するスイッチ
+        """
+        self.match_infos = match_infos
+        self.switches = list(switches)
+        self.match_count = 0  # 自動でマッチした回数
+        self._values: dict[tuple[str, str], float] = {}  # (ノード, アトリビュート) -> 前回の値
+        self._switches_by_plug: dict[tuple[str, str], RigSwitch] = {}
+        self._changed: set[tuple[str, str]] = set()
+        self._scheduled = False
+        self._suspended = False
+        self._handle = None
+
+    @property
+    def is_running(self) -> bool:
+        """監視しているかどうか"""
+        return self._handle is not None
+
+    def start(self) -> list[RigSwitch]:
+        """監視を開始する (存在しないノードのスイッチは除く)
+
+        Returns:
+            list[RigSwitch]: 監視しているスイッチ
+        """
+        self.stop()
+        backend = get_backend()
+        with instrumentation.stage(STAGE_RESOLVE):
+            nodes = backend.resolve_long_names([switch.node for switch in self.switches])
+        self._switches_by_plug = {}
+        for switch, node in zip(self.switches, nodes):
+            if node is None:
+                backend.warning(f"Switch node not found: {switch.node}")
+                continue
+            self._switches_by_plug[(node, switch.attribute)] = switch
+        with instrumentation.stage(STAGE_QUERY):
+            self._values = {plug: float(backend.get_attr(*plug)) for plug in self._switches_by_plug}
+        self._handle = backend.add_attribute_callbacks(list(self._switches_by_plug), self._on_changed)
+        return list(self._switches_by_plug.values())
+
+    def stop(self) -> None:
+        """監視をやめる"""
+        if self._handle is not None:
+            get_backend().remove_attribute_callbacks(self._handle)
+            self._handle = None
+        self._changed.clear()
+
+    def _on_changed(self, node: str, attribute: str) -> None:
+        """スイッチの値が設定されたときのコールバック (変化を記録し、アイドル時の処理を1回だけ予約する)"""
+        if self._suspended:
+            return
+        backend = get_backend()
+        if backend.is_undoing():
+            self._changed.discard((node, attribute))
+            self._values[(node, attribute)] = float(backend.get_attr(node, attribute))
+            return
+        self._changed.add((node, attribute))
+        if not self._scheduled:
+            self._scheduled = True
+            backend.defer(self.flush)
+
+    def flush(self) -> list[RigSwitch]:
+        """記録したスイッチの変化をまとめて処理し、IKから切り替えられたリグの行をマッチする
+
+        Returns:
+            list[RigSwitch]: マッチしたリグのスイッチ
+        """
+        self._scheduled = False
+        changed, self._changed = self._changed, set()
+        if not self.is_running or not changed:
+            return []
+
+        backend = get_backend()
+        switched = []
+        with instrumentation.stage(STAGE_QUERY):
+            for plug in changed:
+                value = float(backend.get_attr(*plug))
+                previous = self._values.get(plug, value)
+                self._values[plug] = value
+                switch = self._switches_by_plug[plug]
+                if self._is_ik(switch, previous) and not self._is_ik(switch, value):
+                    switched.append((plug, switch, value))
+        if not switched:
+            return []
+
+        rigs = {switch.rig for _, switch, _ in switched}
+        infos = [info for info in self.match_infos if get_rig_name(info) in rigs]
+        if infos:
+            self._match_in_ik_pose(infos, switched)
+            self.match_count += 1
+        return [switch for _, switch, _ in switched]
+
+    def _match_in_ik_pose(self, infos: list[MatchInfo], switched: list[tuple[tuple[str, str], RigSwitch, float]]) -> None:
+        """スイッチを一時的にIKの値に戻してマッチする (スイッチの変更はUndoに記録しない)"""
+        backend = get_backend()
+        self._suspended = True
+        try:
+            with undo_disabled():
+                for (node, attribute), switch, _ in switched:
+                    backend.set_attr(node, attribute, switch.ik_value)
+            try:
+                match_many_fk_to_ik(infos)
+            finally:
+                with undo_disabled():
+                    for (node, attribute), _, value in switched:
+                        backend.set_attr(node, attribute, value)
+        finally:
+            self._suspended = False
+
+    @staticmethod
+    def _is_ik(switch: RigSwitch, value: float) -> bool:
+        """スイッチの値がIK状態かどうか"""
+        return switch.is_ik(value)
@@ -1,18 +1,121 @@
-import maya.cmds as cmds  # noqa: INP001 # type: ignore
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
+
+from ..backend import get_backend
+from .instrumentation import STAGE_UNDO_CLOSE, STAGE_UNDO_OPEN, instrumentation
+
+if TYPE_CHECKING:
+    from ..backend import SceneBackend
 
 
 def undo_decorator(chunk_name) -> callable:  # type: ignore
     """Undoデコレーター
 
+    計測が有効な場合は、関数の呼び出し全体を chunk_name の操作として記録する
+
     Args:
         chunk_name (str): Undoのチャンク名
     """
     def _undo_decorator(func) -> callable:  # type: ignore
         def wrapper(*args, **kwargs) -> None:  # noqa: ANN002, ANN003
-            cmds.undoInfo(chunkName=chunk_name, openChunk=True)  # type: ignore
-            try:
-                return func(*args, **kwargs)
-            finally:
-                cmds.undoInfo(closeChunk=True)  # type: ignore
+            backend = get_backend()
+            with instrumentation.operation(chunk_name):
+                with instrumentation.stage(STAGE_UNDO_OPEN):
+                    backend.open_undo_chunk(chunk_name)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with instrumentation.stage(STAGE_UNDO_CLOSE):
+                        backend.close_undo_chunk()
         return wrapper
     return _undo_decorator
+
+
+@contextmanager
+def undo_disabled(backend: SceneBackend | None = None) -> Iterator[None]:
+    """囲んだ範囲の操作をUndoに記録しない (Undoのキューは破棄しない)
+
+    Args:
+        backend (SceneBackend, optional): 使用するバックエンド。省略時は現在のバックエンドを使う
+    """
+    backend = backend if backend is not None else get_backend()
+    enabled = backend.is_undo_enabled()
+    if enabled:
+        backend.set_undo_enabled(False)
+    try:
+        yield
+    finally:
+        if enabled:
+            backend.set_undo_enabled(True)
+
+
+class CurveSnapshotUndo:
+    """アニメーションカーブのスナップショットを1つだけ持ち、Undo・Redoのたびに現在のカーブと入れ替える操作
+
+    Undoでは登録時のカーブに戻し、そのときのカーブを新しいスナップショットとして持つ (Redoはその逆)。
+    Undoのキューに残るのは、Undo・Redoの方向に関わらずカーブ1組分のスナップショットだけになる。
+    カーブのないアトリビュートは値を保持し、カーブを削除して戻すときに値も戻す
+    """
+
+    def __init__(self, plugs: Sequence[tuple[str, str]] = (), backend: SceneBackend | None = None) -> None:
+        """
+        Args:
+            plugs (Sequence[tuple[str, str]]): 変更する (ノード, アトリビュート)
+            backend (SceneBackend, optional): 使用するバックエンド。省略時は現在のバックエンドを使う
+        """
+        self.backend = backend if backend is not None else get_backend()
+        self.plugs: list[tuple[str, str]] = []
+        self.states: list[Any] = []
+        self.values: list[Any] = []  # カーブのないアトリビュートの値 (カーブがある場合はNone)
+        self.add(plugs)
+
+    def add(self, plugs: Sequence[tuple[str, str]]) -> None:
+        """スナップショットにまだ含まれていないアトリビュートの、現在の状態を追加する
+
+        Args:
+            plugs (Sequence[tuple[str, str]]): この後で変更する (ノード, アトリビュート)
+        """
+        recorded = set(self.plugs)
+        plugs = [plug for plug in dict.fromkeys(plugs) if plug not in recorded]
+        if not plugs:
+            return
+        states = self.backend.capture_curves(plugs)
+        self.plugs += plugs
+        self.states += states
+        self.values += self._capture_values(plugs, states)
+
+    def _capture_values(self, plugs: Sequence[tuple[str, str]], states: Sequence[Any]) -> list[Any]:
+        return [self.backend.get_attr(*plug) if state is None else None for plug, state in zip(plugs, states)]
+
+    def restore(self) -> None:
+        """スナップショットの状態に戻す (Undoには記録しない)"""
+        with undo_disabled(self.backend):
+            self.backend.restore_curves(self.plugs, self.states)
+            for plug, state, value in zip(self.plugs, self.states, self.values):
+                if state is None:
+                    self.backend.set_attr(*plug, value)
+
+    def swap(self) -> None:
+        """現在のカーブとスナップショットを入れ替える"""
+        states = self.backend.capture_curves(self.plugs)
+        values = self._capture_values(self.plugs, states)
+        self.restore()
+        self.states, self.values = states, values
+
+
+def register_curve_undo(plugs: Sequence[tuple[str, str]]) -> None:
+    """アトリビュートのアニメーションカーブの現在の状態に戻す操作を、Undoのキューに1つ登録する
+
+    この後のカーブの変更を undo_disabled() の中で行うと、変更を1つずつUndoに記録する代わりに、
+    変更の量に関わらずカーブの数に比例するスナップショット1つでUndo・Redoできる。
+
+    Args:
+        plugs (Sequence[tuple[str, str]]): この後で変更する (ノード, アトリビュート)
+    """
+    backend = get_backend()
+    if not backend.is_undo_enabled():
+        return
+    snapshot = CurveSnapshotUndo(plugs, backend)
+    backend.register_undo(snapshot.swap, snapshot.swap)
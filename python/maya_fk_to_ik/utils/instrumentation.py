@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# 計測するステージ名
+STAGE_RESOLVE = "resolve"  # ノード名の解決
+STAGE_QUERY = "query"  # 行列の取得
+STAGE_COMPUTE = "compute"  # 行列演算
+STAGE_SET = "set"  # 行列・キーの書き込み
+STAGE_UNDO_OPEN = "undo_open"  # Undoチャンクを開く
+STAGE_UNDO_CLOSE = "undo_close"  # Undoチャンクを閉じる
+STAGE_UNDO_SNAPSHOT = "undo_snapshot"  # Undoで戻すカーブのスナップショットの取得
+STAGE_REFRESH = "refresh"  # テーブルモデルの更新通知
+
+MAX_OPERATIONS = 1000  # 保持する操作の記録の最大数
+
+
+@dataclass
+class StageStats:
+    """ステージごとの呼び出し回数と合計時間"""
+    count: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "mean_ms": self.seconds / self.count * 1000.0 if self.count else 0.0,
+        }
+
+
+@dataclass
+class OperationRecord:
+    """1回の操作 (マッチ・一括マッチ・ベイクなど) の計測結果"""
+    name: str
+    seconds: float = 0.0
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class Instrumentation:
+    """処理のステージごとの回数と時間を計測するクラス
+
+    既定では無効で、enable() を呼んだときだけ計測する。
+    operation() で囲んだ範囲を1回の操作として記録し、その中の stage() の時間を操作ごとと全体の両方に集計する。
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.reset()
+
+    def enable(self, enabled: bool = True) -> None:
+        """計測を有効 (または無効) にする"""
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        """計測結果を破棄する"""
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        self.operations: deque[OperationRecord] = deque(maxlen=MAX_OPERATIONS)
+        self._stack: list[OperationRecord] = []
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """囲んだ範囲を1回の操作として計測する (入れ子の場合は外側の操作にまとめる)
+
+        Args:
+            name (str): 操作名
+        """
+        if not self.enabled or self._stack:
+            yield
+            return
+
+        record = OperationRecord(name)
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record.seconds = time.perf_counter() - start
+            self._stack.pop()
+            self.operations.append(record)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """囲んだ範囲をステージとして計測する
+
+        Args:
+            name (str): ステージ名
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            targets = [self.stages] + [record.stages for record in self._stack]
+            for stages in targets:
+                stats = stages.setdefault(name, StageStats())
+                stats.count += 1
+                stats.seconds += seconds
+
+    def add_count(self, name: str, value: int = 1) -> None:
+        """カウンター (行数・フレーム数など) を加算する
+
+        Args:
+            name (str): カウンター名
+            value (int): 加算する値
+        """
+        if not self.enabled:
+            return
+        for counters in [self.counters] + [record.counters for record in self._stack]:
+            counters[name] = counters.get(name, 0) + value
+
+    def report(self) -> dict[str, Any]:
+        """計測結果を辞書で取得する
+
+        Returns:
+            dict[str, Any]: ステージごとの集計・カウンター・操作ごとの記録
+        """
+        return {
+            "enabled": self.enabled,
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "counters": dict(self.counters),
+            "operations": [record.to_dict() for record in self.operations],
+        }
+
+    def export_json(self, file_path: Path) -> None:
+        """計測結果をJSONファイルに書き出す
+
+        Args:
+            file_path (Path): 書き出すファイルパス
+        """
+        with file_path.open("w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4)
+
+    def summary(self) -> str:
+        """計測結果を表示用のテキストで取得する
+
+        Returns:
+            str: ステージごとの集計と直近の操作の一覧
+        """
+        lines = [f"{'stage':<12}{'count':>8}{'total ms':>12}{'mean ms':>10}"]
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            values = stats.to_dict()
+            lines.append(f"{name:<12}{stats.count:>8}{stats.seconds * 1000.0:>12.2f}{values['mean_ms']:>10.3f}")
+        if self.counters:
+            lines.append("")
+            lines.extend(f"{name}: {value}" for name, value in self.counters.items())
+        if self.operations:
+            lines.append("")
+            lines.append("recent operations:")
+            for record in list(self.operations)[-10:]:
+                stages = ", ".join(f"{name} {stats.seconds * 1000.0:.1f}ms" for name, stats in record.stages.items())
+                counters = "".join(f" {name}={value}" for name, value in record.counters.items())
+                lines.append(f"  {record.name}{counters}: {record.seconds * 1000.0:.1f}ms ({stages})")
+        return "\n".join(lines)
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Generator, Sequence, TypeVar
+
+from ..backend import get_backend
+from .decorator import CurveSnapshotUndo
+from .instrumentation import STAGE_UNDO_CLOSE, STAGE_UNDO_OPEN, STAGE_UNDO_SNAPSHOT, instrumentation
+
+_T = TypeVar("_T")
+
+# 少しずつ実行する処理。1単位の処理ごとに (完了した単位数, 全体の単位数) をyieldし、結果をreturnする
+Steps = Generator[tuple[int, int], None, _T]
+
+# ジョブの状態
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+
+_recording_jobs: list[Job] = []  # step() で処理を実行中の、変更を記録するジョブ
+
+
+def record_job_changes(plugs: Sequence[tuple[str, str]]) -> None:
+    """実行中のジョブが、この後で変更するアトリビュートを記録する
+
+    Undoできるジョブの処理は、シーンを変更する前にこの関数で変更するアトリビュートを知らせる。
+    ジョブの外 (run_to_completion() など) で呼んだ場合は何もしない (変更は通常どおりUndoに記録される)
+
+    Args:
+        plugs (Sequence[tuple[str, str]]): この後で変更する (ノード, アトリビュート)
+    """
+    if _recording_jobs:
+        _recording_jobs[-1].record_changes(plugs)
+
+
+def run_to_completion(steps: Steps[_T]) -> _T:
+    """少しずつ実行する処理を最後まで実行する
+
+    Args:
+        steps (Steps): 処理のジェネレーター
+
+    Returns:
+        処理の結果
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+
+
+class Job:
+    """時間を分割して少しずつ実行する処理
+
+    シーンへのアクセスはメインスレッドで行う必要があるため、スレッドは使わずに step() を少しずつ呼び出して実行する。
+
+    undoable の場合は、Undoのチャンクを開いたままにせず、処理が record_job_changes() で知らせたアトリビュートの
+    変更前の状態を記録し、処理自体はUndoに記録せずに実行する。完了したら記録した状態に戻す操作を1つだけUndoに登録し、
+    キャンセル・エラーの場合は記録した状態に直接戻す。ジョブの合間に行われたほかの操作はUndoされない。
+    """
+
+    def __init__(self, name: str, steps: Steps[Any], undoable: bool = True) -> None:
+        """
+        Args:
+            name (str): ジョブ名 (Undoのチャンク名)
+            steps (Steps): 処理のジェネレーター
+            undoable (bool): シーンを変更する処理かどうか
+        """
+        self.name = name
+        self.undoable = undoable
+        self.state = JOB_PENDING
+        self.done = 0
+        self.total = 0
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.start_time = 0.0
+        self._steps = steps
+        self._snapshot: CurveSnapshotUndo | None = None
+        self._backend = get_backend()  # 作成時のバックエンドで変更を記録する
+
+    @property
+    def is_active(self) -> bool:
+        """実行中 (または未実行) かどうか"""
+        return self.state in (JOB_PENDING, JOB_RUNNING)
+
+    def elapsed(self) -> float:
+        """開始してからの経過時間 (秒)"""
+        return time.perf_counter() - self.start_time if self.start_time else 0.0
+
+    def eta(self) -> float | None:
+        """残り時間の見込み (秒)。まだ見込めない場合はNone"""
+        if not self.done or not self.total:
+            return None
+        return self.elapsed() / self.done * max(self.total - self.done, 0)
+
+    def run(self) -> Any:  # noqa: ANN401
+        """ジョブを最後まで続けて実行する
+
+        Returns:
+            処理の結果
+
+        Raises:
+            Exception: 処理中に発生した例外 (変更は元に戻される)
+        """
+        with instrumentation.operation(self.name):
+            self.start()
+            while self.step():
+                pass
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def start(self) -> None:
+        """ジョブを開始する"""
+        if self.state != JOB_PENDING:
+            msg = f"Job '{self.name}' has already been started."
+            raise RuntimeError(msg)
+        self.state = JOB_RUNNING
+        self.start_time = time.perf_counter()
+        if self.undoable:
+            self._snapshot = CurveSnapshotUndo(backend=self._backend)
+
+    def record_changes(self, plugs: Sequence[tuple[str, str]]) -> None:
+        """処理がこの後で変更するアトリビュートの、変更前の状態を記録する (record_job_changes() を参照)
+
+        Args:
+            plugs (Sequence[tuple[str, str]]): この後で変更する (ノード, アトリビュート)
+        """
+        if self._snapshot is not None:
+            with instrumentation.stage(STAGE_UNDO_SNAPSHOT):
+                self._snapshot.add(plugs)
+
+    def step(self) -> bool:
+        """処理を1単位だけ進める
+
+        Returns:
+            bool: まだ続きがあるかどうか
+        """
+        if self.state != JOB_RUNNING:
+            return False
+        try:
+            self.done, self.total = self._next()
+        except StopIteration as e:
+            self.result = e.value
+            self.state = JOB_FINISHED
+            self._register_undo()
+            return False
+        except Exception as e:  # noqa: BLE001
+            self.error = e
+            self.state = JOB_FAILED
+            self._rollback()
+            return False
+        return True
+
+    def cancel(self, rollback: bool = True) -> None:
+        """ジョブを中断し、ここまでの変更を元に戻す
+
+        Args:
+            rollback (bool): 変更を元に戻すかどうか (変更したシーンが閉じられた場合は戻さない)
+        """
+        if not self.is_active:
+            return
+        self._steps.close()
+        self.state = JOB_CANCELLED
+        if rollback:
+            self._rollback()
+        self._snapshot = None
+
+    def _next(self) -> tuple[int, int]:
+        """処理を1単位だけ進める (Undoできるジョブでは、変更を記録しながらUndoへの記録を止めて実行する)"""
+        if self._snapshot is None:
+            return next(self._steps)
+        enabled = self._backend.is_undo_enabled()
+        if enabled:
+            self._backend.set_undo_enabled(False)
+        _recording_jobs.append(self)
+        try:
+            return next(self._steps)
+        finally:
+            _recording_jobs.pop()
+            if enabled:
+                self._backend.set_undo_enabled(True)
+
+    def _register_undo(self) -> None:
+        """記録した変更前の状態に戻す操作を、ジョブ名のUndoのチャンクとして1つだけ登録する"""
+        snapshot, self._snapshot = self._snapshot, None
+        if snapshot is None or not snapshot.plugs:
+            return
+        with instrumentation.stage(STAGE_UNDO_OPEN):
+            self._backend.open_undo_chunk(self.name)
+        try:
+            self._backend.register_undo(snapshot.swap, snapshot.swap)
+        finally:
+            with instrumentation.stage(STAGE_UNDO_CLOSE):
+                self._backend.close_undo_chunk()
+
+    def _rollback(self) -> None:
+        """記録した変更前の状態に戻し、ジョブの変更だけを元に戻す"""
+        snapshot, self._snapshot = self._snapshot, None
+        if snapshot is not None:
+            snapshot.restore()
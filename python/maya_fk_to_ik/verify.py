@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+
+import numpy as np
+
+from .backend import get_backend
+from .bake import BAKE_FRAME_CHUNK, get_frames
+from .core.const import LINEAR_UNIT_CENTIMETERS, VERIFY_ANGLE_TOLERANCE_DEGREES, VERIFY_POSITION_TOLERANCE
+from .core.hierarchy import sort_by_hierarchy
+from .core.matrix import compute_target_matrices, rotation_angles_between
+from .core.profile_store import get_rig_name
+from .scene import query_world_matrices, resolve_match_infos
+from .utils.decorator import undo_disabled
+from .utils.instrumentation import STAGE_COMPUTE, STAGE_QUERY, STAGE_RESOLVE, instrumentation
+from .utils.job import run_to_completion
+
+if TYPE_CHECKING:
+    from .core.match_info import MatchInfo
+    from .core.profile_store import RigSwitch
+    from .utils.job import Steps
+
+VERIFY_WORST_COUNT = 10  # 検証結果に含める、誤差の大きいフレームの数
+
+
+@dataclass
+class VerifyOffender:
+    """検証で誤差が大きかったFKコントローラーとフレームを保持するデータクラス"""
+    fk_ctrl: str
+    joint: str
+    frame: int
+    angle_error: float  # 回転の誤差 (度)
+    position_error: float  # 位置の誤差 (シーンの単位)
+    self_consistency_only: bool = False  # IKの姿勢と比べず、オフセットとの自己整合性だけを確認したかどうか
+
+
+@dataclass
+class VerifyReport:
+    """マッチ結果の検証結果を保持するデータクラス
+
+    IK/FKスイッチがあるリグの行は、FK状態のジョイントとIK状態のジョイントを比べる。
+    スイッチがないリグの行は、ジョイントにオフセットを掛けた姿勢とFKコントローラーを比べる自己整合性の確認だけになり、
+    誤差がなくても合格にはしない
+    """
+    fk_ctrls: list[str]  # FKコントローラーのロング名
+    joints: list[str]  # ジョイントのロング名
+    frames: list[int]  # 検証したフレーム
+    angle_errors: np.ndarray  # (行数, フレーム数) の回転の誤差 (度)
+    position_errors: np.ndarray  # (行数, フレーム数) の位置の誤差 (シーンの単位)
+    ik_compared: np.ndarray  # (行数,) の、IKの姿勢と比べた行のマスク
+    angle_tolerance: float = VERIFY_ANGLE_TOLERANCE_DEGREES  # 一致とみなす回転の誤差 (度)
+    position_tolerance: float = VERIFY_POSITION_TOLERANCE  # 一致とみなす位置の誤差 (シーンの単位)
+
+    @property
+    def failed_rows(self) -> np.ndarray:
+        """(行数,) の、いずれかのフレームで許容誤差を超えた行のマスク"""
+        over = (self.angle_errors > self.angle_tolerance) | (self.position_errors > self.position_tolerance)
+        return over.any(axis=1)
+
+    @property
+    def self_consistency_rows(self) -> np.ndarray:
+        """(行数,) の、IKの姿勢と比べず自己整合性だけを確認した行のマスク"""
+        return ~self.ik_compared
+
+    @property
+    def self_consistency_only(self) -> bool:
+        """自己整合性だけを確認した行があるかどうか"""
+        return bool(self.self_consistency_rows.any())
+
+    @property
+    def passed(self) -> bool:
+        """すべての行をIKの姿勢と比べ、すべての行・フレームが許容誤差に収まっているかどうか"""
+        return not self.failed_rows.any() and not self.self_consistency_only
+
+    @property
+    def max_angle_error(self) -> float:
+        """全行・全フレームで最大の回転の誤差 (度)"""
+        return float(self.angle_errors.max()) if self.angle_errors.size else 0.0
+
+    @property
+    def max_position_error(self) -> float:
+        """全行・全フレームで最大の位置の誤差"""
+        return float(self.position_errors.max()) if self.position_errors.size else 0.0
+
+    def worst(self, count: int = VERIFY_WORST_COUNT) -> list[VerifyOffender]:
+        """誤差の大きいFKコントローラーとフレームを求める
+
+        誤差は許容誤差に対する比率 (回転と位置の大きい方) で比べ、FKコントローラーごとに最も誤差の大きいフレームを1つだけ選ぶ
+
+        Args:
+            count (int): 求める数
+
+        Returns:
+            list[VerifyOffender]: 誤差の大きい順のFKコントローラーとフレーム
+        """
+        if not self.angle_errors.size:
+            return []
+        ratio = np.maximum(
+            self.angle_errors / max(self.angle_tolerance, 1.0e-12),
+            self.position_errors / max(self.position_tolerance, 1.0e-12),
+        )
+        worst_frames = ratio.argmax(axis=1)
+        rows = np.arange(len(self.fk_ctrls))
+        order = np.argsort(-ratio[rows, worst_frames], kind="stable")[:count]
+        return [
+            VerifyOffender(
+                self.fk_ctrls[row],
+                self.joints[row],
+                self.frames[worst_frames[row]],
+                float(self.angle_errors[row, worst_frames[row]]),
+                float(self.position_errors[row, worst_frames[row]]),
+                bool(self.self_consistency_rows[row]),
+            )
+            for row in order
+        ]
+
+    def summary(self, count: int = VERIFY_WORST_COUNT) -> str:
+        """検証結果の概要を文字列で取得する
+
+        Args:
+            count (int): 含める誤差の大きいFKコントローラーの数
+
+        Returns:
+            str: 検証結果の概要
+        """
+        if not self.frames:
+            return "No frames verified."
+        lines = [
+            f"{len(self.fk_ctrls)} rows x {len(self.frames)} frames ({self.frames[0]} - {self.frames[-1]}): "
+            f"{int(self.failed_rows.sum())} rows over tolerance "
+            f"(rotate {self.angle_tolerance:g} deg, translate {self.position_tolerance:g})",
+            f"max rotate error: {self.max_angle_error:.6f} deg, max translate error: {self.max_position_error:.6f}",
+        ]
+        if self.self_consistency_only:
+            lines.append(
+                f"{int(self.self_consistency_rows.sum())} rows (*) are self-consistency only: "
+                "their rigs have no IK/FK switch, so they were not compared against the IK pose",
+            )
+        offenders = self.worst(count)
+        if offenders:
+            lines += ["", f"{'frame':>8}  {'rotate':>12}  {'translate':>12}  fk_ctrl"]
+            lines += [
+                f"{offender.frame:>8}  {offender.angle_error:>12.6f}  {offender.position_error:>12.6f}  "
+                f"{offender.fk_ctrl}{' (*)' if offender.self_consistency_only else ''}"
+                for offender in offenders
+            ]
+        return "\n".join(lines)
+
+    def to_dict(self, count: int = VERIFY_WORST_COUNT) -> dict[str, Any]:
+        """JSONにできる辞書に変換する (フレームごとの誤差は含めない)
+
+        Args:
+            count (int): 含める誤差の大きいFKコントローラーの数
+
+        Returns:
+            dict[str, Any]: 検証結果の辞書
+        """
+        return {
+            "passed": self.passed,
+            "rows": len(self.fk_ctrls),
+            "frames": len(self.frames),
+            "failed_rows": int(self.failed_rows.sum()),
+            "self_consistency_only": self.self_consistency_only,
+            "self_consistency_rows": int(self.self_consistency_rows.sum()),
+            "angle_tolerance": self.angle_tolerance,
+            "position_tolerance": self.position_tolerance,
+            "max_angle_error": self.max_angle_error,
+            "max_position_error": self.max_position_error,
+            "worst": [vars(offender) for offender in self.worst(count)],
+        }
+
+
+def iter_verify_fk_to_ik(
+    infos: Sequence[MatchInfo],
+    start: int,
+    end: int,
+    angle_tolerance: float = VERIFY_ANGLE_TOLERANCE_DEGREES,
+    position_tolerance: float = VERIFY_POSITION_TOLERANCE,
+    switches: Sequence[RigSwitch] = (),
+) -> Steps[VerifyReport]:
+    """フレーム範囲の全フレームで、FKコントローラーがジョイントに合っているかを検証する
+
+    シーンの時間を変更せずに各フレームのワールド行列を評価し、回転と位置の誤差を全行・全フレームまとめて配列演算で求める。
+
+    IK/FKスイッチがあるリグの行は、スイッチを一時的に (Undoに記録せずに) IKとFKの値に切り替えてジョイントを評価し、
+    FK状態 (ベイクしたFKコントローラーに追従する) のジョイントとIK状態のジョイントを比べる。
+    スイッチは1単位の処理の中で元の値に戻すため、処理の合間やキャンセル時にスイッチが切り替わったままにはならない。
+    スイッチがない (またはスイッチにキーがある) リグの行は、ジョイントにオフセットを掛けた目標ワールド行列
+    (マッチ・ベイクで合わせる姿勢) とFKコントローラーを比べ、自己整合性だけを確認した行として記録する。
+
+    行列の取得は、ノード (スイッチがあるリグはリグ) ごとに BAKE_FRAME_CHUNK フレームずつを1単位として進捗を返す
+
+    Args:
+        infos (Sequence[MatchInfo]): 検証するマッチ情報
+        start (int): 開始フレーム
+        end (int): 終了フレーム (含む)
+        angle_tolerance (float): 一致とみなす回転の誤差 (度)
+        position_tolerance (float): 一致とみなす位置の誤差 (シーンの単位)
+        switches (Sequence[RigSwitch]): リグのIK/FKスイッチ
+
+    Yields:
+        tuple[int, int]: 完了した単位数と全体の単位数
+
+    Returns:
+        VerifyReport: 検証結果
+    """
+    frames = get_frames(start, end)
+    linear_scale = 1.0 / LINEAR_UNIT_CENTIMETERS[get_backend().linear_unit()]  # 行列の移動 (センチメートル) からシーンの単位へ
+    infos_by_path = resolve_match_infos(infos)
+    fk_ctrls = sort_by_hierarchy(infos_by_path)
+    rows = [infos_by_path[fk_ctrl] for fk_ctrl in fk_ctrls]
+    instrumentation.add_count("rows", len(rows))
+    instrumentation.add_count("frames", len(frames))
+
+    rigs = [get_rig_name(info) for info in rows]
+    switch_states = _resolve_switches(switches, set(rigs))
+    switched_rows: dict[str, list[int]] = {}  # リグ -> スイッチで比べる行
+    self_consistency_rows: list[int] = []
+    for row, rig in enumerate(rigs):
+        if rig in switch_states:
+            switched_rows.setdefault(rig, []).append(row)
+        else:
+            self_consistency_rows.append(row)
+
+    queries = [(node, "worldMatrix") for row in self_consistency_rows for node in (fk_ctrls[row], rows[row].joint)]
+    chunks = [frames[i:i + BAKE_FRAME_CHUNK] for i in range(0, len(frames), BAKE_FRAME_CHUNK)]
+    total = (len(queries) + len(switched_rows)) * len(chunks) + 1
+    done = 0
+
+    # (行数, 比べる2つの行列, フレーム数, 4, 4)。スイッチで比べる行は [FK状態のジョイント, IK状態のジョイント]、
+    # 自己整合性だけを確認する行は [FKコントローラー, ジョイント]
+    world = np.empty((len(rows), 2, len(frames), 4, 4))
+    for index, query in enumerate(queries):
+        row, column = self_consistency_rows[index // 2], index % 2
+        for i, chunk in enumerate(chunks):
+            offset = i * BAKE_FRAME_CHUNK
+            world[row, column, offset:offset + len(chunk)] = query_world_matrices(*query, chunk)
+            done += 1
+            yield done, total
+
+    for rig, rig_rows in switched_rows.items():
+        for i, chunk in enumerate(chunks):
+            offset = i * BAKE_FRAME_CHUNK
+            fk_world, ik_world = _query_switched_joints(switch_states[rig], [rows[row].joint for row in rig_rows], chunk)
+            world[rig_rows, 0, offset:offset + len(chunk)] = fk_world
+            world[rig_rows, 1, offset:offset + len(chunk)] = ik_world
+            done += 1
+            yield done, total
+
+    with instrumentation.stage(STAGE_COMPUTE):
+        compared_world = world[:, 0]
+        target_world = world[:, 1].copy()
+        if self_consistency_rows:
+            target_world[self_consistency_rows] = compute_target_matrices(
+                world[self_consistency_rows, 1], [rows[row] for row in self_consistency_rows],
+            )
+        angle_errors = np.degrees(rotation_angles_between(compared_world, target_world))
+        position_errors = np.linalg.norm(compared_world[..., 3, :3] - target_world[..., 3, :3], axis=-1) * linear_scale
+    done += 1
+    yield done, total
+
+    ik_compared = np.ones(len(rows), dtype=bool)
+    ik_compared[self_consistency_rows] = False
+    return VerifyReport(
+        fk_ctrls,
+        [info.joint for info in rows],
+        frames,
+        angle_errors,
+        position_errors,
+        ik_compared,
+        angle_tolerance,
+        position_tolerance,
+    )
+
+
+def _resolve_switches(switches: Sequence[RigSwitch], rigs: set[str]) -> dict[str, tuple[str, RigSwitch, float]]:
+    """検証するリグのスイッチを、ロング名と現在の値に解決する
+
+    ノードが存在しないスイッチと、キーがある (一時的に値を変えても評価に反映されない) スイッチは警告を出して除く
+
+    Args:
+        switches (Sequence[RigSwitch]): リグのIK/FKスイッチ
+        rigs (set[str]): 検証する行のリグの名前
+
+    Returns:
+        dict[str, tuple[str, RigSwitch, float]]: リグ -> (スイッチのノードのロング名, スイッチ, 現在の値)
+    """
+    backend = get_backend()
+    switches = [switch for switch in switches if switch.rig in rigs]
+    with instrumentation.stage(STAGE_RESOLVE):
+        nodes = backend.resolve_long_names([switch.node for switch in switches])
+    result = {}
+    with instrumentation.stage(STAGE_QUERY):
+        for switch, node in zip(switches, nodes):
+            if node is None:
+                backend.warning(f"Switch node not found: {switch.node}. Rows of {switch.rig} are checked for self-consistency only.")
+                continue
+            if backend.get_keyframes(node, switch.attribute)[0]:
+                backend.warning(f"Switch {switch.plug} is keyed. Rows of {switch.rig} are checked for self-consistency only.")
+                continue
+            result[switch.rig] = (node, switch, float(backend.get_attr(node, switch.attribute)))
+    return result
+
+
+def _query_switched_joints(
+    switch_state: tuple[str, RigSwitch, float], joints: Sequence[str], frames: Sequence[int],
+) -> tuple[np.ndarray, np.ndarray]:
+    """スイッチをFKとIKの値に切り替えてジョイントのワールド行列を取得し、スイッチを元の値に戻す (Undoに記録しない)
+
+    Args:
+        switch_state (tuple[str, RigSwitch, float]): _resolve_switches() で解決したスイッチ
+        joints (Sequence[str]): ジョイント
+        frames (Sequence[int]): フレームのリスト
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (ジョイント数, フレーム数, 4, 4) の、FK状態とIK状態のワールド行列
+    """
+    backend = get_backend()
+    node, switch, value = switch_state
+    fk_value = value if not switch.is_ik(value) else switch.fk_value
+    world = np.empty((2, len(joints), len(frames), 4, 4))
+    try:
+        for index, switch_value in enumerate((fk_value, switch.ik_value)):
+            with undo_disabled():
+                backend.set_attr(node, switch.attribute, switch_value)
+            for i, joint in enumerate(joints):
+                world[index, i] = query_world_matrices(joint, "worldMatrix", frames)
+    finally:
+        with undo_disabled():
+            backend.set_attr(node, switch.attribute, value)
+    return world[0], world[1]
+
+
+def verify_fk_to_ik(
+    infos: Sequence[MatchInfo],
+    start: int,
+    end: int,
+    angle_tolerance: float = VERIFY_ANGLE_TOLERANCE_DEGREES,
+    position_tolerance: float = VERIFY_POSITION_TOLERANCE,
+    switches: Sequence[RigSwitch] = (),
+) -> VerifyReport:
+    """フレーム範囲の全フレームで、FKコントローラーがジョイントに合っているかを検証する
+
+    処理の内容は iter_verify_fk_to_ik() を参照
+
+    Args:
+        infos (Sequence[MatchInfo]): 検証するマッチ情報
+        start (int): 開始フレーム
+        end (int): 終了フレーム (含む)
+        angle_tolerance (float): 一致とみなす回転の誤差 (度)
+        position_tolerance (float): 一致とみなす位置の誤差 (シーンの単位)
+        switches (Sequence[RigSwitch]): リグのIK/FKスイッチ
+
+    Returns:
+        VerifyReport: 検証結果
+    """
+    return run_to_completion(iter_verify_fk_to_ik(infos, start, end, angle_tolerance, position_tolerance, switches))
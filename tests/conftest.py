@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "python"))
+
+from maya_fk_to_ik.backend import set_backend  # noqa: E402
+from maya_fk_to_ik.backend.fake import FakeBackend  # noqa: E402
+
+
+@pytest.fixture
+def backend() -> FakeBackend:
+    """テストごとに空の疑似シーンをバックエンドとして設定する"""
+    fake = FakeBackend()
+    set_backend(fake)
+    yield fake
+    set_backend(None)
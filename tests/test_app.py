@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pytest
+
+from maya_fk_to_ik.app import MatchFKToIK
+from maya_fk_to_ik.backend import get_backend
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.match_info import MatchInfo, MatchInfos
+from maya_fk_to_ik.core.rotate_type import RotateType
+from maya_fk_to_ik.utils.job import run_to_completion
+
+FRAMES = [1, 2, 3]
+
+
+def build_scene(backend: FakeBackend) -> MatchInfo:
+    """アニメーションしたジョイントと、FKコントローラーを1つずつ作成する"""
+    fk_ctrl = backend.create_node("fk_ctrl")
+    joint = backend.create_node("joint", node_type="joint")
+    backend.set_keyframes(joint, "rotateX", FRAMES, [0.0, 30.0, 60.0])
+    return MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=RotateType.FFF)
+
+
+def test_instance_backend_does_not_replace_current_backend(backend: FakeBackend) -> None:
+    other = FakeBackend()
+    info = build_scene(other)
+    app = MatchFKToIK(backend=other, match_infos=MatchInfos())
+    assert get_backend() is backend
+
+    app.bake([info], FRAMES[0], FRAMES[-1])
+    assert get_backend() is backend
+    assert other.get_keyframes(info.fk_ctrl, "rotateX")[0] == FRAMES
+    assert not backend.exists(info.fk_ctrl)
+
+
+def test_instance_backend_is_used_by_each_step(backend: FakeBackend) -> None:
+    other = FakeBackend()
+    info = build_scene(other)
+    app = MatchFKToIK(backend=other, match_infos=MatchInfos())
+
+    steps = app.iter_bake([info], FRAMES[0], FRAMES[-1])
+    assert get_backend() is backend
+    run_to_completion(steps)
+    assert get_backend() is backend
+    assert other.get_keyframes(info.fk_ctrl, "rotateX")[1] == pytest.approx([0.0, 30.0, 60.0])
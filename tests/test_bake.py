@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from maya_fk_to_ik.app import match_fk_to_ik
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.bake import bake_fk_to_ik
+from maya_fk_to_ik.core.bake_cache import BakeCache
+from maya_fk_to_ik.core.key_reduction import CurveFilter
+from maya_fk_to_ik.core.match_info import MatchInfo
+from maya_fk_to_ik.core.matrix import euler_to_matrix, rotation_angles_between
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+FRAMES = list(range(1, 25))
+
+
+def build_chain(
+    backend: FakeBackend,
+    rotate_types: list[RotateType],
+    fk_ctrl_type: str = "transform",
+    rotate_axis: tuple[float, float, float] = (0.0, 0.0, 0.0),
+    joint_orient: tuple[float, float, float] = (0.0, 0.0, 0.0),
+) -> list[MatchInfo]:
+    """アニメーションしたジョイントのチェーンと、同じ構造のFKコントローラーのチェーンを作成する"""
+    infos = []
+    fk_parent = backend.create_node("fk_root", translate=(1, 0, 0))
+    joint_parent = backend.create_node("joint_root", translate=(1, 0, 0))
+    for i, rotate_type in enumerate(rotate_types):
+        offset = backend.create_node(f"fk_{i}_offset", fk_parent, translate=(0, 2, 0))
+        fk_ctrl = backend.create_node(
+            f"fk_{i}_ctrl", offset, fk_ctrl_type, rotate_order=i % 6, rotate_axis=rotate_axis, joint_orient=joint_orient,
+        )
+        joint = backend.create_node(f"joint_{i}", joint_parent, "joint", translate=(0, 2, 0))
+        for axis, attribute in enumerate(("rotateX", "rotateY", "rotateZ")):
+            values = [np.sin(frame * 0.3 + i + axis) * 60.0 for frame in FRAMES]
+            backend.set_keyframes(joint, attribute, FRAMES, values)
+        infos.append(MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=rotate_type))
+        fk_parent, joint_parent = fk_ctrl, joint
+    return infos
+
+
+def expected_fk_world(backend: FakeBackend, info: MatchInfo, frame: int) -> np.ndarray:
+    """回転タイプのオイラー角から求めた、FKコントローラーの目標ワールド行列"""
+    offset = np.identity(4)
+    offset[:3, :3] = euler_to_matrix(np.radians(list(RotateType.from_string(info.type))))
+    return offset @ np.reshape(backend.get_matrix_at(info.joint, "worldMatrix", frame), (4, 4))
+
+
+def test_bake_keys_every_frame_to_joint_pose(backend: FakeBackend) -> None:
+    infos = build_chain(backend, [RotateType.FFF, RotateType.TFT, RotateType.FTF, RotateType.TTT])
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1])
+
+    for info in infos:
+        for attribute in ("rotateX", "rotateY", "rotateZ", "translateX", "translateY", "translateZ"):
+            times, _ = backend.get_keyframes(info.fk_ctrl, attribute)
+            assert times == FRAMES
+        for frame in FRAMES:
+            fk_world = np.reshape(backend.get_matrix_at(info.fk_ctrl, "worldMatrix", frame), (4, 4))
+            np.testing.assert_allclose(fk_world, expected_fk_world(backend, info, frame), atol=1e-9)
+
+
+@pytest.mark.parametrize("unit", ["m", "in", "mm"])
+def test_bake_writes_translation_in_scene_unit(backend: FakeBackend, unit: str) -> None:
+    backend.unit = unit
+    infos = build_chain(backend, [RotateType.FFF, RotateType.TFT])
+    backend.set_attr(infos[0].joint, "translateY", 3.0)
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1])
+
+    # FKコントローラーのオフセットのノードとの差 (シーンの単位で1) が、移動のキーになる
+    assert backend.get_keyframes(infos[0].fk_ctrl, "translateY")[1] == pytest.approx([1.0] * len(FRAMES))
+    for info in infos:
+        fk_world = np.reshape(backend.get_matrix_at(info.fk_ctrl, "worldMatrix", 10), (4, 4))
+        np.testing.assert_allclose(fk_world, expected_fk_world(backend, info, 10), atol=1e-9)
+
+
+def test_bake_removes_joint_orient_and_rotate_axis(backend: FakeBackend) -> None:
+    infos = build_chain(
+        backend, [RotateType.FFF, RotateType.TFT, RotateType.FTT], "joint", rotate_axis=(10.0, -20.0, 5.0), joint_orient=(0.0, 45.0, 90.0),
+    )
+    # 同じフレームでマッチした結果 (ワールド行列の設定) とベイクした回転の値が一致する
+    backend.current_time = FRAMES[0]
+    match_fk_to_ik(infos[0])
+    matched = [backend.get_attr(infos[0].fk_ctrl, attribute) for attribute in ("rotateX", "rotateY", "rotateZ")]
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1])
+    baked = [backend.get_attr(infos[0].fk_ctrl, attribute) for attribute in ("rotateX", "rotateY", "rotateZ")]
+    np.testing.assert_allclose(baked, matched, atol=1e-9)
+
+    for info in infos:
+        for frame in (FRAMES[0], 10, FRAMES[-1]):
+            fk_world = np.reshape(backend.get_matrix_at(info.fk_ctrl, "worldMatrix", frame), (4, 4))
+            np.testing.assert_allclose(fk_world, expected_fk_world(backend, info, frame), atol=1e-9)
+
+
+def test_bake_with_curve_filter_writes_kept_frames_linearly(backend: FakeBackend) -> None:
+    infos = build_chain(backend, [RotateType.TFT])
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1], curve_filter=CurveFilter(rotate_tolerance=0.5, translate_tolerance=0.01))
+
+    fk_ctrl = infos[0].fk_ctrl
+    for attribute in ("rotateX", "rotateY", "rotateZ"):
+        times, _ = backend.get_keyframes(fk_ctrl, attribute)
+        assert times[0] == FRAMES[0]
+        assert times[-1] == FRAMES[-1]
+        assert len(times) < len(FRAMES)
+        assert backend.is_linear(fk_ctrl, attribute)
+    # 移動は動かないため、最初と最後のキーだけが残る
+    assert backend.get_keyframes(fk_ctrl, "translateY") == ([FRAMES[0], FRAMES[-1]], [0.0, 0.0])
+
+    # 残したキーのフレームでは一致し、その間のフレームも許容誤差の範囲でジョイントに合う
+    rotate_times = set(backend.get_keyframes(fk_ctrl, "rotateX")[0])
+    for frame in FRAMES:
+        fk_world = np.reshape(backend.get_matrix_at(fk_ctrl, "worldMatrix", frame), (4, 4))
+        error = np.degrees(rotation_angles_between(fk_world, expected_fk_world(backend, infos[0], frame)))
+        assert error < 1.5
+        if frame in rotate_times and all(
+            frame in backend.get_keyframes(fk_ctrl, attribute)[0] for attribute in ("rotateY", "rotateZ")
+        ):
+            assert error < 1e-6
+
+
+def test_bake_keeps_keys_outside_range(backend: FakeBackend) -> None:
+    infos = build_chain(backend, [RotateType.FFF])
+    backend.set_keyframes(infos[0].fk_ctrl, "rotateX", [-10.0, 1.0, 100.0], [5.0, 6.0, 7.0])
+    bake_fk_to_ik(infos, 5, 10)
+
+    times, values = backend.get_keyframes(infos[0].fk_ctrl, "rotateX")
+    assert times == [-10.0, 1.0, *range(5, 11), 100.0]
+    assert values[0] == 5.0
+    assert values[1] == 6.0
+    assert values[-1] == 7.0
+
+
+def test_bake_child_uses_baked_parent_pose(backend: FakeBackend) -> None:
+    infos = build_chain(backend, [RotateType.TTT, RotateType.FFT])
+    # 子を先に別々にベイクすると、後からベイクした親の姿勢の変化で子がずれる
+    bake_fk_to_ik(infos[1:], FRAMES[0], FRAMES[-1])
+    bake_fk_to_ik(infos[:1], FRAMES[0], FRAMES[-1])
+    separate = np.reshape(backend.get_matrix_at(infos[1].fk_ctrl, "worldMatrix", 10), (4, 4))
+    assert not np.allclose(separate, expected_fk_world(backend, infos[1], 10), atol=1e-6)
+
+    # 親と子を同時にベイクした場合は、ベイク後の親の姿勢を基準にする
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1])
+    both = np.reshape(backend.get_matrix_at(infos[1].fk_ctrl, "worldMatrix", 10), (4, 4))
+    np.testing.assert_allclose(both, expected_fk_world(backend, infos[1], 10), atol=1e-9)
+
+
+def test_bake_skips_missing_nodes(backend: FakeBackend) -> None:
+    infos = build_chain(backend, [RotateType.FFF])
+    missing = MatchInfo(joint="missing_joint", fk_ctrl="missing_ctrl", type=RotateType.FFF)
+    bake_fk_to_ik([missing, *infos], FRAMES[0], FRAMES[-1])
+    assert backend.get_keyframes(infos[0].fk_ctrl, "rotateX")[0] == FRAMES
+
+
+def test_bake_rejects_invalid_range(backend: FakeBackend) -> None:
+    infos = build_chain(backend, [RotateType.FFF])
+    with pytest.raises(ValueError, match="Invalid frame range"):
+        bake_fk_to_ik(infos, 10, 5)
+
+
+def test_bake_cache_prunes_unreferenced_curve_keys(backend: FakeBackend, tmp_path: Path) -> None:
+    infos = build_chain(backend, [RotateType.FFF])
+    cache = BakeCache(tmp_path)
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1], cache)
+    first = {path.name for path in (tmp_path / "curves").iterdir()}
+
+    # ジョイントのキーを変更すると、変更前のキーはどのキャッシュからも参照されなくなる
+    backend.set_keyframes(infos[0].joint, "rotateX", FRAMES, [float(frame) for frame in FRAMES])
+    bake_fk_to_ik(infos, FRAMES[0], FRAMES[-1], cache)
+    second = {path.name for path in (tmp_path / "curves").iterdir()}
+    assert len(second) == len(first)
+    assert second != first
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.batch import STATUS_UNVERIFIED, BatchTask, run_task
+from maya_fk_to_ik.core.match_info import MatchInfos
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+FRAMES = [1, 2, 3]
+
+
+def write_shot(backend: FakeBackend, folder: Path) -> tuple[Path, Path]:
+    """アニメーションしたジョイントとFKコントローラーのシーンと、そのプロファイルを書き出す"""
+    fk_ctrl = backend.create_node("fk_ctrl")
+    joint = backend.create_node("joint", node_type="joint")
+    backend.set_keyframes(joint, "rotateX", FRAMES, [0.0, 30.0, 60.0])
+    scene = folder / "shot.json"
+    backend.save_scene(str(scene))
+    match_infos = MatchInfos()
+    match_infos.add(fk_ctrl, joint, RotateType.FFF)
+    profile = folder / "profile.json"
+    match_infos.export_json(profile)
+    return scene, profile
+
+
+def test_task_without_output_requires_overwrite(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="no output"):
+        BatchTask.from_dict({"scene": "shot.ma"}, base_path=tmp_path)
+    assert BatchTask.from_dict({"scene": "shot.ma", "save": False}).output is None
+    assert BatchTask.from_dict({"scene": "shot.ma", "overwrite": True}).overwrite
+
+
+def test_output_leaves_source_scene(backend: FakeBackend, tmp_path: Path) -> None:
+    scene, profile = write_shot(backend, tmp_path)
+    source = scene.read_bytes()
+    output = tmp_path / "baked" / "shot.json"
+    task = BatchTask(str(scene), profile=str(profile), start=FRAMES[0], end=FRAMES[-1], output=str(output))
+
+    # JSONのプロファイルにはIK/FKスイッチがないため、検証は自己整合性だけになる
+    result = run_task(task)
+    assert result.status == STATUS_UNVERIFIED, result.error
+    assert result.verify is not None
+    assert result.verify["self_consistency_only"]
+    assert result.output == str(output)
+    assert not backend.undo_queue
+    assert scene.read_bytes() == source
+    assert sorted(path.name for path in output.parent.iterdir()) == ["shot.json"]
+
+
+def test_overwrite_replaces_source_scene(backend: FakeBackend, tmp_path: Path) -> None:
+    scene, profile = write_shot(backend, tmp_path)
+    task = BatchTask(str(scene), profile=str(profile), start=FRAMES[0], end=FRAMES[-1], overwrite=True)
+
+    assert run_task(task).status == STATUS_UNVERIFIED
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["profile.json", "shot.json"]
+    backend.open_scene(str(scene))
+    assert backend.get_keyframes("fk_ctrl", "rotateX")[0] == FRAMES
+
+    backend.new_scene()
+    task.save, task.overwrite = True, False
+    assert "no output" in (run_task(task).error or "")
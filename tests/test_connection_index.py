@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import pytest
+
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.connection_index import (
+    DIRECT_OTHER_SCORE,
+    DIRECT_ROTATE_SCORE,
+    HOP_PENALTY,
+    KIND_CONSTRAINT,
+    KIND_DIRECT,
+    KIND_MATRIX,
+    KIND_UTILITY,
+    MATRIX_SCORE,
+    OTHER_CONSTRAINT_SCORE,
+    STRONG_CONSTRAINT_SCORE,
+    UTILITY_SCORE,
+    ConnectionIndex,
+)
+from maya_fk_to_ik.scene import find_pair_proposals, scan_connections
+
+
+def build_index(connections: list[tuple[str, str]], node_types: dict[str, str]) -> ConnectionIndex:
+    """接続とノードタイプを登録した索引を作成する"""
+    index = ConnectionIndex()
+    index.add_connections(connections)
+    index.set_node_types(node_types)
+    return index
+
+
+@pytest.mark.parametrize(("connections", "node_types", "kind", "score"), [
+    ([("ctrl.rotate", "jnt.rotate")], {}, KIND_DIRECT, DIRECT_ROTATE_SCORE),
+    ([("ctrl.rotateX", "jnt.rotate.rotateX")], {}, KIND_DIRECT, DIRECT_ROTATE_SCORE),
+    ([("ctrl.translate", "jnt.translate")], {}, KIND_DIRECT, DIRECT_OTHER_SCORE),
+    (
+        [("ctrl.worldMatrix[0]", "con.target[0].targetParentMatrix"), ("con.constraintRotate", "jnt.rotate")],
+        {"con": "orientConstraint"}, KIND_CONSTRAINT, STRONG_CONSTRAINT_SCORE,
+    ),
+    (
+        [("ctrl.worldMatrix[0]", "con.target[0].targetParentMatrix"), ("con.constraintRotate", "jnt.rotate")],
+        {"con": "aimConstraint"}, KIND_CONSTRAINT, OTHER_CONSTRAINT_SCORE,
+    ),
+    (
+        [("ctrl.worldMatrix[0]", "mult.matrixIn[0]"), ("mult.matrixSum", "jnt.offsetParentMatrix")],
+        {"mult": "multMatrix"}, KIND_MATRIX, MATRIX_SCORE,
+    ),
+    (
+        [("ctrl.worldMatrix[0]", "mult.matrixIn[0]"), ("mult.matrixSum", "decompose.inputMatrix"),
+         ("decompose.outputRotate", "jnt.rotate")],
+        {"mult": "multMatrix", "decompose": "decomposeMatrix"}, KIND_MATRIX, MATRIX_SCORE * HOP_PENALTY,
+    ),
+    (
+        [("ctrl.rotate", "plus.input3D[0]"), ("plus.output3D", "jnt.rotate")],
+        {"plus": "plusMinusAverage"}, KIND_UTILITY, UTILITY_SCORE,
+    ),
+])
+def test_propose_pairs_scores_connection_kinds(
+    connections: list[tuple[str, str]], node_types: dict[str, str], kind: str, score: float,
+) -> None:
+    index = build_index(connections, {"ctrl": "transform", "jnt": "joint", **node_types})
+    proposals = index.propose_pairs(["ctrl"], max_depth=4)
+    assert [(proposal.joint, proposal.kind) for proposal in proposals] == [("jnt", kind)]
+    assert proposals[0].score == pytest.approx(score)
+
+
+def test_propose_pairs_prefers_best_path_and_orders_by_score() -> None:
+    index = build_index(
+        [
+            ("ctrl_a.rotate", "plus.input3D[0]"), ("plus.output3D", "jnt_a1.rotate"),
+            ("ctrl_a.rotate", "jnt_a2.rotate"),
+            ("ctrl_b.worldMatrix[0]", "con.target[0].targetParentMatrix"), ("con.constraintRotate", "jnt_b.rotate"),
+        ],
+        {
+            "ctrl_a": "transform", "ctrl_b": "transform", "jnt_a1": "joint", "jnt_a2": "joint", "jnt_b": "joint",
+            "plus": "plusMinusAverage", "con": "parentConstraint",
+        },
+    )
+    proposals = index.propose_pairs(["ctrl_b", "ctrl_a"], max_depth=4)
+    assert [(proposal.fk_ctrl, proposal.joint) for proposal in proposals] == [("ctrl_a", "jnt_a2"), ("ctrl_b", "jnt_b")]
+    assert proposals[1].path == ["con"]
+
+
+def test_propose_pairs_stops_at_max_depth_and_first_joint() -> None:
+    # 3つのユーティリティノードを経由してジョイントに到達し、その先のジョイントにもつながっている
+    connections = [
+        ("ctrl.rotate", "n1.input"), ("n1.output", "n2.input"), ("n2.output", "n3.input"),
+        ("n3.output", "jnt.rotate"), ("jnt.rotate", "child_jnt.rotate"),
+    ]
+    node_types = {
+        "ctrl": "transform", "n1": "unitConversion", "n2": "unitConversion", "n3": "unitConversion",
+        "jnt": "joint", "child_jnt": "joint",
+    }
+    index = build_index(connections, node_types)
+
+    assert index.propose_pairs(["ctrl"], max_depth=2) == []
+    proposals = index.propose_pairs(["ctrl"], max_depth=3)
+    assert [(proposal.joint, proposal.path) for proposal in proposals] == [("jnt", ["n1", "n2", "n3"])]
+    assert proposals[0].score == pytest.approx(UTILITY_SCORE * HOP_PENALTY ** 2)
+
+
+def build_rig(backend: FakeBackend, suffix: str = "") -> str:
+    """直接・コンストレイント・行列・ジョイント経由・遠すぎる接続で動くジョイントを持つリグを作成する"""
+    root = backend.create_node(f"rig{suffix}")
+    joints = {
+        name: backend.create_node(f"{name}_jnt{suffix}", root, "joint")
+        for name in ("direct", "constraint", "matrix", "far", "child")
+    }
+    ctrls = {name: backend.create_node(f"{name}_ctrl{suffix}", root) for name in ("direct", "constraint", "matrix", "far")}
+
+    backend.connect(f"{ctrls['direct']}.rotate", f"{joints['direct']}.rotate")
+    constraint = backend.create_node(f"orient{suffix}", node_type="orientConstraint")
+    backend.connect(f"{ctrls['constraint']}.worldMatrix[0]", f"{constraint}.target[0].targetParentMatrix")
+    backend.connect(f"{constraint}.constraintRotate", f"{joints['constraint']}.rotate")
+    mult = backend.create_node(f"mult{suffix}", node_type="multMatrix")
+    backend.connect(f"{ctrls['matrix']}.worldMatrix[0]", f"{mult}.matrixIn[0]")
+    backend.connect(f"{mult}.matrixSum", f"{joints['matrix']}.offsetParentMatrix")
+    # ジョイントに到達したらその先はたどらない
+    backend.connect(f"{joints['direct']}.rotate", f"{joints['child']}.rotate")
+
+    previous = f"{ctrls['far']}.rotate"
+    for i in range(5):
+        node = backend.create_node(f"far_{i}{suffix}", node_type="unitConversion")
+        backend.connect(previous, f"{node}.input")
+        previous = f"{node}.output"
+    backend.connect(previous, f"{joints['far']}.rotate")
+    return root
+
+
+def test_find_pair_proposals_in_scene(backend: FakeBackend) -> None:
+    root = build_rig(backend)
+    proposals = find_pair_proposals([root], max_depth=4)
+    assert [(proposal.fk_ctrl, proposal.joint, proposal.kind) for proposal in proposals] == [
+        ("|rig|direct_ctrl", "|rig|direct_jnt", KIND_DIRECT),
+        ("|rig|constraint_ctrl", "|rig|constraint_jnt", KIND_CONSTRAINT),
+        ("|rig|matrix_ctrl", "|rig|matrix_jnt", KIND_MATRIX),
+    ]
+    assert find_pair_proposals([root], max_depth=5)[-1].joint == "|rig|far_jnt"
+
+
+@pytest.mark.parametrize("rig_count", [1, 20])
+def test_scan_connections_queries_once_per_depth(backend: FakeBackend, rig_count: int) -> None:
+    fk_ctrls = []
+    for i in range(rig_count):
+        root = build_rig(backend, f"_{i}")
+        fk_ctrls.extend(backend.list_transforms([root]))
+    fk_ctrls = [node for node in fk_ctrls if "_ctrl" in node]
+
+    backend.reset_counters()
+    index = scan_connections(fk_ctrls, max_depth=4)
+    # 深さ (FKコントローラー自身と経由する4つのノード) ごとに1回だけ問い合わせる
+    assert backend.call_counts["get_output_connections"] == 5
+    assert backend.call_counts["node_types"] == 6
+    # ジョイントの先の接続は問い合わせない
+    assert not any("_jnt_" in node for node in index.outputs)
+    assert not any("child_jnt" in node for node in index.node_types)
+    assert len(index.propose_pairs(fk_ctrls, max_depth=4)) == 3 * rig_count
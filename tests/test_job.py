@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.bake import iter_bake_fk_to_ik
+from maya_fk_to_ik.core.match_info import MatchInfo
+from maya_fk_to_ik.core.rotate_type import RotateType
+from maya_fk_to_ik.utils.job import JOB_CANCELLED, JOB_FINISHED, Job
+
+FRAMES = list(range(1, 11))
+
+
+def build_scene(backend: FakeBackend) -> MatchInfo:
+    """アニメーションしたジョイントと、キーのないFKコントローラーを1つずつ作成する"""
+    fk_ctrl = backend.create_node("fk_ctrl", rotate=(5, 0, 0))
+    joint = backend.create_node("joint", node_type="joint")
+    backend.set_keyframes(joint, "rotateX", FRAMES, [frame * 10.0 for frame in FRAMES])
+    return MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=RotateType.FFF)
+
+
+def test_finished_job_is_one_undo_entry(backend: FakeBackend) -> None:
+    info = build_scene(backend)
+    undo_count = len(backend.undo_queue)
+    job = Job("Bake FK to IK", iter_bake_fk_to_ik([info], FRAMES[0], FRAMES[-1]))
+    job.run()
+    assert job.state == JOB_FINISHED
+    assert len(backend.undo_queue) == undo_count + 1
+    assert backend.get_keyframes(info.fk_ctrl, "rotateX")[0] == FRAMES
+
+    backend.undo()
+    assert backend.get_keyframes(info.fk_ctrl, "rotateX")[0] == []
+    assert backend.get_attr(info.fk_ctrl, "rotateX") == 5
+
+
+def test_cancel_restores_only_job_changes(backend: FakeBackend) -> None:
+    info = build_scene(backend)
+    other = backend.create_node("other")
+    job = Job("Bake FK to IK", iter_bake_fk_to_ik([info], FRAMES[0], FRAMES[-1]))
+    job.start()
+    while job.step():
+        # ジョブの合間のほかの操作
+        backend.set_keyframes(other, "translateX", [1], [2.0])
+        if backend.get_keyframes(info.fk_ctrl, "rotateX")[0]:
+            job.cancel()
+
+    assert job.state == JOB_CANCELLED
+    assert backend.get_keyframes(info.fk_ctrl, "rotateX")[0] == []
+    assert backend.get_attr(info.fk_ctrl, "rotateX") == 5
+    assert backend.get_keyframes(other, "translateX")[0] == [1]
+    assert backend.is_undo_enabled()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from maya_fk_to_ik.core.key_reduction import reduce_keys
+from maya_fk_to_ik.core.matrix import euler_to_matrix, filter_euler, matrix_to_euler
+
+
+def interpolate_kept(values: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """残したキーの間を直線で補間した値"""
+    index = np.arange(values.shape[1])
+    return np.array([np.interp(index, index[mask], row[mask]) for row, mask in zip(values, keep)])
+
+
+@pytest.mark.parametrize("rotate_order", range(6))
+def test_filter_euler_removes_flips_and_keeps_rotation(rotate_order: int) -> None:
+    frames = np.arange(60, dtype=np.float64)
+    angles = np.zeros((len(frames), 3))
+    angles[:, 0] = np.radians(np.sin(frames * 0.15) * 150.0 + frames * 8.0)
+    angles[:, 1] = np.radians(np.cos(frames * 0.1) * 60.0)
+    angles[:, 2] = np.radians(frames * -12.0)
+    matrices = euler_to_matrix(angles, rotate_order)
+
+    # 分解した角度は±180度で折り返し、フレームによって別解になる
+    decomposed = matrix_to_euler(matrices, rotate_order)
+    assert np.abs(np.diff(decomposed, axis=0)).max() > np.pi
+    filtered = filter_euler(decomposed, rotate_order)
+
+    np.testing.assert_allclose(euler_to_matrix(filtered, rotate_order), matrices, atol=1e-9)
+    assert np.abs(np.diff(filtered, axis=0)).max() <= np.pi
+    np.testing.assert_allclose(filtered[0], decomposed[0])
+    # 元の連続した回転が、360度の倍数だけずれた解として戻る
+    shift = filtered[0] - angles[0]
+    np.testing.assert_allclose(shift, np.round(shift / (2.0 * np.pi)) * 2.0 * np.pi, atol=1e-9)
+    np.testing.assert_allclose(filtered - shift, angles, atol=1e-9)
+
+
+def test_reduce_keys_stays_within_tolerance() -> None:
+    frames = np.arange(120, dtype=np.float64)
+    rng = np.random.default_rng(0)
+    values = np.array([
+        np.sin(frames * 0.1) * 40.0,
+        np.where(frames < 60, 0.0, 10.0),
+        np.cumsum(rng.normal(size=len(frames))),
+    ])
+    tolerance = np.array([0.1, 0.01, 0.5])
+    keep = reduce_keys(values, tolerance)
+
+    assert keep[:, [0, -1]].all()
+    assert (keep.sum(axis=1) < len(frames)).all()
+    assert (np.abs(interpolate_kept(values, keep) - values) <= tolerance[:, np.newaxis] + 1e-12).all()
+
+
+def test_reduce_keys_keeps_only_ends_of_line() -> None:
+    values = np.array([np.linspace(-5.0, 5.0, 30), np.full(30, 2.0)])
+    keep = reduce_keys(values, 1e-9)
+    assert keep.sum(axis=1).tolist() == [2, 2]
+    assert keep[:, [0, -1]].all()
+
+    assert reduce_keys(np.zeros((2, 0)), 0.1).shape == (2, 0)
+    assert reduce_keys(np.array([[1.0]]), 0.1).tolist() == [[True]]
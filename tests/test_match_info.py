@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from maya_fk_to_ik.core.match_info import MATCH_INFO_FILE_VERSION, MatchInfo, MatchInfos
+from maya_fk_to_ik.core.offset import OffsetTransform
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+
+def make_infos(count: int) -> MatchInfos:
+    """ctrl_0, ctrl_1, ... の行を持つマッチ情報を作成する"""
+    match_infos = MatchInfos()
+    for i in range(count):
+        match_infos.add(f"ctrl_{i}", f"joint_{i}", RotateType.FFF)
+    return match_infos
+
+
+def assert_indexed(match_infos: MatchInfos) -> None:
+    """行番号・FKコントローラー・ジョイントの索引が行リストと一致していることを確かめる"""
+    for row, info in enumerate(match_infos):
+        assert match_infos.at(row) is info
+        assert match_infos.row_of(info.fk_ctrl) == row
+        assert match_infos.get(info.fk_ctrl) is info
+        assert match_infos.get_by_joint(info.joint) is info
+
+
+def test_remove_shifts_row_index() -> None:
+    match_infos = make_infos(5)
+    match_infos.remove("ctrl_1")
+    match_infos.remove("ctrl_3")
+    assert [info.fk_ctrl for info in match_infos] == ["ctrl_0", "ctrl_2", "ctrl_4"]
+    assert match_infos.row_of("ctrl_1") == -1
+    assert_indexed(match_infos)
+
+
+def test_insert_shifts_row_index() -> None:
+    match_infos = make_infos(3)
+    match_infos.add("ctrl_new", "joint_new", RotateType.TTT, row=1)
+    match_infos.add("ctrl_first", "joint_first", RotateType.TTT, row=0)
+    assert [info.fk_ctrl for info in match_infos] == ["ctrl_first", "ctrl_0", "ctrl_new", "ctrl_1", "ctrl_2"]
+    assert_indexed(match_infos)
+    match_infos.remove("ctrl_0")
+    assert_indexed(match_infos)
+
+    with pytest.raises(IndexError):
+        match_infos.add("ctrl_out", "joint_out", RotateType.TTT, row=10)
+
+
+def test_edit_renamed_fk_ctrl_keeps_row() -> None:
+    match_infos = make_infos(3)
+    match_infos.edit("ctrl_1", MatchInfo(joint="joint_1", fk_ctrl="ctrl_renamed", type=RotateType.TFT))
+    assert match_infos.get("ctrl_1") is None
+    assert match_infos.row_of("ctrl_renamed") == 1
+    assert_indexed(match_infos)
+
+    with pytest.raises(ValueError, match="already exists"):
+        match_infos.edit("ctrl_0", MatchInfo(joint="joint_0", fk_ctrl="ctrl_2", type=RotateType.FFF))
+    assert_indexed(match_infos)
+
+
+@pytest.mark.parametrize("version", [None, 1])
+def test_load_json_reads_files_without_offset(tmp_path: Path, version: int | None) -> None:
+    rows = {
+        "arm_ctrl": {"joint": "arm_jnt", "fk_ctrl": "arm_ctrl", "type": "TFT"},
+        "leg_ctrl": {"joint": "leg_jnt", "fk_ctrl": "leg_ctrl", "type": "FFF"},
+    }
+    file_path = tmp_path / "match_infos.json"
+    file_path.write_text(json.dumps(rows if version is None else {"version": version, "match_infos": rows}), encoding="utf-8")
+
+    match_infos = MatchInfos()
+    match_infos.load_json(file_path)
+    assert [(info.fk_ctrl, info.joint, info.type, info.offset) for info in match_infos] == [
+        ("arm_ctrl", "arm_jnt", RotateType.TFT, None),
+        ("leg_ctrl", "leg_jnt", RotateType.FFF, None),
+    ]
+    assert_indexed(match_infos)
+
+
+def test_export_json_round_trips_offset(tmp_path: Path) -> None:
+    offset = OffsetTransform(quaternion=(0.0, 0.6, 0.0, 0.8), translation=(1.0, -2.0, 0.5))
+    match_infos = make_infos(2)
+    match_infos.edit("ctrl_1", MatchInfo(joint="joint_1", fk_ctrl="ctrl_1", type=RotateType.TTF, offset=offset))
+    file_path = tmp_path / "match_infos.json"
+    match_infos.export_json(file_path)
+    assert json.loads(file_path.read_text(encoding="utf-8"))["version"] == MATCH_INFO_FILE_VERSION
+
+    loaded = MatchInfos()
+    loaded.load_json(file_path)
+    assert [(info.fk_ctrl, info.type, info.offset) for info in loaded] == [
+        ("ctrl_0", RotateType.FFF, None), ("ctrl_1", RotateType.TTF, offset),
+    ]
+
+    file_path.write_text(json.dumps({"version": MATCH_INFO_FILE_VERSION + 1, "match_infos": {}}), encoding="utf-8")
+    with pytest.raises(ValueError, match="Unsupported match info file version"):
+        loaded.load_json(file_path)
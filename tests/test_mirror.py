@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from maya_fk_to_ik.app import mirror_match_infos
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.match_info import MatchInfo
+from maya_fk_to_ik.core.matrix import compile_offsets, compute_mirrored_fk_world, euler_to_matrix
+from maya_fk_to_ik.core.mirror import NameMirror, format_mirror_rules, parse_mirror_rules
+from maya_fk_to_ik.core.offset import OffsetTransform
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+JOINT_ROTATIONS = [(20.0, -35.0, 50.0), (-10.0, 25.0, 70.0)]
+JOINT_TRANSLATIONS = [(2.0, 1.0, 0.5), (0.0, 3.0, 0.0)]
+OFFSET = OffsetTransform(
+    quaternion=(np.sin(np.radians(15.0)) * 0.6, np.sin(np.radians(15.0)) * 0.8, 0.0, np.cos(np.radians(15.0))),
+    translation=(0.5, 0.0, -0.25),
+)
+
+
+def mirror_world(matrix: np.ndarray, mirror_axis: int = 0, behavior: bool = True) -> np.ndarray:
+    """ワールド行列を左右反転する
+
+    ビヘイビアは反転した3つの軸をすべて逆向きにし、オリエンテーションは反転した軸の1つだけを逆向きにする (どちらも右手系のまま)
+    """
+    mirror = np.identity(4)
+    mirror[mirror_axis, mirror_axis] = -1.0
+    result = np.array(matrix, dtype=np.float64) @ mirror
+    if behavior:
+        result[:3, :3] *= -1.0
+    else:
+        result[mirror_axis, :3] *= -1.0
+    return result
+
+
+def get_world(backend: FakeBackend, node: str) -> np.ndarray:
+    """現在のワールド行列"""
+    return np.reshape(backend.get_world_matrix(node), (4, 4))
+
+
+def build_mirrored_chain(
+    backend: FakeBackend, sources: list[tuple[RotateType, OffsetTransform | None]], behavior: bool = True,
+) -> list[MatchInfo]:
+    """左側のFKコントローラーをジョイントに合わせたチェーンと、それをミラーした右側のチェーンを作成する
+
+    右側のFKコントローラーは常にビヘイビアで、右側のジョイントは behavior に従ってミラーする
+    """
+    infos = []
+    parents: dict[str, str | None] = {"L_jnt": None, "L_ctrl": None, "R_jnt": None, "R_ctrl": None}
+    for i, (rotate_type, offset) in enumerate(sources):
+        left_joint = backend.create_node(
+            f"L_{i}_jnt", parents["L_jnt"], "joint", translate=JOINT_TRANSLATIONS[i], rotate=JOINT_ROTATIONS[i],
+        )
+        left_ctrl = backend.create_node(f"L_{i}_ctrl", parents["L_ctrl"])
+        info = MatchInfo(joint=left_joint, fk_ctrl=left_ctrl, type=rotate_type, offset=offset)
+        backend.set_world_matrix(left_ctrl, (compile_offsets([info])[0] @ get_world(backend, left_joint)).reshape(-1))
+        right_joint = backend.create_node(f"R_{i}_jnt", parents["R_jnt"], "joint")
+        backend.set_world_matrix(right_joint, mirror_world(get_world(backend, left_joint), behavior=behavior).reshape(-1))
+        right_ctrl = backend.create_node(f"R_{i}_ctrl", parents["R_ctrl"])
+        backend.set_world_matrix(right_ctrl, mirror_world(get_world(backend, left_ctrl)).reshape(-1))
+        parents = {"L_jnt": left_joint, "L_ctrl": left_ctrl, "R_jnt": right_joint, "R_ctrl": right_ctrl}
+        infos.append(info)
+    return infos
+
+
+def test_name_mirror_swaps_each_token_once() -> None:
+    mirror = NameMirror()
+    assert mirror.mirror_name("L_arm_ctrl") == "R_arm_ctrl"
+    assert mirror.mirror_name("R_arm_L") == "L_arm_R"
+    assert mirror.mirror_name("|rig|L_arm|L_hand_ctrl") == "|rig|R_arm|R_hand_ctrl"
+    assert mirror.mirror_name("LeftArm") == "RightArm"
+    # 英字の続き (前後) では置換しない
+    assert mirror.mirror_name("arm_Leg") is None
+    assert mirror.mirror_name("leftover_ctrl") is None
+    assert mirror.mirror_name("spine_ctrl") is None
+    # ネームスペースは置換しない
+    assert mirror.mirror_name("|L_char:root|L_char:L_arm") == "|L_char:root|L_char:R_arm"
+    assert mirror.mirror_name("L_char:spine") is None
+
+    custom = NameMirror([("lf", "rt")])
+    assert custom.mirror_name("lf_arm") == "rt_arm"
+    assert custom.mirror_name("half_arm") is None
+    assert NameMirror([]).mirror_name("L_arm") is None
+
+
+def test_parse_mirror_rules() -> None:
+    rules = parse_mirror_rules(" L_:R_ , _L:_R,, Left : Right ")
+    assert rules == [("L_", "R_"), ("_L", "_R"), ("Left", "Right")]
+    assert parse_mirror_rules(format_mirror_rules(rules)) == rules
+    assert parse_mirror_rules("") == []
+    for text in ("L_R_", ":R_", "L_:", "L_:L_"):
+        with pytest.raises(ValueError, match="Invalid mirror rule"):
+            parse_mirror_rules(text)
+
+
+@pytest.mark.parametrize("mirror_axis", range(3))
+def test_compute_mirrored_fk_world_mirrors_matched_pose(mirror_axis: int) -> None:
+    rng = np.random.default_rng(mirror_axis)
+    joint_world = np.tile(np.identity(4), (4, 1, 1))
+    joint_world[:, :3, :3] = euler_to_matrix(rng.uniform(-np.pi, np.pi, (4, 3)))
+    joint_world[:, 3, :3] = rng.normal(size=(4, 3))
+    offsets = compile_offsets([
+        MatchInfo(joint="", fk_ctrl="", type=RotateType.TFT),
+        MatchInfo(joint="", fk_ctrl="", type=RotateType.FFF),
+        MatchInfo(joint="", fk_ctrl="", type=RotateType.FTT),
+        MatchInfo(joint="", fk_ctrl="", type=RotateType.TTT, offset=OFFSET),
+    ])
+    fk_world = offsets @ joint_world
+    mirrored_fk_world = np.array([mirror_world(matrix, mirror_axis) for matrix in fk_world])
+
+    result = compute_mirrored_fk_world(fk_world, joint_world, offsets, mirrored_fk_world, mirror_axis)
+    np.testing.assert_allclose(result, mirrored_fk_world, atol=1e-9)
+
+
+@pytest.mark.parametrize("behavior", [True, False])
+@pytest.mark.parametrize("rotate_type", list(RotateType))
+def test_mirror_match_infos_detects_rotate_type(backend: FakeBackend, rotate_type: RotateType, behavior: bool) -> None:
+    sources = build_mirrored_chain(backend, [(rotate_type, None), (rotate_type, None)], behavior)
+    detections = mirror_match_infos(sources)
+
+    assert [detection.info.fk_ctrl for detection in detections] == ["|R_0_ctrl", "|R_0_ctrl|R_1_ctrl"]
+    for detection in detections:
+        assert detection.residual < 1e-6
+        assert detection.info.offset is None
+        expected = compile_offsets([detection.info])[0] @ get_world(backend, detection.info.joint)
+        np.testing.assert_allclose(get_world(backend, detection.info.fk_ctrl), expected, atol=1e-9)
+        if behavior:
+            # 両側がビヘイビアでミラーされていれば、回転タイプは変わらない
+            assert detection.rotate_type == rotate_type
+
+
+def test_mirror_match_infos_mirrors_offset_row(backend: FakeBackend) -> None:
+    sources = build_mirrored_chain(backend, [(RotateType.FFF, None), (RotateType.TFT, OFFSET)], behavior=False)
+    detections = mirror_match_infos(sources)
+
+    assert detections[0].info.offset is None
+    assert detections[1].info.offset is not None
+    assert detections[1].residual == 0.0
+    for detection in detections:
+        expected = compile_offsets([detection.info])[0] @ get_world(backend, detection.info.joint)
+        np.testing.assert_allclose(get_world(backend, detection.info.fk_ctrl), expected, atol=1e-9)
+
+
+def test_mirror_match_infos_validates_nodes_in_one_query(backend: FakeBackend, capsys: pytest.CaptureFixture[str]) -> None:
+    for name in ("L_a_ctrl", "L_a_jnt", "R_a_ctrl", "L_b_ctrl", "L_b_jnt", "L_c_ctrl", "L_c_jnt", "R_c_ctrl", "R_c_jnt"):
+        backend.create_node(name, node_type="joint" if name.endswith("_jnt") and name != "R_c_jnt" else "transform")
+    backend.create_node("R_a_jnt", node_type="joint")
+    sources = [
+        MatchInfo(joint="L_a_jnt", fk_ctrl="L_a_ctrl", type=RotateType.FFF),
+        MatchInfo(joint="L_b_jnt", fk_ctrl="L_b_ctrl", type=RotateType.FFF),
+        MatchInfo(joint="L_c_jnt", fk_ctrl="L_c_ctrl", type=RotateType.FFF),
+        MatchInfo(joint="L_d_jnt", fk_ctrl="L_d_ctrl", type=RotateType.FFF),
+        MatchInfo(joint="spine_jnt", fk_ctrl="spine_ctrl", type=RotateType.FFF),
+    ]
+
+    backend.reset_counters()
+    detections = mirror_match_infos(sources)
+    assert [detection.info.fk_ctrl for detection in detections] == ["R_a_ctrl"]
+    assert backend.call_counts["node_types"] == 1
+    output = capsys.readouterr().out
+    assert "Node not found for mirrored match info: R_b_ctrl / R_b_jnt" in output
+    assert "Mirrored object 'R_c_jnt' is not a joint." in output
+    assert "Node not found for match info: L_d_ctrl / L_d_jnt" in output
+    assert "spine" not in output
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from maya_fk_to_ik.app import MatchFKToIK
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.match_info import MatchInfo, MatchInfos
+from maya_fk_to_ik.core.matrix import normalize_rotation
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+FRAMES = [1, 2, 3]
+JOINT_ROTATIONS = [10.0, 40.0, 80.0]
+SCALES = [(1.0, 1.0, 1.0), (2.0, 2.0, 2.0), (0.5, 1.5, 3.0)]
+
+
+def get_world(backend: FakeBackend, node: str) -> np.ndarray:
+    """現在のワールド行列"""
+    return np.reshape(backend.get_world_matrix(node), (4, 4))
+
+
+def remove_scale(matrix: np.ndarray) -> np.ndarray:
+    """ワールド行列からスケールを取り除く"""
+    matrix = matrix.copy()
+    matrix[:3, :3] = normalize_rotation(matrix[:3, :3])
+    return matrix
+
+
+def build_scene(backend: FakeBackend, scale: tuple[float, float, float]) -> tuple[MatchInfo, np.ndarray]:
+    """回転タイプで表せない向きと位置のずれがあるFKコントローラーと、スケールしたジョイントを作成する
+
+    Returns:
+        tuple[MatchInfo, np.ndarray]: マッチ情報と、オフセットを記録するポーズでのFKコントローラーのワールド行列
+    """
+    root = backend.create_node("rig", translate=(1.0, 2.0, 0.0), rotate=(0.0, 30.0, 0.0))
+    joint = backend.create_node("joint", root, "joint", translate=(0.0, 3.0, 1.0), rotate=(20.0, -35.0, 50.0))
+    for axis, value in zip("XYZ", scale):
+        backend.set_attr(joint, f"scale{axis}", value)
+    fk_ctrl = backend.create_node("fk_ctrl", root, translate=(0.5, 3.5, 0.5), rotate=(65.0, 10.0, -25.0))
+    return MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=RotateType.FFF), get_world(backend, fk_ctrl)
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_captured_offset_reproduces_fk_pose(backend: FakeBackend, scale: tuple[float, float, float]) -> None:
+    info, fk_world = build_scene(backend, scale)
+    app = MatchFKToIK(match_infos=MatchInfos())
+    assert app.capture_offsets([info]) == [info]
+    assert info.offset is not None
+
+    # 同じポーズでマッチすると、記録したときのFKコントローラーのポーズに戻る
+    backend.set_attr(info.fk_ctrl, "rotateY", 90.0)
+    backend.set_attr(info.fk_ctrl, "translateX", -4.0)
+    app.match_many([info])
+    np.testing.assert_allclose(get_world(backend, info.fk_ctrl), fk_world, atol=1e-9)
+
+    # ジョイントが動くと、スケールを除いたジョイントとの相対的な向きと位置を保ったまま追従する
+    joint_world = get_world(backend, info.joint)
+    backend.set_attr(info.joint, "rotateX", 110.0)
+    backend.set_attr(info.joint, "translateY", 1.0)
+    expected = fk_world @ np.linalg.inv(remove_scale(joint_world)) @ remove_scale(get_world(backend, info.joint))
+    app.match(info.fk_ctrl, info)
+    np.testing.assert_allclose(get_world(backend, info.fk_ctrl), expected, atol=1e-9)
+    np.testing.assert_allclose([backend.get_attr(info.fk_ctrl, f"scale{axis}") for axis in "XYZ"], 1.0, atol=1e-9)
+
+
+@pytest.mark.parametrize("scale", SCALES[1:])
+def test_bake_with_offset_follows_scaled_joint(backend: FakeBackend, scale: tuple[float, float, float]) -> None:
+    info, fk_world = build_scene(backend, scale)
+    app = MatchFKToIK(match_infos=MatchInfos())
+    app.capture_offsets([info])
+    offset = fk_world @ np.linalg.inv(remove_scale(get_world(backend, info.joint)))
+    backend.set_keyframes(info.joint, "rotateX", FRAMES, JOINT_ROTATIONS)
+
+    app.bake([info], FRAMES[0], FRAMES[-1])
+    for frame in FRAMES:
+        backend.current_time = frame
+        expected = offset @ remove_scale(get_world(backend, info.joint))
+        np.testing.assert_allclose(get_world(backend, info.fk_ctrl), expected, atol=1e-6)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from maya_fk_to_ik.app import MatchFKToIK
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.match_info import MatchInfo, MatchInfos
+from maya_fk_to_ik.core.offset import OffsetTransform
+from maya_fk_to_ik.core.profile_store import SCHEMA_VERSION, ProfileStore, get_node_rig_name
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+
+def test_rig_name_without_namespace_uses_root_node() -> None:
+    assert get_node_rig_name("|charA:root|charA:arm_ctrl") == "charA"
+    assert get_node_rig_name("|rigA|spine|arm_ctrl") == "|rigA"
+    assert get_node_rig_name("|rigA") == "|rigA"
+    assert get_node_rig_name("arm_ctrl") == ""
+
+
+def test_rigs_without_namespace_do_not_merge(backend: FakeBackend) -> None:
+    store = ProfileStore(":memory:")
+    store.import_match_infos([
+        MatchInfo(joint="|rigA|arm_jnt", fk_ctrl="|rigA|arm_ctrl", type=RotateType.FFF),
+        MatchInfo(joint="|rigB|arm_jnt", fk_ctrl="|rigB|arm_ctrl", type=RotateType.TTT),
+    ])
+    root = backend.create_node("rigA")
+    backend.create_node("arm_ctrl", root)
+    backend.create_node("arm_jnt", root, "joint")
+
+    app = MatchFKToIK(profile_store=store)
+    assert [info.fk_ctrl for info in app.match_infos] == ["|rigA|arm_ctrl"]
+
+
+def test_import_refuses_rows_without_rig() -> None:
+    store = ProfileStore(":memory:")
+    added = store.import_match_infos([
+        MatchInfo(joint="arm_jnt", fk_ctrl="arm_ctrl", type=RotateType.FFF),
+        MatchInfo(joint="|rigA|arm_jnt", fk_ctrl="|rigA|arm_ctrl", type=RotateType.FFF),
+    ])
+    assert added == 1
+    assert store.rigs() == ["|rigA"]
+
+
+def test_migrate_assigns_root_to_rows_without_namespace(tmp_path: Path) -> None:
+    file_path = tmp_path / "profiles.sqlite3"
+    with sqlite3.connect(file_path) as connection:
+        connection.executescript("""
+            CREATE TABLE match_infos (
+                rig TEXT NOT NULL, fk_ctrl TEXT NOT NULL, joint TEXT NOT NULL, type TEXT NOT NULL,
+                offset_transform TEXT, PRIMARY KEY (rig, fk_ctrl)
+            );
+            INSERT INTO match_infos VALUES ('', '|rigA|arm_ctrl', '|rigA|arm_jnt', 'FFF', NULL);
+            INSERT INTO match_infos VALUES ('', 'leg_ctrl', 'leg_jnt', 'FFF', NULL);
+            PRAGMA user_version = 3;
+        """)
+    connection.close()
+
+    store = ProfileStore(file_path)
+    assert store.rigs() == ["", "|rigA"]
+    store.close()
+
+
+def test_migrate_adds_offset_column_to_schema_2_database(tmp_path: Path) -> None:
+    file_path = tmp_path / "profiles.sqlite3"
+    with sqlite3.connect(file_path) as connection:
+        connection.executescript("""
+            CREATE TABLE match_infos (
+                rig TEXT NOT NULL, fk_ctrl TEXT NOT NULL, joint TEXT NOT NULL, type TEXT NOT NULL,
+                PRIMARY KEY (rig, fk_ctrl)
+            );
+            INSERT INTO match_infos VALUES ('|rigA', '|rigA|arm_ctrl', '|rigA|arm_jnt', 'TFT');
+            PRAGMA user_version = 2;
+        """)
+    connection.close()
+
+    store = ProfileStore(file_path)
+    infos = store.load(["|rigA"])
+    assert [(info.fk_ctrl, info.type, info.offset) for info in infos] == [("|rigA|arm_ctrl", RotateType.TFT, None)]
+    # 移行後のデータベースには、オフセットを持つ行も保存できる
+    offset = OffsetTransform(quaternion=(0.0, 0.0, 0.6, 0.8), translation=(0.0, 1.0, 0.0))
+    infos.append(MatchInfo(joint="|rigA|leg_jnt", fk_ctrl="|rigA|leg_ctrl", type=RotateType.FFF, offset=offset))
+    assert store.save(infos) == 1
+    store.close()
+
+    # 同じファイルのまま列とバージョンが更新されている
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.endswith(("-wal", "-shm"))) == ["profiles.sqlite3"]
+    with sqlite3.connect(file_path) as connection:
+        assert connection.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(match_infos)")]
+        assert columns[-1] == "offset_transform"
+    connection.close()
+    store = ProfileStore(file_path)
+    assert [(info.fk_ctrl, info.offset) for info in store.load(["|rigA"])] == [
+        ("|rigA|arm_ctrl", None), ("|rigA|leg_ctrl", offset),
+    ]
+    store.close()
+
+
+def test_read_only_store_loads_old_database_without_writing(backend: FakeBackend, tmp_path: Path) -> None:
+    file_path = tmp_path / "profiles.sqlite3"
+    with sqlite3.connect(file_path) as connection:
+        connection.executescript("""
+            CREATE TABLE match_infos (
+                rig TEXT NOT NULL, fk_ctrl TEXT NOT NULL, joint TEXT NOT NULL, type TEXT NOT NULL,
+                PRIMARY KEY (rig, fk_ctrl)
+            );
+            INSERT INTO match_infos VALUES ('|rigA', '|rigA|arm_ctrl', '|rigA|arm_jnt', 'TFT');
+            PRAGMA user_version = 2;
+        """)
+    connection.close()
+    content = file_path.read_bytes()
+    root = backend.create_node("rigA")
+    backend.create_node("arm_ctrl", root)
+
+    store = ProfileStore(file_path, read_only=True)
+    app = MatchFKToIK(profile_store=store)
+    assert [(info.fk_ctrl, info.type, info.offset) for info in app.match_infos] == [("|rigA|arm_ctrl", RotateType.TFT, None)]
+    assert app.load_scene_switches() == []
+    # 読み込み専用のプロファイルには、マッチ情報の変更を書き込まない
+    app.match_infos.add("|rigA|leg_ctrl", "|rigA|leg_jnt", RotateType.FFF)
+    store.close()
+
+    assert file_path.read_bytes() == content
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["profiles.sqlite3"]
+
+
+def test_renamed_fk_ctrl_replaces_saved_row() -> None:
+    store = ProfileStore(":memory:")
+    match_infos = MatchInfos()
+    store.attach(match_infos)
+    match_infos.add("|rigA|arm_ctrl", "|rigA|arm_jnt", RotateType.FFF)
+    match_infos.add("|rigA|leg_ctrl", "|rigA|leg_jnt", RotateType.FFF)
+
+    match_infos.edit("|rigA|arm_ctrl", MatchInfo(joint="|rigA|arm_jnt", fk_ctrl="|rigA|hand_ctrl", type=RotateType.TFT))
+    assert [(info.fk_ctrl, info.type) for info in store.load(["|rigA"])] == [
+        ("|rigA|leg_ctrl", RotateType.FFF),
+        ("|rigA|hand_ctrl", RotateType.TFT),
+    ]
+    assert store.save(match_infos) == 0
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.match_info import MatchInfos
+from maya_fk_to_ik.core.profile_store import RigSwitch
+from maya_fk_to_ik.core.rotate_type import RotateType
+from maya_fk_to_ik.switch_watcher import SwitchWatcher
+
+FRAMES = [1, 2, 3]
+IK_ROTATIONS = [0.0, 30.0, 60.0]
+
+
+def build_watcher(backend: FakeBackend) -> tuple[SwitchWatcher, RigSwitch, str]:
+    """IK状態ではIKジョイントに、FK状態ではFKコントローラーに追従するジョイントを持つリグと、そのスイッチの監視を作成する"""
+    root = backend.create_node("rig")
+    switch_node = backend.create_node("switch", parent=root)
+    backend.set_attr(switch_node, "fkIk", 1.0)
+    fk_ctrl = backend.create_node("fk_ctrl", parent=root)
+    ik_joint = backend.create_node("ik_joint", parent=root, node_type="joint")
+    backend.set_keyframes(ik_joint, "rotateX", FRAMES, IK_ROTATIONS)
+    joint = backend.create_node("joint", parent=root, node_type="joint")
+    backend.constrain(joint, ik_joint, f"{switch_node}.fkIk", 1.0)
+    backend.constrain(joint, fk_ctrl, f"{switch_node}.fkIk", 0.0)
+    backend.current_time = FRAMES[1]
+
+    match_infos = MatchInfos()
+    match_infos.add(fk_ctrl, joint, RotateType.FFF)
+    switch = RigSwitch("|rig", switch_node, "fkIk", 1.0)
+    watcher = SwitchWatcher(match_infos, [switch])
+    assert watcher.start() == [switch]
+    return watcher, switch, fk_ctrl
+
+
+def set_switch(backend: FakeBackend, switch: RigSwitch, value: float) -> None:
+    """ユーザーの操作として、Undoに記録してスイッチの値を設定する"""
+    previous = backend.get_attr(switch.node, switch.attribute)
+    backend.set_attr(switch.node, switch.attribute, value)
+    backend.register_undo(
+        lambda: backend.set_attr(switch.node, switch.attribute, previous),
+        lambda: backend.set_attr(switch.node, switch.attribute, value),
+    )
+
+
+def test_switch_from_ik_matches_once(backend: FakeBackend) -> None:
+    watcher, switch, fk_ctrl = build_watcher(backend)
+
+    # スライダーのドラッグで何度も設定されても、アイドル時の1回のマッチにまとめられる
+    for value in (0.7, 0.3, 0.0):
+        backend.set_attr(switch.node, switch.attribute, value)
+    assert len(backend.deferred) == 1
+    assert backend.run_deferred() == 1
+    assert watcher.match_count == 1
+    assert backend.get_attr(fk_ctrl, "rotateX") == pytest.approx(IK_ROTATIONS[1])
+    assert backend.get_attr(switch.node, switch.attribute) == 0.0
+
+    # FKからIKへの切り替えではマッチしない
+    backend.set_attr(switch.node, switch.attribute, 1.0)
+    backend.run_deferred()
+    assert watcher.match_count == 1
+
+    watcher.stop()
+    backend.set_attr(switch.node, switch.attribute, 0.0)
+    assert not backend.deferred
+
+
+def test_undo_and_redo_do_not_match(backend: FakeBackend) -> None:
+    watcher, switch, _ = build_watcher(backend)
+    set_switch(backend, switch, 0.0)
+    backend.run_deferred()
+    assert watcher.match_count == 1
+
+    # マッチとスイッチの変更をUndoしてからRedoしても、マッチし直してRedoのキューを破棄しない
+    backend.undo()
+    backend.undo()
+    assert backend.get_attr(switch.node, switch.attribute) == 1.0
+    backend.redo()
+    assert backend.get_attr(switch.node, switch.attribute) == 0.0
+    assert not backend.deferred
+    assert watcher.match_count == 1
+    assert len(backend.redo_queue) == 1
+
+    # Undoで戻った値を前回の値として、その後のユーザーの切り替えを判定する
+    backend.undo()
+    set_switch(backend, switch, 0.0)
+    backend.run_deferred()
+    assert watcher.match_count == 2
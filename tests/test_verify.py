@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pytest
+
+from maya_fk_to_ik.app import MatchFKToIK
+from maya_fk_to_ik.backend.fake import FakeBackend
+from maya_fk_to_ik.core.match_info import MatchInfo, MatchInfos
+from maya_fk_to_ik.core.profile_store import RigSwitch
+from maya_fk_to_ik.core.rotate_type import RotateType
+
+FRAMES = [1, 2, 3]
+IK_ROTATIONS = [0.0, 30.0, 60.0]
+
+
+def build_rig(backend: FakeBackend, fk_joint_rotate: tuple[float, float, float] = (0.0, 0.0, 0.0)) -> tuple[MatchInfo, RigSwitch]:
+    """IK状態ではIKジョイントに、FK状態ではFKコントローラーの子のFKジョイントに追従するジョイントを持つリグを作成する"""
+    root = backend.create_node("rig")
+    switch = backend.create_node("switch", parent=root)
+    backend.set_attr(switch, "fkIk", 1.0)
+    fk_ctrl = backend.create_node("fk_ctrl", parent=root)
+    fk_joint = backend.create_node("fk_joint", parent=fk_ctrl, node_type="joint", rotate=fk_joint_rotate)
+    ik_joint = backend.create_node("ik_joint", parent=root, node_type="joint")
+    backend.set_keyframes(ik_joint, "rotateX", FRAMES, IK_ROTATIONS)
+    joint = backend.create_node("joint", parent=root, node_type="joint")
+    backend.constrain(joint, ik_joint, f"{switch}.fkIk", 1.0)
+    backend.constrain(joint, fk_joint, f"{switch}.fkIk", 0.0)
+    return MatchInfo(joint=joint, fk_ctrl=fk_ctrl, type=RotateType.FFF), RigSwitch("|rig", switch, "fkIk", 1.0)
+
+
+def test_verify_compares_fk_pose_with_ik_pose(backend: FakeBackend) -> None:
+    info, switch = build_rig(backend)
+    app = MatchFKToIK(match_infos=MatchInfos())
+    backend.set_keyframes(info.fk_ctrl, "rotateX", FRAMES, IK_ROTATIONS)
+
+    report = app.verify([info], FRAMES[0], FRAMES[-1], switches=[switch])
+    assert report.passed
+    assert not report.self_consistency_only
+    assert backend.get_attr(switch.node, "fkIk") == 1.0
+    assert not backend.undo_queue
+
+    # FKコントローラーが合っていなければ、FK状態のジョイントがIK状態からずれる
+    backend.set_keyframes(info.fk_ctrl, "rotateX", FRAMES, [-value for value in IK_ROTATIONS])
+    report = app.verify([info], FRAMES[0], FRAMES[-1], switches=[switch])
+    assert report.failed_rows.tolist() == [True]
+    assert report.max_angle_error > 100.0
+    assert backend.get_attr(switch.node, "fkIk") == 1.0
+
+
+def test_verify_without_switch_is_self_consistency_only(backend: FakeBackend) -> None:
+    info, _ = build_rig(backend)
+    app = MatchFKToIK(match_infos=MatchInfos())
+    app.bake([info], FRAMES[0], FRAMES[-1])
+
+    report = app.verify([info], FRAMES[0], FRAMES[-1], switches=[])
+    assert not report.failed_rows.any()
+    assert report.self_consistency_only
+    assert not report.passed
+    assert report.to_dict()["self_consistency_rows"] == 1
+    assert "self-consistency only" in report.summary()
+
+
+def test_verify_detects_settings_that_are_only_self_consistent(backend: FakeBackend) -> None:
+    # FKジョイントの軸の向きがFKコントローラーと違うのに、オフセットを設定していないリグ
+    info, switch = build_rig(backend, fk_joint_rotate=(0.0, 0.0, 90.0))
+    app = MatchFKToIK(match_infos=MatchInfos())
+    app.bake([info], FRAMES[0], FRAMES[-1])
+
+    assert not app.verify([info], FRAMES[0], FRAMES[-1], switches=[]).failed_rows.any()
+    report = app.verify([info], FRAMES[0], FRAMES[-1], switches=[switch])
+    assert report.failed_rows.tolist() == [True]
+    assert report.max_angle_error == pytest.approx(90.0)
+
+
+def test_verify_reports_position_error_in_scene_unit(backend: FakeBackend) -> None:
+    backend.unit = "m"
+    info, switch = build_rig(backend)
+    backend.set_keyframes(info.fk_ctrl, "rotateX", FRAMES, IK_ROTATIONS)
+    backend.set_attr(info.fk_ctrl, "translateY", 0.5)
+
+    report = MatchFKToIK(match_infos=MatchInfos()).verify([info], FRAMES[0], FRAMES[-1], switches=[switch])
+    assert report.max_position_error == pytest.approx(0.5)